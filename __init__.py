@@ -2,7 +2,17 @@
 
 Helper Functions
 ----------------
-- get_library(dll_path:str,source_path:str="", compile:bool=False) -> CDLL: Get's the DLL specified, will compile if not found and flag is specified
+- get_library(dll_path:str,source_path:str="", compile:bool=False, backend:str="", cdef:str="", build_flags:list[str]|None=None, pgo_profile:str="") -> CDLL: Get's the DLL specified, will compile if not found and flag is specified
+- build_library(dll_path:str, source_path:str, build_flags:list[str]|None=None, pgo_profile:str=""): Builds (or rebuilds) a shared library with go build
+- build_with_pgo(dll_path:str, source_path:str, workload, profile_path:str="", build_flags:list[str]|None=None) -> str: Builds a library, profiles a workload using it, and rebuilds it with profile-guided optimization
+- profile_library(dll_path:str, workload, profile_path:str) -> str: CPU profiles the Go code in a library while a python workload uses it (in a subprocess)
+- DEFAULT_BUILD_FLAGS: The flags passed to go build unless build_flags is passed (-ldflags=-s -w)
+- BACKEND: The FFI backend in use ("ctypes" or "cffi"), set with the CGO_HELPERS_BACKEND environment variable before import
+
+Threads
+-------
+Every function is safe to call from many threads (including on free-threaded python), the library is loaded lazily on first use.
+Each result from Go is owned by the thread that got it, and must be passed to exactly one *_result_to_list() or free_*() call.
 
 Converting to ctypes
 --------------------
@@ -10,6 +20,16 @@ Converting to ctypes
 - prepare_string_array(data:list[str|bytes]) -> tuple[Array[c_char_p], int]: Takes in a string list, and converts it to a C-compatible array
 - prepare_int_array(data:list[int]) -> tuple[Array[c_int], int]: Takes in a int list, and converts it to a C-compatible array
 - prepare_float_array(data:list[float]) -> tuple[Array[c_float], int]: Takes in a float list, and converts it to a C-compatible array
+- prepare_int64_array(data:list[int]) -> tuple[Array[c_int64], int]: Takes in an int list, and converts it to a C-compatible array of 64-bit integers
+- prepare_double_array(data:list[float]) -> tuple[Array[c_double], int]: Takes in a float list, and converts it to a C-compatible array of doubles
+- prepare_bool_array(data:list[bool]) -> tuple[Array[c_ubyte], int]: Takes in a bool list, and converts it to a bit-packed C-compatible array (8 values per byte, least significant bit first)
+- prepare_uint8_array(data:list[int]) -> tuple[Array[c_uint8], int]: Takes in an int list, and converts it to a C-compatible array of uint8_t (0 to 255)
+- prepare_int8_array(data:list[int]) -> tuple[Array[c_int8], int]: Takes in an int list, and converts it to a C-compatible array of int8_t (-128 to 127)
+- prepare_int16_array(data:list[int]) -> tuple[Array[c_int16], int]: Takes in an int list, and converts it to a C-compatible array of int16_t (-32,768 to 32,767)
+- prepare_bytes_array(data:list[bytes|bytearray|memoryview]) -> tuple[Array[c_char_p], Array[c_longlong], int]: Takes in binary blobs, and converts them to a C-compatible array of pointers plus lengths (bytes items aren't copied)
+- prepare_nullable_int_array(data:list[int|None]) -> tuple[Array[c_int], Array[c_ubyte]|None, int]: Takes in a list of ints and Nones, and converts it to a C-compatible int array plus a validity bitmap (None if nothing is missing)
+- prepare_nullable_float_array(data:list[float|None]) -> tuple[Array[c_float], Array[c_ubyte]|None, int]: Takes in a list of floats and Nones, and converts it to a C-compatible float array plus a validity bitmap (None if nothing is missing)
+- prepare_nullable_string_array(data:list[str|bytes|None]) -> tuple[Array[c_char_p], Array[c_ubyte]|None, int]: Takes in a list of strings and Nones, and converts it to a C-compatible string array (missing strings are NULL) plus a validity bitmap
 
 Converting from ctypes
 ----------------------
@@ -17,6 +37,24 @@ Converting from ctypes
 - string_array_result_to_list(pointer:_CStringArrayResult) -> list[str]: 
 - int_array_result_to_list(pointer: _CIntArrayResult) -> list[int]: 
 - float_array_result_to_list(pointer: _CFloatArrayResult) -> list[float]: 
+- int64_array_result_to_list(pointer: _CInt64ArrayResult) -> list[int]: Converts C int64 result struct to a Python list, and frees memory
+- double_array_result_to_list(pointer: _CDoubleArrayResult) -> list[float]: Converts C double result struct to a Python list, and frees memory
+- bool_array_result_to_list(pointer: _CBoolArrayResult) -> list[bool]: Converts bit-packed C bool result struct to a Python list of bools, and frees memory
+- uint8_array_result_to_list(pointer: _CUint8ArrayResult) -> list[int]: Converts C uint8 result struct to a Python list, and frees memory
+- int8_array_result_to_list(pointer: _CInt8ArrayResult) -> list[int]: Converts C int8 result struct to a Python list, and frees memory
+- int16_array_result_to_list(pointer: _CInt16ArrayResult) -> list[int]: Converts C int16 result struct to a Python list, and frees memory
+- bytes_array_result_to_list(pointer: _CBytesArrayResult, copy:bool=False) -> list[memoryview]: Converts C bytes result struct to read-only memoryviews over Go's memory (no decoding or copies), freed once the views are gone. copy=True does one bulk copy and frees straight away
+- nullable_int_array_result_to_list(pointer: _CNullableIntArrayResult) -> list[int|None]: Converts C nullable int result struct to a Python list (None for missing values), and frees memory
+- nullable_float_array_result_to_list(pointer: _CNullableFloatArrayResult) -> list[float|None]: Converts C nullable float result struct to a Python list (None for missing values), and frees memory
+- nullable_string_array_result_to_list(pointer: _CNullableStringArrayResult) -> list[str|None]: Converts C nullable string result struct to a Python list (None for missing strings), and frees memory
+
+Batched calls
+-------------
+- batch_call(function, data:list, input_type:type=str, output_type:type=str, library=None) -> list: Runs a batched Go export over many small inputs in a single FFI call, instead of one call per item
+
+Streaming results
+-----------------
+- stream_results(function, *args, output_type:type=str, callback=None, max_buffered_chunks:int=4) -> Any | Iterator[list]: Calls a streaming Go export (built with a ResultStream), handing each chunk of results to callback, or yielding them from an iterator, as soon as Go produces them
 
 Debugging Functions
 -------------------
@@ -24,38 +62,196 @@ Debugging Functions
 - return_string_array(c_array:CStringArray, number_of_elements:int) ->list[str]: Debugging function that shows you the Go representation of a C array and returns the python list version (does not free)
 - return_int_array(c_array: CIntArray, number_of_elements: int) -> list[int]: Debugging function that shows you the Go representation of a C int array and returns a Python list
 - return_float_array(c_array: CFloatArray, number_of_elements: int) -> list[float]: Debugging function that shows you the Go representation of a C float array and returns a Python list
+- return_int64_array(c_array: CInt64Array, number_of_elements: int) -> list[int]: Debugging function that shows you the Go representation of a C int64 array and returns a Python list
+- return_double_array(c_array: CDoubleArray, number_of_elements: int) -> list[float]: Debugging function that shows you the Go representation of a C double array and returns a Python list
+- return_bool_array(c_array: CBoolArray, number_of_elements: int) -> list[bool]: Debugging function that shows you the Go representation of a bit-packed C bool array and returns a Python list
+- return_uint8_array(c_array: CUint8Array, number_of_elements: int) -> list[int]: Debugging function that shows you the Go representation of a C uint8 array and returns a Python list
+- return_int8_array(c_array: CInt8Array, number_of_elements: int) -> list[int]: Debugging function that shows you the Go representation of a C int8 array and returns a Python list
+- return_int16_array(c_array: CInt16Array, number_of_elements: int) -> list[int]: Debugging function that shows you the Go representation of a C int16 array and returns a Python list
+- return_nullable_int_array(c_array: CIntArray, validity: CValidityArray|None, number_of_elements: int) -> list[int|None]: Debugging function that shows you the Go representation of a nullable C int array and returns a Python list
+- return_nullable_float_array(c_array: CFloatArray, validity: CValidityArray|None, number_of_elements: int) -> list[float|None]: Debugging function that shows you the Go representation of a nullable C float array and returns a Python list
+- return_nullable_string_array(c_array: CStringArray, validity: CValidityArray|None, number_of_elements: int) -> list[str|None]: Debugging function that shows you the Go representation of a nullable C string array and returns a Python list
+- return_handle_string_array(handle:GoHandle|int) -> list[str]: Debugging function that downloads the strings behind a handle from upload_string_array()
+- return_handle_int_array(handle:GoHandle|int) -> list[int]: Debugging function that downloads the integers behind a handle from upload_int_array()
+- return_handle_float_array(handle:GoHandle|int) -> list[float]: Debugging function that downloads the floats behind a handle from upload_float_array()
+- handle_string_lengths(handle:GoHandle|int) -> list[int]: Debugging function that gets the byte length of every string behind a handle, like return_string_lengths() without re-sending the strings
+- stream_string_array(data:list[str|bytes], chunk_size:int=1024, callback=None, max_buffered_chunks:int=4) -> int | Iterator[list[str]]: Debugging function that streams a string array back from Go in chunks, useful to check streaming works
+- stream_int_array(data:list[int], chunk_size:int=1024, callback=None, max_buffered_chunks:int=4) -> int | Iterator[list[int]]: Debugging function that streams an int array back from Go in chunks, useful to check streaming works
+- return_string_lengths(data:list[str|bytes]) -> list[int]: Debugging function that gets the byte length of every string in one batched call, useful to check batching works
+- return_bytes_array(data:list[bytes|bytearray|memoryview]) -> list[memoryview]: Debugging function that sends binary blobs through Go and back, useful to check binary data survives untouched
+- msgpack_roundtrip(value) -> object: Debugging function that sends a nested value through Go as msgpack and back, useful to check the wire format
+- msgpack_records_roundtrip(records:list[dict]) -> list[dict]: Debugging function that decodes records into Go structs and back, an example of decoding msgpack into typed values
+- json_roundtrip(value) -> object: Debugging function that sends a nested value through Go as JSON and back, the baseline msgpack_roundtrip() is compared to
 - print_string(text: str | bytes): Prints a string's go representation, useful to look for encoding issues
 - print_string_array(data:list[str|bytes]): Prints a string array's go representation, useful to look for encoding issues
 - print_int_array(data:list[int]): Prints a int array's go representation, useful to look for rounding/conversion issues
 - print_float_array(data:list[float]): Prints a float array's go representation, useful to look for rounding/conversion issues
 
+Buffer Pool
+-----------
+- enable_buffer_pool(enabled:bool=True, max_retained_bytes:int=256MB): Turns Go's pooled allocator for returned buffers on or off
+- trim_buffer_pool() -> int: Releases every buffer retained by the pool back to libc
+- buffer_pool_stats() -> dict[str, int]: Gets the buffer pool's hits, misses and retained memory
+
+Go Runtime
+----------
+- go_memory_stats() -> dict[str, int|float]: Gets Go's heap and GC pause statistics, and the number of buffers (and bytes) handed to C that haven't been freed yet
+- set_gomaxprocs(procs:int=0) -> int: Sets the number of threads that can run Go code at once (GOMAXPROCS), returns the previous value
+- set_gc_percent(percent:int) -> int: Sets Go's GC target percentage (GOGC, negative turns it off), returns the previous value
+- set_memory_limit(limit:int=-1) -> int: Sets Go's soft memory limit in bytes (GOMEMLIMIT), returns the previous value
+- NO_MEMORY_LIMIT: The memory limit that means no limit (math.MaxInt64)
+- container_limits(root:str="/sys/fs/cgroup", proc_file:str="/proc/self/cgroup") -> dict[str, float|int|None]: Reads the container's (cgroup v1 or v2) CPU quota and memory limit
+- tune_go_runtime(memory_fraction:float=0.5, cpu_fraction:float=1.0, root:str="/sys/fs/cgroup", proc_file:str="/proc/self/cgroup") -> dict[str, int|None]: Fits GOMAXPROCS and Go's memory limit to the container
+
+Profiling
+---------
+- start_cpu_profile(path:str): Starts writing a CPU profile of the Go code in the library to a file (i.e. default.pgo)
+- stop_cpu_profile(): Stops the running CPU profile and writes it to its file
+- write_profile(name:str, path:str): Writes a snapshot profile ("heap", "allocs", "goroutine", "threadcreate", "block" or "mutex") to a file
+- start_trace(path:str): Starts writing an execution trace (runtime/trace) of the Go code in the library to a file
+- stop_trace(): Stops the running execution trace and writes it to its file
+- capture_trace(path:str, seconds:float): Traces everything the library does for a time window, blocking until it's over
+- go_profile(directory:str, cpu:bool=True, trace:bool=False, profiles:tuple[str, ...]=("heap", "allocs", "goroutine")): Context manager that profiles the Go side while a block runs
+
+Handles
+-------
+- upload_string_array(data:list[str|bytes]) -> GoHandle: Copies a string list into Go once, and returns a handle to pass to later calls instead of re-sending it
+- upload_int_array(data:list[int]) -> GoHandle: Copies an int list into Go once, and returns a handle to pass to later calls instead of re-sending it
+- upload_float_array(data:list[float]) -> GoHandle: Copies a float list into Go once, and returns a handle to pass to later calls instead of re-sending it
+- GoHandle(handle:int): An opaque handle to data kept in Go, with release(), released, nbytes, and context manager support (released on exit, or once garbage collected)
+- handle_stats() -> dict[str, int]: Gets the number of live handles, the approximate memory they hold in Go, and the number of uploads/releases
+
+Decorated functions
+-------------------
+- go_function(library=None, name:str="", cache:GoCache|None=None): Decorator that turns a type hinted python stub (i.e. def score(words: list[str], weights: list[float]) -> list[float]) into a call to the Go export with the same name, converting the arguments and converting/freeing the result
+
+Caching
+-------
+- GoCache(max_bytes:int=64MB, ttl:float=0, max_entries:int=0): Opt-in LRU/TTL memoization cache for pure exports with a byte budget, used as a decorator or go_function(cache=...), with stats() and clear()
+- invalidate_caches(): Clears every GoCache, called by get_library() whenever it loads a library
+
+Msgpack
+-------
+- encode_msgpack(value) -> bytes: Encodes a nested python value (None, bool, int, float, str, bytes, list, tuple and dict) as msgpack, a compact binary format Go decodes straight into structs, maps and slices
+- decode_msgpack(data:bytes|bytearray|memoryview) -> object: Decodes a msgpack value (i.e. one from MsgpackMarshal() in Go)
+- prepare_msgpack(value) -> tuple[c_char_p, int]: Encodes a value as msgpack, ready to pass to a Go function taking the data and its length
+- msgpack_result_to_object(pointer: _CBytesArrayResult) -> object: Decodes the msgpack value returned by ValueToCMsgpack() in Go, and frees memory
+
 Freeing Functions
 -----------------
-- free_c_string(ptr: c_char_p): Frees a single C string returned from Go (allocated via C.CString).
+- free_c_string(ptr: c_char_p): Frees a single C string returned from Go (allocated via StringToCString() or C.CString).
 - free_string_array(ptr: CStringArray, count: int): Frees an array of C strings returned from Go.
 - free_int_array(ptr: CIntArray): Frees a C int array returned from Go.
 - free_float_array(ptr: CFloatArray): Frees a C float array returned from Go.
 - free_string_array_result(ptr: _CStringArrayResult): Frees a StringArrayResult (including the array of strings and struct itself).
 - free_int_array_result(ptr: _CIntArrayResult): Frees an IntArrayResult (including the array and the struct itself).
 - free_float_array_result(ptr: _CFloatArrayResult): Frees a FloatArrayResult (including the array and the struct itself).
+- free_int64_array(ptr: CInt64Array): Frees a C int64 array returned from Go.
+- free_double_array(ptr: CDoubleArray): Frees a C double array returned from Go.
+- free_int64_array_result(ptr: _CInt64ArrayResult): Frees an Int64ArrayResult (including the array and the struct itself).
+- free_double_array_result(ptr: _CDoubleArrayResult): Frees a DoubleArrayResult (including the array and the struct itself).
+- free_bool_array_result(ptr: _CBoolArrayResult): Frees a BoolArrayResult (including the array and the struct itself).
+- free_uint8_array_result(ptr: _CUint8ArrayResult): Frees a Uint8ArrayResult (including the array and the struct itself).
+- free_int8_array_result(ptr: _CInt8ArrayResult): Frees a Int8ArrayResult (including the array and the struct itself).
+- free_int16_array_result(ptr: _CInt16ArrayResult): Frees a Int16ArrayResult (including the array and the struct itself).
+- free_bytes_array_result(ptr: _CBytesArrayResult): Frees a BytesArrayResult (including the offsets, data and the struct itself).
+- free_nullable_int_array_result(ptr: _CNullableIntArrayResult): Frees a NullableIntArrayResult (including the array, the validity and the struct itself).
+- free_nullable_float_array_result(ptr: _CNullableFloatArrayResult): Frees a NullableFloatArrayResult (including the array, the validity and the struct itself).
+- free_nullable_string_array_result(ptr: _CNullableStringArrayResult): Frees a NullableStringArrayResult (including the strings, the validity and the struct itself).
 """
 import os
 from platform import platform
 
 # Exported functions
 from .lib import (
+    BACKEND,
     get_library,
+    build_library,
+    build_with_pgo,
+    profile_library,
+    DEFAULT_BUILD_FLAGS,
     prepare_string,
     prepare_string_array,
     prepare_int_array,
     prepare_float_array,
+    prepare_int64_array,
+    prepare_double_array,
+    prepare_bool_array,
+    prepare_uint8_array,
+    prepare_int8_array,
+    prepare_int16_array,
+    prepare_bytes_array,
+    prepare_nullable_int_array,
+    prepare_nullable_float_array,
+    prepare_nullable_string_array,
     string_array_result_to_list,
     int_array_result_to_list,
     float_array_result_to_list,
+    int64_array_result_to_list,
+    double_array_result_to_list,
+    bool_array_result_to_list,
+    uint8_array_result_to_list,
+    int8_array_result_to_list,
+    int16_array_result_to_list,
+    bytes_array_result_to_list,
+    nullable_int_array_result_to_list,
+    nullable_float_array_result_to_list,
+    nullable_string_array_result_to_list,
+    batch_call,
+    stream_results,
     return_string,
     return_string_array,
     return_int_array,
     return_float_array,
+    return_int64_array,
+    return_double_array,
+    return_handle_string_array,
+    return_handle_int_array,
+    return_handle_float_array,
+    handle_string_lengths,
+    stream_string_array,
+    stream_int_array,
+    return_string_lengths,
+    return_bool_array,
+    return_uint8_array,
+    return_int8_array,
+    return_int16_array,
+    return_bytes_array,
+    msgpack_roundtrip,
+    msgpack_records_roundtrip,
+    json_roundtrip,
+    return_nullable_int_array,
+    return_nullable_float_array,
+    return_nullable_string_array,
+    enable_buffer_pool,
+    trim_buffer_pool,
+    buffer_pool_stats,
+    go_memory_stats,
+    set_gomaxprocs,
+    set_gc_percent,
+    set_memory_limit,
+    NO_MEMORY_LIMIT,
+    container_limits,
+    tune_go_runtime,
+    start_cpu_profile,
+    stop_cpu_profile,
+    write_profile,
+    start_trace,
+    stop_trace,
+    capture_trace,
+    go_profile,
+    GoHandle,
+    upload_string_array,
+    upload_int_array,
+    upload_float_array,
+    handle_stats,
+    go_function,
+    GoCache,
+    invalidate_caches,
+    encode_msgpack,
+    decode_msgpack,
+    prepare_msgpack,
+    msgpack_result_to_object,
     print_string,
     print_string_array,
     print_int_array,
@@ -67,6 +263,18 @@ from .lib import (
     free_string_array_result,
     free_int_array_result,
     free_float_array_result,
+    free_int64_array,
+    free_double_array,
+    free_int64_array_result,
+    free_double_array_result,
+    free_bool_array_result,
+    free_uint8_array_result,
+    free_int8_array_result,
+    free_int16_array_result,
+    free_bytes_array_result,
+    free_nullable_int_array_result,
+    free_nullable_float_array_result,
+    free_nullable_string_array_result,
 )
 
 # Check if library exists, and if it doesn't compile it
@@ -0,0 +1,416 @@
+"""Benchmarks for the python side of the helper library
+
+Usage
+-----
+Run every benchmark with:
+
+```bash
+python benchmark.py
+```
+
+Or a single one by name (i.e. `python benchmark.py backends`)
+"""
+import os
+import sys
+import json
+import random
+import timeit
+import threading
+import tempfile
+import subprocess
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+def _time_call(function, number:int, repeat:int=5) -> float:
+    """Times a function, returning the best time per call in microseconds"""
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1_000_000
+
+def _print_table(title:str, header:list[str], rows:list[list]):
+    """Prints results as a simple aligned table"""
+    print(f"\n{title}")
+    widths = [max(len(str(item)) for item in column) for column in zip(header, *rows)]
+    for row in [header, *rows]:
+        print("  ".join(str(item).ljust(width) for item, width in zip(row, widths)))
+
+# ========== FFI backends ==========
+def _backend_worker():
+    """Runs in a subprocess with CGO_HELPERS_BACKEND set, since the backend is picked at import"""
+    import lib as helpers
+    results = {"backend": helpers.BACKEND}
+    for size_name, size in (("small", 10), ("large", 100_000)):
+        number = 20_000 if size_name == "small" else 20
+        ints = [random.randint(-1000, 1000) for _ in range(size)]
+        floats = [random.uniform(-1000, 1000) for _ in range(size)]
+        strings = [random.choice(["Lorem", "ipsum", "dolor", "sit", "amet"]) for _ in range(size)]
+
+        def int_round_trip():
+            c_array, number_of_items = helpers.prepare_int_array(ints)
+            helpers.int_array_result_to_list(helpers.lib.return_int_array(c_array, number_of_items))
+
+        def float_round_trip():
+            c_array, number_of_items = helpers.prepare_float_array(floats)
+            helpers.float_array_result_to_list(helpers.lib.return_float_array(c_array, number_of_items))
+
+        def string_round_trip():
+            c_array, number_of_items = helpers.prepare_string_array(strings)
+            helpers.string_array_result_to_list(helpers.lib.return_string_array(c_array, number_of_items))
+
+        results[size_name] = {
+            "prepare_int_array": _time_call(lambda: helpers.prepare_int_array(ints), number),
+            "prepare_string_array": _time_call(lambda: helpers.prepare_string_array(strings), number),
+            "int round trip": _time_call(int_round_trip, number),
+            "float round trip": _time_call(float_round_trip, number),
+            "string round trip": _time_call(string_round_trip, number),
+        }
+    print(json.dumps(results))
+
+def benchmark_backends():
+    """Compares the ctypes and cffi backends on small (10 item) and large (100k item) payloads"""
+    results = {}
+    for backend in ("ctypes", "cffi"):
+        environment = {**os.environ, "CGO_HELPERS_BACKEND": backend}
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "_backend_worker"],
+            env=environment, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if result["backend"] != backend:
+            print(f"\nSkipping {backend} backend, it is not installed")
+            continue
+        results[backend] = result
+
+    for size_name in ("small", "large"):
+        operations = list(results["ctypes"][size_name])
+        rows = [
+            [operation, *(f"{results[backend][size_name][operation]:.2f}" for backend in results)]
+            for operation in operations
+        ]
+        _print_table(f"FFI backends, {size_name} payloads (us per call)", ["operation", *results], rows)
+
+# ========== Threads ==========
+def _threaded_throughput(function, threads:int, calls_per_thread:int) -> float:
+    """Runs function from several threads at once, returning the total calls per second"""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(calls_per_thread):
+            function()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = timeit.default_timer()
+    for thread in workers:
+        thread.join()
+    return threads * calls_per_thread / (timeit.default_timer() - started)
+
+def benchmark_threads(max_threads:int=0):
+    """Calls the round trip functions from 1 to N threads at once (N is the number of cores by default)
+
+    On free-threaded python (3.13t+) both the python and Go side of a call run in parallel, with the GIL only the Go side can
+    """
+    import lib as helpers
+    max_threads = max_threads or os.cpu_count() or 1
+    thread_counts = sorted({2 ** power for power in range(max_threads.bit_length()) if 2 ** power <= max_threads} | {max_threads})
+    gil_enabled = sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True
+
+    for size_name, size, calls_per_thread in (("small", 10, 5_000), ("large", 100_000, 10)):
+        ints = [random.randint(-1000, 1000) for _ in range(size)]
+        strings = [random.choice(["Lorem", "ipsum", "dolor", "sit", "amet"]) for _ in range(size)]
+
+        def int_round_trip():
+            c_array, number_of_items = helpers.prepare_int_array(ints)
+            helpers.int_array_result_to_list(helpers.lib.return_int_array(c_array, number_of_items))
+
+        def string_round_trip():
+            c_array, number_of_items = helpers.prepare_string_array(strings)
+            helpers.string_array_result_to_list(helpers.lib.return_string_array(c_array, number_of_items))
+
+        int_round_trip(), string_round_trip() # Load the library before timing
+        rows = []
+        baselines = {}
+        for threads in thread_counts:
+            row = [threads]
+            for name, function in (("int", int_round_trip), ("string", string_round_trip)):
+                throughput = _threaded_throughput(function, threads, calls_per_thread)
+                baselines.setdefault(name, throughput)
+                row += [f"{throughput:,.0f}", f"{throughput / baselines[name]:.2f}x"]
+            rows.append(row)
+        _print_table(
+            f"Thread scaling, {size_name} payloads ({size:,} items, GIL {'enabled' if gil_enabled else 'disabled'}, calls per second)",
+            ["threads", "int round trip", "speedup", "string round trip", "speedup"],
+            rows,
+        )
+
+# ========== Binary data ==========
+def benchmark_bytes():
+    """Compares returning binary blobs as memoryviews (zero-copy and bulk copy) against the string array path"""
+    import lib as helpers
+    rows = []
+    for number_of_items, item_size, number in ((1_000, 64, 500), (1_000, 16 * 1024, 20), (10, 4 * 1024 * 1024, 10)):
+        blobs = [random.randbytes(item_size) for _ in range(number_of_items)]
+        text = [blob.hex()[:item_size] for blob in blobs] # Strings can't hold NUL bytes, so compare against text of the same size
+        c_array, lengths, number_of_items = helpers.prepare_bytes_array(blobs)
+        c_strings, number_of_strings = helpers.prepare_string_array(text)
+
+        def views():
+            helpers.bytes_array_result_to_list(helpers.lib.return_bytes_array(c_array, lengths, number_of_items))
+
+        def bulk_copy():
+            helpers.bytes_array_result_to_list(helpers.lib.return_bytes_array(c_array, lengths, number_of_items), copy=True)
+
+        def strings():
+            helpers.string_array_result_to_list(helpers.lib.return_string_array(c_strings, number_of_strings))
+
+        megabytes = number_of_items * item_size / 1024 / 1024
+        rows.append([
+            f"{number_of_items:,} x {item_size:,}B",
+            *(f"{megabytes / (_time_call(function, number, repeat=3) / 1_000_000):,.0f}" for function in (views, bulk_copy, strings)),
+        ])
+    _print_table("Binary round trips (MB per second)", ["payload", "memoryviews", "bulk copy", "string array"], rows)
+
+# ========== Compact types ==========
+def benchmark_compact():
+    """Compares sending a 1M item filter mask and small codes as bit-packed bools/uint8 against int arrays"""
+    import lib as helpers
+    size = 1_000_000
+    mask = [random.random() < 0.5 for _ in range(size)]
+    codes = [random.randint(0, 255) for _ in range(size)]
+
+    def round_trip(prepare, function, to_list, data):
+        c_array, number_of_items = prepare(data)
+        return lambda: to_list(function(c_array, number_of_items))
+
+    rows = []
+    for name, prepare, function, to_list, data in (
+        ("mask as int", helpers.prepare_int_array, helpers.lib.return_int_array, helpers.int_array_result_to_list, mask),
+        ("mask as bool", helpers.prepare_bool_array, helpers.lib.return_bool_array, helpers.bool_array_result_to_list, mask),
+        ("codes as int", helpers.prepare_int_array, helpers.lib.return_int_array, helpers.int_array_result_to_list, codes),
+        ("codes as uint8", helpers.prepare_uint8_array, helpers.lib.return_uint8_array, helpers.uint8_array_result_to_list, codes),
+    ):
+        c_array, _ = prepare(data)
+        rows.append([
+            name,
+            f"{len(bytes(c_array)):,}",
+            f"{_time_call(lambda: prepare(data), 5, repeat=3) / 1000:,.1f}",
+            f"{_time_call(round_trip(prepare, function, to_list, data), 5, repeat=3) / 1000:,.1f}",
+        ])
+    _print_table(f"Compact types, {size:,} items", ["payload", "bytes sent", "prepare (ms)", "round trip (ms)"], rows)
+
+# ========== Streaming ==========
+def benchmark_streaming():
+    """Compares building a 1M string result in one go against streaming it in chunks, by time to the first result and in total"""
+    import lib as helpers
+    size = 1_000_000
+    data = [f"match {i}" for i in range(size)]
+    c_array, number_of_items = helpers.prepare_string_array(data)
+
+    def whole(on_first):
+        result = helpers.string_array_result_to_list(helpers.lib.return_string_array(c_array, number_of_items))
+        on_first()
+        return len(result)
+
+    def iterator(on_first, chunk_size):
+        chunks = helpers.stream_results(helpers.lib.stream_string_array, c_array, number_of_items, chunk_size)
+        total = len(next(chunks))
+        on_first()
+        return total + sum(map(len, chunks))
+
+    def callback(on_first, chunk_size):
+        counts = []
+        def on_chunk(chunk):
+            if not counts:
+                on_first()
+            counts.append(len(chunk))
+        helpers.stream_results(helpers.lib.stream_string_array, c_array, number_of_items, chunk_size, callback=on_chunk)
+        return sum(counts)
+
+    rows = []
+    for name, function in (
+        ("whole result", whole),
+        ("iterator, 1k chunks", lambda on_first: iterator(on_first, 1_000)),
+        ("iterator, 64k chunks", lambda on_first: iterator(on_first, 65_536)),
+        ("callback, 1k chunks", lambda on_first: callback(on_first, 1_000)),
+        ("callback, 64k chunks", lambda on_first: callback(on_first, 65_536)),
+    ):
+        best_first, best_total = float("inf"), float("inf")
+        for _ in range(3):
+            first = []
+            start = timeit.default_timer()
+            assert function(lambda: first.append(timeit.default_timer())) == size
+            best_total = min(best_total, timeit.default_timer() - start)
+            best_first = min(best_first, first[0] - start)
+        rows.append([name, f"{best_first * 1000:,.2f}", f"{best_total * 1000:,.1f}"])
+    _print_table(f"Streaming {size:,} strings", ["path", "first result (ms)", "total (ms)"], rows)
+
+# ========== Handles ==========
+def benchmark_handles():
+    """Compares querying a resident 10k string dataset through a handle against re-sending it on every call"""
+    import lib as helpers
+    rows = []
+    for number_of_items in (100, 10_000):
+        data = [f"reference item {i}" for i in range(number_of_items)]
+        c_array, number_of_strings = helpers.prepare_string_array(data)
+        handle = helpers.upload_string_array(data)
+        number = max(10, 1_000_000 // number_of_items)
+
+        re_send = _time_call(lambda: helpers.return_string_lengths(data), number, repeat=3)
+        re_send_prepared = _time_call(lambda: helpers.int_array_result_to_list(helpers.lib.return_string_lengths(c_array, number_of_strings)), number, repeat=3)
+        resident = _time_call(lambda: helpers.handle_string_lengths(handle), number, repeat=3)
+        rows.append([f"{number_of_items:,}", f"{re_send:,.1f}", f"{re_send_prepared:,.1f}", f"{resident:,.1f}", f"{handle.nbytes:,}"])
+        handle.release()
+    _print_table("Querying a string dataset (us per query)", ["items", "re-send", "re-send (prepared once)", "handle", "handle bytes"], rows)
+
+# ========== Decorated functions ==========
+def benchmark_go_function():
+    """Compares calls through a @go_function stub against the same calls written by hand with prepare_*/*_result_to_list"""
+    import lib as helpers
+
+    @helpers.go_function()
+    def return_string_lengths(data: list[str]) -> list[int]: ...
+
+    @helpers.go_function()
+    def return_int_array(data: list[int]) -> list[int]: ...
+
+    def hand_written_lengths(data):
+        c_array, number_of_items = helpers.prepare_string_array(data)
+        return helpers.int_array_result_to_list(helpers.lib.return_string_lengths(c_array, number_of_items))
+
+    def hand_written_ints(data):
+        c_array, number_of_items = helpers.prepare_int_array(data)
+        return helpers.int_array_result_to_list(helpers.lib.return_int_array(c_array, number_of_items))
+
+    rows = []
+    for size, number in ((1, 20_000), (10, 20_000), (10_000, 100)):
+        strings = [random.choice(["Lorem", "ipsum", "dolor", "sit", "amet"]) for _ in range(size)]
+        ints = [random.randint(-1000, 1000) for _ in range(size)]
+        for name, data, hand_written, decorated in (("string lengths", strings, hand_written_lengths, return_string_lengths), ("int round trip", ints, hand_written_ints, return_int_array)):
+            assert decorated(data) == hand_written(data)
+            by_hand = _time_call(lambda: hand_written(data), number)
+            through_plan = _time_call(lambda: decorated(data), number)
+            rows.append([f"{name} ({size:,})", f"{by_hand:,.2f}", f"{through_plan:,.2f}", f"{through_plan - by_hand:+,.2f}"])
+    _print_table(f"@go_function overhead, {helpers.BACKEND} (us per call)", ["call", "hand-written", "@go_function", "difference"], rows)
+
+# ========== Caching ==========
+def benchmark_cache():
+    """Compares a pure export called directly against a GoCache miss (hashing the input and storing the result) and hit"""
+    import lib as helpers
+    cache = helpers.GoCache()
+
+    @helpers.go_function(name="return_string_lengths")
+    def lengths(data: list[str]) -> list[int]: ...
+
+    @helpers.go_function(name="return_string_lengths", cache=cache)
+    def cached_lengths(data: list[str]) -> list[int]: ...
+
+    def miss(data):
+        cache.clear()
+        return cached_lengths(data)
+
+    rows = []
+    for size, number in ((10, 20_000), (1_000, 1_000), (100_000, 10)):
+        data = [random.choice(["Lorem", "ipsum", "dolor", "sit", "amet"]) + str(i) for i in range(size)]
+        uncached = _time_call(lambda: lengths(data), number)
+        missed = _time_call(lambda: miss(data), number)
+        cached_lengths(data)
+        hit = _time_call(lambda: cached_lengths(data), number)
+        rows.append([f"{size:,}", f"{uncached:,.1f}", f"{missed:,.1f}", f"{hit:,.1f}", f"{uncached / hit:,.1f}x"])
+    _print_table("GoCache on a pure export (us per call)", ["items", "uncached", "miss", "hit", "hit speedup"], rows)
+
+# ========== Msgpack ==========
+def benchmark_msgpack():
+    """Compares sending nested records through Go as msgpack against JSON, by encoded size and round trip time"""
+    import lib as helpers
+    rows = []
+    for size, number in ((10, 2_000), (1_000, 20), (10_000, 3)):
+        records = [
+            {"id": i, "name": f"item{i}", "active": i % 2 == 0, "scores": [i / 3, 0.5, -1.25], "tags": {"size": i % 7, "rank": i}}
+            for i in range(size)
+        ]
+        msgpack_size, json_size = len(helpers.encode_msgpack(records)), len(json.dumps(records).encode())
+        encode = _time_call(lambda: helpers.encode_msgpack(records), number)
+        decode = _time_call(lambda: helpers.decode_msgpack(helpers.encode_msgpack(records)), number) - encode
+        msgpack_time = _time_call(lambda: helpers.msgpack_roundtrip(records), number)
+        json_time = _time_call(lambda: helpers.json_roundtrip(records), number)
+        rows.append([
+            f"{size:,}", f"{msgpack_size:,}", f"{json_size:,}", f"{encode:,.1f}", f"{decode:,.1f}",
+            f"{msgpack_time:,.1f}", f"{json_time:,.1f}", f"{json_time / msgpack_time:,.2f}x",
+        ])
+    _print_table(
+        f"Nested records through Go and back, {'msgpack package' if helpers._msgpack else 'pure python'} codec (bytes, us per call)",
+        ["records", "msgpack bytes", "json bytes", "py encode", "py decode", "msgpack", "json", "msgpack speedup"],
+        rows,
+    )
+
+# ========== Profile-guided optimization ==========
+_PGO_STRINGS = [random.choice(["Lorem", "ipsum", "dolor", "sit", "amet", "世界"]) for _ in range(50_000)]
+_PGO_INTS = [random.randint(-1000, 1000) for _ in range(50_000)]
+
+def _pgo_operations(helpers) -> dict:
+    """The calls that are profiled, and then timed against both builds"""
+    string_array, number_of_strings = helpers.prepare_string_array(_PGO_STRINGS)
+    int_array, number_of_ints = helpers.prepare_int_array(_PGO_INTS)
+    return {
+        "string round trip": lambda: helpers.string_array_result_to_list(helpers.lib.return_string_array(string_array, number_of_strings)),
+        "string lengths": lambda: helpers.int_array_result_to_list(helpers.lib.return_string_lengths(string_array, number_of_strings)),
+        "int round trip": lambda: helpers.int_array_result_to_list(helpers.lib.return_int_array(int_array, number_of_ints)),
+    }
+
+def _pgo_workload():
+    """The representative workload profiled by build_with_pgo(), runs in a subprocess"""
+    import lib as helpers
+    for _ in range(50):
+        for operation in _pgo_operations(helpers).values():
+            operation()
+
+def _pgo_worker():
+    """Runs in a subprocess with CGO_HELPERS_BENCHMARK_LIBRARY set, since only one library can be loaded per process"""
+    import lib as helpers
+    helpers.dll_file = os.environ["CGO_HELPERS_BENCHMARK_LIBRARY"]
+    print(json.dumps({name: _time_call(operation, 20) for name, operation in _pgo_operations(helpers).items()}))
+
+def benchmark_pgo():
+    """Compares a plain build against one built with profile-guided optimization from a profile of _pgo_workload()
+
+    Builds both libraries into a temporary folder, so it needs go (1.21+) installed
+    """
+    import lib as helpers
+    source_path = os.path.join(os.path.abspath(os.path.dirname(__file__)), "lib.go")
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        libraries = {"default": os.path.join(folder, "default.so"), "pgo": os.path.join(folder, "pgo.so")}
+        helpers.build_library(libraries["default"], source_path, pgo_profile="off")
+        helpers.build_with_pgo(libraries["pgo"], source_path, _pgo_workload, profile_path=os.path.join(folder, "default.pgo"))
+        for build, library in libraries.items():
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "_pgo_worker"],
+                env={**os.environ, "CGO_HELPERS_BENCHMARK_LIBRARY": library}, capture_output=True, text=True, check=True,
+            ).stdout
+            results[build] = json.loads(output.strip().splitlines()[-1])
+
+    rows = [
+        [operation, f"{results['default'][operation]:,.1f}", f"{results['pgo'][operation]:,.1f}", f"{results['default'][operation] / results['pgo'][operation]:.2f}x"]
+        for operation in results["default"]
+    ]
+    _print_table(f"PGO build, {len(_PGO_STRINGS):,} items (us per call)", ["operation", "default", "pgo", "speedup"], rows)
+
+BENCHMARKS = {
+    "backends": benchmark_backends,
+    "threads": benchmark_threads,
+    "bytes": benchmark_bytes,
+    "compact": benchmark_compact,
+    "streaming": benchmark_streaming,
+    "handles": benchmark_handles,
+    "go_function": benchmark_go_function,
+    "cache": benchmark_cache,
+    "msgpack": benchmark_msgpack,
+    "pgo": benchmark_pgo,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1].startswith("_"):
+        globals()[sys.argv[1]]() # Internal subprocess workers
+    else:
+        for name in (sys.argv[1:] or BENCHMARKS):
+            BENCHMARKS[name]()
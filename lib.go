@@ -6,13 +6,60 @@
 //	CFloatArrayToSlice(cArray *C.float, length int) []float32{} // Converts a C array of floats to a slice of floats
 //	CIntArrayToSlice(cArray *C.int, length int) []int{} // Takes a C integer array and coverts it to an integer slice
 //	CStringArrayToSlice(cArray **C.char, numberOfStrings int) []string{} // Takes in an array of strings, and converts it to a slice of strings
+//	CBoolArrayToSlice(cArray *C.uchar, length int) []bool{} // Unpacks a bit-packed C bool array (LSB first) to a bool slice
+//	CUint8ArrayToSlice(cArray *C.uint8_t, length int) []uint8{} // Copies a C uint8_t array to a uint8 slice in one block
+//	CInt8ArrayToSlice(cArray *C.int8_t, length int) []int8{} // Copies a C int8_t array to an int8 slice in one block
+//	CInt16ArrayToSlice(cArray *C.int16_t, length int) []int16{} // Copies a C int16_t array to an int16 slice in one block
+//	CBytesArrayToSlice(cArray **C.uchar, lengths *C.longlong, numberOfElements int) [][]byte{} // Copies an array of binary blobs (with explicit lengths) to a slice of byte slices
+//	CInt32ArrayToSlice(cArray *C.int, length int) []int32{} // Copies a C int array to an int32 slice in one block
+//	CInt64ArrayToSlice(cArray *C.int64_t, length int) []int64{} // Copies a C int64_t array to an int64 slice in one block
+//	CFloat32ArrayToSlice(cArray *C.float, length int) []float32{} // Copies a C float array to a float32 slice in one block
+//	CFloat64ArrayToSlice(cArray *C.double, length int) []float64{} // Copies a C double array to a float64 slice in one block
+//
+// # Nullable arrays (a validity bitmap next to the data, bit i is set when value i is present, nil means nothing is missing)
+//
+//	NewValidity(length int) Validity{} // Make a validity bitmap with every value present
+//	(validity Validity) IsValid(i int) bool{} // Check if value i is present
+//	(validity Validity) SetValid(i int, valid bool){} // Mark value i as present or missing
+//	(validity Validity) AllValid(length int) bool{} // Fast check that no value is missing (8 bytes at a time)
+//	NullableInt32SliceToCArray(data []int32, validity Validity) *C.NullableIntArrayResult{} // Return a nullable int32 array as a C-Compatible array
+//	NullableFloat32SliceToCArray(data []float32, validity Validity) *C.NullableFloatArrayResult{} // Return a nullable float32 array as a C-Compatible array
+//	NullableStringSliceToCArray(data []string, validity Validity) *C.NullableStringArrayResult{} // Return a nullable string array as a C-Compatible array (missing strings are NULL)
+//	CNullableInt32ArrayToSlice(cArray *C.int, validity *C.uchar, length int) ([]int32, Validity){} // Copies a nullable C int array to an int32 slice and its validity
+//	CNullableFloat32ArrayToSlice(cArray *C.float, validity *C.uchar, length int) ([]float32, Validity){} // Copies a nullable C float array to a float32 slice and its validity
+//	CNullableStringArrayToSlice(cArray **C.char, validity *C.uchar, numberOfStrings int) ([]string, Validity){} // Copies a nullable C string array to a string slice and its validity
+//
+// # Batched calls (run a scalar function over a whole array in one call)
+//
+//	BatchStrings[R any](cArray **C.char, numberOfStrings int, function func(string) R) []R{} // Runs a scalar string function over every string in a C string array
+//	BatchInts[R any](cArray *C.int, numberOfElements int, function func(int) R) []R{} // Runs a scalar int function over every integer in a C int array
+//	BatchFloats[R any](cArray *C.float, numberOfElements int, function func(float32) R) []R{} // Runs a scalar float function over every float in a C float array
+//
+// # Streaming results (push fixed-size chunks to a C callback as they are produced, instead of building the whole result)
+//
+//	NewStringStream(callback C.ChunkCallback, context unsafe.Pointer, chunkSize int) *ResultStream[string]{} // Stream strings to callback as C.StringArrayResult chunks
+//	NewInt32Stream(callback C.ChunkCallback, context unsafe.Pointer, chunkSize int) *ResultStream[int32]{} // Stream int32s to callback as C.IntArrayResult chunks
+//	NewFloat32Stream(callback C.ChunkCallback, context unsafe.Pointer, chunkSize int) *ResultStream[float32]{} // Stream float32s to callback as C.FloatArrayResult chunks
+//	(stream *ResultStream[T]) Send(value T) bool{} // Add a value, sending the chunk once it's full, false once the consumer has cancelled
+//	(stream *ResultStream[T]) Close() bool{} // Send the last partial chunk, false if the consumer has cancelled
+//	(stream *ResultStream[T]) Cancelled() bool{} // Check if the consumer has cancelled the stream
+//	(stream *ResultStream[T]) Sent() int{} // The number of values handed to the consumer so far
 //
 // # Convert Go types to C types (external; Use to prep data to return to C)
 //
-//	StringToCString(data string) *C.char{} // Convert a string to a c-compatible C-string (glorified alias for C.CString)
+//	StringToCString(data string) *C.char{} // Convert a string to a c-compatible C-string (pooled version of C.CString, free it with FreeCString)
 //	StringSliceToCArray(data []string) *C.StringArrayResult{} // Return dynamically sized string array as a C-Compatible array
 //	IntSliceToCArray(data []int) *C.IntArrayResult{} // Return dynamically sized int array as a C-Compatible array
 //	FloatSliceToCArray(data []float32) *C.FloatArrayResult{} // Return dynamically float sized array as a C-Compatible array
+//	Int32SliceToCArray(data []int32) *C.IntArrayResult{} // Return dynamically sized int32 array as a C-Compatible array (single memmove)
+//	Int64SliceToCArray(data []int64) *C.Int64ArrayResult{} // Return dynamically sized int64 array as a C-Compatible array (single memmove)
+//	Float32SliceToCArray(data []float32) *C.FloatArrayResult{} // Return dynamically sized float32 array as a C-Compatible array (single memmove)
+//	Float64SliceToCArray(data []float64) *C.DoubleArrayResult{} // Return dynamically sized float64 array as a C-Compatible array (single memmove)
+//	BoolSliceToCArray(data []bool) *C.BoolArrayResult{} // Return a bool slice as a bit-packed C-Compatible array (8 values per byte, LSB first)
+//	Uint8SliceToCArray(data []uint8) *C.Uint8ArrayResult{} // Return dynamically sized uint8 array as a C-Compatible array (single memmove)
+//	Int8SliceToCArray(data []int8) *C.Int8ArrayResult{} // Return dynamically sized int8 array as a C-Compatible array (single memmove)
+//	Int16SliceToCArray(data []int16) *C.Int16ArrayResult{} // Return dynamically sized int16 array as a C-Compatible array (single memmove)
+//	BytesSliceToCArray(data [][]byte) *C.BytesArrayResult{} // Return binary blobs as one contiguous C buffer plus offsets (no encoding, NUL bytes are kept)
 //
 // # Memory Freeing
 //
@@ -20,6 +67,54 @@
 //	FreeStringArray(inputArray **C.char, count C.int){} // Free's an array of strings
 //	FreeIntArray(ptr *C.int){}  // Free's an array of integers
 //	FreeFloatArray(ptr *C.float){} // Free's an array of floats
+//	FreeInt64Array(ptr *C.int64_t){} // Free's an array of int64's
+//	FreeDoubleArray(ptr *C.double){} // Free's an array of doubles
+//
+// # Buffer pool (buffers handed to C come from poolAlloc, and are released with poolFree)
+//
+//	enable_buffer_pool(enabled C.int, maxRetainedBytes C.longlong){} // Turn the buffer pool on or off, turning it off releases every retained buffer
+//	trim_buffer_pool() C.longlong{} // Release every buffer retained by the pool back to libc
+//	buffer_pool_stats(out *C.BufferPoolStats){} // Write the pool's hit/miss counters and retained memory into a C.BufferPoolStats
+//
+// # Go runtime
+//
+//	go_memory_stats(out *C.GoMemoryStats){} // Write a snapshot of the Go runtime's memory and GC pause statistics (and live C buffers) into a C.GoMemoryStats
+//	set_gomaxprocs(procs C.int) C.int{} // Set the number of threads running Go code at once, returns the previous value (below 1 only reads it)
+//	set_gc_percent(percent C.int) C.int{} // Set GOGC (negative turns the GC off), returns the previous value
+//	set_memory_limit(limit C.longlong) C.longlong{} // Set Go's soft memory limit in bytes, returns the previous value (negative only reads it)
+//
+// # Profiling (errors are returned as a C string to free with FreeCString, NULL means success)
+//
+//	StartCPUProfile(path string) error{} // Start writing a CPU profile of the library's Go code to a file
+//	StopCPUProfile() error{} // Stop the running CPU profile and close its file
+//	WriteProfile(name string, path string) error{} // Write a heap/allocs/goroutine/threadcreate/block/mutex profile to a file
+//	StartTrace(path string) error{} // Start writing an execution trace (runtime/trace) to a file
+//	StopTrace() error{} // Stop the running execution trace and close its file
+//	start_cpu_profile(cPath *C.char) *C.char{} // Start writing a CPU profile to a file (i.e. default.pgo for profile-guided optimization)
+//	stop_cpu_profile() *C.char{} // Stop the running CPU profile and close its file
+//	write_profile(cName *C.char, cPath *C.char) *C.char{} // Write a snapshot profile (i.e. "heap", "allocs" or "goroutine") to a file
+//	start_trace(cPath *C.char) *C.char{} // Start writing an execution trace to a file
+//	stop_trace() *C.char{} // Stop the running execution trace and close its file
+//	capture_trace(cPath *C.char, milliseconds C.int) *C.char{} // Trace everything the library does for a time window, blocking until it's over
+//
+// # Handles (data uploaded once and kept in Go, so later calls pass a handle instead of re-sending it)
+//
+//	NewHandle(value any, bytes int) C.uintptr_t{} // Register a Go value and return an opaque handle to it
+//	HandleValue[T any](handle C.uintptr_t) (T, bool){} // Look up the value behind a handle, false if it's released or not a T
+//	ReleaseHandle(handle C.uintptr_t) bool{} // Drop a handle so Go can collect its value, false if it was already released
+//	upload_string_array(cArray **C.char, numberOfStrings C.int) C.uintptr_t{} // Copy a C string array into Go, and return a handle to the []string
+//	upload_int_array(cArray *C.int, numberOfElements C.int) C.uintptr_t{} // Copy a C int array into Go, and return a handle to the []int32
+//	upload_float_array(cArray *C.float, numberOfElements C.int) C.uintptr_t{} // Copy a C float array into Go, and return a handle to the []float32
+//	release_handle(handle C.uintptr_t) C.int{} // Release a handle, 0 if it was already released
+//	handle_size(handle C.uintptr_t) C.longlong{} // The bytes held by a handle, -1 if it's released
+//	handle_stats(out *C.HandleStats){} // Write the number of live handles and the memory they hold into a C.HandleStats
+//
+// # Msgpack (a compact binary format for nested values, structs are encoded as maps of their fields)
+//
+//	MsgpackMarshal(value any) ([]byte, error){} // Encode nil, bools, numbers, strings, []byte, slices, maps and structs as msgpack
+//	MsgpackUnmarshal(data []byte, out any) error{} // Decode msgpack into a *struct, *map, *slice or *any
+//	CMsgpackToValue(cData unsafe.Pointer, length C.int, out any) error{} // Decode a msgpack buffer from C (i.e. Python's prepare_msgpack()) without copying it first
+//	ValueToCMsgpack(value any) (*C.BytesArrayResult, error){} // Return a Go value as msgpack, in a C.BytesArrayResult holding one item
 //
 // # Debugging Functions
 //
@@ -27,6 +122,26 @@
 //	return_string_array(cArray **C.char, numberOfStrings int) *C.StringArrayResult{} // Used to convert a C-compatible string array to wrapper type
 //	return_int_array(cArray *C.int, numberOfElements C.int) *C.IntArrayResult{} // Used to convert a C-compatible integer array to wrapper type
 //	return_float_array(cArray *C.float, numberOfElements C.int) *C.FloatArrayResult{} // Used to convert a C-compatible float array to wrapper type
+//	return_int64_array(cArray *C.int64_t, numberOfElements C.int) *C.Int64ArrayResult{} // Used to convert a C-compatible int64_t array to wrapper type
+//	return_double_array(cArray *C.double, numberOfElements C.int) *C.DoubleArrayResult{} // Used to convert a C-compatible double array to wrapper type
+//	return_string_lengths(cArray **C.char, numberOfStrings C.int) *C.IntArrayResult{} // Used to get the length of every string in one call, an example of a batched export
+//	return_handle_string_array(handle C.uintptr_t) *C.StringArrayResult{} // Used to download the strings behind a handle (NULL if the handle is released)
+//	return_handle_int_array(handle C.uintptr_t) *C.IntArrayResult{} // Used to download the integers behind a handle (NULL if the handle is released)
+//	return_handle_float_array(handle C.uintptr_t) *C.FloatArrayResult{} // Used to download the floats behind a handle (NULL if the handle is released)
+//	handle_string_lengths(handle C.uintptr_t) *C.IntArrayResult{} // Used to get the length of every string behind a handle, an example of an export that queries resident data
+//	stream_string_array(cArray **C.char, numberOfStrings C.int, chunkSize C.int, callback C.ChunkCallback, context unsafe.Pointer) C.longlong{} // Used to stream a C-compatible string array back in chunks, an example of a streaming export
+//	stream_int_array(cArray *C.int, numberOfElements C.int, chunkSize C.int, callback C.ChunkCallback, context unsafe.Pointer) C.longlong{} // Used to stream a C-compatible int array back in chunks, an example of a streaming export
+//	return_bool_array(cArray *C.uchar, numberOfElements C.int) *C.BoolArrayResult{} // Used to convert a bit-packed C-compatible bool array to wrapper type
+//	return_uint8_array(cArray *C.uint8_t, numberOfElements C.int) *C.Uint8ArrayResult{} // Used to convert a C-compatible uint8_t array to wrapper type
+//	return_int8_array(cArray *C.int8_t, numberOfElements C.int) *C.Int8ArrayResult{} // Used to convert a C-compatible int8_t array to wrapper type
+//	return_int16_array(cArray *C.int16_t, numberOfElements C.int) *C.Int16ArrayResult{} // Used to convert a C-compatible int16_t array to wrapper type
+//	return_nullable_int_array(cArray *C.int, validity *C.uchar, numberOfElements C.int) *C.NullableIntArrayResult{} // Used to convert a nullable C-compatible int array to wrapper type
+//	return_nullable_float_array(cArray *C.float, validity *C.uchar, numberOfElements C.int) *C.NullableFloatArrayResult{} // Used to convert a nullable C-compatible float array to wrapper type
+//	return_nullable_string_array(cArray **C.char, validity *C.uchar, numberOfStrings C.int) *C.NullableStringArrayResult{} // Used to convert a nullable C-compatible string array to wrapper type
+//	return_bytes_array(cArray **C.uchar, lengths *C.longlong, numberOfElements int) *C.BytesArrayResult{} // Used to convert a C-compatible array of binary blobs to wrapper type
+//	msgpack_roundtrip(cData unsafe.Pointer, length C.int) *C.BytesArrayResult{} // Used to decode a msgpack value into Go and encode it again, good for debugging the wire format
+//	msgpack_records_roundtrip(cData unsafe.Pointer, length C.int) *C.BytesArrayResult{} // Used to decode msgpack records into Go structs and encode them again
+//	json_roundtrip(cString *C.char) *C.char{} // Used to decode JSON into Go and encode it again, the encoding/json baseline for msgpack_roundtrip
 //	print_string(ptr *C.char){} // Prints the go representation of a C string, good for debugging encoding issues
 //	print_string_array(cArray **C.char, numberOfString int){} // Prints the go representation of an array, good for debugging encoding issues
 //	print_int_array(cArray *C.int, numberOfInts int){} // Prints the go representation of an array, good for debugging rounding/conversion issues
@@ -50,6 +165,7 @@ package main
 
 /*
 #include <stdlib.h>
+#include <stdint.h>
 
 typedef struct{
 	int numberOfElements;
@@ -66,16 +182,136 @@ typedef struct {
     float* data;
 } FloatArrayResult;
 
+typedef struct {
+    int numberOfElements;
+    int64_t* data;
+} Int64ArrayResult;
+
+typedef struct {
+    int numberOfElements;
+    double* data;
+} DoubleArrayResult;
+
+// Bit-packed, value i is bit i%8 of data[i/8] (least significant bit first), so data holds (numberOfElements+7)/8 bytes
+typedef struct {
+    int numberOfElements;
+    unsigned char* data;
+} BoolArrayResult;
+
+typedef struct {
+    int numberOfElements;
+    uint8_t* data;
+} Uint8ArrayResult;
+
+typedef struct {
+    int numberOfElements;
+    int8_t* data;
+} Int8ArrayResult;
+
+typedef struct {
+    int numberOfElements;
+    int16_t* data;
+} Int16ArrayResult;
+
+// Nullable arrays, value i is missing when bit i%8 of validity[i/8] is 0 (validity is NULL when nothing is missing)
+typedef struct {
+    int numberOfElements;
+    int* data;
+    unsigned char* validity;
+} NullableIntArrayResult;
+
+typedef struct {
+    int numberOfElements;
+    float* data;
+    unsigned char* validity;
+} NullableFloatArrayResult;
+
+// Missing strings are also NULL in data
+typedef struct {
+    int numberOfElements;
+    char** data;
+    unsigned char* validity;
+} NullableStringArrayResult;
+
+// Binary blobs stored back to back, item i is data[offsets[i]:offsets[i+1]] (offsets has numberOfElements+1 entries)
+typedef struct {
+    int numberOfElements;
+    long long* offsets;
+    unsigned char* data;
+} BytesArrayResult;
+
+typedef struct {
+    long long hits;
+    long long misses;
+    long long retainedBytes;
+    long long retainedBuffers;
+    long long maxRetainedBytes;
+} BufferPoolStats;
+
+typedef struct {
+    unsigned long long heapAlloc;
+    unsigned long long heapInuse;
+    unsigned long long heapObjects;
+    unsigned long long sys;
+    unsigned long long mallocs;
+    unsigned long long frees;
+    unsigned long long numGC;
+    long long liveCBuffers;
+    long long liveCBytes;
+    unsigned long long totalAlloc;
+    unsigned long long heapSys;
+    unsigned long long heapIdle;
+    unsigned long long heapReleased;
+    unsigned long long nextGC;
+    unsigned long long lastGC;
+    unsigned long long numForcedGC;
+    unsigned long long pauseTotalNs;
+    unsigned long long lastPauseNs;
+    unsigned long long maxPauseNs;
+    double gcCPUFraction;
+} GoMemoryStats;
+
+typedef struct {
+    long long liveHandles;
+    long long liveBytes;
+    long long uploads;
+    long long releases;
+} HandleStats;
+
+// Receives one chunk of a streamed result (a *ArrayResult owned by Go, only valid until the callback returns), return non-zero to cancel the stream
+typedef int (*ChunkCallback)(void* chunk, void* context);
+
+// cgo can't call C function pointers directly
+static inline int call_chunk_callback(ChunkCallback callback, void* chunk, void* context) {
+    return callback(chunk, context);
+}
+
 */
 import "C"
 import (
+	"bytes"
+	"encoding/binary"
+	"encoding/json"
 	"fmt"
+	"math"
+	"math/bits"
+	"os"
+	"reflect"
+	"runtime"
+	"runtime/cgo"
+	"runtime/debug"
+	"runtime/pprof"
+	"runtime/trace"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"time"
 	"unsafe"
 )
 
 // ======== Convert Go types to C type ========
 
-// Convert a string to a c-compatible C-string (glorified alias for C.CString)
+// Convert a string to a c-compatible C-string (pooled version of C.CString)
 //
 // Parameters:
 //   - input: The Go string to convert.
@@ -84,7 +320,7 @@ import (
 //   - A pointer to the newly allocated C string (*C.char).
 //     Note: The caller is responsible for freeing the allocated memory using FreeCString.
 func StringToCString(input string) unsafe.Pointer {
-	return unsafe.Pointer(C.CString(input))
+	return unsafe.Pointer(poolCString(input))
 }
 
 // A function to take a slice and convert it to a StringArrayResult to be returned to C code
@@ -102,7 +338,7 @@ func StringSliceToCArray(data []string) *C.StringArrayResult {
 	amountOfElements := C.size_t(count)
 	sizeOfSingleElement := C.size_t(unsafe.Sizeof(uintptr(0)))
 	amountOfMemory := amountOfElements * sizeOfSingleElement
-	stringArray := (**C.char)(C.malloc(amountOfMemory))
+	stringArray := (**C.char)(poolAlloc(amountOfMemory))
 
 	// Create Array of data
 	for i, currentString := range data {
@@ -112,12 +348,12 @@ func StringSliceToCArray(data []string) *C.StringArrayResult {
 		sizeOfSingleElement := unsafe.Sizeof(uintptr(0))        // Size of a single string
 
 		locationInMemory := (**C.char)(unsafe.Pointer(locationOfArray + offsetIntoArray*sizeOfSingleElement))
-		*locationInMemory = C.CString(currentString) // Convert go string to C string and insert at location in array
+		*locationInMemory = poolCString(currentString) // Convert go string to C string and insert at location in array
 
 	}
 
 	// Allocate memory for the struct
-	result := (*C.StringArrayResult)(C.malloc(C.size_t(unsafe.Sizeof(C.StringArrayResult{}))))
+	result := (*C.StringArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.StringArrayResult{}))))
 	result.numberOfElements = C.int(count)
 	result.data = stringArray
 
@@ -137,7 +373,7 @@ func IntSliceToCArray(data []int) *C.IntArrayResult {
 
 	// Allocate memory in C for the int array
 	amountOfMemory := C.size_t(count) * C.size_t(unsafe.Sizeof(C.int(0)))
-	cArray := (*C.int)(C.malloc(amountOfMemory))
+	cArray := (*C.int)(poolAlloc(amountOfMemory))
 
 	// Fill in the values
 	array := (*[1 << 30]C.int)(unsafe.Pointer(cArray))
@@ -146,7 +382,7 @@ func IntSliceToCArray(data []int) *C.IntArrayResult {
 	}
 
 	// Allocate the result struct
-	result := (*C.IntArrayResult)(C.malloc(C.size_t(unsafe.Sizeof(C.IntArrayResult{}))))
+	result := (*C.IntArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.IntArrayResult{}))))
 	result.numberOfElements = C.int(count)
 	result.data = cArray
 
@@ -162,23 +398,194 @@ func IntSliceToCArray(data []int) *C.IntArrayResult {
 //   - Pointer to a C.FloatArrayResult containing the converted C floats.
 //     Note: The caller is responsible for freeing the allocated memory using free_float_array_result.
 func FloatSliceToCArray(data []float32) *C.FloatArrayResult {
-	count := len(data)
+	return Float32SliceToCArray(data)
+}
 
-	// Allocate memory in C for the float array
-	amountOfMemory := C.size_t(count) * C.size_t(unsafe.Sizeof(C.float(0)))
-	cArray := (*C.float)(C.malloc(amountOfMemory))
+// Copies a Go slice into a newly allocated C array with a single memmove
+//
+// Parameters:
+//   - data: Slice to copy, T must have the same memory layout as the C element type.
+//
+// Returns:
+//   - Pointer to the start of the C array.
+//     Note: The caller is responsible for freeing the allocated memory.
+func copyToCArray[T any](data []T) unsafe.Pointer {
+	var element T
+	amountOfMemory := C.size_t(len(data)) * C.size_t(unsafe.Sizeof(element))
+	cArray := poolAlloc(amountOfMemory)
 
-	// Fill in the values
-	array := (*[1 << 30]C.float)(unsafe.Pointer(cArray))
-	for i, val := range data {
-		array[i] = C.float(val)
+	if len(data) > 0 {
+		copy(unsafe.Slice((*T)(cArray), len(data)), data)
 	}
+	return cArray
+}
 
-	// Allocate the result struct
-	result := (*C.FloatArrayResult)(C.malloc(C.size_t(unsafe.Sizeof(C.FloatArrayResult{}))))
+// Return dynamically sized int32 array as a C-Compatible array, copied in one block since int32 matches C.int
+//
+// Parameters:
+//   - data: Slice of Go int32 values to convert.
+//
+// Returns:
+//   - Pointer to a C.IntArrayResult containing the converted C integers.
+//     Note: The caller is responsible for freeing the allocated memory using free_int_array_result.
+func Int32SliceToCArray(data []int32) *C.IntArrayResult {
+	result := (*C.IntArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.IntArrayResult{}))))
+	result.numberOfElements = C.int(len(data))
+	result.data = (*C.int)(copyToCArray(data))
+	return result
+}
+
+// Return dynamically sized int64 array as a C-Compatible array, copied in one block since int64 matches C.int64_t
+//
+// Parameters:
+//   - data: Slice of Go int64 values to convert.
+//
+// Returns:
+//   - Pointer to a C.Int64ArrayResult containing the converted C integers.
+//     Note: The caller is responsible for freeing the allocated memory using free_int64_array_result.
+func Int64SliceToCArray(data []int64) *C.Int64ArrayResult {
+	result := (*C.Int64ArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.Int64ArrayResult{}))))
+	result.numberOfElements = C.int(len(data))
+	result.data = (*C.int64_t)(copyToCArray(data))
+	return result
+}
+
+// Return dynamically sized float32 array as a C-Compatible array, copied in one block since float32 matches C.float
+//
+// Parameters:
+//   - data: Slice of Go float32 values to convert.
+//
+// Returns:
+//   - Pointer to a C.FloatArrayResult containing the converted C floats.
+//     Note: The caller is responsible for freeing the allocated memory using free_float_array_result.
+func Float32SliceToCArray(data []float32) *C.FloatArrayResult {
+	result := (*C.FloatArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.FloatArrayResult{}))))
+	result.numberOfElements = C.int(len(data))
+	result.data = (*C.float)(copyToCArray(data))
+	return result
+}
+
+// Return dynamically sized float64 array as a C-Compatible array, copied in one block since float64 matches C.double
+//
+// Parameters:
+//   - data: Slice of Go float64 values to convert.
+//
+// Returns:
+//   - Pointer to a C.DoubleArrayResult containing the converted C doubles.
+//     Note: The caller is responsible for freeing the allocated memory using free_double_array_result.
+func Float64SliceToCArray(data []float64) *C.DoubleArrayResult {
+	result := (*C.DoubleArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.DoubleArrayResult{}))))
+	result.numberOfElements = C.int(len(data))
+	result.data = (*C.double)(copyToCArray(data))
+	return result
+}
+
+// Return a bool slice as a bit-packed C-Compatible array, 8 values per byte with the least significant bit first
+//
+// Parameters:
+//   - data: Slice of Go bools to convert.
+//
+// Returns:
+//   - Pointer to a C.BoolArrayResult, value i is bit i%8 of data[i/8].
+//     Note: The caller is responsible for freeing the allocated memory using free_bool_array_result.
+func BoolSliceToCArray(data []bool) *C.BoolArrayResult {
+	count := len(data)
+	numberOfBytes := (count + 7) / 8
+	packed := unsafe.Slice((*byte)(poolAlloc(C.size_t(numberOfBytes))), numberOfBytes)
+	clear(packed) // Pooled buffers are reused, so unset bits could be left over from last time
+
+	for i, value := range data {
+		if value {
+			packed[i/8] |= 1 << (i % 8)
+		}
+	}
+
+	result := (*C.BoolArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.BoolArrayResult{}))))
 	result.numberOfElements = C.int(count)
-	result.data = cArray
+	result.data = (*C.uchar)(unsafe.Pointer(unsafe.SliceData(packed)))
+	return result
+}
+
+// Return dynamically sized uint8 array as a C-Compatible array, copied in one block since uint8 matches C.uint8_t
+//
+// Parameters:
+//   - data: Slice of Go uint8 values to convert.
+//
+// Returns:
+//   - Pointer to a C.Uint8ArrayResult containing the converted C integers.
+//     Note: The caller is responsible for freeing the allocated memory using free_uint8_array_result.
+func Uint8SliceToCArray(data []uint8) *C.Uint8ArrayResult {
+	result := (*C.Uint8ArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.Uint8ArrayResult{}))))
+	result.numberOfElements = C.int(len(data))
+	result.data = (*C.uint8_t)(copyToCArray(data))
+	return result
+}
+
+// Return dynamically sized int8 array as a C-Compatible array, copied in one block since int8 matches C.int8_t
+//
+// Parameters:
+//   - data: Slice of Go int8 values to convert.
+//
+// Returns:
+//   - Pointer to a C.Int8ArrayResult containing the converted C integers.
+//     Note: The caller is responsible for freeing the allocated memory using free_int8_array_result.
+func Int8SliceToCArray(data []int8) *C.Int8ArrayResult {
+	result := (*C.Int8ArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.Int8ArrayResult{}))))
+	result.numberOfElements = C.int(len(data))
+	result.data = (*C.int8_t)(copyToCArray(data))
+	return result
+}
+
+// Return dynamically sized int16 array as a C-Compatible array, copied in one block since int16 matches C.int16_t
+//
+// Parameters:
+//   - data: Slice of Go int16 values to convert.
+//
+// Returns:
+//   - Pointer to a C.Int16ArrayResult containing the converted C integers.
+//     Note: The caller is responsible for freeing the allocated memory using free_int16_array_result.
+func Int16SliceToCArray(data []int16) *C.Int16ArrayResult {
+	result := (*C.Int16ArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.Int16ArrayResult{}))))
+	result.numberOfElements = C.int(len(data))
+	result.data = (*C.int16_t)(copyToCArray(data))
+	return result
+}
+
+// Return binary blobs as a C-Compatible array, every item is copied back to back into one buffer with an offset per item
+//
+// Parameters:
+//   - data: Slice of byte slices to convert (i.e. compressed payloads, hashes or images).
+//
+// Returns:
+//   - Pointer to a C.BytesArrayResult, item i is data[offsets[i]:offsets[i+1]].
+//     Note: The caller is responsible for freeing the allocated memory using free_bytes_array_result.
+//
+// Notes
+//
+//   - Items are not NUL terminated or encoded, so binary data (including NUL bytes) comes back exactly as it was
+func BytesSliceToCArray(data [][]byte) *C.BytesArrayResult {
+	count := len(data)
+
+	// Work out where each item starts, the extra offset at the end is the total size
+	offsets := unsafe.Slice((*int64)(poolAlloc(C.size_t(count+1)*C.size_t(unsafe.Sizeof(int64(0))))), count+1)
+	totalSize := 0
+	for i, item := range data {
+		offsets[i] = int64(totalSize)
+		totalSize += len(item)
+	}
+	offsets[count] = int64(totalSize)
+
+	// Copy every item into a single buffer
+	buffer := poolAlloc(C.size_t(totalSize))
+	contents := unsafe.Slice((*byte)(buffer), totalSize)
+	for i, item := range data {
+		copy(contents[offsets[i]:], item)
+	}
 
+	result := (*C.BytesArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.BytesArrayResult{}))))
+	result.numberOfElements = C.int(count)
+	result.offsets = (*C.longlong)(unsafe.Pointer(&offsets[0]))
+	result.data = (*C.uchar)(buffer)
 	return result
 }
 
@@ -235,170 +642,2581 @@ func CIntArrayToSlice(cArray unsafe.Pointer, length int) []int {
 //	var cFloatArray  *C.float // Assuming it's set in some line after this
 //	goFloats := CFloatArrayToSlice(unsafe.Pointer(cFloatArray), length)
 func CFloatArrayToSlice(cArray unsafe.Pointer, length int) []float32 {
-	// Setup buffer for array contents
-	const bufferSize = 1 << 30 // Allocate a huge buffer
-	slice := (*[bufferSize]C.float)(cArray)[:length:length]
-
-	// Convert to []float32
-	result := make([]float32, length)
-	for i := 0; i < length; i++ {
-		result[i] = float32(slice[i])
-	}
-	return result
+	return CFloat32ArrayToSlice(cArray, length)
 }
 
-// Takes in an array of strings, and converts it to a slice of strings
-// C array -> slice of strings
+// Copies a C array into a new Go slice with a single memmove
 //
 // Parameters:
-//   - cArray: Pointer to the C array of strings (**C.char).
-//   - numberOfStrings: Number of strings in the C array.
+//   - cArray: Pointer to the start of the C array, T must have the same memory layout as the C element type.
+//   - length: Number of elements in the C array.
 //
 // Returns:
-//   - A Go slice containing the converted strings.
-//
-// Notes
-//
-//   - This function DOES NOT clean memory of input array, that's up to others to clear
-func CStringArrayToSlice(cArray unsafe.Pointer, numberOfStrings int) []string {
-	// Setup buffer for array contents
-	const bufferSize = 1 << 30 // Allocate a huge buffer
-	stringPointers := (*[bufferSize]*C.char)(cArray)[:numberOfStrings:numberOfStrings]
-
-	result := make([]string, 0, numberOfStrings)
-	for i := range numberOfStrings {
-		result = append(result, C.GoString(stringPointers[i]))
+//   - A Go slice containing a copy of the C array.
+func copyFromCArray[T any](cArray unsafe.Pointer, length int) []T {
+	result := make([]T, length)
+	if length > 0 {
+		copy(result, unsafe.Slice((*T)(cArray), length))
 	}
 	return result
 }
 
-// ========== Debugging Functions ==========
-
-// Used to convert a C-compatible string back to itself, good for debugging encoding issues
+// Takes a C integer array and copies it to an int32 slice in one block
 //
 // Parameters:
-//   - cString: Pointer to the C string (*C.char).
+//   - cArray: Pointer to the C array of integers (*C.int).
+//   - length: Number of elements in the C array.
 //
 // Returns:
-//   - Pointer to a new C string with the same content (*C.char).
-//     Note: The caller is responsible for freeing the allocated memory using FreeCString.
-//
-//export return_string
-func return_string(cString unsafe.Pointer) unsafe.Pointer {
-	internalRepresentation := C.GoString((*C.char)(cString))
-	result := StringToCString(internalRepresentation)
-	return result
+//   - A Go slice containing the converted integers.
+func CInt32ArrayToSlice(cArray unsafe.Pointer, length int) []int32 {
+	return copyFromCArray[int32](cArray, length)
 }
 
-// Used to convert a C-compatible string array to wrapper type
+// Takes a C int64_t array and copies it to an int64 slice in one block
 //
 // Parameters:
-//   - cArray: Pointer to the C array of strings (**C.char).
-//   - numberOfStrings: Number of strings in the C array.
+//   - cArray: Pointer to the C array of integers (*C.int64_t).
+//   - length: Number of elements in the C array.
 //
 // Returns:
-//   - Pointer to a C.StringArrayResult containing the converted strings (*C.StringArrayResult).
-//     Note: The caller is responsible for freeing the allocated memory using free_string_array_result.
-//
-//export return_string_array
-func return_string_array(cArray unsafe.Pointer, numberOfStrings int) *C.StringArrayResult {
-
-	internalRepresentation := CStringArrayToSlice(cArray, numberOfStrings)
-
-	result := StringSliceToCArray(internalRepresentation)
-
-	return result
+//   - A Go slice containing the converted integers.
+func CInt64ArrayToSlice(cArray unsafe.Pointer, length int) []int64 {
+	return copyFromCArray[int64](cArray, length)
 }
 
-// Used to convert a C-compatible integer array to wrapper type
+// Takes a C float array and copies it to a float32 slice in one block
 //
 // Parameters:
-//   - cArray: Pointer to the C array of integers (*C.int).
-//   - numberOfElements: Number of elements in the C array.
+//   - cArray: Pointer to the C array of floats (*C.float).
+//   - length: Number of elements in the C array.
 //
 // Returns:
-//   - Pointer to a C.IntArrayResult containing the converted integers (*C.IntArrayResult).
-//     Note: The caller is responsible for freeing the allocated memory using free_int_array_result.
-//
-//export return_int_array
-func return_int_array(cArray unsafe.Pointer, numberOfElements C.int) *C.IntArrayResult {
-	internalRepresentation := CIntArrayToSlice(cArray, int(numberOfElements))
-	result := IntSliceToCArray(internalRepresentation)
-	return (*C.IntArrayResult)(result)
+//   - A Go slice containing the converted float32 values.
+func CFloat32ArrayToSlice(cArray unsafe.Pointer, length int) []float32 {
+	return copyFromCArray[float32](cArray, length)
 }
 
-// Used to convert a C-compatible float array to wrapper type
+// Takes a C double array and copies it to a float64 slice in one block
 //
 // Parameters:
-//   - cArray: Pointer to the C array of floats(*C.float).
-//   - numberOfElements: Number of elements in the C array.
+//   - cArray: Pointer to the C array of doubles (*C.double).
+//   - length: Number of elements in the C array.
 //
 // Returns:
-//   - Pointer to a C.FloatArrayResult containing the converted floats (*C.FloatArrayResult).
-//     Note: The caller is responsible for freeing the allocated memory using free_float_array_result.
-//
-//export return_float_array
-func return_float_array(cArray unsafe.Pointer, numberOfElements C.int) *C.FloatArrayResult {
-	internalRepresentation := CFloatArrayToSlice(cArray, int(numberOfElements))
-	result := FloatSliceToCArray(internalRepresentation)
-	return (*C.FloatArrayResult)(result)
+//   - A Go slice containing the converted float64 values.
+func CFloat64ArrayToSlice(cArray unsafe.Pointer, length int) []float64 {
+	return copyFromCArray[float64](cArray, length)
 }
 
-// Prints the go representation of a C string, good for debugging encoding issues
+// Takes a bit-packed C bool array (8 values per byte, least significant bit first) and unpacks it to a bool slice
 //
 // Parameters:
-//   - ptr: Pointer to the C string (*C.char).
+//   - cArray: Pointer to the packed C array ((length+7)/8 bytes of *C.uchar).
+//   - length: Number of bools (bits) in the C array.
 //
-//export print_string
-func print_string(ptr unsafe.Pointer) {
-	if ptr != nil {
-		fmt.Printf("print_string() Go representation: %s\n", C.GoString((*C.char)(ptr)))
-	} else {
-		fmt.Println("print_string() received nil pointer")
+// Returns:
+//   - A Go slice containing the unpacked bools.
+func CBoolArrayToSlice(cArray unsafe.Pointer, length int) []bool {
+	result := make([]bool, length)
+	if length == 0 {
+		return result
+	}
+	packed := unsafe.Slice((*byte)(cArray), (length+7)/8)
+	for i := range length {
+		result[i] = packed[i/8]&(1<<(i%8)) != 0
 	}
+	return result
 }
 
-// Prints the go representation of an array, good for debugging encoding issues
+// Takes a C uint8_t array and copies it to a uint8 slice in one block
 //
 // Parameters:
-//   - cArray: Pointer to the C array of strings (**C.char).
-//   - numberOfString: Number of strings in the C array.
+//   - cArray: Pointer to the C array of integers (*C.uint8_t).
+//   - length: Number of elements in the C array.
 //
-//export print_string_array
-func print_string_array(cArray unsafe.Pointer, numberOfString int) {
-	res := CStringArrayToSlice(cArray, numberOfString)
-	fmt.Printf("print_string_array() Go representation: %v\n", res)
+// Returns:
+//   - A Go slice containing the converted integers.
+func CUint8ArrayToSlice(cArray unsafe.Pointer, length int) []uint8 {
+	return copyFromCArray[uint8](cArray, length)
 }
 
-// Prints the go representation of an array, good for debugging rounding/conversion issues
+// Takes a C int8_t array and copies it to an int8 slice in one block
 //
 // Parameters:
-//   - cArray: Pointer to the C array of integers (*C.int).
-//   - numberOfInts: Number of integers in the C array.
+//   - cArray: Pointer to the C array of integers (*C.int8_t).
+//   - length: Number of elements in the C array.
 //
-//export print_int_array
-func print_int_array(cArray unsafe.Pointer, numberOfInts int) {
-	fmt.Printf("Got initial array with %d items, converting", numberOfInts)
-	res := CIntArrayToSlice(cArray, numberOfInts)
-	fmt.Println("Converted array")
-
-	fmt.Printf("print_int_array() Go representation: %v\n", res)
+// Returns:
+//   - A Go slice containing the converted integers.
+func CInt8ArrayToSlice(cArray unsafe.Pointer, length int) []int8 {
+	return copyFromCArray[int8](cArray, length)
 }
 
-// Prints the go representation of an array, good for debugging rounding/conversion issues
+// Takes a C int16_t array and copies it to an int16 slice in one block
 //
 // Parameters:
-//   - cArray: Pointer to the C array of floats (*C.float).
-//   - numberOfFloats: Number of floats in the C array.
+//   - cArray: Pointer to the C array of integers (*C.int16_t).
+//   - length: Number of elements in the C array.
 //
-//export print_float_array
-func print_float_array(cArray unsafe.Pointer, numberOfFloats int) {
-	res := CFloatArrayToSlice(cArray, numberOfFloats)
-
-	fmt.Printf("print_float_array() Go representation: %v\n", res)
+// Returns:
+//   - A Go slice containing the converted integers.
+func CInt16ArrayToSlice(cArray unsafe.Pointer, length int) []int16 {
+	return copyFromCArray[int16](cArray, length)
 }
 
-// ========== Functions to free memory ==========
+// Takes in an array of strings, and converts it to a slice of strings
+// C array -> slice of strings
+//
+// Parameters:
+//   - cArray: Pointer to the C array of strings (**C.char).
+//   - numberOfStrings: Number of strings in the C array.
+//
+// Returns:
+//   - A Go slice containing the converted strings.
+//
+// Notes
+//
+//   - This function DOES NOT clean memory of input array, that's up to others to clear
+func CStringArrayToSlice(cArray unsafe.Pointer, numberOfStrings int) []string {
+	// Setup buffer for array contents
+	const bufferSize = 1 << 30 // Allocate a huge buffer
+	stringPointers := (*[bufferSize]*C.char)(cArray)[:numberOfStrings:numberOfStrings]
+
+	result := make([]string, 0, numberOfStrings)
+	for i := range numberOfStrings {
+		result = append(result, C.GoString(stringPointers[i]))
+	}
+	return result
+}
+
+// Takes in an array of binary blobs with explicit lengths, and copies it to a slice of byte slices
+//
+// Parameters:
+//   - cArray: Pointer to the C array of pointers to each item (**C.uchar).
+//   - lengths: Pointer to the C array with the length of each item in bytes (*C.longlong).
+//   - numberOfElements: Number of items in the C arrays.
+//
+// Returns:
+//   - A Go slice containing a copy of each item, all items share one backing buffer.
+//
+// Notes
+//
+//   - This function DOES NOT clean memory of input array, that's up to others to clear
+//   - Items can contain NUL bytes, the lengths are used instead of looking for a terminator
+func CBytesArrayToSlice(cArray unsafe.Pointer, lengths unsafe.Pointer, numberOfElements int) [][]byte {
+	if numberOfElements == 0 {
+		return [][]byte{}
+	}
+	pointers := unsafe.Slice((*unsafe.Pointer)(cArray), numberOfElements)
+	itemLengths := unsafe.Slice((*int64)(lengths), numberOfElements)
+
+	totalSize := int64(0)
+	for _, length := range itemLengths {
+		totalSize += length
+	}
+
+	// One allocation for every item instead of one per item
+	buffer := make([]byte, totalSize)
+	result := make([][]byte, numberOfElements)
+	start := int64(0)
+	for i, length := range itemLengths {
+		item := buffer[start : start+length : start+length]
+		if length > 0 {
+			copy(item, unsafe.Slice((*byte)(pointers[i]), length))
+		}
+		result[i] = item
+		start += length
+	}
+	return result
+}
+
+// ======== Nullable arrays ========
+
+// Validity bitmap of a nullable array, value i is present when bit i%8 of byte i/8 is set (least significant bit first)
+//
+// Notes
+//
+//   - A nil Validity means every value is present, the *SliceToCArray functions send NULL instead of a bitmap in that case
+type Validity []byte
+
+// Make a validity bitmap for length values, with every value present
+//
+// Parameters:
+//   - length: The number of values.
+//
+// Returns:
+//   - A bitmap of (length+7)/8 bytes with every bit set.
+func NewValidity(length int) Validity {
+	validity := make(Validity, (length+7)/8)
+	for i := range validity {
+		validity[i] = 0xFF
+	}
+	return validity
+}
+
+// Check if value i is present
+//
+// Parameters:
+//   - i: The index of the value.
+//
+// Returns:
+//   - false if the value is missing, true otherwise (always true for a nil Validity).
+func (validity Validity) IsValid(i int) bool {
+	return validity == nil || validity[i/8]&(1<<(i%8)) != 0
+}
+
+// Mark value i as present or missing
+//
+// Parameters:
+//   - i: The index of the value.
+//   - valid: If the value is present.
+//
+// Notes
+//
+//   - validity must not be nil, use NewValidity() to make one
+func (validity Validity) SetValid(i int, valid bool) {
+	if valid {
+		validity[i/8] |= 1 << (i % 8)
+	} else {
+		validity[i/8] &^= 1 << (i % 8)
+	}
+}
+
+// Check that none of the first length values are missing, 8 bytes (64 values) at a time
+//
+// Parameters:
+//   - length: The number of values.
+//
+// Returns:
+//   - true if no value is missing (always true for a nil Validity), use it to skip validity checks in hot loops.
+func (validity Validity) AllValid(length int) bool {
+	if validity == nil {
+		return true
+	}
+	fullBytes := length / 8
+	i := 0
+	for ; i+8 <= fullBytes; i += 8 {
+		if binary.LittleEndian.Uint64(validity[i:]) != math.MaxUint64 {
+			return false
+		}
+	}
+	for ; i < fullBytes; i++ {
+		if validity[i] != 0xFF {
+			return false
+		}
+	}
+	if remainingBits := length % 8; remainingBits != 0 {
+		mask := byte(1<<remainingBits - 1)
+		return validity[fullBytes]&mask == mask
+	}
+	return true
+}
+
+// Copy a validity bitmap into C memory, or NULL if nothing is missing
+func validityToC(validity Validity, length int) *C.uchar {
+	if validity.AllValid(length) {
+		return nil
+	}
+	return (*C.uchar)(copyToCArray(validity[:(length+7)/8]))
+}
+
+// Copy a validity bitmap from C memory, or nil if it's NULL or nothing is missing
+func validityFromC(cValidity unsafe.Pointer, length int) Validity {
+	if cValidity == nil {
+		return nil
+	}
+	validity := Validity(copyFromCArray[byte](cValidity, (length+7)/8))
+	if validity.AllValid(length) {
+		return nil
+	}
+	return validity
+}
+
+// Return a nullable int32 array as a C-Compatible array, the data is copied in one block
+//
+// Parameters:
+//   - data: Slice of Go int32 values to convert (the values of missing items are sent as they are).
+//   - validity: Which values are present, nil if none are missing.
+//
+// Returns:
+//   - Pointer to a C.NullableIntArrayResult containing the converted C integers and validity (NULL if nothing is missing).
+//     Note: The caller is responsible for freeing the allocated memory using free_nullable_int_array_result.
+func NullableInt32SliceToCArray(data []int32, validity Validity) *C.NullableIntArrayResult {
+	result := (*C.NullableIntArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.NullableIntArrayResult{}))))
+	result.numberOfElements = C.int(len(data))
+	result.data = (*C.int)(copyToCArray(data))
+	result.validity = validityToC(validity, len(data))
+	return result
+}
+
+// Return a nullable float32 array as a C-Compatible array, the data is copied in one block
+//
+// Parameters:
+//   - data: Slice of Go float32 values to convert (the values of missing items are sent as they are).
+//   - validity: Which values are present, nil if none are missing.
+//
+// Returns:
+//   - Pointer to a C.NullableFloatArrayResult containing the converted C floats and validity (NULL if nothing is missing).
+//     Note: The caller is responsible for freeing the allocated memory using free_nullable_float_array_result.
+func NullableFloat32SliceToCArray(data []float32, validity Validity) *C.NullableFloatArrayResult {
+	result := (*C.NullableFloatArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.NullableFloatArrayResult{}))))
+	result.numberOfElements = C.int(len(data))
+	result.data = (*C.float)(copyToCArray(data))
+	result.validity = validityToC(validity, len(data))
+	return result
+}
+
+// Return a nullable string array as a C-Compatible array, missing strings are NULL (and not allocated)
+//
+// Parameters:
+//   - data: Slice of Go strings to convert (the values of missing items are ignored).
+//   - validity: Which strings are present, nil if none are missing.
+//
+// Returns:
+//   - Pointer to a C.NullableStringArrayResult containing the converted C strings and validity (NULL if nothing is missing).
+//     Note: The caller is responsible for freeing the allocated memory using free_nullable_string_array_result.
+func NullableStringSliceToCArray(data []string, validity Validity) *C.NullableStringArrayResult {
+	count := len(data)
+	stringArray := (**C.char)(poolAlloc(C.size_t(count) * C.size_t(unsafe.Sizeof(uintptr(0)))))
+	strings := unsafe.Slice(stringArray, count)
+
+	allValid := validity.AllValid(count)
+	for i, item := range data {
+		if allValid || validity.IsValid(i) {
+			strings[i] = poolCString(item)
+		} else {
+			strings[i] = nil
+		}
+	}
+
+	result := (*C.NullableStringArrayResult)(poolAlloc(C.size_t(unsafe.Sizeof(C.NullableStringArrayResult{}))))
+	result.numberOfElements = C.int(count)
+	result.data = stringArray
+	result.validity = validityToC(validity, count)
+	return result
+}
+
+// Takes a nullable C int array and copies it to an int32 slice in one block, along with its validity
+//
+// Parameters:
+//   - cArray: Pointer to the C array of integers (*C.int).
+//   - cValidity: Pointer to the C validity bitmap (*C.uchar), NULL if nothing is missing.
+//   - length: Number of elements in the C array.
+//
+// Returns:
+//   - A Go slice containing the converted integers (missing values are whatever C sent, usually 0).
+//   - The validity of each value, nil if nothing is missing.
+func CNullableInt32ArrayToSlice(cArray unsafe.Pointer, cValidity unsafe.Pointer, length int) ([]int32, Validity) {
+	return copyFromCArray[int32](cArray, length), validityFromC(cValidity, length)
+}
+
+// Takes a nullable C float array and copies it to a float32 slice in one block, along with its validity
+//
+// Parameters:
+//   - cArray: Pointer to the C array of floats (*C.float).
+//   - cValidity: Pointer to the C validity bitmap (*C.uchar), NULL if nothing is missing.
+//   - length: Number of elements in the C array.
+//
+// Returns:
+//   - A Go slice containing the converted floats (missing values are whatever C sent, usually 0).
+//   - The validity of each value, nil if nothing is missing.
+func CNullableFloat32ArrayToSlice(cArray unsafe.Pointer, cValidity unsafe.Pointer, length int) ([]float32, Validity) {
+	return copyFromCArray[float32](cArray, length), validityFromC(cValidity, length)
+}
+
+// Takes a nullable C string array and converts it to a slice of strings, along with its validity
+//
+// Parameters:
+//   - cArray: Pointer to the C array of strings (**C.char).
+//   - cValidity: Pointer to the C validity bitmap (*C.uchar), NULL if nothing is missing.
+//   - numberOfStrings: Number of strings in the C array.
+//
+// Returns:
+//   - A Go slice containing the converted strings (missing strings are "").
+//   - The validity of each string, nil if nothing is missing.
+//
+// Notes
+//
+//   - NULL strings are treated as missing even if their validity bit is set
+func CNullableStringArrayToSlice(cArray unsafe.Pointer, cValidity unsafe.Pointer, numberOfStrings int) ([]string, Validity) {
+	validity := validityFromC(cValidity, numberOfStrings)
+	result := make([]string, numberOfStrings)
+	if numberOfStrings == 0 {
+		return result, validity
+	}
+
+	for i, pointer := range unsafe.Slice((**C.char)(cArray), numberOfStrings) {
+		if pointer == nil || !validity.IsValid(i) {
+			if validity == nil {
+				validity = NewValidity(numberOfStrings)
+			}
+			validity.SetValid(i, false)
+			continue
+		}
+		result[i] = C.GoString(pointer)
+	}
+	return result, validity
+}
+
+// ======== Batched calls ========
+
+// Applies a scalar function to every item of a slice, used to build batched exports
+//
+// Parameters:
+//   - data: The slice of inputs.
+//   - function: The scalar function to run on each input.
+//
+// Returns:
+//   - A slice with the result of function for each input, in the same order.
+func mapSlice[T any, R any](data []T, function func(T) R) []R {
+	result := make([]R, len(data))
+	for i, item := range data {
+		result[i] = function(item)
+	}
+	return result
+}
+
+// Runs a scalar string function over every string in a C string array in a single call
+//
+// Parameters:
+//   - cArray: Pointer to the C array of strings (**C.char).
+//   - numberOfStrings: Number of strings in the C array.
+//   - function: The scalar function to run on each string.
+//
+// Returns:
+//   - A Go slice with the result for each string, ready to be passed to one of the *SliceToCArray functions.
+//
+// Usage:
+//
+//	//export upper_batch
+//	func upper_batch(cArray unsafe.Pointer, numberOfStrings int) *C.StringArrayResult {
+//		return StringSliceToCArray(BatchStrings(cArray, numberOfStrings, strings.ToUpper))
+//	}
+func BatchStrings[R any](cArray unsafe.Pointer, numberOfStrings int, function func(string) R) []R {
+	return mapSlice(CStringArrayToSlice(cArray, numberOfStrings), function)
+}
+
+// Runs a scalar int function over every integer in a C int array in a single call
+//
+// Parameters:
+//   - cArray: Pointer to the C array of integers (*C.int).
+//   - numberOfElements: Number of elements in the C array.
+//   - function: The scalar function to run on each integer.
+//
+// Returns:
+//   - A Go slice with the result for each integer, ready to be passed to one of the *SliceToCArray functions.
+func BatchInts[R any](cArray unsafe.Pointer, numberOfElements int, function func(int) R) []R {
+	return mapSlice(CIntArrayToSlice(cArray, numberOfElements), function)
+}
+
+// Runs a scalar float function over every float in a C float array in a single call
+//
+// Parameters:
+//   - cArray: Pointer to the C array of floats (*C.float).
+//   - numberOfElements: Number of elements in the C array.
+//   - function: The scalar function to run on each float.
+//
+// Returns:
+//   - A Go slice with the result for each float, ready to be passed to one of the *SliceToCArray functions.
+func BatchFloats[R any](cArray unsafe.Pointer, numberOfElements int, function func(float32) R) []R {
+	return mapSlice(CFloatArrayToSlice(cArray, numberOfElements), function)
+}
+
+// ======== Streaming results ========
+
+// The number of values per chunk when a stream is made with a chunkSize < 1
+const defaultChunkSize = 1024
+
+// Sends a result to C in fixed-size chunks as it is produced, so peak memory is one chunk instead of the whole result
+//
+// Notes
+//
+//   - Each chunk is converted with one of the *SliceToCArray functions, handed to the callback, and freed once the callback returns, so consumers must copy what they need
+//   - The callback runs on the goroutine calling Send()/Close(), and blocking in it blocks the producer (the consumer controls the buffering)
+//   - A non-zero return from the callback cancels the stream, Send() then returns false so the producer can stop early
+//   - A ResultStream is not safe for concurrent use, send from a single goroutine (i.e. collect from workers over a channel)
+type ResultStream[T any] struct {
+	chunk     []T
+	toC       func([]T) unsafe.Pointer
+	free      func(unsafe.Pointer)
+	emit      func(chunk unsafe.Pointer) bool // Hands a chunk to the consumer, false if it cancelled
+	cancelled bool
+	sent      int
+}
+
+// Makes a stream that converts chunks with toC, hands them to callback, then frees them with free
+func newResultStream[T any](callback C.ChunkCallback, context unsafe.Pointer, chunkSize int, toC func([]T) unsafe.Pointer, free func(unsafe.Pointer)) *ResultStream[T] {
+	if chunkSize < 1 {
+		chunkSize = defaultChunkSize
+	}
+	return &ResultStream[T]{
+		chunk: make([]T, 0, chunkSize),
+		toC:   toC,
+		free:  free,
+		emit: func(chunk unsafe.Pointer) bool {
+			return C.call_chunk_callback(callback, chunk, context) == 0
+		},
+	}
+}
+
+// Makes a stream of strings, sent to callback as C.StringArrayResult chunks
+//
+// Parameters:
+//   - callback: The C function to hand each chunk to, along with context.
+//   - context: An opaque pointer passed to every call of callback (can be NULL).
+//   - chunkSize: The number of strings per chunk (the last chunk can be smaller), 1024 if < 1.
+//
+// Returns:
+//   - The stream, call Close() once every string has been sent.
+//
+// Usage:
+//
+//	//export find_matches
+//	func find_matches(cPattern *C.char, callback C.ChunkCallback, context unsafe.Pointer) C.longlong {
+//		stream := NewStringStream(callback, context, 4096)
+//		for match := range scan(C.GoString(cPattern)) {
+//			if !stream.Send(match) {
+//				break // Python stopped reading
+//			}
+//		}
+//		stream.Close()
+//		return C.longlong(stream.Sent())
+//	}
+func NewStringStream(callback C.ChunkCallback, context unsafe.Pointer, chunkSize int) *ResultStream[string] {
+	return newResultStream(callback, context, chunkSize, func(chunk []string) unsafe.Pointer {
+		return unsafe.Pointer(StringSliceToCArray(chunk))
+	}, free_string_array_result)
+}
+
+// Makes a stream of int32s, sent to callback as C.IntArrayResult chunks
+//
+// Parameters:
+//   - callback: The C function to hand each chunk to, along with context.
+//   - context: An opaque pointer passed to every call of callback (can be NULL).
+//   - chunkSize: The number of integers per chunk (the last chunk can be smaller), 1024 if < 1.
+//
+// Returns:
+//   - The stream, call Close() once every integer has been sent.
+func NewInt32Stream(callback C.ChunkCallback, context unsafe.Pointer, chunkSize int) *ResultStream[int32] {
+	return newResultStream(callback, context, chunkSize, func(chunk []int32) unsafe.Pointer {
+		return unsafe.Pointer(Int32SliceToCArray(chunk))
+	}, free_int_array_result)
+}
+
+// Makes a stream of float32s, sent to callback as C.FloatArrayResult chunks
+//
+// Parameters:
+//   - callback: The C function to hand each chunk to, along with context.
+//   - context: An opaque pointer passed to every call of callback (can be NULL).
+//   - chunkSize: The number of floats per chunk (the last chunk can be smaller), 1024 if < 1.
+//
+// Returns:
+//   - The stream, call Close() once every float has been sent.
+func NewFloat32Stream(callback C.ChunkCallback, context unsafe.Pointer, chunkSize int) *ResultStream[float32] {
+	return newResultStream(callback, context, chunkSize, func(chunk []float32) unsafe.Pointer {
+		return unsafe.Pointer(Float32SliceToCArray(chunk))
+	}, free_float_array_result)
+}
+
+// Hands the buffered values to the consumer as one chunk, then frees it
+func (stream *ResultStream[T]) flush() {
+	if len(stream.chunk) == 0 || stream.cancelled {
+		return
+	}
+	chunk := stream.toC(stream.chunk)
+	stream.cancelled = !stream.emit(chunk)
+	stream.free(chunk)
+	stream.sent += len(stream.chunk)
+	stream.chunk = stream.chunk[:0]
+}
+
+// Add a value to the stream, sending the current chunk once it's full
+//
+// Parameters:
+//   - value: The value to send.
+//
+// Returns:
+//   - false once the consumer has cancelled the stream (the value is dropped), true otherwise.
+func (stream *ResultStream[T]) Send(value T) bool {
+	if stream.cancelled {
+		return false
+	}
+	stream.chunk = append(stream.chunk, value)
+	if len(stream.chunk) == cap(stream.chunk) {
+		stream.flush()
+	}
+	return !stream.cancelled
+}
+
+// Send the last partial chunk, call this once every value has been sent (or the producer stops early)
+//
+// Returns:
+//   - false if the consumer cancelled the stream, true otherwise.
+func (stream *ResultStream[T]) Close() bool {
+	stream.flush()
+	stream.chunk = nil
+	return !stream.cancelled
+}
+
+// Check if the consumer has cancelled the stream
+//
+// Returns:
+//   - true if a callback returned non-zero.
+func (stream *ResultStream[T]) Cancelled() bool {
+	return stream.cancelled
+}
+
+// The number of values handed to the consumer so far
+//
+// Returns:
+//   - The number of values in every chunk sent, including the chunk the consumer cancelled on.
+func (stream *ResultStream[T]) Sent() int {
+	return stream.sent
+}
+
+// ========== Debugging Functions ==========
+
+// Used to convert a C-compatible string back to itself, good for debugging encoding issues
+//
+// Parameters:
+//   - cString: Pointer to the C string (*C.char).
+//
+// Returns:
+//   - Pointer to a new C string with the same content (*C.char).
+//     Note: The caller is responsible for freeing the allocated memory using FreeCString.
+//
+//export return_string
+func return_string(cString unsafe.Pointer) unsafe.Pointer {
+	internalRepresentation := C.GoString((*C.char)(cString))
+	result := StringToCString(internalRepresentation)
+	return result
+}
+
+// Used to convert a C-compatible string array to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of strings (**C.char).
+//   - numberOfStrings: Number of strings in the C array.
+//
+// Returns:
+//   - Pointer to a C.StringArrayResult containing the converted strings (*C.StringArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_string_array_result.
+//
+//export return_string_array
+func return_string_array(cArray unsafe.Pointer, numberOfStrings int) *C.StringArrayResult {
+
+	internalRepresentation := CStringArrayToSlice(cArray, numberOfStrings)
+
+	result := StringSliceToCArray(internalRepresentation)
+
+	return result
+}
+
+// Used to convert a C-compatible integer array to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of integers (*C.int).
+//   - numberOfElements: Number of elements in the C array.
+//
+// Returns:
+//   - Pointer to a C.IntArrayResult containing the converted integers (*C.IntArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_int_array_result.
+//
+//export return_int_array
+func return_int_array(cArray unsafe.Pointer, numberOfElements C.int) *C.IntArrayResult {
+	internalRepresentation := CIntArrayToSlice(cArray, int(numberOfElements))
+	result := IntSliceToCArray(internalRepresentation)
+	return (*C.IntArrayResult)(result)
+}
+
+// Used to convert a C-compatible float array to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of floats(*C.float).
+//   - numberOfElements: Number of elements in the C array.
+//
+// Returns:
+//   - Pointer to a C.FloatArrayResult containing the converted floats (*C.FloatArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_float_array_result.
+//
+//export return_float_array
+func return_float_array(cArray unsafe.Pointer, numberOfElements C.int) *C.FloatArrayResult {
+	internalRepresentation := CFloatArrayToSlice(cArray, int(numberOfElements))
+	result := FloatSliceToCArray(internalRepresentation)
+	return (*C.FloatArrayResult)(result)
+}
+
+// Used to convert a C-compatible int64_t array to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of integers (*C.int64_t).
+//   - numberOfElements: Number of elements in the C array.
+//
+// Returns:
+//   - Pointer to a C.Int64ArrayResult containing the converted integers (*C.Int64ArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_int64_array_result.
+//
+//export return_int64_array
+func return_int64_array(cArray unsafe.Pointer, numberOfElements C.int) *C.Int64ArrayResult {
+	internalRepresentation := CInt64ArrayToSlice(cArray, int(numberOfElements))
+	return Int64SliceToCArray(internalRepresentation)
+}
+
+// Used to convert a C-compatible double array to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of doubles (*C.double).
+//   - numberOfElements: Number of elements in the C array.
+//
+// Returns:
+//   - Pointer to a C.DoubleArrayResult containing the converted doubles (*C.DoubleArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_double_array_result.
+//
+//export return_double_array
+func return_double_array(cArray unsafe.Pointer, numberOfElements C.int) *C.DoubleArrayResult {
+	internalRepresentation := CFloat64ArrayToSlice(cArray, int(numberOfElements))
+	return Float64SliceToCArray(internalRepresentation)
+}
+
+// Used to get the byte length of every string in a C-compatible string array in one call, an example of a batched export
+//
+// Parameters:
+//   - cArray: Pointer to the C array of strings (**C.char).
+//   - numberOfStrings: Number of strings in the C array.
+//
+// Returns:
+//   - Pointer to a C.IntArrayResult containing the length of each string (*C.IntArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_int_array_result.
+//
+//export return_string_lengths
+func return_string_lengths(cArray unsafe.Pointer, numberOfStrings C.int) *C.IntArrayResult {
+	lengths := BatchStrings(cArray, int(numberOfStrings), func(item string) int { return len(item) })
+	return IntSliceToCArray(lengths)
+}
+
+// Used to download the strings behind a handle
+//
+// Parameters:
+//   - handle: A handle returned by upload_string_array.
+//
+// Returns:
+//   - Pointer to a C.StringArrayResult containing a copy of the strings, or NULL if the handle is released (or not a string array).
+//     Note: The caller is responsible for freeing the allocated memory using free_string_array_result.
+//
+//export return_handle_string_array
+func return_handle_string_array(handle C.uintptr_t) *C.StringArrayResult {
+	data, ok := HandleValue[[]string](handle)
+	if !ok {
+		return nil
+	}
+	return StringSliceToCArray(data)
+}
+
+// Used to download the integers behind a handle
+//
+// Parameters:
+//   - handle: A handle returned by upload_int_array.
+//
+// Returns:
+//   - Pointer to a C.IntArrayResult containing a copy of the integers, or NULL if the handle is released (or not an int array).
+//     Note: The caller is responsible for freeing the allocated memory using free_int_array_result.
+//
+//export return_handle_int_array
+func return_handle_int_array(handle C.uintptr_t) *C.IntArrayResult {
+	data, ok := HandleValue[[]int32](handle)
+	if !ok {
+		return nil
+	}
+	return Int32SliceToCArray(data)
+}
+
+// Used to download the floats behind a handle
+//
+// Parameters:
+//   - handle: A handle returned by upload_float_array.
+//
+// Returns:
+//   - Pointer to a C.FloatArrayResult containing a copy of the floats, or NULL if the handle is released (or not a float array).
+//     Note: The caller is responsible for freeing the allocated memory using free_float_array_result.
+//
+//export return_handle_float_array
+func return_handle_float_array(handle C.uintptr_t) *C.FloatArrayResult {
+	data, ok := HandleValue[[]float32](handle)
+	if !ok {
+		return nil
+	}
+	return Float32SliceToCArray(data)
+}
+
+// Used to get the byte length of every string behind a handle, an example of an export that queries resident data
+//
+// Parameters:
+//   - handle: A handle returned by upload_string_array.
+//
+// Returns:
+//   - Pointer to a C.IntArrayResult containing the length of each string, or NULL if the handle is released (or not a string array).
+//     Note: The caller is responsible for freeing the allocated memory using free_int_array_result.
+//
+//export handle_string_lengths
+func handle_string_lengths(handle C.uintptr_t) *C.IntArrayResult {
+	data, ok := HandleValue[[]string](handle)
+	if !ok {
+		return nil
+	}
+	return IntSliceToCArray(mapSlice(data, func(item string) int { return len(item) }))
+}
+
+// Used to stream a C-compatible string array back in chunks, an example of a streaming export
+//
+// Parameters:
+//   - cArray: Pointer to the C array of strings (**C.char).
+//   - numberOfStrings: Number of strings in the C array.
+//   - chunkSize: The number of strings per chunk, 1024 if < 1.
+//   - callback: The C function to hand each C.StringArrayResult chunk to, return non-zero to stop early.
+//   - context: An opaque pointer passed to every call of callback (can be NULL).
+//
+// Returns:
+//   - The number of strings handed to callback.
+//
+//export stream_string_array
+func stream_string_array(cArray unsafe.Pointer, numberOfStrings C.int, chunkSize C.int, callback C.ChunkCallback, context unsafe.Pointer) C.longlong {
+	stream := NewStringStream(callback, context, int(chunkSize))
+	for _, item := range CStringArrayToSlice(cArray, int(numberOfStrings)) {
+		if !stream.Send(item) {
+			break
+		}
+	}
+	stream.Close()
+	return C.longlong(stream.Sent())
+}
+
+// Used to stream a C-compatible int array back in chunks, an example of a streaming export
+//
+// Parameters:
+//   - cArray: Pointer to the C array of integers (*C.int).
+//   - numberOfElements: Number of elements in the C array.
+//   - chunkSize: The number of integers per chunk, 1024 if < 1.
+//   - callback: The C function to hand each C.IntArrayResult chunk to, return non-zero to stop early.
+//   - context: An opaque pointer passed to every call of callback (can be NULL).
+//
+// Returns:
+//   - The number of integers handed to callback.
+//
+//export stream_int_array
+func stream_int_array(cArray unsafe.Pointer, numberOfElements C.int, chunkSize C.int, callback C.ChunkCallback, context unsafe.Pointer) C.longlong {
+	stream := NewInt32Stream(callback, context, int(chunkSize))
+	for _, item := range CInt32ArrayToSlice(cArray, int(numberOfElements)) {
+		if !stream.Send(item) {
+			break
+		}
+	}
+	stream.Close()
+	return C.longlong(stream.Sent())
+}
+
+// Used to convert a bit-packed C-compatible bool array to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of bools (*C.uchar).
+//   - numberOfElements: Number of elements in the C array.
+//
+// Returns:
+//   - Pointer to a C.BoolArrayResult containing the converted bools (*C.BoolArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_bool_array_result.
+//
+//export return_bool_array
+func return_bool_array(cArray unsafe.Pointer, numberOfElements C.int) *C.BoolArrayResult {
+	internalRepresentation := CBoolArrayToSlice(cArray, int(numberOfElements))
+	return BoolSliceToCArray(internalRepresentation)
+}
+
+// Used to convert a C-compatible uint8_t array to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of integers (*C.uint8_t).
+//   - numberOfElements: Number of elements in the C array.
+//
+// Returns:
+//   - Pointer to a C.Uint8ArrayResult containing the converted integers (*C.Uint8ArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_uint8_array_result.
+//
+//export return_uint8_array
+func return_uint8_array(cArray unsafe.Pointer, numberOfElements C.int) *C.Uint8ArrayResult {
+	internalRepresentation := CUint8ArrayToSlice(cArray, int(numberOfElements))
+	return Uint8SliceToCArray(internalRepresentation)
+}
+
+// Used to convert a C-compatible int8_t array to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of integers (*C.int8_t).
+//   - numberOfElements: Number of elements in the C array.
+//
+// Returns:
+//   - Pointer to a C.Int8ArrayResult containing the converted integers (*C.Int8ArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_int8_array_result.
+//
+//export return_int8_array
+func return_int8_array(cArray unsafe.Pointer, numberOfElements C.int) *C.Int8ArrayResult {
+	internalRepresentation := CInt8ArrayToSlice(cArray, int(numberOfElements))
+	return Int8SliceToCArray(internalRepresentation)
+}
+
+// Used to convert a C-compatible int16_t array to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of integers (*C.int16_t).
+//   - numberOfElements: Number of elements in the C array.
+//
+// Returns:
+//   - Pointer to a C.Int16ArrayResult containing the converted integers (*C.Int16ArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_int16_array_result.
+//
+//export return_int16_array
+func return_int16_array(cArray unsafe.Pointer, numberOfElements C.int) *C.Int16ArrayResult {
+	internalRepresentation := CInt16ArrayToSlice(cArray, int(numberOfElements))
+	return Int16SliceToCArray(internalRepresentation)
+}
+
+// Used to convert a nullable C-compatible int array to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of integers (*C.int).
+//   - validity: Pointer to the C validity bitmap (*C.uchar), NULL if nothing is missing.
+//   - numberOfElements: Number of elements in the C array.
+//
+// Returns:
+//   - Pointer to a C.NullableIntArrayResult containing the converted integers (*C.NullableIntArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_nullable_int_array_result.
+//
+//export return_nullable_int_array
+func return_nullable_int_array(cArray unsafe.Pointer, validity unsafe.Pointer, numberOfElements C.int) *C.NullableIntArrayResult {
+	internalRepresentation, internalValidity := CNullableInt32ArrayToSlice(cArray, validity, int(numberOfElements))
+	return NullableInt32SliceToCArray(internalRepresentation, internalValidity)
+}
+
+// Used to convert a nullable C-compatible float array to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of floats (*C.float).
+//   - validity: Pointer to the C validity bitmap (*C.uchar), NULL if nothing is missing.
+//   - numberOfElements: Number of elements in the C array.
+//
+// Returns:
+//   - Pointer to a C.NullableFloatArrayResult containing the converted floats (*C.NullableFloatArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_nullable_float_array_result.
+//
+//export return_nullable_float_array
+func return_nullable_float_array(cArray unsafe.Pointer, validity unsafe.Pointer, numberOfElements C.int) *C.NullableFloatArrayResult {
+	internalRepresentation, internalValidity := CNullableFloat32ArrayToSlice(cArray, validity, int(numberOfElements))
+	return NullableFloat32SliceToCArray(internalRepresentation, internalValidity)
+}
+
+// Used to convert a nullable C-compatible string array to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of strings (**C.char), missing strings can be NULL.
+//   - validity: Pointer to the C validity bitmap (*C.uchar), NULL if nothing is missing.
+//   - numberOfStrings: Number of strings in the C array.
+//
+// Returns:
+//   - Pointer to a C.NullableStringArrayResult containing the converted strings (*C.NullableStringArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_nullable_string_array_result.
+//
+//export return_nullable_string_array
+func return_nullable_string_array(cArray unsafe.Pointer, validity unsafe.Pointer, numberOfStrings C.int) *C.NullableStringArrayResult {
+	internalRepresentation, internalValidity := CNullableStringArrayToSlice(cArray, validity, int(numberOfStrings))
+	return NullableStringSliceToCArray(internalRepresentation, internalValidity)
+}
+
+// Used to convert a C-compatible array of binary blobs to wrapper type
+//
+// Parameters:
+//   - cArray: Pointer to the C array of pointers to each item (**C.uchar).
+//   - lengths: Pointer to the C array with the length of each item in bytes (*C.longlong).
+//   - numberOfElements: Number of items in the C arrays.
+//
+// Returns:
+//   - Pointer to a C.BytesArrayResult containing a copy of the items (*C.BytesArrayResult).
+//     Note: The caller is responsible for freeing the allocated memory using free_bytes_array_result.
+//
+//export return_bytes_array
+func return_bytes_array(cArray unsafe.Pointer, lengths unsafe.Pointer, numberOfElements C.int) *C.BytesArrayResult {
+	internalRepresentation := CBytesArrayToSlice(cArray, lengths, int(numberOfElements))
+	return BytesSliceToCArray(internalRepresentation)
+}
+
+// A nested record used by msgpack_records_roundtrip, to show decoding straight into Go structs
+type msgpackDebugRecord struct {
+	Name     string               `msgpack:"name"`
+	Scores   []float64            `msgpack:"scores"`
+	Tags     map[string]int       `msgpack:"tags"`
+	Children []msgpackDebugRecord `msgpack:"children"`
+}
+
+// Used to decode a msgpack value into Go and encode it again, good for debugging the wire format
+//
+// Parameters:
+//   - cData: Pointer to the msgpack encoded bytes.
+//   - length: The number of bytes.
+//
+// Returns:
+//   - Pointer to a C.BytesArrayResult with the re-encoded value as its only item, or NULL if the data isn't valid msgpack.
+//     Note: The caller is responsible for freeing the allocated memory using free_bytes_array_result.
+//
+//export msgpack_roundtrip
+func msgpack_roundtrip(cData unsafe.Pointer, length C.int) *C.BytesArrayResult {
+	var internalRepresentation any
+	if err := CMsgpackToValue(cData, length, &internalRepresentation); err != nil {
+		return nil
+	}
+	result, err := ValueToCMsgpack(internalRepresentation)
+	if err != nil {
+		return nil
+	}
+	return result
+}
+
+// Used to decode a msgpack list of records into Go structs and encode them again, an example of decoding into typed values
+//
+// Parameters:
+//   - cData: Pointer to the msgpack encoded list of maps with "name", "scores", "tags" and "children" keys.
+//   - length: The number of bytes.
+//
+// Returns:
+//   - Pointer to a C.BytesArrayResult with the re-encoded records as its only item, or NULL if the data doesn't fit the records.
+//     Note: The caller is responsible for freeing the allocated memory using free_bytes_array_result.
+//
+//export msgpack_records_roundtrip
+func msgpack_records_roundtrip(cData unsafe.Pointer, length C.int) *C.BytesArrayResult {
+	var internalRepresentation []msgpackDebugRecord
+	if err := CMsgpackToValue(cData, length, &internalRepresentation); err != nil {
+		return nil
+	}
+	result, err := ValueToCMsgpack(internalRepresentation)
+	if err != nil {
+		return nil
+	}
+	return result
+}
+
+// Used to decode a JSON document into Go and encode it again, the encoding/json baseline for msgpack_roundtrip
+//
+// Parameters:
+//   - cString: Pointer to the JSON C string (*C.char).
+//
+// Returns:
+//   - Pointer to a new C string with the re-encoded JSON (*C.char), or NULL if it isn't valid JSON.
+//     Note: The caller is responsible for freeing the allocated memory using FreeCString.
+//
+//export json_roundtrip
+func json_roundtrip(cString unsafe.Pointer) unsafe.Pointer {
+	var internalRepresentation any
+	if err := json.Unmarshal([]byte(C.GoString((*C.char)(cString))), &internalRepresentation); err != nil {
+		return nil
+	}
+	encoded, err := json.Marshal(internalRepresentation)
+	if err != nil {
+		return nil
+	}
+	return StringToCString(string(encoded))
+}
+
+// Prints the go representation of a C string, good for debugging encoding issues
+//
+// Parameters:
+//   - ptr: Pointer to the C string (*C.char).
+//
+//export print_string
+func print_string(ptr unsafe.Pointer) {
+	if ptr != nil {
+		fmt.Printf("print_string() Go representation: %s\n", C.GoString((*C.char)(ptr)))
+	} else {
+		fmt.Println("print_string() received nil pointer")
+	}
+}
+
+// Prints the go representation of an array, good for debugging encoding issues
+//
+// Parameters:
+//   - cArray: Pointer to the C array of strings (**C.char).
+//   - numberOfString: Number of strings in the C array.
+//
+//export print_string_array
+func print_string_array(cArray unsafe.Pointer, numberOfString int) {
+	res := CStringArrayToSlice(cArray, numberOfString)
+	fmt.Printf("print_string_array() Go representation: %v\n", res)
+}
+
+// Prints the go representation of an array, good for debugging rounding/conversion issues
+//
+// Parameters:
+//   - cArray: Pointer to the C array of integers (*C.int).
+//   - numberOfInts: Number of integers in the C array.
+//
+//export print_int_array
+func print_int_array(cArray unsafe.Pointer, numberOfInts int) {
+	fmt.Printf("Got initial array with %d items, converting", numberOfInts)
+	res := CIntArrayToSlice(cArray, numberOfInts)
+	fmt.Println("Converted array")
+
+	fmt.Printf("print_int_array() Go representation: %v\n", res)
+}
+
+// Prints the go representation of an array, good for debugging rounding/conversion issues
+//
+// Parameters:
+//   - cArray: Pointer to the C array of floats (*C.float).
+//   - numberOfFloats: Number of floats in the C array.
+//
+//export print_float_array
+func print_float_array(cArray unsafe.Pointer, numberOfFloats int) {
+	res := CFloatArrayToSlice(cArray, numberOfFloats)
+
+	fmt.Printf("print_float_array() Go representation: %v\n", res)
+}
+
+// ========== Buffer pool ==========
+
+// Every buffer handed to C (arrays, result structs and strings) goes through poolAlloc/poolFree. When the pool
+// is enabled freed buffers are kept on per size-class free lists and reused, instead of going back to libc.
+// Buffers are plain C.malloc memory, their size class is tracked in liveBuffers (keyed by pointer) instead of
+// in the memory itself, so poolFree never reads around the pointers it's given.
+
+const (
+	poolMinClassShift   = 6  // The smallest size class is 64 bytes
+	poolNumberOfClasses = 25 // The largest size class is 1GB, anything bigger is never pooled
+	poolUnpooledClass   = -1 // Size class for buffers too big to pool (and every buffer allocated while the pool is off)
+)
+
+// A buffer handed out by poolAlloc
+type poolBuffer struct {
+	class    int
+	capacity int64
+}
+
+var bufferPool = struct {
+	sync.Mutex
+	enabled          atomic.Bool
+	freeLists        [poolNumberOfClasses][]unsafe.Pointer
+	hits             int64
+	misses           int64
+	retainedBytes    int64
+	retainedBuffers  int64
+	maxRetainedBytes int64
+}{maxRetainedBytes: 256 << 20}
+
+// Buffers handed out by poolAlloc that have not been passed to poolFree yet, pointers that aren't in it are C.CString/C.malloc memory
+var liveBuffers = struct {
+	sync.Mutex
+	buffers map[unsafe.Pointer]poolBuffer
+}{buffers: map[unsafe.Pointer]poolBuffer{}}
+
+// The number (and bytes) of liveBuffers, used for leak detection
+var liveCBuffers, liveCBytes atomic.Int64
+
+// Gets the size class a buffer of a given size fits in
+//
+// Parameters:
+//   - size: The number of bytes needed.
+//
+// Returns:
+//   - The index of the smallest size class that fits size, or poolUnpooledClass if it's too big to pool.
+func poolSizeClass(size int) int {
+	if size <= 1<<poolMinClassShift {
+		return 0
+	}
+	class := bits.Len(uint(size-1)) - poolMinClassShift
+	if class >= poolNumberOfClasses {
+		return poolUnpooledClass
+	}
+	return class
+}
+
+// Allocate a buffer for C, reusing a pooled buffer of the same size class when the pool is enabled
+//
+// Parameters:
+//   - size: The number of bytes needed.
+//
+// Returns:
+//   - Pointer to at least size bytes of memory (exactly size bytes while the pool is disabled, the whole size class while it's enabled).
+//     Note: The memory should be freed using poolFree (or one of the Free*/free_* functions), C.free works while the pool is
+//     disabled but leaves the buffer counted in liveCBuffers.
+func poolAlloc(size C.size_t) unsafe.Pointer {
+	class := poolUnpooledClass // Buffers allocated while the pool is off are never pooled, so they don't pay for rounding up
+	capacity := int(size)
+	if bufferPool.enabled.Load() {
+		class = poolSizeClass(int(size))
+	}
+	if class != poolUnpooledClass {
+		capacity = 1 << (class + poolMinClassShift)
+	}
+
+	var buffer unsafe.Pointer
+	if class != poolUnpooledClass {
+		bufferPool.Lock()
+		freeList := bufferPool.freeLists[class]
+		if last := len(freeList) - 1; last >= 0 {
+			buffer = freeList[last]
+			bufferPool.freeLists[class] = freeList[:last]
+			bufferPool.hits++
+			bufferPool.retainedBytes -= int64(capacity)
+			bufferPool.retainedBuffers--
+		} else {
+			bufferPool.misses++
+		}
+		bufferPool.Unlock()
+	}
+	if buffer == nil {
+		buffer = C.malloc(C.size_t(max(capacity, 1))) // Never 0, so every buffer has its own (non NULL) pointer to track
+	}
+
+	liveBuffers.Lock()
+	liveBuffers.buffers[buffer] = poolBuffer{class: class, capacity: int64(capacity)}
+	liveBuffers.Unlock()
+	liveCBuffers.Add(1)
+	liveCBytes.Add(int64(capacity))
+	return buffer
+}
+
+// Free a buffer from poolAlloc, keeping it for reuse if the pool is enabled and has room
+//
+// Parameters:
+//   - ptr: Pointer returned by poolAlloc, C.CString or C.malloc, nil is ignored.
+//
+// Notes
+//
+//   - Pointers poolAlloc didn't hand out (i.e. from C.CString in your own exports) are passed straight to C.free
+//   - While the pool is enabled, free its buffers with poolFree (or the Free*/free_* functions), never C.free. Otherwise
+//     their address is still tracked, and could be pooled again once libc reuses it for something else.
+func poolFree(ptr unsafe.Pointer) {
+	if ptr == nil {
+		return
+	}
+	liveBuffers.Lock()
+	buffer, owned := liveBuffers.buffers[ptr]
+	delete(liveBuffers.buffers, ptr)
+	liveBuffers.Unlock()
+	if !owned {
+		C.free(ptr)
+		return
+	}
+	liveCBuffers.Add(-1)
+	liveCBytes.Add(-buffer.capacity)
+
+	class := buffer.class
+	if class != poolUnpooledClass && bufferPool.enabled.Load() {
+		capacity := buffer.capacity
+		bufferPool.Lock()
+		// Checked again under the lock, so a buffer can't be retained after enable_buffer_pool(0, ...) trimmed the pool
+		if bufferPool.enabled.Load() && bufferPool.retainedBytes+capacity <= bufferPool.maxRetainedBytes {
+			bufferPool.freeLists[class] = append(bufferPool.freeLists[class], ptr)
+			bufferPool.retainedBytes += capacity
+			bufferPool.retainedBuffers++
+			bufferPool.Unlock()
+			return
+		}
+		bufferPool.Unlock()
+	}
+	C.free(ptr)
+}
+
+// Copy a Go string into a NUL terminated C string allocated with poolAlloc (pooled version of C.CString)
+//
+// Parameters:
+//   - input: The Go string to convert.
+//
+// Returns:
+//   - A pointer to the C string.
+//     Note: The caller is responsible for freeing the allocated memory using FreeCString.
+func poolCString(input string) *C.char {
+	buffer := poolAlloc(C.size_t(len(input) + 1))
+	cString := unsafe.Slice((*byte)(buffer), len(input)+1)
+	copy(cString, input)
+	cString[len(input)] = 0
+	return (*C.char)(buffer)
+}
+
+// Turn the buffer pool on or off, turning it off releases every retained buffer back to libc
+//
+// Parameters:
+//   - enabled: 1 to pool freed buffers, 0 to free them straight away (the default).
+//   - maxRetainedBytes: The most memory the pool will hold on to, freed buffers past this go back to libc.
+//
+//export enable_buffer_pool
+func enable_buffer_pool(enabled C.int, maxRetainedBytes C.longlong) {
+	bufferPool.Lock()
+	bufferPool.maxRetainedBytes = int64(maxRetainedBytes)
+	bufferPool.Unlock()
+
+	bufferPool.enabled.Store(enabled != 0)
+	if enabled == 0 {
+		trim_buffer_pool()
+	}
+}
+
+// Release every buffer retained by the pool back to libc
+//
+// Returns:
+//   - The number of bytes released.
+//
+//export trim_buffer_pool
+func trim_buffer_pool() C.longlong {
+	bufferPool.Lock()
+	freeLists := bufferPool.freeLists
+	released := bufferPool.retainedBytes
+	bufferPool.freeLists = [poolNumberOfClasses][]unsafe.Pointer{}
+	bufferPool.retainedBytes = 0
+	bufferPool.retainedBuffers = 0
+	bufferPool.Unlock()
+
+	for _, freeList := range freeLists {
+		for _, ptr := range freeList {
+			C.free(ptr)
+		}
+	}
+	return C.longlong(released)
+}
+
+// Write the pool's hit/miss counters and retained memory into a C.BufferPoolStats
+//
+// Parameters:
+//   - out: Pointer to the C.BufferPoolStats to fill in (*C.BufferPoolStats).
+//
+//export buffer_pool_stats
+func buffer_pool_stats(out unsafe.Pointer) {
+	stats := (*C.BufferPoolStats)(out)
+	bufferPool.Lock()
+	defer bufferPool.Unlock()
+	stats.hits = C.longlong(bufferPool.hits)
+	stats.misses = C.longlong(bufferPool.misses)
+	stats.retainedBytes = C.longlong(bufferPool.retainedBytes)
+	stats.retainedBuffers = C.longlong(bufferPool.retainedBuffers)
+	stats.maxRetainedBytes = C.longlong(bufferPool.maxRetainedBytes)
+}
+
+// ========== Go runtime ==========
+
+// Write a snapshot of the Go runtime's memory statistics into a C.GoMemoryStats
+//
+// Parameters:
+//   - out: Pointer to the C.GoMemoryStats to fill in (*C.GoMemoryStats).
+//
+// Notes
+//
+//   - liveCBuffers/liveCBytes count memory handed to C by this library that has not been freed yet (buffers retained by the pool don't count)
+//   - lastPauseNs/maxPauseNs are the latest and longest stop the world pauses out of the last 256 collections
+//   - Reading the stats briefly stops the world, so sample it, don't call it in hot loops
+//
+//export go_memory_stats
+func go_memory_stats(out unsafe.Pointer) {
+	var memoryStats runtime.MemStats
+	runtime.ReadMemStats(&memoryStats)
+
+	stats := (*C.GoMemoryStats)(out)
+	stats.heapAlloc = C.ulonglong(memoryStats.HeapAlloc)
+	stats.heapInuse = C.ulonglong(memoryStats.HeapInuse)
+	stats.heapObjects = C.ulonglong(memoryStats.HeapObjects)
+	stats.sys = C.ulonglong(memoryStats.Sys)
+	stats.mallocs = C.ulonglong(memoryStats.Mallocs)
+	stats.frees = C.ulonglong(memoryStats.Frees)
+	stats.numGC = C.ulonglong(memoryStats.NumGC)
+	stats.liveCBuffers = C.longlong(liveCBuffers.Load())
+	stats.liveCBytes = C.longlong(liveCBytes.Load())
+	stats.totalAlloc = C.ulonglong(memoryStats.TotalAlloc)
+	stats.heapSys = C.ulonglong(memoryStats.HeapSys)
+	stats.heapIdle = C.ulonglong(memoryStats.HeapIdle)
+	stats.heapReleased = C.ulonglong(memoryStats.HeapReleased)
+	stats.nextGC = C.ulonglong(memoryStats.NextGC)
+	stats.lastGC = C.ulonglong(memoryStats.LastGC)
+	stats.numForcedGC = C.ulonglong(memoryStats.NumForcedGC)
+	stats.pauseTotalNs = C.ulonglong(memoryStats.PauseTotalNs)
+	stats.gcCPUFraction = C.double(memoryStats.GCCPUFraction)
+
+	// PauseNs is a circular buffer, the latest pause is at (NumGC+255)%256
+	var lastPause, maxPause uint64
+	if memoryStats.NumGC > 0 {
+		lastPause = memoryStats.PauseNs[(memoryStats.NumGC+255)%256]
+	}
+	for _, pause := range memoryStats.PauseNs[:min(memoryStats.NumGC, 256)] {
+		maxPause = max(maxPause, pause)
+	}
+	stats.lastPauseNs = C.ulonglong(lastPause)
+	stats.maxPauseNs = C.ulonglong(maxPause)
+}
+
+// Set the number of OS threads that can run Go code at once (GOMAXPROCS), i.e. to the container's CPU quota so Go doesn't fight python for cores
+//
+// Parameters:
+//   - procs: The new value, below 1 leaves it unchanged.
+//
+// Returns:
+//   - The previous value (C.int).
+//
+//export set_gomaxprocs
+func set_gomaxprocs(procs C.int) C.int {
+	return C.int(runtime.GOMAXPROCS(int(procs)))
+}
+
+// Set the garbage collection target percentage (GOGC), higher values collect less often but use more memory
+//
+// Parameters:
+//   - percent: The new value, negative turns the GC off (only the memory limit triggers collections then).
+//
+// Returns:
+//   - The previous value (C.int).
+//
+//export set_gc_percent
+func set_gc_percent(percent C.int) C.int {
+	return C.int(debug.SetGCPercent(int(percent)))
+}
+
+// Set Go's soft memory limit (GOMEMLIMIT), the GC runs more often as the Go heap gets close to it, i.e. below the container's memory limit
+//
+// Parameters:
+//   - limit: The new limit in bytes, negative leaves it unchanged (math.MaxInt64 means no limit).
+//
+// Returns:
+//   - The previous limit in bytes (C.longlong).
+//
+//export set_memory_limit
+func set_memory_limit(limit C.longlong) C.longlong {
+	return C.longlong(debug.SetMemoryLimit(int64(limit)))
+}
+
+// ========== Profiling ==========
+
+// The file the running CPU profile is written to, nil if none is running
+var cpuProfile struct {
+	sync.Mutex
+	file *os.File
+}
+
+// The file the running execution trace is written to, nil if none is running
+var executionTrace struct {
+	sync.Mutex
+	file *os.File
+}
+
+// Convert an error to a C string for the caller to free with FreeCString, NULL if there was no error
+func errorToCString(err error) *C.char {
+	if err == nil {
+		return nil
+	}
+	return poolCString(err.Error())
+}
+
+// Start writing a CPU profile of everything Go runs in this library to a file, used to build with profile-guided optimization (go build -pgo)
+//
+// Parameters:
+//   - path: The path to write the profile to, i.e. default.pgo next to the main package.
+//
+// Returns:
+//   - An error if a profile is already running, or the file can't be created.
+func StartCPUProfile(path string) error {
+	cpuProfile.Lock()
+	defer cpuProfile.Unlock()
+	if cpuProfile.file != nil {
+		return fmt.Errorf("a CPU profile is already running (writing to %s)", cpuProfile.file.Name())
+	}
+	file, err := os.Create(path)
+	if err != nil {
+		return err
+	}
+	if err := pprof.StartCPUProfile(file); err != nil {
+		file.Close()
+		return err
+	}
+	cpuProfile.file = file
+	return nil
+}
+
+// Stop the running CPU profile, flushing it to its file
+//
+// Returns:
+//   - An error if no profile is running, or the file can't be written.
+func StopCPUProfile() error {
+	cpuProfile.Lock()
+	defer cpuProfile.Unlock()
+	if cpuProfile.file == nil {
+		return fmt.Errorf("no CPU profile is running")
+	}
+	pprof.StopCPUProfile()
+	err := cpuProfile.file.Close()
+	cpuProfile.file = nil
+	return err
+}
+
+// Start writing a CPU profile to a file, see StartCPUProfile
+//
+// Parameters:
+//   - cPath: The path to write the profile to (*C.char).
+//
+// Returns:
+//   - NULL if the profile started, otherwise the error.
+//     Note: The caller is responsible for freeing the error using FreeCString.
+//
+//export start_cpu_profile
+func start_cpu_profile(cPath *C.char) *C.char {
+	return errorToCString(StartCPUProfile(C.GoString(cPath)))
+}
+
+// Stop the running CPU profile, see StopCPUProfile
+//
+// Returns:
+//   - NULL if the profile was written, otherwise the error.
+//     Note: The caller is responsible for freeing the error using FreeCString.
+//
+//export stop_cpu_profile
+func stop_cpu_profile() *C.char {
+	return errorToCString(StopCPUProfile())
+}
+
+// Write a snapshot profile to a file
+//
+// Parameters:
+//   - name: The profile to write, one of the pprof.Lookup() names ("heap", "allocs", "goroutine", "threadcreate", "block" or "mutex").
+//     heap and allocs run a garbage collection first so they include everything allocated up to now.
+//   - path: The path to write the profile to.
+//
+// Returns:
+//   - An error if the profile doesn't exist, or the file can't be written.
+func WriteProfile(name string, path string) error {
+	profile := pprof.Lookup(name)
+	if profile == nil {
+		return fmt.Errorf("unknown profile %q", name)
+	}
+	if name == "heap" || name == "allocs" {
+		runtime.GC() // Heap profiles are only updated by garbage collections
+	}
+	file, err := os.Create(path)
+	if err != nil {
+		return err
+	}
+	if err := profile.WriteTo(file, 0); err != nil {
+		file.Close()
+		return err
+	}
+	return file.Close()
+}
+
+// Start writing an execution trace (runtime/trace) of the library's Go code to a file, view it with go tool trace
+//
+// Parameters:
+//   - path: The path to write the trace to.
+//
+// Returns:
+//   - An error if a trace is already running, or the file can't be created.
+func StartTrace(path string) error {
+	executionTrace.Lock()
+	defer executionTrace.Unlock()
+	if executionTrace.file != nil {
+		return fmt.Errorf("an execution trace is already running (writing to %s)", executionTrace.file.Name())
+	}
+	file, err := os.Create(path)
+	if err != nil {
+		return err
+	}
+	if err := trace.Start(file); err != nil {
+		file.Close()
+		return err
+	}
+	executionTrace.file = file
+	return nil
+}
+
+// Stop the running execution trace, flushing it to its file
+//
+// Returns:
+//   - An error if no trace is running, or the file can't be written.
+func StopTrace() error {
+	executionTrace.Lock()
+	defer executionTrace.Unlock()
+	if executionTrace.file == nil {
+		return fmt.Errorf("no execution trace is running")
+	}
+	trace.Stop()
+	err := executionTrace.file.Close()
+	executionTrace.file = nil
+	return err
+}
+
+// Write a snapshot profile to a file, see WriteProfile
+//
+// Parameters:
+//   - cName: The profile to write (*C.char), i.e. "heap", "allocs" or "goroutine".
+//   - cPath: The path to write the profile to (*C.char).
+//
+// Returns:
+//   - NULL if the profile was written, otherwise the error.
+//     Note: The caller is responsible for freeing the error using FreeCString.
+//
+//export write_profile
+func write_profile(cName *C.char, cPath *C.char) *C.char {
+	return errorToCString(WriteProfile(C.GoString(cName), C.GoString(cPath)))
+}
+
+// Start writing an execution trace to a file, see StartTrace
+//
+// Parameters:
+//   - cPath: The path to write the trace to (*C.char).
+//
+// Returns:
+//   - NULL if the trace started, otherwise the error.
+//     Note: The caller is responsible for freeing the error using FreeCString.
+//
+//export start_trace
+func start_trace(cPath *C.char) *C.char {
+	return errorToCString(StartTrace(C.GoString(cPath)))
+}
+
+// Stop the running execution trace, see StopTrace
+//
+// Returns:
+//   - NULL if the trace was written, otherwise the error.
+//     Note: The caller is responsible for freeing the error using FreeCString.
+//
+//export stop_trace
+func stop_trace() *C.char {
+	return errorToCString(StopTrace())
+}
+
+// Trace everything the library does for a time window, blocking until it's over (other threads keep calling in meanwhile)
+//
+// Parameters:
+//   - cPath: The path to write the trace to (*C.char).
+//   - milliseconds: How long to trace for.
+//
+// Returns:
+//   - NULL if the trace was written, otherwise the error.
+//     Note: The caller is responsible for freeing the error using FreeCString.
+//
+//export capture_trace
+func capture_trace(cPath *C.char, milliseconds C.int) *C.char {
+	if err := StartTrace(C.GoString(cPath)); err != nil {
+		return errorToCString(err)
+	}
+	time.Sleep(time.Duration(milliseconds) * time.Millisecond)
+	return errorToCString(StopTrace())
+}
+
+// ========== Handles ==========
+
+// Live handles and the approximate bytes each one holds, cgo.Handle panics on released handles so every lookup is checked here first
+var handles = struct {
+	sync.RWMutex
+	sizes     map[cgo.Handle]int64
+	liveBytes int64
+	uploads   int64
+	releases  int64
+}{sizes: map[cgo.Handle]int64{}}
+
+// Register a Go value and return an opaque handle to it, the value stays alive (and in Go's memory) until the handle is released
+//
+// Parameters:
+//   - value: The value to keep, usually a slice built from uploaded C data.
+//   - bytes: The approximate memory held by value, used for reporting.
+//
+// Returns:
+//   - A non-zero handle to pass back to Go in later calls.
+//     Note: The caller is responsible for releasing the handle using release_handle.
+func NewHandle(value any, bytes int) C.uintptr_t {
+	handle := cgo.NewHandle(value)
+	handles.Lock()
+	defer handles.Unlock()
+	handles.sizes[handle] = int64(bytes)
+	handles.liveBytes += int64(bytes)
+	handles.uploads++
+	return C.uintptr_t(handle)
+}
+
+// Look up the value behind a handle
+//
+// Parameters:
+//   - handle: The handle returned by NewHandle().
+//
+// Returns:
+//   - The value, and true if the handle is live and holds a T (zero value and false otherwise, instead of panicking).
+func HandleValue[T any](handle C.uintptr_t) (T, bool) {
+	handles.RLock()
+	defer handles.RUnlock()
+	var value T
+	if _, live := handles.sizes[cgo.Handle(handle)]; !live {
+		return value, false
+	}
+	value, ok := cgo.Handle(handle).Value().(T)
+	return value, ok
+}
+
+// Drop a handle, so Go can collect its value once nothing else uses it
+//
+// Parameters:
+//   - handle: The handle returned by NewHandle().
+//
+// Returns:
+//   - false if the handle was already released (or never existed), true otherwise.
+func ReleaseHandle(handle C.uintptr_t) bool {
+	handles.Lock()
+	defer handles.Unlock()
+	bytes, live := handles.sizes[cgo.Handle(handle)]
+	if !live {
+		return false
+	}
+	delete(handles.sizes, cgo.Handle(handle))
+	cgo.Handle(handle).Delete()
+	handles.liveBytes -= bytes
+	handles.releases++
+	return true
+}
+
+// Copy a C string array into Go once, so later calls can pass the handle instead of the strings
+//
+// Parameters:
+//   - cArray: Pointer to the C array of strings (**C.char).
+//   - numberOfStrings: Number of strings in the C array.
+//
+// Returns:
+//   - A handle to the []string, use HandleValue[[]string]() to get it back.
+//     Note: The caller is responsible for releasing the handle using release_handle.
+//
+//export upload_string_array
+func upload_string_array(cArray unsafe.Pointer, numberOfStrings C.int) C.uintptr_t {
+	data := CStringArrayToSlice(cArray, int(numberOfStrings))
+	bytes := len(data) * int(unsafe.Sizeof(""))
+	for _, item := range data {
+		bytes += len(item)
+	}
+	return NewHandle(data, bytes)
+}
+
+// Copy a C int array into Go once, so later calls can pass the handle instead of the integers
+//
+// Parameters:
+//   - cArray: Pointer to the C array of integers (*C.int).
+//   - numberOfElements: Number of elements in the C array.
+//
+// Returns:
+//   - A handle to the []int32, use HandleValue[[]int32]() to get it back.
+//     Note: The caller is responsible for releasing the handle using release_handle.
+//
+//export upload_int_array
+func upload_int_array(cArray unsafe.Pointer, numberOfElements C.int) C.uintptr_t {
+	return NewHandle(CInt32ArrayToSlice(cArray, int(numberOfElements)), int(numberOfElements)*4)
+}
+
+// Copy a C float array into Go once, so later calls can pass the handle instead of the floats
+//
+// Parameters:
+//   - cArray: Pointer to the C array of floats (*C.float).
+//   - numberOfElements: Number of elements in the C array.
+//
+// Returns:
+//   - A handle to the []float32, use HandleValue[[]float32]() to get it back.
+//     Note: The caller is responsible for releasing the handle using release_handle.
+//
+//export upload_float_array
+func upload_float_array(cArray unsafe.Pointer, numberOfElements C.int) C.uintptr_t {
+	return NewHandle(CFloat32ArrayToSlice(cArray, int(numberOfElements)), int(numberOfElements)*4)
+}
+
+// Release a handle, so Go can collect the data behind it
+//
+// Parameters:
+//   - handle: The handle returned by one of the upload_* functions (or NewHandle()).
+//
+// Returns:
+//   - 1 if the handle was released, 0 if it was already released (releasing twice is safe).
+//
+//export release_handle
+func release_handle(handle C.uintptr_t) C.int {
+	if ReleaseHandle(handle) {
+		return 1
+	}
+	return 0
+}
+
+// Get the approximate memory held by a handle
+//
+// Parameters:
+//   - handle: The handle returned by one of the upload_* functions (or NewHandle()).
+//
+// Returns:
+//   - The bytes held by the handle, or -1 if it's released.
+//
+//export handle_size
+func handle_size(handle C.uintptr_t) C.longlong {
+	handles.RLock()
+	defer handles.RUnlock()
+	bytes, live := handles.sizes[cgo.Handle(handle)]
+	if !live {
+		return -1
+	}
+	return C.longlong(bytes)
+}
+
+// Write the number of live handles, the memory they hold, and the upload/release counters into a C.HandleStats
+//
+// Parameters:
+//   - out: Pointer to the C.HandleStats to fill in (*C.HandleStats).
+//
+//export handle_stats
+func handle_stats(out unsafe.Pointer) {
+	stats := (*C.HandleStats)(out)
+	handles.RLock()
+	defer handles.RUnlock()
+	stats.liveHandles = C.longlong(len(handles.sizes))
+	stats.liveBytes = C.longlong(handles.liveBytes)
+	stats.uploads = C.longlong(handles.uploads)
+	stats.releases = C.longlong(handles.releases)
+}
+
+// ========== Msgpack ==========
+
+// Msgpack type bytes (https://github.com/msgpack/msgpack/blob/master/spec.md), only the subset without extension types is used
+const (
+	msgpackNil     = 0xc0
+	msgpackFalse   = 0xc2
+	msgpackTrue    = 0xc3
+	msgpackBin8    = 0xc4
+	msgpackBin16   = 0xc5
+	msgpackBin32   = 0xc6
+	msgpackFloat32 = 0xca
+	msgpackFloat64 = 0xcb
+	msgpackUint8   = 0xcc
+	msgpackUint16  = 0xcd
+	msgpackUint32  = 0xce
+	msgpackUint64  = 0xcf
+	msgpackInt8    = 0xd0
+	msgpackInt16   = 0xd1
+	msgpackInt32   = 0xd2
+	msgpackInt64   = 0xd3
+	msgpackStr8    = 0xd9
+	msgpackStr16   = 0xda
+	msgpackStr32   = 0xdb
+	msgpackArray16 = 0xdc
+	msgpackArray32 = 0xdd
+	msgpackMap16   = 0xde
+	msgpackMap32   = 0xdf
+)
+
+// The most map entries allocated up front, bigger maps grow as they're decoded so a bogus length can't allocate much
+const msgpackMaxSizeHint = 4096
+
+// The deepest values are nested when decoding, so bogus data can't recurse until the goroutine's stack overflows
+const msgpackMaxDepth = 10000
+
+// A struct field as it's encoded, the `msgpack:"name"` tag (or the field name) is the key and `msgpack:"-"` skips it
+type msgpackField struct {
+	name  string
+	index int
+}
+
+// Encoded fields per struct type, so reflection over the tags only runs once per type
+var msgpackFields sync.Map
+
+func msgpackFieldsOf(structType reflect.Type) []msgpackField {
+	if cached, ok := msgpackFields.Load(structType); ok {
+		return cached.([]msgpackField)
+	}
+	numberOfFields := structType.NumField()
+	fields := make([]msgpackField, 0, numberOfFields)
+	for i := range numberOfFields {
+		field := structType.Field(i)
+		name, tagged := field.Tag.Lookup("msgpack")
+		if !field.IsExported() || name == "-" {
+			continue
+		}
+		if !tagged || name == "" {
+			name = field.Name
+		}
+		fields = append(fields, msgpackField{name: name, index: i})
+	}
+	cached, _ := msgpackFields.LoadOrStore(structType, fields)
+	return cached.([]msgpackField)
+}
+
+func appendMsgpackLength(buffer []byte, length int, fixed byte, fixedMax int, code16 byte, code32 byte) []byte {
+	switch {
+	case length <= fixedMax:
+		return append(buffer, fixed|byte(length))
+	case length <= math.MaxUint16:
+		return binary.BigEndian.AppendUint16(append(buffer, code16), uint16(length))
+	default:
+		return binary.BigEndian.AppendUint32(append(buffer, code32), uint32(length))
+	}
+}
+
+func appendMsgpackInt(buffer []byte, value int64) []byte {
+	switch {
+	case value >= 0:
+		return appendMsgpackUint(buffer, uint64(value))
+	case value >= -32:
+		return append(buffer, byte(value)) // Negative fixint
+	case value >= math.MinInt8:
+		return append(buffer, msgpackInt8, byte(value))
+	case value >= math.MinInt16:
+		return binary.BigEndian.AppendUint16(append(buffer, msgpackInt16), uint16(value))
+	case value >= math.MinInt32:
+		return binary.BigEndian.AppendUint32(append(buffer, msgpackInt32), uint32(value))
+	default:
+		return binary.BigEndian.AppendUint64(append(buffer, msgpackInt64), uint64(value))
+	}
+}
+
+func appendMsgpackUint(buffer []byte, value uint64) []byte {
+	switch {
+	case value <= 0x7f:
+		return append(buffer, byte(value)) // Positive fixint
+	case value <= math.MaxUint8:
+		return append(buffer, msgpackUint8, byte(value))
+	case value <= math.MaxUint16:
+		return binary.BigEndian.AppendUint16(append(buffer, msgpackUint16), uint16(value))
+	case value <= math.MaxUint32:
+		return binary.BigEndian.AppendUint32(append(buffer, msgpackUint32), uint32(value))
+	default:
+		return binary.BigEndian.AppendUint64(append(buffer, msgpackUint64), value)
+	}
+}
+
+func appendMsgpackString(buffer []byte, value string) []byte {
+	if len(value) <= math.MaxUint8 && len(value) > 31 {
+		buffer = append(buffer, msgpackStr8, byte(len(value)))
+	} else {
+		buffer = appendMsgpackLength(buffer, len(value), 0xa0, 31, msgpackStr16, msgpackStr32)
+	}
+	return append(buffer, value...)
+}
+
+func appendMsgpackBytes(buffer []byte, value []byte) []byte {
+	switch {
+	case len(value) <= math.MaxUint8:
+		buffer = append(buffer, msgpackBin8, byte(len(value)))
+	case len(value) <= math.MaxUint16:
+		buffer = binary.BigEndian.AppendUint16(append(buffer, msgpackBin16), uint16(len(value)))
+	default:
+		buffer = binary.BigEndian.AppendUint32(append(buffer, msgpackBin32), uint32(len(value)))
+	}
+	return append(buffer, value...)
+}
+
+func appendMsgpackFloat(buffer []byte, value float64) []byte {
+	return binary.BigEndian.AppendUint64(append(buffer, msgpackFloat64), math.Float64bits(value))
+}
+
+// Append the msgpack encoding of a value, the common dynamic types (from decoding into any) skip reflection
+func appendMsgpack(buffer []byte, value any) ([]byte, error) {
+	switch typed := value.(type) {
+	case nil:
+		return append(buffer, msgpackNil), nil
+	case bool:
+		if typed {
+			return append(buffer, msgpackTrue), nil
+		}
+		return append(buffer, msgpackFalse), nil
+	case int:
+		return appendMsgpackInt(buffer, int64(typed)), nil
+	case int64:
+		return appendMsgpackInt(buffer, typed), nil
+	case uint64:
+		return appendMsgpackUint(buffer, typed), nil
+	case float64:
+		return appendMsgpackFloat(buffer, typed), nil
+	case string:
+		return appendMsgpackString(buffer, typed), nil
+	case []byte:
+		return appendMsgpackBytes(buffer, typed), nil
+	case []any:
+		var err error
+		buffer = appendMsgpackLength(buffer, len(typed), 0x90, 15, msgpackArray16, msgpackArray32)
+		for _, item := range typed {
+			if buffer, err = appendMsgpack(buffer, item); err != nil {
+				return buffer, err
+			}
+		}
+		return buffer, nil
+	case map[string]any:
+		var err error
+		buffer = appendMsgpackLength(buffer, len(typed), 0x80, 15, msgpackMap16, msgpackMap32)
+		for key, item := range typed {
+			buffer = appendMsgpackString(buffer, key)
+			if buffer, err = appendMsgpack(buffer, item); err != nil {
+				return buffer, err
+			}
+		}
+		return buffer, nil
+	}
+	return appendMsgpackValue(buffer, reflect.ValueOf(value))
+}
+
+func appendMsgpackValue(buffer []byte, value reflect.Value) ([]byte, error) {
+	var err error
+	switch value.Kind() {
+	case reflect.Bool:
+		return appendMsgpack(buffer, value.Bool())
+	case reflect.Int, reflect.Int8, reflect.Int16, reflect.Int32, reflect.Int64:
+		return appendMsgpackInt(buffer, value.Int()), nil
+	case reflect.Uint, reflect.Uint8, reflect.Uint16, reflect.Uint32, reflect.Uint64, reflect.Uintptr:
+		return appendMsgpackUint(buffer, value.Uint()), nil
+	case reflect.Float32, reflect.Float64:
+		return appendMsgpackFloat(buffer, value.Float()), nil
+	case reflect.String:
+		return appendMsgpackString(buffer, value.String()), nil
+	case reflect.Pointer, reflect.Interface:
+		if value.IsNil() {
+			return append(buffer, msgpackNil), nil
+		}
+		return appendMsgpack(buffer, value.Elem().Interface())
+	case reflect.Slice, reflect.Array:
+		if value.Kind() == reflect.Slice && value.IsNil() {
+			return append(buffer, msgpackNil), nil
+		}
+		if value.Kind() == reflect.Slice && value.Type().Elem().Kind() == reflect.Uint8 {
+			return appendMsgpackBytes(buffer, value.Bytes()), nil
+		}
+		length := value.Len()
+		buffer = appendMsgpackLength(buffer, length, 0x90, 15, msgpackArray16, msgpackArray32)
+		for i := range length {
+			if buffer, err = appendMsgpackValue(buffer, value.Index(i)); err != nil {
+				return buffer, err
+			}
+		}
+		return buffer, nil
+	case reflect.Map:
+		if value.IsNil() {
+			return append(buffer, msgpackNil), nil
+		}
+		buffer = appendMsgpackLength(buffer, value.Len(), 0x80, 15, msgpackMap16, msgpackMap32)
+		entries := value.MapRange()
+		for entries.Next() {
+			if buffer, err = appendMsgpackValue(buffer, entries.Key()); err != nil {
+				return buffer, err
+			}
+			if buffer, err = appendMsgpackValue(buffer, entries.Value()); err != nil {
+				return buffer, err
+			}
+		}
+		return buffer, nil
+	case reflect.Struct:
+		fields := msgpackFieldsOf(value.Type())
+		buffer = appendMsgpackLength(buffer, len(fields), 0x80, 15, msgpackMap16, msgpackMap32)
+		for _, field := range fields {
+			buffer = appendMsgpackString(buffer, field.name)
+			if buffer, err = appendMsgpackValue(buffer, value.Field(field.index)); err != nil {
+				return buffer, err
+			}
+		}
+		return buffer, nil
+	}
+	return buffer, fmt.Errorf("msgpack: can't encode a %s", value.Type())
+}
+
+// Encode a Go value as msgpack, a compact binary format for nested values (see decode_msgpack() in lib.py)
+//
+// Parameters:
+//   - value: The value to encode, nil, bools, numbers, strings, []byte (as binary), slices, arrays, maps, and structs (as maps
+//     of their exported fields, named by their `msgpack:"name"` tag or the field name, `msgpack:"-"` skips a field).
+//
+// Returns:
+//   - The encoded bytes, or an error if value holds a type that can't be encoded (i.e. a channel or function).
+func MsgpackMarshal(value any) ([]byte, error) {
+	return appendMsgpack(make([]byte, 0, 256), value)
+}
+
+// Reads msgpack values from a buffer
+type msgpackDecoder struct {
+	data     []byte
+	position int
+	depth    int // How many values are being decoded inside each other
+}
+
+func (decoder *msgpackDecoder) errorf(format string, arguments ...any) error {
+	return fmt.Errorf("msgpack: "+format+" (at byte %d)", append(arguments, decoder.position)...)
+}
+
+// Start decoding a value inside the current one, call leave() once it's decoded
+func (decoder *msgpackDecoder) enter() error {
+	if decoder.depth >= msgpackMaxDepth {
+		return decoder.errorf("values nested more than %d deep", msgpackMaxDepth)
+	}
+	decoder.depth++
+	return nil
+}
+
+func (decoder *msgpackDecoder) leave() {
+	decoder.depth--
+}
+
+// Take the next length bytes
+func (decoder *msgpackDecoder) read(length int) ([]byte, error) {
+	if length < 0 || length > len(decoder.data)-decoder.position {
+		return nil, decoder.errorf("unexpected end of data, %d more bytes needed", length)
+	}
+	chunk := decoder.data[decoder.position : decoder.position+length]
+	decoder.position += length
+	return chunk, nil
+}
+
+func (decoder *msgpackDecoder) readByte() (byte, error) {
+	chunk, err := decoder.read(1)
+	if err != nil {
+		return 0, err
+	}
+	return chunk[0], nil
+}
+
+// Read a big endian unsigned integer of 1, 2, 4 or 8 bytes
+func (decoder *msgpackDecoder) readUint(size int) (uint64, error) {
+	chunk, err := decoder.read(size)
+	if err != nil {
+		return 0, err
+	}
+	switch size {
+	case 1:
+		return uint64(chunk[0]), nil
+	case 2:
+		return uint64(binary.BigEndian.Uint16(chunk)), nil
+	case 4:
+		return uint64(binary.BigEndian.Uint32(chunk)), nil
+	}
+	return binary.BigEndian.Uint64(chunk), nil
+}
+
+// Read the length of an array (isMap false) or map (isMap true) header
+func (decoder *msgpackDecoder) readContainerLength(code byte, isMap bool) (int, bool, error) {
+	fixed, code16, code32 := byte(0x90), byte(msgpackArray16), byte(msgpackArray32)
+	if isMap {
+		fixed, code16, code32 = 0x80, msgpackMap16, msgpackMap32
+	}
+	var length uint64
+	var err error
+	switch {
+	case code&0xf0 == fixed:
+		return int(code & 0x0f), true, nil
+	case code == code16:
+		length, err = decoder.readUint(2)
+	case code == code32:
+		length, err = decoder.readUint(4)
+	default:
+		return 0, false, nil
+	}
+	return int(length), true, err
+}
+
+// Read the contents of a str or bin value, ok is false if code isn't one
+func (decoder *msgpackDecoder) readBytes(code byte) (chunk []byte, ok bool, err error) {
+	var length uint64
+	switch {
+	case code&0xe0 == 0xa0:
+		length = uint64(code & 0x1f)
+	case code == msgpackStr8 || code == msgpackBin8:
+		length, err = decoder.readUint(1)
+	case code == msgpackStr16 || code == msgpackBin16:
+		length, err = decoder.readUint(2)
+	case code == msgpackStr32 || code == msgpackBin32:
+		length, err = decoder.readUint(4)
+	default:
+		return nil, false, nil
+	}
+	if err != nil {
+		return nil, true, err
+	}
+	chunk, err = decoder.read(int(length))
+	return chunk, true, err
+}
+
+// Read a number, as an int64, uint64 (above math.MaxInt64) or float64, ok is false if code isn't one
+func (decoder *msgpackDecoder) readNumber(code byte) (number any, ok bool, err error) {
+	var bits uint64
+	switch {
+	case code <= 0x7f:
+		return int64(code), true, nil
+	case code >= 0xe0:
+		return int64(int8(code)), true, nil
+	case code >= msgpackUint8 && code <= msgpackUint64:
+		if bits, err = decoder.readUint(1 << (code - msgpackUint8)); err != nil || bits > math.MaxInt64 {
+			return bits, true, err
+		}
+		return int64(bits), true, nil
+	case code >= msgpackInt8 && code <= msgpackInt64:
+		size := 1 << (code - msgpackInt8)
+		if bits, err = decoder.readUint(size); err != nil {
+			return nil, true, err
+		}
+		shift := 64 - 8*size
+		return int64(bits<<shift) >> shift, true, nil // Sign extend
+	case code == msgpackFloat32:
+		bits, err = decoder.readUint(4)
+		return float64(math.Float32frombits(uint32(bits))), true, err
+	case code == msgpackFloat64:
+		bits, err = decoder.readUint(8)
+		return math.Float64frombits(bits), true, err
+	}
+	return nil, false, nil
+}
+
+// Decode the next value into a dynamic Go value: nil, bool, int64 (uint64 above math.MaxInt64), float64, string, []byte, []any
+// and map[string]any (map[any]any if a key isn't a string)
+func (decoder *msgpackDecoder) decodeAny() (any, error) {
+	if err := decoder.enter(); err != nil {
+		return nil, err
+	}
+	defer decoder.leave()
+	code, err := decoder.readByte()
+	if err != nil {
+		return nil, err
+	}
+	switch code {
+	case msgpackNil:
+		return nil, nil
+	case msgpackFalse:
+		return false, nil
+	case msgpackTrue:
+		return true, nil
+	}
+	if number, ok, err := decoder.readNumber(code); ok {
+		return number, err
+	}
+	if chunk, ok, err := decoder.readBytes(code); ok {
+		if err != nil || code == msgpackBin8 || code == msgpackBin16 || code == msgpackBin32 {
+			return bytes.Clone(chunk), err
+		}
+		return string(chunk), nil
+	}
+	if length, ok, err := decoder.readContainerLength(code, false); ok {
+		if err != nil {
+			return nil, err
+		}
+		if length > len(decoder.data)-decoder.position { // Every item takes at least a byte
+			return nil, decoder.errorf("array of %d items is longer than the data", length)
+		}
+		items := make([]any, length)
+		for i := range items {
+			if items[i], err = decoder.decodeAny(); err != nil {
+				return nil, err
+			}
+		}
+		return items, nil
+	}
+	if length, ok, err := decoder.readContainerLength(code, true); ok {
+		if err != nil {
+			return nil, err
+		}
+		return decoder.decodeAnyMap(length)
+	}
+	return nil, decoder.errorf("unsupported type byte 0x%02x", code)
+}
+
+func (decoder *msgpackDecoder) decodeAnyMap(length int) (any, error) {
+	if length > (len(decoder.data)-decoder.position)/2 { // Every entry takes at least two bytes
+		return nil, decoder.errorf("map of %d entries is longer than the data", length)
+	}
+	items := make(map[string]any, min(length, msgpackMaxSizeHint))
+	var anyItems map[any]any // Only used once a key isn't a string
+	for range length {
+		key, err := decoder.decodeAny()
+		if err != nil {
+			return nil, err
+		}
+		value, err := decoder.decodeAny()
+		if err != nil {
+			return nil, err
+		}
+		if text, ok := key.(string); ok && anyItems == nil {
+			items[text] = value
+			continue
+		}
+		if anyItems == nil {
+			anyItems = make(map[any]any, min(length, msgpackMaxSizeHint))
+			for text, item := range items {
+				anyItems[text] = item
+			}
+		}
+		if key != nil && !reflect.TypeOf(key).Comparable() {
+			return nil, decoder.errorf("can't use a %T as a map key", key)
+		}
+		anyItems[key] = value
+	}
+	if anyItems != nil {
+		return anyItems, nil
+	}
+	return items, nil
+}
+
+func (decoder *msgpackDecoder) mismatch(code byte, target reflect.Value) error {
+	return decoder.errorf("can't decode type byte 0x%02x into a %s", code, target.Type())
+}
+
+// Decode the next value into target, converting to its type (i.e. the fields of a struct, or the keys and values of a typed map)
+func (decoder *msgpackDecoder) decodeInto(target reflect.Value) error {
+	if target.Kind() == reflect.Interface && target.NumMethod() == 0 {
+		value, err := decoder.decodeAny()
+		if err == nil && value != nil {
+			target.Set(reflect.ValueOf(value))
+		} else if err == nil {
+			target.SetZero()
+		}
+		return err
+	}
+	if err := decoder.enter(); err != nil {
+		return err
+	}
+	defer decoder.leave()
+	code, err := decoder.readByte()
+	if err != nil {
+		return err
+	}
+	if code == msgpackNil {
+		target.SetZero()
+		return nil
+	}
+
+	switch target.Kind() {
+	case reflect.Pointer:
+		if target.IsNil() {
+			target.Set(reflect.New(target.Type().Elem()))
+		}
+		decoder.position-- // The element reads the type byte again
+		return decoder.decodeInto(target.Elem())
+	case reflect.Bool:
+		if code != msgpackTrue && code != msgpackFalse {
+			return decoder.mismatch(code, target)
+		}
+		target.SetBool(code == msgpackTrue)
+		return nil
+	case reflect.Int, reflect.Int8, reflect.Int16, reflect.Int32, reflect.Int64:
+		number, ok, err := decoder.readNumber(code)
+		if err != nil {
+			return err
+		}
+		if unsigned, isUint := number.(uint64); ok && isUint {
+			return decoder.errorf("%d overflows a %s", unsigned, target.Type())
+		}
+		if integer, isInt := number.(int64); ok && isInt {
+			if target.OverflowInt(integer) {
+				return decoder.errorf("%d overflows a %s", integer, target.Type())
+			}
+			target.SetInt(integer)
+			return nil
+		}
+	case reflect.Uint, reflect.Uint8, reflect.Uint16, reflect.Uint32, reflect.Uint64, reflect.Uintptr:
+		number, ok, err := decoder.readNumber(code)
+		if err != nil {
+			return err
+		}
+		var unsigned uint64
+		switch typed := number.(type) {
+		case int64:
+			if typed < 0 {
+				return decoder.errorf("%d overflows a %s", typed, target.Type())
+			}
+			unsigned = uint64(typed)
+		case uint64:
+			unsigned = typed
+		default:
+			ok = false
+		}
+		if ok {
+			if target.OverflowUint(unsigned) {
+				return decoder.errorf("%d overflows a %s", unsigned, target.Type())
+			}
+			target.SetUint(unsigned)
+			return nil
+		}
+	case reflect.Float32, reflect.Float64:
+		number, ok, err := decoder.readNumber(code)
+		if err != nil {
+			return err
+		}
+		switch typed := number.(type) {
+		case float64:
+			target.SetFloat(typed)
+		case int64:
+			target.SetFloat(float64(typed))
+		case uint64:
+			target.SetFloat(float64(typed))
+		}
+		if ok {
+			return nil
+		}
+	case reflect.String:
+		if chunk, ok, err := decoder.readBytes(code); ok {
+			if err == nil {
+				target.SetString(string(chunk))
+			}
+			return err
+		}
+	case reflect.Slice:
+		if target.Type().Elem().Kind() == reflect.Uint8 {
+			if chunk, ok, err := decoder.readBytes(code); ok {
+				if err == nil {
+					target.SetBytes(bytes.Clone(chunk))
+				}
+				return err
+			}
+		}
+		if length, ok, err := decoder.readContainerLength(code, false); ok {
+			if err != nil {
+				return err
+			}
+			if length > len(decoder.data)-decoder.position { // Every item takes at least a byte
+				return decoder.errorf("array of %d items is longer than the data", length)
+			}
+			items := reflect.MakeSlice(target.Type(), length, length)
+			for i := range length {
+				if err := decoder.decodeInto(items.Index(i)); err != nil {
+					return err
+				}
+			}
+			target.Set(items)
+			return nil
+		}
+	case reflect.Array:
+		if length, ok, err := decoder.readContainerLength(code, false); ok {
+			if err != nil {
+				return err
+			}
+			if length != target.Len() {
+				return decoder.errorf("can't decode %d items into a %s", length, target.Type())
+			}
+			for i := range length {
+				if err := decoder.decodeInto(target.Index(i)); err != nil {
+					return err
+				}
+			}
+			return nil
+		}
+	case reflect.Map:
+		if length, ok, err := decoder.readContainerLength(code, true); ok {
+			if err != nil {
+				return err
+			}
+			if length > (len(decoder.data)-decoder.position)/2 { // Every entry takes at least two bytes
+				return decoder.errorf("map of %d entries is longer than the data", length)
+			}
+			if target.IsNil() {
+				target.Set(reflect.MakeMapWithSize(target.Type(), min(length, msgpackMaxSizeHint)))
+			}
+			keyType, valueType := target.Type().Key(), target.Type().Elem()
+			for range length {
+				key, value := reflect.New(keyType).Elem(), reflect.New(valueType).Elem()
+				if err := decoder.decodeInto(key); err != nil {
+					return err
+				}
+				if err := decoder.decodeInto(value); err != nil {
+					return err
+				}
+				target.SetMapIndex(key, value)
+			}
+			return nil
+		}
+	case reflect.Struct:
+		if length, ok, err := decoder.readContainerLength(code, true); ok {
+			if err != nil {
+				return err
+			}
+			return decoder.decodeStruct(target, length)
+		}
+	default:
+		return decoder.errorf("can't decode into a %s", target.Type())
+	}
+	return decoder.mismatch(code, target)
+}
+
+// Decode the entries of a map into the matching fields of a struct, by tag or name (case-insensitive like encoding/json), skipping unknown keys
+func (decoder *msgpackDecoder) decodeStruct(target reflect.Value, length int) error {
+	fields := msgpackFieldsOf(target.Type())
+	for range length {
+		code, err := decoder.readByte()
+		if err != nil {
+			return err
+		}
+		key, ok, err := decoder.readBytes(code)
+		if !ok {
+			return decoder.errorf("struct keys must be strings, got type byte 0x%02x", code)
+		}
+		if err != nil {
+			return err
+		}
+		index := -1
+		for _, field := range fields {
+			if field.name == string(key) {
+				index = field.index
+				break
+			}
+			if index < 0 && strings.EqualFold(field.name, string(key)) {
+				index = field.index
+			}
+		}
+		if index < 0 {
+			if _, err := decoder.decodeAny(); err != nil { // Unknown keys are skipped
+				return err
+			}
+			continue
+		}
+		if err := decoder.decodeInto(target.Field(index)); err != nil {
+			return err
+		}
+	}
+	return nil
+}
+
+// Decode msgpack into a Go value, a compact binary format for nested values (see encode_msgpack() in lib.py)
+//
+// Parameters:
+//   - data: The encoded bytes, strings and binary values are copied out of it so it can be freed afterwards.
+//   - out: A pointer to decode into, i.e. a *struct (map keys are matched to fields by tag or name), *map[string]T, *[]T or *any
+//     (which gets nil, bool, int64, uint64 above math.MaxInt64, float64, string, []byte, []any and map[string]any values).
+//
+// Returns:
+//   - An error if data isn't valid msgpack, doesn't fit out (i.e. a string into an int, or 300 into an int8), has bytes left over, or
+//     nests values more than 10,000 deep.
+func MsgpackUnmarshal(data []byte, out any) error {
+	decoder := msgpackDecoder{data: data}
+	var err error
+	if dynamic, ok := out.(*any); ok {
+		*dynamic, err = decoder.decodeAny()
+	} else if target := reflect.ValueOf(out); target.Kind() != reflect.Pointer || target.IsNil() {
+		return fmt.Errorf("msgpack: can only decode into a non-nil pointer, got a %T", out)
+	} else {
+		err = decoder.decodeInto(target.Elem())
+	}
+	if err == nil && decoder.position != len(data) {
+		err = decoder.errorf("%d bytes left over after the value", len(data)-decoder.position)
+	}
+	return err
+}
+
+// Decode a msgpack buffer from C (i.e. from Python's prepare_msgpack()) into a Go value, see MsgpackUnmarshal
+//
+// Parameters:
+//   - cData: Pointer to the encoded bytes, it isn't copied.
+//   - length: The number of bytes.
+//   - out: A pointer to decode into.
+//
+// Returns:
+//   - An error if the data isn't valid msgpack, or doesn't fit out.
+func CMsgpackToValue(cData unsafe.Pointer, length C.int, out any) error {
+	return MsgpackUnmarshal(unsafe.Slice((*byte)(cData), int(length)), out)
+}
+
+// Encode a Go value as msgpack into a C.BytesArrayResult holding one item, for Python's msgpack_result_to_object(), see MsgpackMarshal
+//
+// Parameters:
+//   - value: The value to encode.
+//
+// Returns:
+//   - Pointer to a C.BytesArrayResult with the encoded bytes as its only item, or an error if value can't be encoded.
+//     Note: The caller is responsible for freeing this memory using free_bytes_array_result.
+func ValueToCMsgpack(value any) (*C.BytesArrayResult, error) {
+	encoded, err := MsgpackMarshal(value)
+	if err != nil {
+		return nil, err
+	}
+	return BytesSliceToCArray([][]byte{encoded}), nil
+}
+
+// ========== Functions to free memory ==========
 
 // Free a previously allocated C string from Go.
 //
@@ -408,7 +3226,7 @@ func print_float_array(cArray unsafe.Pointer, numberOfFloats int) {
 //export FreeCString
 func FreeCString(ptr unsafe.Pointer) {
 	if ptr != nil {
-		C.free(ptr)
+		poolFree(ptr)
 	}
 }
 
@@ -426,9 +3244,9 @@ func FreeStringArray(inputArray unsafe.Pointer, count C.int) {
 		memorySizeOfStruct := unsafe.Sizeof(uintptr(0)) // Size of a single struct
 
 		ptr := *(**C.char)(unsafe.Pointer(locationOfArray + offsetIntoArray*memorySizeOfStruct))
-		C.free(unsafe.Pointer(ptr))
+		poolFree(unsafe.Pointer(ptr))
 	}
-	C.free(inputArray)
+	poolFree(inputArray)
 }
 
 // Free an *C.int.
@@ -438,7 +3256,7 @@ func FreeStringArray(inputArray unsafe.Pointer, count C.int) {
 //
 //export FreeIntArray
 func FreeIntArray(ptr unsafe.Pointer) {
-	C.free(ptr)
+	poolFree(ptr)
 }
 
 // Free a *C.float.
@@ -448,7 +3266,27 @@ func FreeIntArray(ptr unsafe.Pointer) {
 //
 //export FreeFloatArray
 func FreeFloatArray(ptr unsafe.Pointer) {
-	C.free(ptr)
+	poolFree(ptr)
+}
+
+// Free an *C.int64_t.
+//
+// Parameters:
+//   - result: Pointer to the *C.int64_t to be freed.
+//
+//export FreeInt64Array
+func FreeInt64Array(ptr unsafe.Pointer) {
+	poolFree(ptr)
+}
+
+// Free a *C.double.
+//
+// Parameters:
+//   - result: Pointer to the *C.double to be freed.
+//
+//export FreeDoubleArray
+func FreeDoubleArray(ptr unsafe.Pointer) {
+	poolFree(ptr)
 }
 
 // Free a *C.StringArrayResult.
@@ -460,7 +3298,7 @@ func FreeFloatArray(ptr unsafe.Pointer) {
 func free_string_array_result(StringArrayResultReference unsafe.Pointer) {
 	temp := (*C.StringArrayResult)(StringArrayResultReference)
 	FreeStringArray(unsafe.Pointer(temp.data), temp.numberOfElements)
-	C.free(unsafe.Pointer(StringArrayResultReference))
+	poolFree(unsafe.Pointer(StringArrayResultReference))
 }
 
 // Free a *C.IntArrayResult.
@@ -472,7 +3310,7 @@ func free_string_array_result(StringArrayResultReference unsafe.Pointer) {
 func free_int_array_result(ptr unsafe.Pointer) {
 	temp := (*C.IntArrayResult)(ptr)
 	FreeIntArray(unsafe.Pointer(temp.data))
-	C.free(unsafe.Pointer(ptr))
+	poolFree(unsafe.Pointer(ptr))
 }
 
 // Free a *C.FloatArrayResult.
@@ -484,7 +3322,131 @@ func free_int_array_result(ptr unsafe.Pointer) {
 func free_float_array_result(ptr unsafe.Pointer) {
 	temp := (*C.FloatArrayResult)(ptr)
 	FreeFloatArray(unsafe.Pointer(temp.data))
-	C.free(unsafe.Pointer(ptr))
+	poolFree(unsafe.Pointer(ptr))
+}
+
+// Free a *C.Int64ArrayResult.
+//
+// Parameters:
+//   - result: Pointer to the C.Int64ArrayResult to be freed (*C.Int64ArrayResult).
+//
+//export free_int64_array_result
+func free_int64_array_result(ptr unsafe.Pointer) {
+	temp := (*C.Int64ArrayResult)(ptr)
+	FreeInt64Array(unsafe.Pointer(temp.data))
+	poolFree(unsafe.Pointer(ptr))
+}
+
+// Free a *C.DoubleArrayResult.
+//
+// Parameters:
+//   - result: Pointer to the C.DoubleArrayResult to be freed (*C.DoubleArrayResult).
+//
+//export free_double_array_result
+func free_double_array_result(ptr unsafe.Pointer) {
+	temp := (*C.DoubleArrayResult)(ptr)
+	FreeDoubleArray(unsafe.Pointer(temp.data))
+	poolFree(unsafe.Pointer(ptr))
+}
+
+// Free a *C.BoolArrayResult.
+//
+// Parameters:
+//   - result: Pointer to the C.BoolArrayResult to be freed (*C.BoolArrayResult).
+//
+//export free_bool_array_result
+func free_bool_array_result(ptr unsafe.Pointer) {
+	temp := (*C.BoolArrayResult)(ptr)
+	poolFree(unsafe.Pointer(temp.data))
+	poolFree(ptr)
+}
+
+// Free a *C.Uint8ArrayResult.
+//
+// Parameters:
+//   - result: Pointer to the C.Uint8ArrayResult to be freed (*C.Uint8ArrayResult).
+//
+//export free_uint8_array_result
+func free_uint8_array_result(ptr unsafe.Pointer) {
+	temp := (*C.Uint8ArrayResult)(ptr)
+	poolFree(unsafe.Pointer(temp.data))
+	poolFree(ptr)
+}
+
+// Free a *C.Int8ArrayResult.
+//
+// Parameters:
+//   - result: Pointer to the C.Int8ArrayResult to be freed (*C.Int8ArrayResult).
+//
+//export free_int8_array_result
+func free_int8_array_result(ptr unsafe.Pointer) {
+	temp := (*C.Int8ArrayResult)(ptr)
+	poolFree(unsafe.Pointer(temp.data))
+	poolFree(ptr)
+}
+
+// Free a *C.Int16ArrayResult.
+//
+// Parameters:
+//   - result: Pointer to the C.Int16ArrayResult to be freed (*C.Int16ArrayResult).
+//
+//export free_int16_array_result
+func free_int16_array_result(ptr unsafe.Pointer) {
+	temp := (*C.Int16ArrayResult)(ptr)
+	poolFree(unsafe.Pointer(temp.data))
+	poolFree(ptr)
+}
+
+// Free a *C.NullableIntArrayResult.
+//
+// Parameters:
+//   - result: Pointer to the C.NullableIntArrayResult to be freed (*C.NullableIntArrayResult).
+//
+//export free_nullable_int_array_result
+func free_nullable_int_array_result(ptr unsafe.Pointer) {
+	temp := (*C.NullableIntArrayResult)(ptr)
+	FreeIntArray(unsafe.Pointer(temp.data))
+	poolFree(unsafe.Pointer(temp.validity))
+	poolFree(ptr)
+}
+
+// Free a *C.NullableFloatArrayResult.
+//
+// Parameters:
+//   - result: Pointer to the C.NullableFloatArrayResult to be freed (*C.NullableFloatArrayResult).
+//
+//export free_nullable_float_array_result
+func free_nullable_float_array_result(ptr unsafe.Pointer) {
+	temp := (*C.NullableFloatArrayResult)(ptr)
+	FreeFloatArray(unsafe.Pointer(temp.data))
+	poolFree(unsafe.Pointer(temp.validity))
+	poolFree(ptr)
+}
+
+// Free a *C.NullableStringArrayResult, missing (NULL) strings are skipped.
+//
+// Parameters:
+//   - result: Pointer to the C.NullableStringArrayResult to be freed (*C.NullableStringArrayResult).
+//
+//export free_nullable_string_array_result
+func free_nullable_string_array_result(ptr unsafe.Pointer) {
+	temp := (*C.NullableStringArrayResult)(ptr)
+	FreeStringArray(unsafe.Pointer(temp.data), temp.numberOfElements)
+	poolFree(unsafe.Pointer(temp.validity))
+	poolFree(ptr)
+}
+
+// Free a *C.BytesArrayResult.
+//
+// Parameters:
+//   - result: Pointer to the C.BytesArrayResult to be freed (*C.BytesArrayResult).
+//
+//export free_bytes_array_result
+func free_bytes_array_result(ptr unsafe.Pointer) {
+	temp := (*C.BytesArrayResult)(ptr)
+	poolFree(unsafe.Pointer(temp.offsets))
+	poolFree(unsafe.Pointer(temp.data))
+	poolFree(unsafe.Pointer(ptr))
 }
 
 func main() {}
@@ -1,11 +1,187 @@
 """A package to help with building Go-python libraries"""
 import os
+import sys
+import json
+import struct
+import math
+import time
+import queue
 import subprocess
+import multiprocessing
+import warnings
+import threading
+import weakref
+import inspect
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager, ExitStack
+from functools import wraps
+from typing import get_type_hints
+from itertools import repeat
+from operator import is_not
 from platform import platform
-from ctypes import CDLL, Array, cdll, c_char_p, c_int, POINTER, c_float, Structure, string_at 
+from ctypes import CDLL, Array, cdll, c_char_p, c_char, c_int, POINTER, c_float, c_int64, c_double, c_longlong, c_ulonglong, c_ubyte, c_uint8, c_int8, c_int16, c_void_p, c_size_t, Structure, CFUNCTYPE, byref, cast, string_at 
+
+# ========== FFI Backend Selection ==========
+_BACKENDS = ("ctypes", "cffi", "auto")
+
+def _select_backend(requested:str) -> str:
+    """Picks the FFI backend to use, falling back to ctypes if cffi is not installed
+
+    Parameters
+    ----------
+    requested : str
+        The requested backend, one of "ctypes", "cffi" or "auto" (cffi if available, otherwise ctypes)
+
+    Raises
+    ------
+    ValueError:
+        If the requested backend is not one of the supported backends
+
+    Returns
+    -------
+    str
+        The backend that will be used, either "ctypes" or "cffi"
+    """
+    requested = requested.lower().strip()
+    if requested not in _BACKENDS:
+        raise ValueError(f"Unknown FFI backend {requested!r}, supported backends are {_BACKENDS}")
+    if requested == "ctypes":
+        return "ctypes"
+    try:
+        import cffi # noqa: F401
+        return "cffi"
+    except ImportError:
+        if requested == "cffi":
+            warnings.warn("cffi backend requested but cffi is not installed, falling back to ctypes")
+        return "ctypes"
+
+# The backend is picked once at import, set CGO_HELPERS_BACKEND=cffi (or auto) before importing to use cffi
+BACKEND = _select_backend(os.environ.get("CGO_HELPERS_BACKEND", "ctypes"))
+
+# Declarations of the structs and exports in lib.go, used by the cffi backend
+_CDEF = """
+typedef struct { int numberOfElements; char** data; } StringArrayResult;
+typedef struct { int numberOfElements; int* data; } IntArrayResult;
+typedef struct { int numberOfElements; float* data; } FloatArrayResult;
+typedef struct { int numberOfElements; int64_t* data; } Int64ArrayResult;
+typedef struct { int numberOfElements; double* data; } DoubleArrayResult;
+typedef struct { int numberOfElements; long long* offsets; unsigned char* data; } BytesArrayResult;
+typedef struct { int numberOfElements; unsigned char* data; } BoolArrayResult;
+typedef struct { int numberOfElements; uint8_t* data; } Uint8ArrayResult;
+typedef struct { int numberOfElements; int8_t* data; } Int8ArrayResult;
+typedef struct { int numberOfElements; int16_t* data; } Int16ArrayResult;
+typedef struct { int numberOfElements; int* data; unsigned char* validity; } NullableIntArrayResult;
+typedef struct { int numberOfElements; float* data; unsigned char* validity; } NullableFloatArrayResult;
+typedef struct { int numberOfElements; char** data; unsigned char* validity; } NullableStringArrayResult;
+typedef struct { long long hits; long long misses; long long retainedBytes; long long retainedBuffers; long long maxRetainedBytes; } BufferPoolStats;
+typedef struct {
+    unsigned long long heapAlloc; unsigned long long heapInuse; unsigned long long heapObjects; unsigned long long sys;
+    unsigned long long mallocs; unsigned long long frees; unsigned long long numGC; long long liveCBuffers; long long liveCBytes;
+    unsigned long long totalAlloc; unsigned long long heapSys; unsigned long long heapIdle; unsigned long long heapReleased;
+    unsigned long long nextGC; unsigned long long lastGC; unsigned long long numForcedGC; unsigned long long pauseTotalNs;
+    unsigned long long lastPauseNs; unsigned long long maxPauseNs; double gcCPUFraction;
+} GoMemoryStats;
+
+char* return_string(char* cString);
+StringArrayResult* return_string_array(char** cArray, long long numberOfStrings);
+IntArrayResult* return_int_array(int* cArray, int numberOfElements);
+FloatArrayResult* return_float_array(float* cArray, int numberOfElements);
+Int64ArrayResult* return_int64_array(int64_t* cArray, int numberOfElements);
+DoubleArrayResult* return_double_array(double* cArray, int numberOfElements);
+IntArrayResult* return_string_lengths(char** cArray, int numberOfStrings);
+void print_string(char* ptr);
+void print_string_array(char** cArray, long long numberOfString);
+void print_int_array(int* cArray, long long numberOfInts);
+void print_float_array(float* cArray, long long numberOfFloats);
+
+void FreeCString(char* ptr);
+void FreeStringArray(char** inputArray, int count);
+void FreeIntArray(int* ptr);
+void FreeFloatArray(float* ptr);
+void free_string_array_result(StringArrayResult* StringArrayResultReference);
+void free_int_array_result(IntArrayResult* ptr);
+void free_float_array_result(FloatArrayResult* ptr);
+void FreeInt64Array(int64_t* ptr);
+void FreeDoubleArray(double* ptr);
+void free_int64_array_result(Int64ArrayResult* ptr);
+void free_double_array_result(DoubleArrayResult* ptr);
+
+BoolArrayResult* return_bool_array(unsigned char* cArray, int numberOfElements);
+Uint8ArrayResult* return_uint8_array(uint8_t* cArray, int numberOfElements);
+Int8ArrayResult* return_int8_array(int8_t* cArray, int numberOfElements);
+Int16ArrayResult* return_int16_array(int16_t* cArray, int numberOfElements);
+void free_bool_array_result(BoolArrayResult* ptr);
+void free_uint8_array_result(Uint8ArrayResult* ptr);
+void free_int8_array_result(Int8ArrayResult* ptr);
+void free_int16_array_result(Int16ArrayResult* ptr);
+
+NullableIntArrayResult* return_nullable_int_array(int* cArray, unsigned char* validity, int numberOfElements);
+NullableFloatArrayResult* return_nullable_float_array(float* cArray, unsigned char* validity, int numberOfElements);
+NullableStringArrayResult* return_nullable_string_array(char** cArray, unsigned char* validity, int numberOfStrings);
+void free_nullable_int_array_result(NullableIntArrayResult* ptr);
+void free_nullable_float_array_result(NullableFloatArrayResult* ptr);
+void free_nullable_string_array_result(NullableStringArrayResult* ptr);
+
+BytesArrayResult* return_bytes_array(char** cArray, long long* lengths, int numberOfElements);
+void free_bytes_array_result(BytesArrayResult* ptr);
+
+BytesArrayResult* msgpack_roundtrip(char* cData, int length);
+BytesArrayResult* msgpack_records_roundtrip(char* cData, int length);
+char* json_roundtrip(char* cString);
+
+void enable_buffer_pool(int enabled, long long maxRetainedBytes);
+long long trim_buffer_pool(void);
+void buffer_pool_stats(BufferPoolStats* out);
+
+void go_memory_stats(GoMemoryStats* out);
+int set_gomaxprocs(int procs);
+int set_gc_percent(int percent);
+long long set_memory_limit(long long limit);
+
+char* start_cpu_profile(char* cPath);
+char* stop_cpu_profile(void);
+char* write_profile(char* cName, char* cPath);
+char* start_trace(char* cPath);
+char* stop_trace(void);
+char* capture_trace(char* cPath, int milliseconds);
+
+typedef struct { long long liveHandles; long long liveBytes; long long uploads; long long releases; } HandleStats;
+uintptr_t upload_string_array(char** cArray, int numberOfStrings);
+uintptr_t upload_int_array(int* cArray, int numberOfElements);
+uintptr_t upload_float_array(float* cArray, int numberOfElements);
+int release_handle(uintptr_t handle);
+long long handle_size(uintptr_t handle);
+void handle_stats(HandleStats* out);
+StringArrayResult* return_handle_string_array(uintptr_t handle);
+IntArrayResult* return_handle_int_array(uintptr_t handle);
+FloatArrayResult* return_handle_float_array(uintptr_t handle);
+IntArrayResult* handle_string_lengths(uintptr_t handle);
+
+typedef int (*ChunkCallback)(void* chunk, void* context);
+long long stream_string_array(char** cArray, int numberOfStrings, int chunkSize, ChunkCallback callback, void* context);
+long long stream_int_array(int* cArray, int numberOfElements, int chunkSize, ChunkCallback callback, void* context);
+"""
+
+# Guards one-time setup (loading the library, declaring the cffi API), calls after setup never take it
+_setup_lock = threading.RLock()
+
+_ffi = None
+
+def _cffi_ffi():
+    """Gets the shared cffi FFI instance, creating it (and declaring lib.go's API) on first use"""
+    global _ffi
+    if _ffi is None:
+        with _setup_lock:
+            if _ffi is None:
+                from cffi import FFI
+                ffi = FFI()
+                ffi.cdef(_CDEF)
+                _ffi = ffi
+    return _ffi
 
 # ========== Helper Functions  ============
-def get_library(dll_path:str,source_path:str="", compile:bool=False) -> CDLL:
+def get_library(dll_path:str,source_path:str="", compile:bool=False, backend:str="", cdef:str="", build_flags:list[str]|None=None, pgo_profile:str="") -> CDLL:
     """Get's the DLL specified, will compile if not found and flag is specified
 
     Parameters
@@ -19,6 +195,23 @@ def get_library(dll_path:str,source_path:str="", compile:bool=False) -> CDLL:
     compile : bool, optional
         Specify if you should try to compile DLL if not in path, by default False
 
+    backend : str, optional
+        The FFI backend to load the library with ("ctypes", "cffi" or "auto"), by default "" which uses BACKEND
+
+    cdef : str, optional
+        C declarations of your own exports, only needed for the cffi backend, by default ""
+
+    build_flags : list[str] | None, optional
+        Flags passed to go build when compiling, by default None which uses DEFAULT_BUILD_FLAGS (-ldflags=-s -w)
+
+    pgo_profile : str, optional
+        A CPU profile to build with profile-guided optimization (see build_with_pgo()), or "off", by default "" which uses
+        default.pgo if there is one next to the source
+
+    Notes
+    -----
+    - Clears every GoCache, since results cached from a previously loaded library may be stale
+
     Raises
     ------
     ValueError:
@@ -27,7 +220,7 @@ def get_library(dll_path:str,source_path:str="", compile:bool=False) -> CDLL:
     Returns
     -------
     CDLL
-        The linked library
+        The linked library (a cffi library object if the cffi backend is used)
         
     Examples
     --------
@@ -48,22 +241,176 @@ def get_library(dll_path:str,source_path:str="", compile:bool=False) -> CDLL:
     if not os.path.exists(dll_path):
         if not compile:
             raise ValueError(f"Linked Library is not available: {dll_path}")
-        if platform().lower().startswith("windows"):
-            additional_flags = "set GOTRACEBACK=system &&"
+        print("\nRequired shared library is not available, building...")
+        build_library(dll_path, source_path, build_flags, pgo_profile)
+    backend = _select_backend(backend) if backend else BACKEND
+    if backend == "cffi":
+        ffi = _cffi_ffi()
+        with _setup_lock: # The FFI instance is shared, so declarations can't interleave
+            if cdef:
+                ffi.cdef(cdef, override=True)
+            library = ffi.dlopen(dll_path)
+    else:
+        library = cdll.LoadLibrary(dll_path)
+    invalidate_caches() # A reloaded (or rebuilt) library may return different results
+    return library
+
+# Flags get_library()/build_library() pass to go build by default (strip symbols and debug info)
+DEFAULT_BUILD_FLAGS = ("-ldflags=-s -w",)
+
+def _build_command(dll_path:str, build_flags:list[str]|None=None, pgo_profile:str="") -> list[str]:
+    """The go build command for a shared library"""
+    command = ["go", "build", *(DEFAULT_BUILD_FLAGS if build_flags is None else build_flags)]
+    if pgo_profile:
+        command.append(f"-pgo={pgo_profile}")
+    return [*command, "-buildmode=c-shared", "-o", dll_path]
+
+def build_library(dll_path:str, source_path:str, build_flags:list[str]|None=None, pgo_profile:str=""):
+    """Builds (or rebuilds) a shared library from Go source
+
+    Parameters
+    ----------
+    dll_path : str
+        The path to write the library to
+
+    source_path : str
+        The path to the source go file, the build runs in its folder
+
+    build_flags : list[str] | None, optional
+        Flags passed to go build, by default None which uses DEFAULT_BUILD_FLAGS (-ldflags=-s -w)
+
+    pgo_profile : str, optional
+        A CPU profile to build with profile-guided optimization (go build -pgo), or "off" to build without one, by default ""
+        which uses default.pgo if there is one next to the source
+
+    Raises
+    ------
+    ValueError:
+        If the library can't be built
+
+    Examples
+    --------
+    ```
+    build_library("similarity.so", "lib.go", build_flags=["-ldflags=-s -w", "-trimpath"], pgo_profile="similarity.pgo")
+    ```
+    """
+    command = _build_command(dll_path, build_flags, pgo_profile)
+    try:
+        subprocess.run(command, check=True, cwd=os.path.dirname(source_path) or None, env={**os.environ, "GOTRACEBACK": "system"})
+    except Exception as e:
+        if isinstance(e, FileNotFoundError):
+            print("Unable to find Go install, please install it and try again\n")
         else:
-            additional_flags = "env GOTRACEBACK=system"
-        command = f"{additional_flags} go build -ldflags \"-s -w\" -buildmode=c-shared -o \"{dll_path}\""
-        if compile:
-            print("\nRequired shared library is not available, building...")
-            try:
-                subprocess.run(command, shell=True, check=True, cwd=os.path.dirname(source_path))
-            except Exception as e:
-                if isinstance(e, FileNotFoundError):
-                    print("Unable to find Go install, please install it and try again\n")
-                else:
-                    print(f"Ran into error while trying to build shared library, make sure go, and a compatible compiler are installed, then try building manually using:\n\t{command}\nExiting with error:\n\t{e}")
-                raise ValueError(f"Linked Library is not available or compileable: {dll_path}")
-    return cdll.LoadLibrary(dll_path)
+            print(f"Ran into error while trying to build shared library, make sure go, and a compatible compiler are installed, then try building manually using:\n\t{subprocess.list2cmdline(command)}\nExiting with error:\n\t{e}")
+        raise ValueError(f"Linked Library is not available or compileable: {dll_path}")
+
+def _profile_worker(dll_path:str, profile_path:str, workload):
+    """Runs in a subprocess, loads dll_path in place of lib.so and CPU profiles workload() while it uses it"""
+    global dll_file
+    dll_file = dll_path
+    start_cpu_profile(profile_path)
+    try:
+        workload()
+    finally:
+        stop_cpu_profile()
+
+def profile_library(dll_path:str, workload, profile_path:str) -> str:
+    """CPU profiles the Go code in a library while a python workload uses it, in a subprocess
+
+    Parameters
+    ----------
+    dll_path : str
+        The library to profile, it's loaded in place of lib.so so the functions in this module use it
+
+    workload : Callable[[], Any]
+        A module level function (so it can be pickled) that runs representative calls, i.e. through return_string_array()
+
+    profile_path : str
+        The path to write the profile to
+
+    Notes
+    -----
+    - Runs in a fresh (spawned) python process since a loaded library can't be swapped, so guard your script with
+      `if __name__ == "__main__":`
+    - Only time spent in Go is profiled, so the workload should spend most of its time in the library
+
+    Raises
+    ------
+    RuntimeError:
+        If the workload or the profiler fails
+
+    Returns
+    -------
+    str
+        profile_path
+    """
+    process = multiprocessing.get_context("spawn").Process(
+        target=_profile_worker, args=(os.path.abspath(dll_path), os.path.abspath(profile_path), workload), name="profile_library",
+    )
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"Profiling {dll_path} failed with exit code {process.exitcode}, see the error above")
+    return profile_path
+
+def build_with_pgo(dll_path:str, source_path:str, workload, profile_path:str="", build_flags:list[str]|None=None) -> str:
+    """Builds a library with profile-guided optimization: builds it, profiles workload using it, then rebuilds it with the profile
+
+    Parameters
+    ----------
+    dll_path : str
+        The path to write the library to
+
+    source_path : str
+        The path to the source go file
+
+    workload : Callable[[], Any]
+        A module level function that runs representative calls through the library (see profile_library())
+
+    profile_path : str, optional
+        Where to save the profile, by default "" which saves default.pgo next to the source, so later plain builds
+        (go build or get_library()) keep using it
+
+    build_flags : list[str] | None, optional
+        Flags passed to go build, by default None which uses DEFAULT_BUILD_FLAGS (-ldflags=-s -w)
+
+    Notes
+    -----
+    - Needs Go 1.21+, and the profile should be refreshed when the Go code or the workload changes a lot
+    - Call it before this process loads dll_path (Windows can't overwrite a loaded library)
+
+    Raises
+    ------
+    ValueError:
+        If the library can't be built
+
+    RuntimeError:
+        If profiling fails
+
+    Returns
+    -------
+    str
+        The path of the profile
+
+    Examples
+    --------
+    ```
+    import lib as helpers
+
+    def workload():
+        c_array, number_of_items = helpers.prepare_string_array(["Lorem", "ipsum"] * 50_000)
+        for _ in range(200):
+            helpers.return_string_array(c_array, number_of_items)
+
+    if __name__ == "__main__":
+        helpers.build_with_pgo("lib.so", "lib.go", workload) # Writes default.pgo, and rebuilds lib.so with it
+    ```
+    """
+    profile_path = profile_path or os.path.join(os.path.dirname(os.path.abspath(source_path)), "default.pgo")
+    build_library(dll_path, source_path, build_flags, pgo_profile="off") # Don't let an old default.pgo skew the profile
+    profile_library(dll_path, workload, profile_path)
+    build_library(dll_path, source_path, build_flags, pgo_profile=profile_path)
+    return profile_path
 
 # ========== C Structs ==========
 class _CStringArrayResult(Structure):
@@ -84,52 +431,317 @@ class _CFloatArrayResult(Structure):
         ("data", POINTER(c_float)),
     ]
 
+class _CInt64ArrayResult(Structure):
+    _fields_ = [
+        ("numberOfElements", c_int),
+        ("data", POINTER(c_int64)),
+    ]
+
+class _CDoubleArrayResult(Structure):
+    _fields_ = [
+        ("numberOfElements", c_int),
+        ("data", POINTER(c_double)),
+    ]
+
+class _CBoolArrayResult(Structure):
+    _fields_ = [
+        ("numberOfElements", c_int),
+        ("data", POINTER(c_ubyte)), # Bit-packed, (numberOfElements+7)//8 bytes with the least significant bit first
+    ]
+
+class _CUint8ArrayResult(Structure):
+    _fields_ = [
+        ("numberOfElements", c_int),
+        ("data", POINTER(c_uint8)),
+    ]
+
+class _CInt8ArrayResult(Structure):
+    _fields_ = [
+        ("numberOfElements", c_int),
+        ("data", POINTER(c_int8)),
+    ]
+
+class _CInt16ArrayResult(Structure):
+    _fields_ = [
+        ("numberOfElements", c_int),
+        ("data", POINTER(c_int16)),
+    ]
+
+# Value i is missing when bit i%8 of validity[i//8] is 0, validity is NULL when nothing is missing
+class _CNullableIntArrayResult(Structure):
+    _fields_ = [
+        ("numberOfElements", c_int),
+        ("data", POINTER(c_int)),
+        ("validity", POINTER(c_ubyte)),
+    ]
+
+class _CNullableFloatArrayResult(Structure):
+    _fields_ = [
+        ("numberOfElements", c_int),
+        ("data", POINTER(c_float)),
+        ("validity", POINTER(c_ubyte)),
+    ]
+
+class _CNullableStringArrayResult(Structure):
+    _fields_ = [
+        ("numberOfElements", c_int),
+        ("data", POINTER(c_char_p)), # Missing strings are also NULL
+        ("validity", POINTER(c_ubyte)),
+    ]
+
+class _CBytesArrayResult(Structure):
+    _fields_ = [
+        ("numberOfElements", c_int),
+        ("offsets", POINTER(c_longlong)), # numberOfElements+1 entries, item i is data[offsets[i]:offsets[i+1]]
+        ("data", POINTER(c_ubyte)),
+    ]
+
+class _CBufferPoolStats(Structure):
+    _fields_ = [
+        ("hits", c_longlong),
+        ("misses", c_longlong),
+        ("retainedBytes", c_longlong),
+        ("retainedBuffers", c_longlong),
+        ("maxRetainedBytes", c_longlong),
+    ]
+
+class _CGoMemoryStats(Structure):
+    _fields_ = [
+        ("heapAlloc", c_ulonglong),
+        ("heapInuse", c_ulonglong),
+        ("heapObjects", c_ulonglong),
+        ("sys", c_ulonglong),
+        ("mallocs", c_ulonglong),
+        ("frees", c_ulonglong),
+        ("numGC", c_ulonglong),
+        ("liveCBuffers", c_longlong),
+        ("liveCBytes", c_longlong),
+        ("totalAlloc", c_ulonglong),
+        ("heapSys", c_ulonglong),
+        ("heapIdle", c_ulonglong),
+        ("heapReleased", c_ulonglong),
+        ("nextGC", c_ulonglong),
+        ("lastGC", c_ulonglong),
+        ("numForcedGC", c_ulonglong),
+        ("pauseTotalNs", c_ulonglong),
+        ("lastPauseNs", c_ulonglong),
+        ("maxPauseNs", c_ulonglong),
+        ("gcCPUFraction", c_double),
+    ]
+
+class _CHandleStats(Structure):
+    _fields_ = [
+        ("liveHandles", c_longlong),
+        ("liveBytes", c_longlong),
+        ("uploads", c_longlong),
+        ("releases", c_longlong),
+    ]
+
+# Called by Go with each chunk of a streamed result (a *ArrayResult only valid during the call), returns non-zero to cancel
+_ChunkCallback = CFUNCTYPE(c_int, c_void_p, c_void_p)
+
 # ========== Setup CGo functions ==========
 
-# import library
+# import library (loaded on first use, see _library())
 dll_source_file = os.path.join(os.path.dirname(os.path.realpath(__file__)), "lib.go")
 if platform().lower().startswith("windows"):
     dll_file = os.path.join(os.path.dirname(os.path.realpath(__file__)),"lib.dll")
-    lib = get_library(dll_file, dll_source_file, True)
 else:
     dll_file = os.path.join(os.path.dirname(os.path.realpath(__file__)),"lib.so")
-    lib = get_library(dll_file, dll_source_file, True)
 
-lib.print_string_array.argtypes =  [POINTER(c_char_p), c_int]
-lib.FreeStringArray.argtypes = [POINTER(c_char_p), c_int]
+_lib = None
 
-lib.print_int_array.argtypes =  [POINTER(c_int), c_int]
-lib.FreeIntArray.argtypes = [POINTER(c_int)]
+def _library():
+    """Gets lib.go's library, loading it (and setting up its exports) the first time it's needed
 
-lib.print_float_array.argtypes =  [POINTER(c_float), c_int]
-lib.FreeFloatArray.argtypes =  [POINTER(c_float)]
+    Notes
+    -----
+    - Safe to call from many threads at once, only the first call takes a lock, every call after that is a plain read
+    - The library is only published once it's fully setup, so no thread ever sees exports without their argtypes
+    """
+    lib = _lib
+    if lib is None:
+        lib = _load_library()
+    return lib
+
+def _load_library():
+    """Loads and sets up the library under the setup lock, the slow path of _library()"""
+    global _lib
+    with _setup_lock:
+        if _lib is None:
+            lib = get_library(dll_file, dll_source_file, True)
+            if BACKEND == "ctypes":
+                _setup_ctypes_functions(lib)
+            _lib = lib
+        return _lib
+
+def _setup_ctypes_handle_functions(lib:CDLL):
+    """Sets the argtypes/restype of the exports a GoHandle calls, go_function() also sets them on the libraries it binds"""
+    lib.release_handle.argtypes = [c_size_t]
+    lib.handle_size.argtypes = [c_size_t]
+    lib.handle_size.restype = c_longlong
+
+def __getattr__(name:str):
+    # lib used to be loaded at import, keep `lib.lib`/`from lib import lib` working now that it's loaded lazily
+    if name == "lib":
+        return _library()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _setup_ctypes_functions(lib:CDLL):
+    """Sets the argtypes/restype of lib.go's exports, only needed for the ctypes backend"""
+    lib.print_string_array.argtypes =  [POINTER(c_char_p), c_int]
+    lib.FreeStringArray.argtypes = [POINTER(c_char_p), c_int]
 
-lib.return_string.argtypes = [c_char_p]
-lib.return_string.restype = c_char_p
+    lib.print_int_array.argtypes =  [POINTER(c_int), c_int]
+    lib.FreeIntArray.argtypes = [POINTER(c_int)]
 
-lib.FreeCString.argtypes = [c_char_p]
+    lib.print_float_array.argtypes =  [POINTER(c_float), c_int]
+    lib.FreeFloatArray.argtypes =  [POINTER(c_float)]
 
-lib.print_string.argtypes = [c_char_p]
+    lib.return_string.argtypes = [c_char_p]
+    lib.return_string.restype = POINTER(c_char) # Not c_char_p, which would copy to bytes and lose the pointer to free
 
-## ========== Array-based functions ==========
+    lib.FreeCString.argtypes = [c_char_p]
 
-lib.FreeStringArray.argtypes = [POINTER(c_char_p), c_int]
-lib.free_string_array_result.argtypes = [POINTER(_CStringArrayResult)]
-lib.return_string_array.argtypes = [POINTER(c_char_p), c_int] 
-lib.return_string_array.restype = POINTER(_CStringArrayResult)
+    lib.print_string.argtypes = [c_char_p]
 
-lib.return_int_array.argtypes = [POINTER(c_int), c_int]
-lib.return_int_array.restype = POINTER(_CIntArrayResult)
-lib.free_int_array_result.argtypes = [POINTER(_CIntArrayResult)]
+    ## ========== Array-based functions ==========
 
-lib.return_float_array.argtypes = [POINTER(c_float), c_int]
-lib.return_float_array.restype = POINTER(_CFloatArrayResult)
-lib.free_float_array_result.argtypes = [POINTER(_CFloatArrayResult)]
+    lib.FreeStringArray.argtypes = [POINTER(c_char_p), c_int]
+    lib.free_string_array_result.argtypes = [POINTER(_CStringArrayResult)]
+    lib.return_string_array.argtypes = [POINTER(c_char_p), c_int] 
+    lib.return_string_array.restype = POINTER(_CStringArrayResult)
+
+    lib.return_int_array.argtypes = [POINTER(c_int), c_int]
+    lib.return_int_array.restype = POINTER(_CIntArrayResult)
+    lib.free_int_array_result.argtypes = [POINTER(_CIntArrayResult)]
+
+    lib.return_float_array.argtypes = [POINTER(c_float), c_int]
+    lib.return_float_array.restype = POINTER(_CFloatArrayResult)
+    lib.free_float_array_result.argtypes = [POINTER(_CFloatArrayResult)]
+
+    lib.return_int64_array.argtypes = [POINTER(c_int64), c_int]
+    lib.return_int64_array.restype = POINTER(_CInt64ArrayResult)
+    lib.FreeInt64Array.argtypes = [POINTER(c_int64)]
+    lib.free_int64_array_result.argtypes = [POINTER(_CInt64ArrayResult)]
+
+    lib.return_double_array.argtypes = [POINTER(c_double), c_int]
+    lib.return_double_array.restype = POINTER(_CDoubleArrayResult)
+    lib.FreeDoubleArray.argtypes = [POINTER(c_double)]
+    lib.free_double_array_result.argtypes = [POINTER(_CDoubleArrayResult)]
+
+    lib.return_bool_array.argtypes = [POINTER(c_ubyte), c_int]
+    lib.return_bool_array.restype = POINTER(_CBoolArrayResult)
+    lib.free_bool_array_result.argtypes = [POINTER(_CBoolArrayResult)]
+
+    lib.return_uint8_array.argtypes = [POINTER(c_uint8), c_int]
+    lib.return_uint8_array.restype = POINTER(_CUint8ArrayResult)
+    lib.free_uint8_array_result.argtypes = [POINTER(_CUint8ArrayResult)]
+
+    lib.return_int8_array.argtypes = [POINTER(c_int8), c_int]
+    lib.return_int8_array.restype = POINTER(_CInt8ArrayResult)
+    lib.free_int8_array_result.argtypes = [POINTER(_CInt8ArrayResult)]
+
+    lib.return_int16_array.argtypes = [POINTER(c_int16), c_int]
+    lib.return_int16_array.restype = POINTER(_CInt16ArrayResult)
+    lib.free_int16_array_result.argtypes = [POINTER(_CInt16ArrayResult)]
+
+    lib.return_nullable_int_array.argtypes = [POINTER(c_int), POINTER(c_ubyte), c_int]
+    lib.return_nullable_int_array.restype = POINTER(_CNullableIntArrayResult)
+    lib.free_nullable_int_array_result.argtypes = [POINTER(_CNullableIntArrayResult)]
+
+    lib.return_nullable_float_array.argtypes = [POINTER(c_float), POINTER(c_ubyte), c_int]
+    lib.return_nullable_float_array.restype = POINTER(_CNullableFloatArrayResult)
+    lib.free_nullable_float_array_result.argtypes = [POINTER(_CNullableFloatArrayResult)]
+
+    lib.return_nullable_string_array.argtypes = [POINTER(c_char_p), POINTER(c_ubyte), c_int]
+    lib.return_nullable_string_array.restype = POINTER(_CNullableStringArrayResult)
+    lib.free_nullable_string_array_result.argtypes = [POINTER(_CNullableStringArrayResult)]
+
+    lib.return_bytes_array.argtypes = [POINTER(c_char_p), POINTER(c_longlong), c_int]
+    lib.return_bytes_array.restype = POINTER(_CBytesArrayResult)
+    lib.free_bytes_array_result.argtypes = [POINTER(_CBytesArrayResult)]
+
+    ## ========== Msgpack ==========
+
+    lib.msgpack_roundtrip.argtypes = [c_char_p, c_int]
+    lib.msgpack_roundtrip.restype = POINTER(_CBytesArrayResult)
+    lib.msgpack_records_roundtrip.argtypes = [c_char_p, c_int]
+    lib.msgpack_records_roundtrip.restype = POINTER(_CBytesArrayResult)
+    lib.json_roundtrip.argtypes = [c_char_p]
+    lib.json_roundtrip.restype = POINTER(c_char) # Not c_char_p, which would copy to bytes and lose the pointer to free
+
+    ## ========== Buffer pool ==========
+
+    lib.enable_buffer_pool.argtypes = [c_int, c_longlong]
+    lib.trim_buffer_pool.restype = c_longlong
+    lib.buffer_pool_stats.argtypes = [POINTER(_CBufferPoolStats)]
+
+    ## ========== Go runtime ==========
+
+    lib.go_memory_stats.argtypes = [POINTER(_CGoMemoryStats)]
+    lib.set_gomaxprocs.argtypes = [c_int]
+    lib.set_gomaxprocs.restype = c_int
+    lib.set_gc_percent.argtypes = [c_int]
+    lib.set_gc_percent.restype = c_int
+    lib.set_memory_limit.argtypes = [c_longlong]
+    lib.set_memory_limit.restype = c_longlong
+
+    ## ========== Profiling ==========
+
+    lib.start_cpu_profile.argtypes = [c_char_p]
+    lib.start_cpu_profile.restype = POINTER(c_char) # Errors are returned as a C string to free
+    lib.stop_cpu_profile.restype = POINTER(c_char)
+    lib.write_profile.argtypes = [c_char_p, c_char_p]
+    lib.write_profile.restype = POINTER(c_char)
+    lib.start_trace.argtypes = [c_char_p]
+    lib.start_trace.restype = POINTER(c_char)
+    lib.stop_trace.restype = POINTER(c_char)
+    lib.capture_trace.argtypes = [c_char_p, c_int]
+    lib.capture_trace.restype = POINTER(c_char)
+
+    ## ========== Handles ==========
+
+    lib.upload_string_array.argtypes = [POINTER(c_char_p), c_int]
+    lib.upload_string_array.restype = c_size_t
+    lib.upload_int_array.argtypes = [POINTER(c_int), c_int]
+    lib.upload_int_array.restype = c_size_t
+    lib.upload_float_array.argtypes = [POINTER(c_float), c_int]
+    lib.upload_float_array.restype = c_size_t
+    _setup_ctypes_handle_functions(lib)
+    lib.handle_stats.argtypes = [POINTER(_CHandleStats)]
+    lib.return_handle_string_array.argtypes = [c_size_t]
+    lib.return_handle_string_array.restype = POINTER(_CStringArrayResult)
+    lib.return_handle_int_array.argtypes = [c_size_t]
+    lib.return_handle_int_array.restype = POINTER(_CIntArrayResult)
+    lib.return_handle_float_array.argtypes = [c_size_t]
+    lib.return_handle_float_array.restype = POINTER(_CFloatArrayResult)
+    lib.handle_string_lengths.argtypes = [c_size_t]
+    lib.handle_string_lengths.restype = POINTER(_CIntArrayResult)
+
+    ## ========== Streaming ==========
+
+    lib.stream_string_array.argtypes = [POINTER(c_char_p), c_int, c_int, _ChunkCallback, c_void_p]
+    lib.stream_string_array.restype = c_longlong
+    lib.stream_int_array.argtypes = [POINTER(c_int), c_int, c_int, _ChunkCallback, c_void_p]
+    lib.stream_int_array.restype = c_longlong
+
+    lib.return_string_lengths.argtypes = [POINTER(c_char_p), c_int]
+    lib.return_string_lengths.restype = POINTER(_CIntArrayResult)
 
 # ========== Nice Typehints/Type Aliases ==========
 CIntArray = Array[c_int]
 CFloatArray = Array[c_float]
 CStringArray = Array[c_char_p]
+CInt64Array = Array[c_int64]
+CDoubleArray = Array[c_double]
+CBoolArray = Array[c_ubyte]
+CUint8Array = Array[c_uint8]
+CInt8Array = Array[c_int8]
+CInt16Array = Array[c_int16]
+CValidityArray = Array[c_ubyte]
+CBytesArray = Array[c_char_p]
+CLengthArray = Array[c_longlong]
 
 # ========== Python types to C ============
 def prepare_string(data: str | bytes) -> c_char_p:
@@ -281,211 +893,2441 @@ def prepare_float_array(data:list[float]) -> tuple[CFloatArray, int]:
     c_array = array_type(*data)
     return c_array, number_of_items
 
-# ========== Convert C types to python ============
-def string_to_str(pointer: c_char_p) -> str:
-    """Takes in a pointer to a C string and returns a Python string
+def prepare_int64_array(data:list[int]) -> tuple[CInt64Array, int]:
+    """Takes in an int list, and converts it to a C-compatible array of 64-bit integers
 
     Parameters
     ----------
-    pointer : c_char_p
-        A C-style string pointer returned from Go
+    data : list[int]
+        The list of integers to convert to an array
+
+    Returns
+    -------
+    Array[c_int64], int
+        The resulting array, and the number of items
 
     Notes
     -----
-    - Assumes the pointer is a valid null-terminated UTF-8 encoded string
-    - Does NOT free the pointer automatically, you must call `lib.FreeCString(pointer)` if needed
+    - Because the data is allocated in python, python will free the memory afterwords
+    - The values are packed in one pass by the array module, and the C array shares its buffer (no per-item ctypes objects)
+    - Use this over prepare_int_array() when values don't fit in 32 bits, or to pair with CInt64ArrayToSlice() in Go
 
-    Returns
-    -------
-    str
-        The decoded Python string representation of the C string
-        
     Examples
     --------
     ```
-    c_str = prepare_string(b"Hello from Python!")
-    result: str = string_to_str(c_str)
-    lib.FreeCString(c_str)
+    lib = cdll.LoadLibrary("path/to/library.dll") # Load Library
+
+    # Function that takes in int64 array, and number of items, then returns them as an Int64ArrayResult
+    lib.return_int64_array.argtypes =  [POINTER(c_int64), c_int]
+    lib.return_int64_array.restype = POINTER(_CInt64ArrayResult)
+
+    # Prep data using function
+    data = [1, 2**40, -3]
+    c_array, number_of_items = prepare_int64_array(data)
+
+    # Use data in C
+    result = int64_array_result_to_list(lib.return_int64_array(c_array, number_of_items))
     ```
     """
-    if pointer:
-        return pointer.value.decode("utf-8", errors="replace")
-    return ""
+    buffer = array("q", data) # Force an error if wrong type
+    number_of_items = len(buffer)
+    return (c_int64 * number_of_items).from_buffer(buffer), number_of_items
 
-def string_array_result_to_list(pointer:_CStringArrayResult) -> list[str]:
-    """Takes in a pointer to a string result and returns a list of strings
+def prepare_double_array(data:list[float]) -> tuple[CDoubleArray, int]:
+    """Takes in a float list, and converts it to a C-compatible array of doubles
 
     Parameters
     ----------
-    pointer : _CStringArrayResult
-        A pointer to a CString Result
+    data : list[float]
+        The list of floats to convert to an array
+
+    Returns
+    -------
+    Array[c_double], int
+        The resulting array, and the number of items
 
     Notes
     -----
-    - free's the original pointer
+    - Because the data is allocated in python, python will free the memory afterwords
+    - The values are packed in one pass by the array module, and the C array shares its buffer (no per-item ctypes objects)
+    - Unlike prepare_float_array() there is no loss of precision, since python floats are doubles
+    """
+    buffer = array("d", data) # Force an error if wrong type
+    number_of_items = len(buffer)
+    return (c_double * number_of_items).from_buffer(buffer), number_of_items
+
+# Every byte value to the ASCII digit of its truthiness, and back, used to (un)pack bools without per-element loops
+_TO_BIT_DIGITS = bytes.maketrans(bytes(range(256)), b"0" + b"1" * 255)
+_FROM_BIT_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+_MISSING_FROM_BIT_DIGITS = bytes.maketrans(b"01", b"\x01\x00")
+
+def _pack_bools(data:list[bool]) -> bytes:
+    """Packs bools into bytes, 8 per byte with the least significant bit first (the layout of a BoolArrayResult)
+
+    bytes() turns the bools into 0/1 bytes, which become a string of binary digits (reversed so the first value is the
+    lowest bit) that python parses into one big int in linear time, and writes back out little endian
+    """
+    if not data:
+        return b""
+    digits = bytes(data).translate(_TO_BIT_DIGITS)[::-1] # Force an error if wrong type
+    return int(digits, 2).to_bytes((len(digits) + 7) // 8, "little")
+
+def _bit_digits(packed:bytes, number_of_items:int) -> bytes:
+    """The first number_of_items bits of bytes packed by _pack_bools() as ASCII digits, first value first"""
+    return f"{int.from_bytes(packed, 'little'):0{number_of_items}b}"[::-1][:number_of_items].encode()
+
+def _unpack_bools(packed:bytes, number_of_items:int) -> list[bool]:
+    """Unpacks number_of_items bools from bytes packed by _pack_bools() (or BoolSliceToCArray() in Go)"""
+    if not number_of_items:
+        return []
+    return list(map(bool, _bit_digits(packed, number_of_items).translate(_FROM_BIT_DIGITS)))
+
+def _apply_validity(values:list, validity:bytes, number_of_items:int) -> list:
+    """Replaces the values a validity bitmap marks as missing with None, without per-element python loops"""
+    if not number_of_items:
+        return values
+    missing = _bit_digits(validity, number_of_items).translate(_MISSING_FROM_BIT_DIGITS)
+    return list(map(tuple.__getitem__, zip(values, repeat(None)), missing)) # (value, None)[missing]
+
+def _validity_of(data:list) -> bytes:
+    """Packs which items are not None into a validity bitmap (the same layout as _pack_bools())"""
+    return _pack_bools(bytes(map(is_not, data, repeat(None))))
+
+def prepare_bool_array(data:list[bool]) -> tuple[CBoolArray, int]:
+    """Takes in a bool list, and converts it to a bit-packed C-compatible array (8 values per byte)
+
+    Parameters
+    ----------
+    data : list[bool]
+        The list of bools to convert to an array (ints from 0 to 255 are treated as their truthiness)
+
+    Raises
+    ------
+    ValueError:
+        If an int is outside 0 to 255 (map bool over the data first to pack any int by its truthiness)
+
+    TypeError:
+        If a value isn't a bool or int
 
     Returns
     -------
-    list[str]
-        The list of strings the pointer pointed to
-        
+    Array[c_ubyte], int
+        The resulting packed array, and the number of bools (not bytes)
+
+    Notes
+    -----
+    - Because the data is allocated in python, python will free the memory afterwords
+    - Value i is bit i%8 of byte i//8 (least significant bit first), use CBoolArrayToSlice() in Go to unpack it
+    - Packing is done without per-element python loops, and takes 32x less memory than prepare_int_array()
+
     Examples
     --------
     ```
-    data = [
-        random.choice(["Lorem", "ipsum", "dolor", "sit", "amet"]) 
-        for _ in range(100)
-    ]
-    
-    c_array, number_of_elements = prepare_string_array(data)
-    
-    pointer = return_string_array(c_array, number_of_elements)
-    
-    result:list[str] = string_array_result_to_list(pointer)
-    ```
-    """
-    try:
-        result_data = pointer.contents
-        results = []
-        for i in range(result_data.numberOfElements):
-            results.append(result_data.data[i].decode(errors='replace'))
-        return results
-    finally:
-        lib.free_string_array_result(pointer)
+    lib = cdll.LoadLibrary("path/to/library.dll") # Load Library
 
-def int_array_result_to_list(pointer: _CIntArrayResult) -> list[int]:
-    """Converts C int result struct to a Python list, and frees memory."""
-    try:
-        result_data = pointer.contents
-        return [result_data.data[i] for i in range(result_data.numberOfElements)]
-    finally:
-        lib.free_int_array_result(pointer)
+    # Function that takes in a packed bool array, and number of items, then returns them as a BoolArrayResult
+    lib.return_bool_array.argtypes = [POINTER(c_ubyte), c_int]
+    lib.return_bool_array.restype = POINTER(_CBoolArrayResult)
 
-def float_array_result_to_list(pointer: _CFloatArrayResult) -> list[float]:
-    """Converts C float result struct to a Python list, and frees memory."""
-    try:
-        result_data = pointer.contents
-        return [result_data.data[i] for i in range(result_data.numberOfElements)]
-    finally:
-        lib.free_float_array_result(pointer)
+    # Prep data using function
+    mask = [True, False, True]
+    c_array, number_of_items = prepare_bool_array(mask)
 
-# ========== Debugging Functions ==========
+    # Use data in C
+    result = bool_array_result_to_list(lib.return_bool_array(c_array, number_of_items))
+    ```
+    """
+    packed = _pack_bools(data)
+    return (c_ubyte * len(packed)).from_buffer_copy(packed), len(data)
 
-def return_string(text: str | bytes) -> str:
-    """Debugging function that shows you the Go representation of a C string and returns the python string version
+def prepare_uint8_array(data:list[int]) -> tuple[CUint8Array, int]:
+    """Takes in an int list, and converts it to a C-compatible array of uint8_t (0 to 255)
 
     Parameters
     ----------
-    text : str | bytes
-        The text to get the representation of
+    data : list[int]
+        The list of ints to convert to an array
+
+    Raises
+    ------
+    OverflowError:
+        If a value doesn't fit in a uint8_t
 
     Returns
     -------
-    str
-        The returned string
-    """
-    c_input = prepare_string(text)
-    result = lib.return_string(c_input)
+    Array[c_uint8], int
+        The resulting array, and the number of items
+
+    Notes
+    -----
+    - Because the data is allocated in python, python will free the memory afterwords
+    - The values are packed in one pass by the array module, and the C array shares its buffer (no per-item ctypes objects)
+    """
+    buffer = array("B", data) # Force an error if wrong type or out of range
+    number_of_items = len(buffer)
+    return (c_uint8 * number_of_items).from_buffer(buffer), number_of_items
+
+def prepare_int8_array(data:list[int]) -> tuple[CInt8Array, int]:
+    """Takes in an int list, and converts it to a C-compatible array of int8_t (-128 to 127)
+
+    Parameters
+    ----------
+    data : list[int]
+        The list of ints to convert to an array
+
+    Raises
+    ------
+    OverflowError:
+        If a value doesn't fit in a int8_t
+
+    Returns
+    -------
+    Array[c_int8], int
+        The resulting array, and the number of items
+
+    Notes
+    -----
+    - Because the data is allocated in python, python will free the memory afterwords
+    - The values are packed in one pass by the array module, and the C array shares its buffer (no per-item ctypes objects)
+    """
+    buffer = array("b", data) # Force an error if wrong type or out of range
+    number_of_items = len(buffer)
+    return (c_int8 * number_of_items).from_buffer(buffer), number_of_items
+
+def prepare_int16_array(data:list[int]) -> tuple[CInt16Array, int]:
+    """Takes in an int list, and converts it to a C-compatible array of int16_t (-32,768 to 32,767)
+
+    Parameters
+    ----------
+    data : list[int]
+        The list of ints to convert to an array
+
+    Raises
+    ------
+    OverflowError:
+        If a value doesn't fit in a int16_t
+
+    Returns
+    -------
+    Array[c_int16], int
+        The resulting array, and the number of items
+
+    Notes
+    -----
+    - Because the data is allocated in python, python will free the memory afterwords
+    - The values are packed in one pass by the array module, and the C array shares its buffer (no per-item ctypes objects)
+    """
+    buffer = array("h", data) # Force an error if wrong type or out of range
+    number_of_items = len(buffer)
+    return (c_int16 * number_of_items).from_buffer(buffer), number_of_items
+
+def prepare_bytes_array(data:list[bytes|bytearray|memoryview]) -> tuple[CBytesArray, CLengthArray, int]:
+    """Takes in a list of binary blobs, and converts it to a C-compatible array of pointers plus the length of each item
+
+    Parameters
+    ----------
+    data : list[bytes | bytearray | memoryview]
+        The binary data to convert (i.e. compressed payloads, hashes or images)
+
+    Returns
+    -------
+    Array[c_char_p], Array[c_longlong], int
+        The pointer to each item, the length of each item in bytes, and the number of items
+
+    Notes
+    -----
+    - bytes items are not copied, the pointers point straight at python's buffers (other types are copied to bytes first)
+    - Items are not encoded or NUL terminated, Go uses the lengths so NUL bytes are kept
+    - Because the data is owned by python, python will free the memory afterwords, so keep the arrays alive until Go returns
+
+    Examples
+    --------
+    ```
+    lib = cdll.LoadLibrary("path/to/library.dll") # Load Library
+
+    # Function that takes in binary blobs, their lengths and the number of items, then returns them as a BytesArrayResult
+    lib.return_bytes_array.argtypes = [POINTER(c_char_p), POINTER(c_longlong), c_int]
+    lib.return_bytes_array.restype = POINTER(_CBytesArrayResult)
+
+    # Prep data using function
+    data = [b"\x00\x01\x02", hashlib.sha256(b"Hello").digest()]
+    c_array, lengths, number_of_items = prepare_bytes_array(data)
+
+    # Use data in C
+    result = bytes_array_result_to_list(lib.return_bytes_array(c_array, lengths, number_of_items))
+    ```
+    """
+    items = [item if type(item) == bytes else bytes(item) for item in data]
+    number_of_items = len(items)
+    lengths = array("q", map(len, items))
+    return (c_char_p * number_of_items)(*items), (c_longlong * number_of_items).from_buffer(lengths), number_of_items
+
+def prepare_nullable_int_array(data:list[int|None]) -> tuple[CIntArray, CValidityArray|None, int]:
+    """Takes in a list of ints and Nones, and converts it to a C-compatible int array plus a validity bitmap
+
+    Parameters
+    ----------
+    data : list[int | None]
+        The list of integers to convert to an array, None marks a missing value
+
+    Raises
+    ------
+    OverflowError:
+        If a value doesn't fit in a C int
+
+    Returns
+    -------
+    Array[c_int], Array[c_ubyte] | None, int
+        The resulting array (missing values are 0), the validity bitmap (None if nothing is missing), and the number of items
+
+    Notes
+    -----
+    - Because the data is allocated in python, python will free the memory afterwords
+    - Value i is present when bit i%8 of validity[i//8] is set (least significant bit first), use CNullableInt32ArrayToSlice() in Go to read it
+    - The values and the bitmap are each built in one pass by C code (array and map), there are no per-element python loops
+    - When nothing is missing no bitmap is built at all, and Go gets NULL (so Validity.AllValid() is free)
+
+    Examples
+    --------
+    ```
+    lib = cdll.LoadLibrary("path/to/library.dll") # Load Library
+
+    # Function that takes in an int array, its validity, and number of items, then returns them as a NullableIntArrayResult
+    lib.return_nullable_int_array.argtypes = [POINTER(c_int), POINTER(c_ubyte), c_int]
+    lib.return_nullable_int_array.restype = POINTER(_CNullableIntArrayResult)
+
+    # Prep data using function
+    data = [1, None, 3]
+    c_array, validity, number_of_items = prepare_nullable_int_array(data)
+
+    # Use data in C
+    result = nullable_int_array_result_to_list(lib.return_nullable_int_array(c_array, validity, number_of_items)) # [1, None, 3]
+    ```
+    """
+    if None not in data:
+        buffer = array("i", data) # Force an error if wrong type or out of range
+        return (c_int * len(buffer)).from_buffer(buffer), None, len(buffer)
+    buffer = array("i", map({None: 0}.get, data, data)) # Missing values become 0
+    validity = _validity_of(data)
+    return (c_int * len(buffer)).from_buffer(buffer), (c_ubyte * len(validity)).from_buffer_copy(validity), len(buffer)
+
+def prepare_nullable_float_array(data:list[float|None]) -> tuple[CFloatArray, CValidityArray|None, int]:
+    """Takes in a list of floats and Nones, and converts it to a C-compatible float array plus a validity bitmap
+
+    Parameters
+    ----------
+    data : list[float | None]
+        The list of floats to convert to an array, None marks a missing value
+
+    Returns
+    -------
+    Array[c_float], Array[c_ubyte] | None, int
+        The resulting array (missing values are 0.0), the validity bitmap (None if nothing is missing), and the number of items
+
+    Notes
+    -----
+    - Because the data is allocated in python, python will free the memory afterwords
+    - Works like prepare_nullable_int_array(), use CNullableFloat32ArrayToSlice() in Go to read it
+    - Unlike NaN, None survives the round trip as "missing" rather than as a value
+    """
+    if None not in data:
+        buffer = array("f", data) # Force an error if wrong type
+        return (c_float * len(buffer)).from_buffer(buffer), None, len(buffer)
+    buffer = array("f", map({None: 0.0}.get, data, data)) # Missing values become 0.0
+    validity = _validity_of(data)
+    return (c_float * len(buffer)).from_buffer(buffer), (c_ubyte * len(validity)).from_buffer_copy(validity), len(buffer)
+
+def prepare_nullable_string_array(data:list[str|bytes|None]) -> tuple[CStringArray, CValidityArray|None, int]:
+    """Takes in a list of strings and Nones, and converts it to a C-compatible string array plus a validity bitmap
+
+    Parameters
+    ----------
+    data : list[str | bytes | None]
+        The list to convert, None marks a missing string
+
+    Returns
+    -------
+    Array[c_char_p], Array[c_ubyte] | None, int
+        The resulting array (missing strings are NULL), the validity bitmap (None if nothing is missing), and the number of items
+
+    Notes
+    -----
+    - Because the data is allocated in python, python will free the memory afterwords
+    - Missing strings are NULL pointers and are also marked in the bitmap, so Go can tell None apart from ""
+    - Use CNullableStringArrayToSlice() in Go to read it
+    """
+    items = [item.encode() if type(item) == str else item if item is None else bytes(item) for item in data]
+    c_array = (c_char_p * len(items))(*items) # None becomes NULL
+    if None not in items:
+        return c_array, None, len(items)
+    validity = _validity_of(items)
+    return c_array, (c_ubyte * len(validity)).from_buffer_copy(validity), len(items)
+
+def _prepare_str_list(data:list[str]) -> tuple[CStringArray, int]:
+    """prepare_string_array() for data known to only hold str (i.e. from a type hint), skips the per item type checks"""
+    return (c_char_p * len(data))(*map(str.encode, data)), len(data)
+
+def _prepare_int_list(data:list[int]) -> tuple[CIntArray, int]:
+    """prepare_int_array() packed in one go by array, which also raises an OverflowError for values that don't fit"""
+    buffer = array("i", data) # Force an error if wrong type or out of range
+    return (c_int * len(buffer)).from_buffer(buffer), len(buffer)
+
+def _prepare_float_list(data:list[float]) -> tuple[CFloatArray, int]:
+    """prepare_float_array() packed in one go by array"""
+    buffer = array("f", data) # Force an error if wrong type
+    return (c_float * len(buffer)).from_buffer(buffer), len(buffer)
+
+# ========== Convert C types to python ============
+def string_to_str(pointer: c_char_p) -> str:
+    """Takes in a pointer to a C string and returns a Python string
+
+    Parameters
+    ----------
+    pointer : c_char_p
+        A C-style string pointer returned from Go
+
+    Notes
+    -----
+    - Assumes the pointer is a valid null-terminated UTF-8 encoded string
+    - Does NOT free the pointer automatically, you must call `lib.FreeCString(pointer)` if needed
+
+    Returns
+    -------
+    str
+        The decoded Python string representation of the C string
+        
+    Examples
+    --------
+    ```
+    c_str = prepare_string(b"Hello from Python!")
+    result: str = string_to_str(c_str)
+    lib.FreeCString(c_str)
+    ```
+    """
+    if pointer:
+        return pointer.value.decode("utf-8", errors="replace")
+    return ""
+
+def _c_string_contents(pointer: c_char_p) -> bytes:
+    """Copies the bytes of a C string returned from Go (does not free)"""
+    return string_at(pointer)
+
+def _string_array_contents(pointer:_CStringArrayResult) -> list[str]:
+    """Decodes the strings in a StringArrayResult (does not free)"""
+    result_data = pointer.contents
+    return [item.decode(errors='replace') for item in result_data.data[:result_data.numberOfElements]]
+
+def _int_array_contents(pointer:_CIntArrayResult) -> list[int]:
+    """Copies the values in an IntArrayResult (does not free)"""
+    result_data = pointer.contents
+    return result_data.data[:result_data.numberOfElements]
+
+def _float_array_contents(pointer:_CFloatArrayResult) -> list[float]:
+    """Copies the values in a FloatArrayResult (does not free)"""
+    result_data = pointer.contents
+    return result_data.data[:result_data.numberOfElements]
+
+def _int64_array_contents(pointer:_CInt64ArrayResult) -> list[int]:
+    """Copies the values in an Int64ArrayResult (does not free)"""
+    result_data = pointer.contents
+    return result_data.data[:result_data.numberOfElements]
+
+def _double_array_contents(pointer:_CDoubleArrayResult) -> list[float]:
+    """Copies the values in a DoubleArrayResult (does not free)"""
+    result_data = pointer.contents
+    return result_data.data[:result_data.numberOfElements]
+
+def _bool_array_contents(pointer:_CBoolArrayResult) -> list[bool]:
+    """Unpacks the values in a BoolArrayResult (does not free)"""
+    result_data = pointer.contents
+    return _unpack_bools(string_at(result_data.data, (result_data.numberOfElements + 7) // 8), result_data.numberOfElements)
+
+def _uint8_array_contents(pointer:_CUint8ArrayResult) -> list[int]:
+    """Copies the values in a Uint8ArrayResult (does not free)"""
+    result_data = pointer.contents
+    return list(string_at(result_data.data, result_data.numberOfElements))
+
+def _int8_array_contents(pointer:_CInt8ArrayResult) -> list[int]:
+    """Copies the values in an Int8ArrayResult (does not free)"""
+    result_data = pointer.contents
+    return result_data.data[:result_data.numberOfElements]
+
+def _int16_array_contents(pointer:_CInt16ArrayResult) -> list[int]:
+    """Copies the values in an Int16ArrayResult (does not free)"""
+    result_data = pointer.contents
+    return result_data.data[:result_data.numberOfElements]
+
+def _nullable_int_array_contents(pointer:_CNullableIntArrayResult) -> list[int|None]:
+    """Copies the values in a NullableIntArrayResult, with None for missing values (does not free)"""
+    result_data = pointer.contents
+    values = result_data.data[:result_data.numberOfElements]
+    if not result_data.validity:
+        return values
+    return _apply_validity(values, string_at(result_data.validity, (result_data.numberOfElements + 7) // 8), result_data.numberOfElements)
+
+def _nullable_float_array_contents(pointer:_CNullableFloatArrayResult) -> list[float|None]:
+    """Copies the values in a NullableFloatArrayResult, with None for missing values (does not free)"""
+    result_data = pointer.contents
+    values = result_data.data[:result_data.numberOfElements]
+    if not result_data.validity:
+        return values
+    return _apply_validity(values, string_at(result_data.validity, (result_data.numberOfElements + 7) // 8), result_data.numberOfElements)
+
+def _nullable_string_array_contents(pointer:_CNullableStringArrayResult) -> list[str|None]:
+    """Decodes the strings in a NullableStringArrayResult, with None for missing strings (does not free)"""
+    result_data = pointer.contents
+    values = [None if item is None else item.decode(errors='replace') for item in result_data.data[:result_data.numberOfElements]]
+    if not result_data.validity:
+        return values
+    return _apply_validity(values, string_at(result_data.validity, (result_data.numberOfElements + 7) // 8), result_data.numberOfElements)
+
+def _bytes_array_layout(pointer:_CBytesArrayResult) -> tuple[list[int], int]:
+    """Gets the item offsets (numberOfElements+1 of them) and the address of the data in a BytesArrayResult (does not free)"""
+    result_data = pointer.contents
+    return result_data.offsets[:result_data.numberOfElements + 1], cast(result_data.data, c_void_p).value
+
+def _chunk_callback_arguments(function) -> tuple[_ChunkCallback, None]:
+    """Wraps a python function so Go can call it with each chunk of a streamed result, returns the (callback, context) arguments
+
+    Keep the callback alive until Go returns
+    """
+    return _ChunkCallback(function), None
+
+def _chunk_pointer(chunk:int, struct_type:type[Structure]):
+    """Casts the void* a chunk callback gets to a pointer to struct_type, so it can be read by the *_contents functions"""
+    return cast(chunk, POINTER(struct_type))
+
+def _read_struct(function, struct_type:type[Structure]) -> dict:
+    """Calls a Go export that fills in a struct through a pointer, and returns the struct's fields as a dict"""
+    result = struct_type()
+    function(byref(result))
+    return {name: getattr(result, name) for name, _ in struct_type._fields_}
+
+def string_array_result_to_list(pointer:_CStringArrayResult) -> list[str]:
+    """Takes in a pointer to a string result and returns a list of strings
+
+    Parameters
+    ----------
+    pointer : _CStringArrayResult
+        A pointer to a CString Result
+
+    Notes
+    -----
+    - free's the original pointer
+
+    Returns
+    -------
+    list[str]
+        The list of strings the pointer pointed to
+        
+    Examples
+    --------
+    ```
+    data = [
+        random.choice(["Lorem", "ipsum", "dolor", "sit", "amet"]) 
+        for _ in range(100)
+    ]
+    
+    c_array, number_of_elements = prepare_string_array(data)
+    
+    pointer = return_string_array(c_array, number_of_elements)
+    
+    result:list[str] = string_array_result_to_list(pointer)
+    ```
+    """
+    try:
+        return _string_array_contents(pointer)
+    finally:
+        _library().free_string_array_result(pointer)
+
+def int_array_result_to_list(pointer: _CIntArrayResult) -> list[int]:
+    """Converts C int result struct to a Python list, and frees memory."""
+    try:
+        return _int_array_contents(pointer)
+    finally:
+        _library().free_int_array_result(pointer)
+
+def float_array_result_to_list(pointer: _CFloatArrayResult) -> list[float]:
+    """Converts C float result struct to a Python list, and frees memory."""
+    try:
+        return _float_array_contents(pointer)
+    finally:
+        _library().free_float_array_result(pointer)
+
+def int64_array_result_to_list(pointer: _CInt64ArrayResult) -> list[int]:
+    """Converts C int64 result struct to a Python list, and frees memory."""
+    try:
+        return _int64_array_contents(pointer)
+    finally:
+        _library().free_int64_array_result(pointer)
+
+def double_array_result_to_list(pointer: _CDoubleArrayResult) -> list[float]:
+    """Converts C double result struct to a Python list, and frees memory."""
+    try:
+        return _double_array_contents(pointer)
+    finally:
+        _library().free_double_array_result(pointer)
+
+def bool_array_result_to_list(pointer: _CBoolArrayResult) -> list[bool]:
+    """Converts bit-packed C bool result struct to a Python list of bools, and frees memory."""
+    try:
+        return _bool_array_contents(pointer)
+    finally:
+        _library().free_bool_array_result(pointer)
+
+def uint8_array_result_to_list(pointer: _CUint8ArrayResult) -> list[int]:
+    """Converts C uint8 result struct to a Python list, and frees memory."""
+    try:
+        return _uint8_array_contents(pointer)
+    finally:
+        _library().free_uint8_array_result(pointer)
+
+def int8_array_result_to_list(pointer: _CInt8ArrayResult) -> list[int]:
+    """Converts C int8 result struct to a Python list, and frees memory."""
+    try:
+        return _int8_array_contents(pointer)
+    finally:
+        _library().free_int8_array_result(pointer)
+
+def int16_array_result_to_list(pointer: _CInt16ArrayResult) -> list[int]:
+    """Converts C int16 result struct to a Python list, and frees memory."""
+    try:
+        return _int16_array_contents(pointer)
+    finally:
+        _library().free_int16_array_result(pointer)
+
+def nullable_int_array_result_to_list(pointer: _CNullableIntArrayResult) -> list[int|None]:
+    """Converts C nullable int result struct to a Python list (None for missing values), and frees memory."""
+    try:
+        return _nullable_int_array_contents(pointer)
+    finally:
+        _library().free_nullable_int_array_result(pointer)
+
+def nullable_float_array_result_to_list(pointer: _CNullableFloatArrayResult) -> list[float|None]:
+    """Converts C nullable float result struct to a Python list (None for missing values), and frees memory."""
+    try:
+        return _nullable_float_array_contents(pointer)
+    finally:
+        _library().free_nullable_float_array_result(pointer)
+
+def nullable_string_array_result_to_list(pointer: _CNullableStringArrayResult) -> list[str|None]:
+    """Converts C nullable string result struct to a Python list (None for missing strings), and frees memory."""
+    try:
+        return _nullable_string_array_contents(pointer)
+    finally:
+        _library().free_nullable_string_array_result(pointer)
+
+def bytes_array_result_to_list(pointer: _CBytesArrayResult, copy:bool=False) -> list[memoryview]:
+    """Converts a C bytes result struct to a list of read-only memoryviews, one per item, without decoding anything
+
+    Parameters
+    ----------
+    pointer : _CBytesArrayResult
+        The pointer returned from Go (i.e. by BytesSliceToCArray())
+
+    copy : bool, optional
+        If the data should be copied into a single bytes object, freeing the Go memory straight away, by default False
+
+    Notes
+    -----
+    - By default the views point straight at Go's memory (no copies), which is freed once every view (and any slice of one) is garbage collected
+    - With copy=True all the items are copied in one block, and the views point into that bytes object instead
+    - Either way, use bytes(view) to get an item as bytes (this copies that item)
+    - The pointer is freed by this function, don't pass it to free_bytes_array_result()
+
+    Returns
+    -------
+    list[memoryview]
+        A read-only view of each item, in the same order
+
+    Examples
+    --------
+    ```
+    c_array, lengths, number_of_items = prepare_bytes_array([b"\x89PNG...", b"\x1f\x8b..."])
+
+    views = bytes_array_result_to_list(lib.return_bytes_array(c_array, lengths, number_of_items))
+
+    with open("image.png", "wb") as image_file:
+        image_file.write(views[0]) # No copies
+    ```
+    """
+    try:
+        offsets, address = _bytes_array_layout(pointer)
+        total_size = offsets[-1]
+        if copy:
+            view = memoryview(string_at(address, total_size))
+        else:
+            buffer = (c_ubyte * total_size).from_address(address)
+            view = memoryview(buffer).cast("B").toreadonly()
+    except BaseException:
+        _library().free_bytes_array_result(pointer)
+        raise
+
+    if copy:
+        _library().free_bytes_array_result(pointer)
+    else:
+        # Every view (and slice of one) keeps buffer alive, so Go's memory is freed once the last one is gone
+        weakref.finalize(buffer, _library().free_bytes_array_result, pointer)
+    return [view[start:end] for start, end in zip(offsets, offsets[1:])]
+
+# ========== cffi Backend ==========
+# Same behaviour as the ctypes functions above, but producing/consuming cffi cdata objects
+
+def _cffi_keep_alive(c_array, buffers):
+    """Ties buffers to a pointer array, which doesn't own what it points at, so they live for as long as the array is used"""
+    return _ffi.gc(c_array, lambda _, keep_alive=(c_array, buffers): None)
+
+def _cffi_prepare_string(data: str | bytes):
+    if not data:
+        return _ffi.new("char[]", b"")
+    if type(data) == str:
+        return _ffi.new("char[]", data.encode())
+    return _ffi.new("char[]", bytes(data))
+
+def _cffi_prepare_string_array(data:list[str|bytes]):
+    buffers = [
+            _ffi.new("char[]", item.encode())
+        if type(item) == str
+        else
+            _ffi.new("char[]", bytes(item))
+        for item in data
+    ]
+    return _cffi_keep_alive(_ffi.new("char*[]", buffers), buffers), len(buffers)
+
+def _cffi_prepare_int_array(data:list[int]):
+    return _ffi.new("int[]", data), len(data)
+
+def _cffi_prepare_float_array(data:list[float]):
+    return _ffi.new("float[]", data), len(data)
+
+def _cffi_prepare_int64_array(data:list[int]):
+    return _ffi.new("int64_t[]", data), len(data)
+
+def _cffi_prepare_double_array(data:list[float]):
+    return _ffi.new("double[]", data), len(data)
+
+def _cffi_prepare_bool_array(data:list[bool]):
+    return _ffi.new("unsigned char[]", _pack_bools(data)), len(data)
+
+def _cffi_prepare_uint8_array(data:list[int]):
+    return _ffi.new("uint8_t[]", data), len(data)
+
+def _cffi_prepare_int8_array(data:list[int]):
+    return _ffi.new("int8_t[]", data), len(data)
+
+def _cffi_prepare_int16_array(data:list[int]):
+    return _ffi.new("int16_t[]", data), len(data)
+
+def _cffi_prepare_bytes_array(data:list[bytes|bytearray|memoryview]):
+    items = [item if type(item) == bytes else bytes(item) for item in data]
+    buffers = [_ffi.from_buffer(item) for item in items] # Points at python's buffers, no copies
+    return _cffi_keep_alive(_ffi.new("char*[]", buffers), buffers), _ffi.new("long long[]", [len(item) for item in items]), len(items)
+
+def _cffi_prepare_nullable_int_array(data:list[int|None]):
+    if None not in data:
+        return _ffi.new("int[]", data), _ffi.NULL, len(data)
+    return _ffi.new("int[]", list(map({None: 0}.get, data, data))), _ffi.new("unsigned char[]", _validity_of(data)), len(data)
+
+def _cffi_prepare_nullable_float_array(data:list[float|None]):
+    if None not in data:
+        return _ffi.new("float[]", data), _ffi.NULL, len(data)
+    return _ffi.new("float[]", list(map({None: 0.0}.get, data, data))), _ffi.new("unsigned char[]", _validity_of(data)), len(data)
+
+def _cffi_prepare_nullable_string_array(data:list[str|bytes|None]):
+    buffers = [_ffi.NULL if item is None else _ffi.new("char[]", item.encode() if type(item) == str else bytes(item)) for item in data]
+    validity = _ffi.NULL if None not in data else _ffi.new("unsigned char[]", _validity_of(data))
+    return _cffi_keep_alive(_ffi.new("char*[]", buffers), buffers), validity, len(buffers)
+
+def _cffi_prepare_str_list(data:list[str]):
+    buffers = [_ffi.new("char[]", item) for item in map(str.encode, data)]
+    return _cffi_keep_alive(_ffi.new("char*[]", buffers), buffers), len(buffers)
+
+def _cffi_prepare_int_list(data:list[int]):
+    return _ffi.new("int[]", data), len(data)
+
+def _cffi_prepare_float_list(data:list[float]):
+    return _ffi.new("float[]", data), len(data)
+
+def _cffi_string_to_str(pointer) -> str:
+    if pointer:
+        return _ffi.string(pointer).decode("utf-8", errors="replace")
+    return ""
+
+def _cffi_c_string_contents(pointer) -> bytes:
+    return _ffi.string(pointer)
+
+def _cffi_string_array_contents(pointer) -> list[str]:
+    return [_ffi.string(item).decode(errors='replace') for item in _ffi.unpack(pointer.data, pointer.numberOfElements)]
+
+def _cffi_int_array_contents(pointer) -> list[int]:
+    return _ffi.unpack(pointer.data, pointer.numberOfElements)
+
+def _cffi_float_array_contents(pointer) -> list[float]:
+    return _ffi.unpack(pointer.data, pointer.numberOfElements)
+
+def _cffi_int64_array_contents(pointer) -> list[int]:
+    return _ffi.unpack(pointer.data, pointer.numberOfElements)
+
+def _cffi_double_array_contents(pointer) -> list[float]:
+    return _ffi.unpack(pointer.data, pointer.numberOfElements)
+
+def _cffi_bool_array_contents(pointer) -> list[bool]:
+    return _unpack_bools(_ffi.buffer(pointer.data, (pointer.numberOfElements + 7) // 8)[:], pointer.numberOfElements)
+
+def _cffi_uint8_array_contents(pointer) -> list[int]:
+    return list(_ffi.buffer(pointer.data, pointer.numberOfElements)[:])
+
+def _cffi_int8_array_contents(pointer) -> list[int]:
+    return _ffi.unpack(pointer.data, pointer.numberOfElements)
+
+def _cffi_int16_array_contents(pointer) -> list[int]:
+    return _ffi.unpack(pointer.data, pointer.numberOfElements)
+
+def _cffi_nullable_array_contents(pointer, values:list) -> list:
+    if pointer.validity == _ffi.NULL:
+        return values
+    return _apply_validity(values, _ffi.buffer(pointer.validity, (pointer.numberOfElements + 7) // 8)[:], pointer.numberOfElements)
+
+def _cffi_nullable_int_array_contents(pointer) -> list[int|None]:
+    return _cffi_nullable_array_contents(pointer, _ffi.unpack(pointer.data, pointer.numberOfElements))
+
+def _cffi_nullable_float_array_contents(pointer) -> list[float|None]:
+    return _cffi_nullable_array_contents(pointer, _ffi.unpack(pointer.data, pointer.numberOfElements))
+
+def _cffi_nullable_string_array_contents(pointer) -> list[str|None]:
+    return _cffi_nullable_array_contents(pointer, [
+        None if item == _ffi.NULL else _ffi.string(item).decode(errors='replace')
+        for item in _ffi.unpack(pointer.data, pointer.numberOfElements)
+    ])
+
+def _cffi_bytes_array_layout(pointer) -> tuple[list[int], int]:
+    return _ffi.unpack(pointer.offsets, pointer.numberOfElements + 1), int(_ffi.cast("uintptr_t", pointer.data))
+
+def _cffi_chunk_callback_arguments(function):
+    return _ffi.callback("ChunkCallback", function), _ffi.NULL
+
+def _cffi_chunk_pointer(chunk, struct_type:type[Structure]):
+    return _ffi.cast(f"{struct_type.__name__.removeprefix('_C')}*", chunk)
+
+def _cffi_read_struct(function, struct_type:type[Structure]) -> dict:
+    result = _ffi.new(f"{struct_type.__name__.removeprefix('_C')}*") # i.e. _CBufferPoolStats -> BufferPoolStats*
+    function(result)
+    return {name: getattr(result, name) for name, _ in struct_type._fields_}
+
+# Functions that depend on the backend, everything else is written against these
+_BACKEND_FUNCTIONS = (
+    "prepare_string",
+    "prepare_string_array",
+    "prepare_int_array",
+    "prepare_float_array",
+    "prepare_int64_array",
+    "prepare_double_array",
+    "prepare_bool_array",
+    "prepare_uint8_array",
+    "prepare_int8_array",
+    "prepare_int16_array",
+    "prepare_bytes_array",
+    "prepare_nullable_int_array",
+    "prepare_nullable_float_array",
+    "prepare_nullable_string_array",
+    "_prepare_str_list",
+    "_prepare_int_list",
+    "_prepare_float_list",
+    "string_to_str",
+    "_c_string_contents",
+    "_string_array_contents",
+    "_int_array_contents",
+    "_float_array_contents",
+    "_int64_array_contents",
+    "_double_array_contents",
+    "_bool_array_contents",
+    "_uint8_array_contents",
+    "_int8_array_contents",
+    "_int16_array_contents",
+    "_nullable_int_array_contents",
+    "_nullable_float_array_contents",
+    "_nullable_string_array_contents",
+    "_bytes_array_layout",
+    "_chunk_callback_arguments",
+    "_chunk_pointer",
+    "_read_struct",
+)
+
+if BACKEND == "cffi":
+    _cffi_ffi() # The _cffi_* functions use _ffi directly, so declare the API up front (this does not load the library)
+    for _name in _BACKEND_FUNCTIONS:
+        _function = globals()[f"_cffi_{_name.lstrip('_')}"]
+        _function.__doc__ = globals()[_name].__doc__
+        globals()[_name] = _function
+    del _name, _function
+
+# ========== Batched calls ==========
+_BATCH_TYPES = {
+    # Type: (prepare function, argument type, result contents function, result type, export freeing the result)
+    str: (prepare_string_array, POINTER(c_char_p), _string_array_contents, POINTER(_CStringArrayResult), "free_string_array_result"),
+    int: (prepare_int_array, POINTER(c_int), _int_array_contents, POINTER(_CIntArrayResult), "free_int_array_result"),
+    float: (prepare_float_array, POINTER(c_float), _float_array_contents, POINTER(_CFloatArrayResult), "free_float_array_result"),
+}
+
+def _export_library(function, library=None):
+    """The library an export belongs to (so its results are freed where they were allocated), library if it's given
+
+    Raises a TypeError for ctypes functions that aren't this module's exports, since their library can't be looked up
+    """
+    if library is not None:
+        return library
+    library = _library()
+    if BACKEND == "ctypes":
+        own = getattr(library, getattr(function, "__name__", ""), None)
+        if own is None or cast(own, c_void_p).value != cast(function, c_void_p).value:
+            raise TypeError(f"{getattr(function, '__name__', function)} isn't an export of this module's library, pass the library it came from")
+    return library
+
+def batch_call(function, data:list[str|bytes]|list[int]|list[float], input_type:type=str, output_type:type=str, library=None) -> list[str]|list[int]|list[float]:
+    """Runs a batched Go export over many small inputs in a single FFI call, instead of one call per item
+
+    Parameters
+    ----------
+    function : ctypes function
+        The Go export to call, must take (array, number_of_elements) and return a *ArrayResult (i.e. built with BatchStrings() in Go)
+
+    data : list[str | bytes] | list[int] | list[float]
+        The inputs, one per item
+
+    input_type : type, optional
+        The type of the inputs, one of str, int or float, by default str
+
+    output_type : type, optional
+        The type of the results, one of str, int or float, by default str
+
+    library : CDLL, optional
+        The library function comes from, the result is freed with its free_*_array_result export, by default None which uses
+        this module's library
+
+    Notes
+    -----
+    - Sets the argtypes/restype of function if they are not already setup, it never overwrites ones the caller setup
+    - Frees the result array, so the returned list is safe to keep
+
+    Raises
+    ------
+    ValueError:
+        If input_type or output_type is not supported
+
+    TypeError:
+        If function's argtypes/restype are setup for different types, or it's from another library and library isn't given
+
+    Returns
+    -------
+    list[str] | list[int] | list[float]
+        The result for each input, in the same order
+        
+    Examples
+    --------
+    ```
+    lib = cdll.LoadLibrary("path/to/library.dll") # Load Library
+
+    # Go export built with: StringSliceToCArray(BatchStrings(cArray, numberOfStrings, strings.ToUpper))
+    result = batch_call(lib.upper_batch, ["Hello", "World", "!"], library=lib) # ["HELLO", "WORLD", "!"]
+    ```
+    """
+    if input_type not in _BATCH_TYPES or output_type not in _BATCH_TYPES:
+        raise ValueError(f"Unsupported batch types {input_type}->{output_type}, supported types are {list(_BATCH_TYPES)}")
+    prepare, argument_type, _, _, _ = _BATCH_TYPES[input_type]
+    _, _, contents, result_type, free_name = _BATCH_TYPES[output_type]
+    library = _export_library(function, library)
+
+    if BACKEND == "ctypes" and function.restype is not result_type:
+        with _setup_lock: # Only the first call configures the function, restype is set last so other threads never see half of it
+            argument_types = (argument_type, c_int)
+            if function.restype not in (c_int, result_type) or function.argtypes not in (None, argument_types): # c_int is the default restype
+                raise TypeError(f"{function.__name__} is already setup for other types (argtypes {function.argtypes}, restype {function.restype})")
+            function.argtypes = argument_types
+            function.restype = result_type
+
+    c_array, number_of_items = prepare(data)
+    pointer = function(c_array, number_of_items)
+    try:
+        return contents(pointer)
+    finally:
+        getattr(library, free_name)(pointer)
+
+# ========== Streaming results ==========
+_STREAM_TYPES = {
+    # Type: (chunk struct type, chunk contents function)
+    str: (_CStringArrayResult, _string_array_contents),
+    int: (_CIntArrayResult, _int_array_contents),
+    float: (_CFloatArrayResult, _float_array_contents),
+}
+
+_STREAM_END = object() # Queued once Go returns
+
+def stream_results(function, *args, output_type:type=str, callback=None, max_buffered_chunks:int=4):
+    """Calls a streaming Go export, handing each chunk of results to python as soon as Go produces it
+
+    Parameters
+    ----------
+    function : ctypes function
+        The Go export to call, must take (*args, callback, context) and send its results with a ResultStream (i.e. NewStringStream() in Go)
+
+    *args
+        The arguments to pass before the callback
+
+    output_type : type, optional
+        The type of the results, one of str, int or float, by default str
+
+    callback : Callable[[list], bool | None], optional
+        Called with each chunk (as a list) once Go has filled it, on the thread that called stream_results() (Go waits for it to
+        return before producing more), return False to cancel the stream, by default None (return an iterator)
+
+    max_buffered_chunks : int, optional
+        When iterating, the number of chunks Go can get ahead of the consumer before it blocks, by default 4
+
+    Notes
+    -----
+    - Go frees each chunk once the callback returns, the lists handed to python are copies so they are safe to keep
+    - Peak memory is about max_buffered_chunks chunks instead of the whole result, and the first results arrive straight away
+    - When iterating, the export runs on a background thread, and stopping early (break, or closing the iterator) cancels it
+      at its next chunk
+    - An exception raised by callback cancels the stream, and is raised again once Go returns
+
+    Raises
+    ------
+    ValueError:
+        If output_type is not supported
+
+    Returns
+    -------
+    Any | Iterator[list[str] | list[int] | list[float]]
+        With a callback, whatever the export returns (i.e. the number of items sent), otherwise an iterator over the chunks
+
+    Examples
+    --------
+    ```
+    lib = cdll.LoadLibrary("path/to/library.dll") # Load Library
+
+    # Go export built with NewStringStream(callback, context, 4096)
+    lib.find_matches.argtypes = [c_char_p, _ChunkCallback, c_void_p]
+
+    with open("matches.txt", "w") as output_file:
+        for chunk in stream_results(lib.find_matches, b"pattern"):
+            output_file.write("\n".join(chunk)) # Writes start before Go finishes scanning
+    ```
+    """
+    if output_type not in _STREAM_TYPES:
+        raise ValueError(f"Unsupported stream type {output_type}, supported types are {list(_STREAM_TYPES)}")
+    struct_type, contents = _STREAM_TYPES[output_type]
+    if callback is None:
+        return _iterate_stream(function, args, struct_type, contents, max(1, max_buffered_chunks))
+
+    errors = []
+    def on_chunk(chunk, _context) -> int:
+        try:
+            return 1 if callback(contents(_chunk_pointer(chunk, struct_type))) is False else 0
+        except BaseException as error: # Exceptions can't unwind through Go, so cancel and raise it once Go returns
+            errors.append(error)
+            return 1
+
+    result = function(*args, *_chunk_callback_arguments(on_chunk))
+    if errors:
+        raise errors[0]
+    return result
+
+def _iterate_stream(function, args:tuple, struct_type:type[Structure], contents, max_buffered_chunks:int):
+    """Runs a streaming Go export on a background thread, yielding the chunks it sends through a bounded queue"""
+    chunks = queue.Queue(max_buffered_chunks)
+    cancelled = threading.Event()
+
+    def put(item) -> bool:
+        """Waits for room in the queue (holding Go back), gives up and returns False once the consumer has stopped"""
+        while not cancelled.is_set():
+            try:
+                chunks.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def on_chunk(chunk, _context) -> int:
+        try:
+            return 0 if put(contents(_chunk_pointer(chunk, struct_type))) else 1
+        except BaseException as error:
+            put(error)
+            return 1
+
+    def produce():
+        try:
+            function(*args, *_chunk_callback_arguments(on_chunk))
+        except BaseException as error:
+            put(error)
+        put(_STREAM_END)
+
+    thread = threading.Thread(target=produce, name="stream_results", daemon=True)
+    thread.start()
+    try:
+        while (item := chunks.get()) is not _STREAM_END:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        cancelled.set() # Go stops at its next chunk
+        thread.join()
+
+# ========== Profiling ==========
+def _raise_go_error(pointer):
+    """Raises an error message returned by Go as a RuntimeError (freeing it), NULL means there was no error"""
+    if not pointer:
+        return
+    try:
+        message = _c_string_contents(pointer).decode(errors="replace")
+    finally:
+        _library().FreeCString(pointer)
+    raise RuntimeError(message)
+
+def start_cpu_profile(path:str):
+    """Starts writing a CPU profile of the Go code in the library to path (i.e. default.pgo for go build -pgo)
+
+    Raises
+    ------
+    RuntimeError:
+        If a profile is already running, or the file can't be created
+    """
+    _raise_go_error(_library().start_cpu_profile(os.fsencode(path)))
+
+def stop_cpu_profile():
+    """Stops the running CPU profile, and writes it to its file
+
+    Raises
+    ------
+    RuntimeError:
+        If no profile is running
+    """
+    _raise_go_error(_library().stop_cpu_profile())
+
+def write_profile(name:str, path:str):
+    """Writes a snapshot profile of the Go side of the library to a file, view it with `go tool pprof`
+
+    Parameters
+    ----------
+    name : str
+        The profile to write, "heap" (live memory), "allocs" (every allocation so far), "goroutine", "threadcreate",
+        "block" or "mutex", heap and allocs run a garbage collection first so they're up to date
+
+    path : str
+        The path to write the profile to
+
+    Raises
+    ------
+    RuntimeError:
+        If the profile doesn't exist, or the file can't be written
+    """
+    _raise_go_error(_library().write_profile(name.encode(), os.fsencode(path)))
+
+def start_trace(path:str):
+    """Starts writing an execution trace (runtime/trace) of the Go side of the library to a file, view it with `go tool trace`
+
+    Raises
+    ------
+    RuntimeError:
+        If a trace is already running, or the file can't be created
+    """
+    _raise_go_error(_library().start_trace(os.fsencode(path)))
+
+def stop_trace():
+    """Stops the running execution trace, and writes it to its file
+
+    Raises
+    ------
+    RuntimeError:
+        If no trace is running
+    """
+    _raise_go_error(_library().stop_trace())
+
+def capture_trace(path:str, seconds:float):
+    """Traces everything the library does for a time window, blocking until it's over, calls from other threads are traced
+
+    Parameters
+    ----------
+    path : str
+        The path to write the trace to
+
+    seconds : float
+        How long to trace for
+
+    Raises
+    ------
+    RuntimeError:
+        If a trace is already running, or the file can't be written
+    """
+    _raise_go_error(_library().capture_trace(os.fsencode(path), int(seconds * 1000)))
+
+@contextmanager
+def go_profile(directory:str, cpu:bool=True, trace:bool=False, profiles:tuple[str, ...]=("heap", "allocs", "goroutine")):
+    """Profiles the Go side of the library while the block runs, i.e. to see where one slow request spends its time
+
+    Parameters
+    ----------
+    directory : str
+        The folder to write the files to (created if needed), cpu.pprof, trace.out and <profile>.pprof for each snapshot
+
+    cpu : bool, optional
+        Whether to CPU profile the block, by default True
+
+    trace : bool, optional
+        Whether to write an execution trace of the block, by default False since traces are large
+
+    profiles : tuple[str, ...], optional
+        Snapshot profiles to write once the block finishes without an error (see write_profile()), by default ("heap", "allocs", "goroutine")
+
+    Notes
+    -----
+    - Profiles cover every thread using the library (Go has one profiler per process), so only one block can run at a time
+    - Only Go's side is profiled, use cProfile for the python side
+
+    Raises
+    ------
+    RuntimeError:
+        If a CPU profile or trace is already running, or a file can't be written
+
+    Yields
+    ------
+    dict[str, str]
+        The path of each file written ("cpu", "trace" and each profile name), they're complete once the block exits
+
+    Examples
+    --------
+    ```
+    with go_profile("profiles/slow_request", trace=True) as paths:
+        handle_request()
+    print(paths["cpu"]) # go tool pprof -top profiles/slow_request/cpu.pprof
+    ```
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {name: os.path.join(directory, f"{name}.pprof") for name in profiles}
+    with ExitStack() as stack: # Stops whatever was started, even if the block (or starting the trace) fails
+        if cpu:
+            paths["cpu"] = os.path.join(directory, "cpu.pprof")
+            start_cpu_profile(paths["cpu"])
+            stack.callback(stop_cpu_profile)
+        if trace:
+            paths["trace"] = os.path.join(directory, "trace.out")
+            start_trace(paths["trace"])
+            stack.callback(stop_trace)
+        yield paths
+    for name in profiles: # After the cpu profile stops, so the garbage collections they run aren't in it
+        write_profile(name, paths[name])
+
+# ========== Handles ==========
+def _release_handle(handle:int, library=None) -> bool:
+    """Releases a handle in Go (in library, by default this module's library), False if it was already released"""
+    return bool((_library() if library is None else library).release_handle(handle))
+
+class GoHandle:
+    """An opaque handle to data uploaded to Go once, pass it to exports in place of the data to skip re-sending it
+
+    Parameters
+    ----------
+    handle : int
+        The handle returned by Go (i.e. by upload_string_array() or NewHandle())
+
+    library : CDLL, optional
+        The library that created the handle, it's released (and sized) there, by default None which uses this module's library
+
+    Notes
+    -----
+    - Use it as a context manager, or call release(), to free the Go memory as soon as you're done with it
+    - Handles that are never released are released once the GoHandle is garbage collected
+    - Can be passed straight to ctypes/cffi functions that take a uintptr_t (or use int(handle))
+
+    Examples
+    --------
+    ```
+    with upload_string_array(reference_data) as reference:
+        for query in queries:
+            matches = string_array_result_to_list(lib.search(reference, prepare_string(query))) # Go never re-converts reference_data
+    ```
+    """
+    def __init__(self, handle:int, library=None):
+        self.handle = handle
+        self.library = library
+        self._finalizer = weakref.finalize(self, _release_handle, handle, library)
+
+    def release(self) -> bool:
+        """Releases the data in Go, returns False if it was already released (releasing twice is safe)"""
+        return bool(self._finalizer())
+
+    @property
+    def released(self) -> bool:
+        """If the handle has been released"""
+        return not self._finalizer.alive
+
+    @property
+    def nbytes(self) -> int:
+        """The approximate memory held in Go by this handle, 0 once it's released"""
+        return max((_library() if self.library is None else self.library).handle_size(self.handle), 0)
+
+    @property
+    def _as_parameter_(self) -> int:
+        return self.handle
+
+    def __index__(self) -> int:
+        return self.handle
+
+    def __int__(self) -> int:
+        return self.handle
+
+    def __enter__(self) -> "GoHandle":
+        return self
+
+    def __exit__(self, *_):
+        self.release()
+
+    def __repr__(self) -> str:
+        return f"GoHandle({self.handle}, {'released' if self.released else f'{self.nbytes} bytes'})"
+
+def upload_string_array(data:list[str|bytes]) -> GoHandle:
+    """Copies a string list into Go once, so later calls can pass the handle instead of re-sending (and re-converting) the strings
+
+    Parameters
+    ----------
+    data : list[str | bytes]
+        The strings to keep in Go
+
+    Returns
+    -------
+    GoHandle
+        The handle to the []string in Go, use HandleValue[[]string]() in Go to get it back
+    """
+    c_array, number_of_items = prepare_string_array(data)
+    return GoHandle(_library().upload_string_array(c_array, number_of_items))
+
+def upload_int_array(data:list[int]) -> GoHandle:
+    """Copies an int list into Go once, so later calls can pass the handle instead of re-sending the integers
+
+    Parameters
+    ----------
+    data : list[int]
+        The integers to keep in Go
+
+    Returns
+    -------
+    GoHandle
+        The handle to the []int32 in Go, use HandleValue[[]int32]() in Go to get it back
+    """
+    c_array, number_of_items = prepare_int_array(data)
+    return GoHandle(_library().upload_int_array(c_array, number_of_items))
+
+def upload_float_array(data:list[float]) -> GoHandle:
+    """Copies a float list into Go once, so later calls can pass the handle instead of re-sending the floats
+
+    Parameters
+    ----------
+    data : list[float]
+        The floats to keep in Go
+
+    Returns
+    -------
+    GoHandle
+        The handle to the []float32 in Go, use HandleValue[[]float32]() in Go to get it back
+    """
+    c_array, number_of_items = prepare_float_array(data)
+    return GoHandle(_library().upload_float_array(c_array, number_of_items))
+
+def handle_stats() -> dict[str, int]:
+    """Gets the number of live handles, the approximate memory they hold in Go, and the number of uploads/releases so far
+
+    Returns
+    -------
+    dict[str, int]
+        liveHandles, liveBytes, uploads and releases, if liveHandles keeps growing some handles are never released
+    """
+    return _read_struct(_library().handle_stats, _CHandleStats)
+
+# ========== Go functions ==========
+def _as_argument(value) -> tuple:
+    """Passes a value to C as is (ctypes/cffi convert it using the argument type)"""
+    return (value,)
+
+def _string_result(pointer) -> str:
+    """Copies a C string returned from Go into a python string, and frees it"""
+    if not pointer:
+        return ""
+    try:
+        return _c_string_contents(pointer).decode(errors="replace")
+    finally:
+        _library().FreeCString(pointer)
+
+_GO_ARGUMENT_TYPES = {
+    # Type hint: (function returning the C arguments, C argument types)
+    str: (lambda data: (prepare_string(data),), [c_char_p]),
+    bytes: (lambda data: (prepare_string(data),), [c_char_p]),
+    int: (_as_argument, [c_int]),
+    float: (_as_argument, [c_float]),
+    bool: (_as_argument, [c_int]),
+    GoHandle: (_as_argument, [c_size_t]),
+    list[str]: (_prepare_str_list, [POINTER(c_char_p), c_int]),
+    list[bytes]: (prepare_bytes_array, [POINTER(c_char_p), POINTER(c_longlong), c_int]),
+    list[int]: (_prepare_int_list, [POINTER(c_int), c_int]),
+    list[float]: (_prepare_float_list, [POINTER(c_float), c_int]),
+    list[bool]: (prepare_bool_array, [POINTER(c_ubyte), c_int]),
+    list[int|None]: (prepare_nullable_int_array, [POINTER(c_int), POINTER(c_ubyte), c_int]),
+    list[float|None]: (prepare_nullable_float_array, [POINTER(c_float), POINTER(c_ubyte), c_int]),
+    list[str|None]: (prepare_nullable_string_array, [POINTER(c_char_p), POINTER(c_ubyte), c_int]),
+}
+
+_GO_RESULT_TYPES = {
+    # Type hint: (C result type, result conversion function, None returns the C value as is)
+    type(None): (None, None),
+    str: (POINTER(c_char), _string_result), # Not c_char_p, which would copy to bytes and lose the pointer to free
+    int: (c_int, None),
+    float: (c_float, None),
+    bool: (c_int, bool),
+    GoHandle: (c_size_t, GoHandle), # go_function() binds it to the library the handle came from
+    list[str]: (POINTER(_CStringArrayResult), string_array_result_to_list),
+    list[memoryview]: (POINTER(_CBytesArrayResult), bytes_array_result_to_list),
+    list[int]: (POINTER(_CIntArrayResult), int_array_result_to_list),
+    list[float]: (POINTER(_CFloatArrayResult), float_array_result_to_list),
+    list[bool]: (POINTER(_CBoolArrayResult), bool_array_result_to_list),
+    list[int|None]: (POINTER(_CNullableIntArrayResult), nullable_int_array_result_to_list),
+    list[float|None]: (POINTER(_CNullableFloatArrayResult), nullable_float_array_result_to_list),
+    list[str|None]: (POINTER(_CNullableStringArrayResult), nullable_string_array_result_to_list),
+}
+
+def go_function(library=None, name:str="", cache:"GoCache|None"=None):
+    """Decorator that turns a type hinted python stub into a call to the Go export with the same name
+
+    The signature is read once, when the function is decorated, into a plan of which prepare_* function to run on each argument
+    and how to convert (and free) the result, so calls just run the plan
+
+    Parameters
+    ----------
+    library : CDLL, optional
+        The library with the export (i.e. from get_library()), by default None which uses this module's library
+
+    name : str, optional
+        The name of the Go export, by default "" which uses the function's name
+
+    cache : GoCache | None, optional
+        A cache to memoize the export's results in, only for pure exports (same input, same result), by default None
+
+    Notes
+    -----
+    - Supported arguments are str, bytes, int, float, bool, GoHandle, and lists of str, bytes, int, float, bool, int|None, float|None
+      and str|None, each list is passed as (array, number_of_elements) and nullable lists as (array, validity, number_of_elements)
+    - Supported results are None, str, int, float, bool, GoHandle, and list[...] for each *ArrayResult type (list[memoryview] for
+      BytesArrayResult), results are freed once they're converted
+    - GoHandle results are released in library, so it must export release_handle and handle_size (as lib.go does)
+    - int/float/bool are C.int/C.float/C.int, and list[str] only accepts str (use list[bytes] for binary data)
+    - The export is looked up (and its argtypes/restype setup with ctypes) on the first call, the stub's body is never run
+    - With the cffi backend the library's cdef must declare the export
+
+    Raises
+    ------
+    TypeError:
+        If a parameter or the result has no (or an unsupported) type hint, or a GoHandle result would be cached
+
+    Examples
+    --------
+    ```
+    lib = get_library("similarity.so", "lib.go", compile=True)
+
+    @go_function(lib)
+    def score(words: list[str], weights: list[float]) -> list[float]: # Go: score(cWords **C.char, numberOfWords C.int, cWeights *C.float, numberOfWeights C.int) *C.FloatArrayResult
+        ...
+
+    print(score(["Lorem", "ipsum"], [0.5, 2.0]))
+    ```
+    """
+    def decorator(function):
+        signature = inspect.signature(function)
+        hints = get_type_hints(function)
+        if "return" not in hints:
+            raise TypeError(f"{function.__name__}() needs a return type hint (-> None if the export returns nothing)")
+        plan = []
+        for parameter in [*signature.parameters, "return"]:
+            types = _GO_RESULT_TYPES if parameter == "return" else _GO_ARGUMENT_TYPES
+            if hints.get(parameter) not in types:
+                supported = ", ".join(getattr(hint, "__name__", None) if type(hint) == type else str(hint) for hint in types)
+                raise TypeError(f"{function.__name__}(): {parameter} has an unsupported type hint {hints.get(parameter)!r}, supported types are {supported}")
+            plan.append(types[hints[parameter]])
+        *arguments, (result_type, convert_result) = plan
+        if hints["return"] is GoHandle:
+            if cache is not None:
+                raise TypeError(f"{function.__name__}() returns a GoHandle, which can't be cached (it would be shared by every caller)")
+            convert_result = lambda handle: GoHandle(handle, library)
+        prepares = tuple(prepare for prepare, _ in arguments)
+        argument_types = [argument_type for _, types in arguments for argument_type in types]
+        export_name = name or function.__name__
+        number_of_arguments = len(prepares)
+        export = None
+
+        def bind():
+            nonlocal export
+            with _setup_lock: # Only the first call configures the export, other threads wait for it
+                if export is None:
+                    bound = getattr(_library() if library is None else library, export_name)
+                    if BACKEND == "ctypes":
+                        bound.argtypes = argument_types
+                        bound.restype = result_type
+                        if library is not None and hints["return"] is GoHandle:
+                            _setup_ctypes_handle_functions(library)
+                    export = bound
+            return export
+
+        @wraps(function)
+        def call(*args, **kwargs):
+            if kwargs or len(args) != number_of_arguments: # Keywords and defaults take the slow path
+                bound_arguments = signature.bind(*args, **kwargs)
+                bound_arguments.apply_defaults()
+                args = bound_arguments.args
+            c_arguments = []
+            for prepare, value in zip(prepares, args):
+                c_arguments += prepare(value) # Keeps the prepared arrays alive until the call returns
+            result = (export or bind())(*c_arguments)
+            return result if convert_result is None else convert_result(result)
+        return call if cache is None else cache(call)
+    return decorator
+
+# ========== Caching ==========
+# Every GoCache, so get_library() can clear them when a library is reloaded
+_caches = weakref.WeakSet()
+
+# Separates the positional arguments in a key from the keyword names and values, so neither is mistaken for the other
+_KEYWORDS = object()
+
+def _cache_key(value):
+    """A hashable copy of an argument's content, lists become tuples and handles their id in Go
+
+    Released handles raise a TypeError so the call skips the cache, a result cached while the handle was live must not be
+    served once its data is gone
+    """
+    if type(value) == list:
+        return tuple(value)
+    if type(value) in (bytearray, memoryview):
+        return bytes(value)
+    if type(value) == GoHandle:
+        if value.released:
+            raise TypeError("Released handles can't be cached")
+        return int(value) # Handles aren't reused, and the cache shouldn't keep the data alive
+    return value
+
+def _result_size(result) -> int:
+    """The approximate memory held by a cached result, or one part of a key
+
+    Lists from Go hold one type (and None), so items are sized from their lengths and one sample, sys.getsizeof() on every
+    item takes about as long as the Go call. Mixed lists (i.e. a tuple argument) are sized item by item instead
+    """
+    if type(result) not in (list, tuple):
+        return sys.getsizeof(result) + (result.nbytes if type(result) == memoryview else 0)
+    size = sys.getsizeof(result)
+    sample = next(filter(None, result), None)
+    try:
+        if type(sample) in (str, bytes):
+            return size + sum(map(len, filter(None, result))) + len(result) * sys.getsizeof(sample[:0])
+        if type(sample) == memoryview:
+            return size + sum(item.nbytes for item in result) + len(result) * sys.getsizeof(sample)
+    except (TypeError, AttributeError): # Not every item is like the sample
+        return size + sum(map(_result_size, result))
+    return size + len(result) * sys.getsizeof(sample)
+
+class GoCache:
+    """An opt-in memoization cache for pure Go exports (same input, same result), holding already converted python results
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        The approximate memory the cached results (and their keys) may use, least recently used entries are evicted to stay
+        under it, by default 64MB
+
+    ttl : float, optional
+        Seconds an entry stays valid for, by default 0 which keeps entries until they're evicted
+
+    max_entries : int, optional
+        The most entries to keep, by default 0 which means no limit
+
+    Notes
+    -----
+    - Keys are the function and the content of its arguments (lists are hashed as tuples), so equal inputs hit even if they're
+      different list objects, and arguments that can't be hashed (i.e. a list of bytearrays) skip the cache
+    - Lists are returned as copies, so callers can change them without changing the cache
+    - Safe to share between functions and threads, two threads missing on the same input at once both call Go
+    - Every cache is cleared by get_library() (see invalidate_caches())
+
+    Examples
+    --------
+    ```
+    cache = GoCache(max_bytes=16 * 1024 * 1024, ttl=300)
+
+    @go_function(lib, cache=cache)
+    def normalize(words: list[str]) -> list[str]: ...
+
+    normalize(["Café", "Lorem"]) # Calls Go
+    normalize(["Café", "Lorem"]) # Served from the cache
+    print(cache.stats()) # {'hits': 1, 'misses': 1, ...}
+    ```
+    """
+    def __init__(self, max_bytes:int=64 * 1024 * 1024, ttl:float=0, max_entries:int=0):
+        if max_bytes <= 0 or ttl < 0 or max_entries < 0:
+            raise ValueError(f"max_bytes must be above 0, and ttl/max_entries at least 0, got {max_bytes=}, {ttl=} and {max_entries=}")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # Key: (result, size, expiry time), least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(("hits", "misses", "evictions", "expirations", "uncacheable", "invalidations"), 0)
+        _caches.add(self)
+
+    def __call__(self, function):
+        """Memoizes function (i.e. a wrapper around a Go export) in this cache"""
+        @wraps(function)
+        def cached(*args, **kwargs):
+            try:
+                key = (function, *map(_cache_key, args))
+                if kwargs:
+                    names = sorted(kwargs)
+                    key = (*key, _KEYWORDS, *names, *(_cache_key(kwargs[name]) for name in names))
+                found, result = self._get(key)
+            except TypeError: # Unhashable arguments, or released handles
+                with self._lock:
+                    self._stats["uncacheable"] += 1
+                return function(*args, **kwargs)
+            if found:
+                return list(result) if type(result) == list else result
+            result = function(*args, **kwargs)
+            self._put(key, list(result) if type(result) == list else result)
+            return result
+        cached.cache = self
+        return cached
+
+    def _get(self, key) -> tuple[bool, object]:
+        """Looks up a key, returning (False, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and entry[2] <= time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return True, entry[0]
+
+    def _put(self, key, result):
+        """Stores a result, evicting the least recently used entries to stay under the limits"""
+        size = _result_size(result) + sum(map(_result_size, key))
+        if size > self.max_bytes:
+            return
+        expiry = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (result, size, expiry)
+            self._bytes += size
+            while self._bytes > self.max_bytes or (self.max_entries and len(self._entries) > self.max_entries):
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        """Drops an entry, the lock must be held"""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        """Drops every entry (the hit/miss counters are kept)"""
+        with self._lock:
+            if self._entries:
+                self._stats["invalidations"] += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Gets the cache's hits, misses, evictions (for space), expirations (for the ttl), uncacheable calls, invalidations
+        (clears that dropped entries), and the number of entries and approximate bytes they hold"""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._bytes, "maxBytes": self.max_bytes}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"GoCache(entries={len(self._entries)}, bytes={self._bytes}, max_bytes={self.max_bytes}, ttl={self.ttl})"
+
+def invalidate_caches():
+    """Clears every GoCache, get_library() calls it since a reloaded (or rebuilt) library may return different results"""
+    for cache in list(_caches):
+        cache.clear()
+
+# ========== Msgpack ==========
+# A compact, schema-less binary format for nested values (the msgpack spec without extension types), decoded by
+# MsgpackUnmarshal()/CMsgpackToValue() in lib.go straight into Go structs, maps and slices
+try:
+    import msgpack as _msgpack # Optional, its C extension is used instead of the pure python codec below when it's installed
+except ImportError:
+    _msgpack = None
+
+_pack_uint8 = struct.Struct(">BB").pack
+_pack_uint16 = struct.Struct(">BH").pack
+_pack_uint32 = struct.Struct(">BI").pack
+_pack_uint64 = struct.Struct(">BQ").pack
+_pack_int8 = struct.Struct(">Bb").pack
+_pack_int16 = struct.Struct(">Bh").pack
+_pack_int32 = struct.Struct(">Bi").pack
+_pack_int64 = struct.Struct(">Bq").pack
+_pack_float64 = struct.Struct(">Bd").pack
+
+def _msgpack_header(out:bytearray, length:int, fixed:int, fixed_max:int, code16:int, code32:int):
+    """Appends the header of a str, array or map with length items"""
+    if length <= fixed_max:
+        out.append(fixed | length)
+    elif length <= 0xffff:
+        out += _pack_uint16(code16, length)
+    elif length <= 0xffffffff:
+        out += _pack_uint32(code32, length)
+    else:
+        raise OverflowError(f"msgpack can't hold {length} items in one value")
+
+def _encode_int(value:int, out:bytearray):
+    if value >= 0:
+        if value <= 0x7f:
+            out.append(value)
+        elif value <= 0xff:
+            out += _pack_uint8(0xcc, value)
+        elif value <= 0xffff:
+            out += _pack_uint16(0xcd, value)
+        elif value <= 0xffffffff:
+            out += _pack_uint32(0xce, value)
+        elif value <= 0xffffffffffffffff:
+            out += _pack_uint64(0xcf, value)
+        else:
+            raise OverflowError(f"{value} is too big for msgpack (the most is 2**64-1)")
+    elif value >= -32:
+        out.append(value & 0xff) # Negative fixint
+    elif value >= -0x80:
+        out += _pack_int8(0xd0, value)
+    elif value >= -0x8000:
+        out += _pack_int16(0xd1, value)
+    elif value >= -0x80000000:
+        out += _pack_int32(0xd2, value)
+    elif value >= -0x8000000000000000:
+        out += _pack_int64(0xd3, value)
+    else:
+        raise OverflowError(f"{value} is too small for msgpack (the least is -2**63)")
+
+def _encode_bytes(value:bytes|bytearray|memoryview, out:bytearray):
+    length = value.nbytes if type(value) is memoryview else len(value)
+    if length <= 0xff:
+        out += _pack_uint8(0xc4, length)
+    elif length <= 0xffff:
+        out += _pack_uint16(0xc5, length)
+    elif length <= 0xffffffff:
+        out += _pack_uint32(0xc6, length)
+    else:
+        raise OverflowError(f"msgpack can't hold {length} bytes in one value")
+    out += value
+
+def _encode_msgpack(value, out:bytearray):
+    """Appends the encoding of value, exact types are checked first since they're by far the most common"""
+    kind = type(value)
+    if kind is str:
+        data = value.encode()
+        length = len(data)
+        if 31 < length <= 0xff:
+            out += _pack_uint8(0xd9, length)
+        else:
+            _msgpack_header(out, length, 0xa0, 31, 0xda, 0xdb)
+        out += data
+    elif kind is int:
+        _encode_int(value, out)
+    elif kind is float:
+        out += _pack_float64(0xcb, value)
+    elif value is None:
+        out.append(0xc0)
+    elif kind is bool:
+        out.append(0xc3 if value else 0xc2)
+    elif kind is dict:
+        _msgpack_header(out, len(value), 0x80, 15, 0xde, 0xdf)
+        for key, item in value.items():
+            _encode_msgpack(key, out)
+            _encode_msgpack(item, out)
+    elif kind is list or kind is tuple:
+        _msgpack_header(out, len(value), 0x90, 15, 0xdc, 0xdd)
+        for item in value:
+            _encode_msgpack(item, out)
+    elif kind is bytes or kind is bytearray or kind is memoryview:
+        _encode_bytes(value, out)
+    # Subclasses (i.e. an IntEnum or OrderedDict) are encoded as their base type
+    elif isinstance(value, bool):
+        out.append(0xc3 if value else 0xc2)
+    elif isinstance(value, str):
+        _encode_msgpack(str.__str__(value), out)
+    elif isinstance(value, int):
+        _encode_int(int(value), out)
+    elif isinstance(value, float):
+        out += _pack_float64(0xcb, value)
+    elif isinstance(value, dict):
+        _encode_msgpack(dict(value), out)
+    elif isinstance(value, (list, tuple)):
+        _encode_msgpack(list(value), out)
+    elif isinstance(value, (bytes, bytearray)):
+        _encode_bytes(bytes(value), out)
+    else:
+        raise TypeError(f"msgpack can't encode a {kind.__name__}")
+
+def encode_msgpack(value) -> bytes:
+    """Encodes a nested python value as msgpack, a compact binary format Go can decode straight into structs, maps and slices
+
+    Parameters
+    ----------
+    value : None | bool | int | float | str | bytes | list | tuple | dict
+        The value to encode, containers can be nested to any depth
+
+    Notes
+    -----
+    - str is encoded as a msgpack str, and bytes/bytearray/memoryview as bin (Go decodes those to []byte)
+    - Tuples are encoded as lists, and subclasses (i.e. an IntEnum) as their base type
+    - Floats are always 64 bit, so they come back exactly the same
+    - Uses the msgpack package's C extension if it's installed (`pip install msgpack`), otherwise a pure python encoder with the same output
+
+    Raises
+    ------
+    TypeError
+        If value holds a type msgpack can't encode (i.e. a set)
+
+    OverflowError
+        If an int doesn't fit in 64 bits (it has to be between -2**63 and 2**64-1)
+
+    Returns
+    -------
+    bytes
+        The encoded value
+
+    Examples
+    --------
+    ```
+    encode_msgpack({"name": "widget", "sizes": [1, 2.5]}) # b'\\x82\\xa4name\\xa6widget\\xa5sizes\\x92\\x01\\xcb@\\x04\\x00\\x00\\x00\\x00\\x00\\x00'
+    ```
+    """
+    if _msgpack is not None:
+        return _msgpack.packb(value, use_bin_type=True)
+    out = bytearray()
+    _encode_msgpack(value, out)
+    return bytes(out)
+
+_unpack_uint16 = struct.Struct(">H").unpack_from
+_unpack_uint32 = struct.Struct(">I").unpack_from
+_unpack_float32 = struct.Struct(">f").unpack_from
+_unpack_float64 = struct.Struct(">d").unpack_from
+
+# Fixed size values after their type byte: type byte: (struct unpacking the value, size)
+_MSGPACK_NUMBERS = {
+    0xca: (_unpack_float32, 4),
+    0xcb: (_unpack_float64, 8),
+    0xcc: (struct.Struct(">B").unpack_from, 1),
+    0xcd: (_unpack_uint16, 2),
+    0xce: (_unpack_uint32, 4),
+    0xcf: (struct.Struct(">Q").unpack_from, 8),
+    0xd0: (struct.Struct(">b").unpack_from, 1),
+    0xd1: (struct.Struct(">h").unpack_from, 2),
+    0xd2: (struct.Struct(">i").unpack_from, 4),
+    0xd3: (struct.Struct(">q").unpack_from, 8),
+}
+
+# Headers with an explicit length, type byte: (kind, size of the length)
+_MSGPACK_LENGTHS = {
+    0xc4: ("bin", 1), 0xc5: ("bin", 2), 0xc6: ("bin", 4),
+    0xd9: ("str", 1), 0xda: ("str", 2), 0xdb: ("str", 4),
+    0xdc: ("array", 2), 0xdd: ("array", 4),
+    0xde: ("map", 2), 0xdf: ("map", 4),
+}
+_MSGPACK_CONSTANTS = {0xc0: None, 0xc2: False, 0xc3: True}
+
+def _decode_msgpack(data:bytes, position:int) -> tuple:
+    """Decodes the value at position, returning it and the position just after it (the most common type bytes are checked first)"""
+    code = data[position]
+    position += 1
+    if code <= 0x7f:
+        return code, position
+    if code & 0xe0 == 0xa0:
+        kind, length = "str", code & 0x1f
+    elif code == 0xcb:
+        return _unpack_float64(data, position)[0], position + 8
+    elif code & 0xf0 == 0x80:
+        kind, length = "map", code & 0x0f
+    elif code & 0xf0 == 0x90:
+        kind, length = "array", code & 0x0f
+    elif code >= 0xe0:
+        return code - 0x100, position
+    elif code in _MSGPACK_CONSTANTS:
+        return _MSGPACK_CONSTANTS[code], position
+    elif code in _MSGPACK_NUMBERS:
+        unpack, size = _MSGPACK_NUMBERS[code]
+        return unpack(data, position)[0], position + size
+    elif code in _MSGPACK_LENGTHS:
+        kind, size = _MSGPACK_LENGTHS[code]
+        length = data[position] if size == 1 else (_unpack_uint16 if size == 2 else _unpack_uint32)(data, position)[0]
+        position += size
+    else:
+        raise ValueError(f"Unsupported msgpack type byte 0x{code:02x} at byte {position - 1}")
+
+    if kind == "str" or kind == "bin":
+        end = position + length
+        if end > len(data):
+            raise ValueError(f"msgpack data ends early, a {kind} of {length} bytes starts at byte {position}")
+        return (str(data[position:end], "utf-8") if kind == "str" else data[position:end]), end
+    if kind == "map":
+        items = {}
+        for _ in range(length):
+            key, position = _decode_msgpack(data, position)
+            items[key], position = _decode_msgpack(data, position)
+        return items, position
+    items = []
+    append = items.append
+    for _ in range(length):
+        item, position = _decode_msgpack(data, position)
+        append(item)
+    return items, position
+
+def _reject_extension(code:int, data:bytes):
+    raise ValueError(f"msgpack extension types aren't supported (got type {code})")
+
+def decode_msgpack(data:bytes|bytearray|memoryview) -> object:
+    """Decodes a msgpack value, i.e. one encoded by encode_msgpack() or by MsgpackMarshal() in Go
+
+    Parameters
+    ----------
+    data : bytes | bytearray | memoryview
+        The encoded value
+
+    Notes
+    -----
+    - str values come back as str, bin as bytes, arrays as lists and maps as dicts
+    - Uses the msgpack package's C extension if it's installed, otherwise a pure python decoder
+    - Go structs are encoded as maps, keyed by their msgpack tags (or field names)
+
+    Raises
+    ------
+    ValueError
+        If data isn't valid msgpack (i.e. it ends early, uses an extension type, has bytes left over, or is nested too deeply)
+
+    Returns
+    -------
+    object
+        The decoded value
+
+    Examples
+    --------
+    ```
+    decode_msgpack(encode_msgpack({"name": "widget", "sizes": [1, 2.5]})) # {'name': 'widget', 'sizes': [1, 2.5]}
+    ```
+    """
+    try:
+        if _msgpack is not None:
+            return _msgpack.unpackb(data, raw=False, strict_map_key=False, ext_hook=_reject_extension)
+        data = bytes(data) # Slicing bytes is faster than slicing a memoryview, so one copy up front pays for itself
+        value, position = _decode_msgpack(data, 0)
+    except (IndexError, struct.error) as error:
+        raise ValueError(f"msgpack data ends early ({len(data)} bytes)") from error
+    except UnicodeDecodeError as error:
+        raise ValueError(f"msgpack str isn't valid UTF-8: {error}") from error
+    except TypeError as error: # i.e. a list as a map key
+        raise ValueError(f"msgpack map key can't be used in a dict: {error}") from error
+    except RecursionError as error: # The pure python decoder recurses once per nested array/map
+        raise ValueError("msgpack value is nested too deeply") from error
+    if position != len(data):
+        raise ValueError(f"{len(data) - position} bytes left over after the msgpack value")
+    return value
+
+def prepare_msgpack(value) -> tuple[c_char_p, int]:
+    """Encodes a nested python value as msgpack, ready to pass to a Go function taking (unsafe.Pointer, C.int)
+
+    Parameters
+    ----------
+    value : None | bool | int | float | str | bytes | list | tuple | dict
+        The value to encode (see encode_msgpack())
+
+    Notes
+    -----
+    - In Go use CMsgpackToValue(cData, length, &out) to decode it straight into a struct, map or slice
+
+    Returns
+    -------
+    tuple[c_char_p, int]
+        The encoded bytes and their length
+
+    Examples
+    --------
+    ```
+    c_data, length = prepare_msgpack([{"name": "a", "scores": [1.5]}])
+
+    records = msgpack_result_to_object(lib.msgpack_records_roundtrip(c_data, length))
+    ```
+    """
+    encoded = encode_msgpack(value)
+    return prepare_string(encoded), len(encoded)
+
+def msgpack_result_to_object(pointer: _CBytesArrayResult) -> object:
+    """Decodes the msgpack value Go returned (with ValueToCMsgpack()) to python objects
+
+    Parameters
+    ----------
+    pointer : _CBytesArrayResult
+        The pointer returned from Go, a C.BytesArrayResult holding the encoded value as its only item
+
+    Notes
+    -----
+    - The value is decoded straight from Go's memory, which is freed once decoding is done
+    - The pointer is freed by this function, don't pass it to free_bytes_array_result()
+
+    Raises
+    ------
+    ValueError
+        If pointer is NULL (the Go function failed to decode or encode its value)
+
+    Returns
+    -------
+    object
+        The decoded value (see decode_msgpack())
+    """
+    if not pointer:
+        raise ValueError("Go failed to decode or encode the msgpack value")
+    return decode_msgpack(bytes_array_result_to_list(pointer)[0])
+
+# ========== Debugging Functions ==========
+
+def return_string(text: str | bytes) -> str:
+    """Debugging function that shows you the Go representation of a C string and returns the python string version
+
+    Parameters
+    ----------
+    text : str | bytes
+        The text to get the representation of
+
+    Returns
+    -------
+    str
+        The returned string
+    """
+    c_input = prepare_string(text)
+    result = _library().return_string(c_input)
+
+    if not result:
+        return ""
+
+    try:
+        return _c_string_contents(result).decode(errors="replace")
+    finally:
+        _library().FreeCString(result)
+
+def return_string_array(c_array:CStringArray, number_of_elements:int) ->list[str]:
+    """Debugging function that shows you the Go representation of a C array and returns the python list version
+
+    Parameters
+    ----------
+    c_array : Array[c_char_p]
+        The array to print and convert
+    number_of_elements : int
+        The number of elements in the array
+
+    Notes
+    -----
+    - DOES NOT FREE INPUT ARRAY
+    - This function returns the PYTHON list version, do not reassign input variable or it'll never free (i.e. c_array = return_string_array(c_array, number_of_elements))
+
+    Returns
+    -------
+    list[str]
+        The python string representation of the array
+        
+    Examples
+    --------
+    ```
+    data = [
+        random.choice(["Lorem", "ipsum", "dolor", "sit", "amet"]) 
+        for _ in range(100)
+    ]
+    
+    c_array, number_of_elements = prepare_string_array(data)
+    
+    result:list[str] = return_string_array(c_array, number_of_elements)
+    
+    lib.free_string_array_result(c_array, number_of_elements)
+    ```
+    """
+    pointer = _library().return_string_array(c_array, number_of_elements)
+
+    return string_array_result_to_list(pointer)
+
+def return_int_array(c_array: CIntArray, number_of_elements: int) -> list[int]:
+    """Debugging function that shows you the Go representation of a C int array and returns a Python list
+
+    Notes
+    -----
+    - DOES NOT FREE INPUT ARRAY
+    - Frees input array ONLY on exception
+    - Returns the PYTHON list version, do not reassign input variable
+
+    Returns
+    -------
+    list[int]
+    """
+    pointer = _library().return_int_array(c_array, number_of_elements)
+    try:
+        return _int_array_contents(pointer)
+    except Exception as e:
+        print(f"return_int_array(): Ran into error, freeing memory. Error: {e}")
+        _library().free_int_array_result(c_array)  # In case you define a similar freeing function for input
+        raise e
+    finally:
+        _library().free_int_array_result(pointer)
+
+def return_float_array(c_array: CFloatArray, number_of_elements: int) -> list[float]:
+    """Debugging function that shows you the Go representation of a C float array and returns a Python list
+
+    Notes
+    -----
+    - DOES NOT FREE INPUT ARRAY ON SUCCESS
+    - Frees input array ONLY on exception
+    - Returns the PYTHON list version, do not reassign input variable
+    - The data is only accurate up to ~4 decimals (i.e. if value is -790.5207366698761 you might get -790.520751953125)
+
+    Returns
+    -------
+    list[float]
+    """
+    pointer = _library().return_float_array(c_array, number_of_elements)
+    try:
+        return _float_array_contents(pointer)
+    except Exception as e:
+        print(f"return_float_array(): Ran into error, freeing memory. Error: {e}")
+        _library().free_float_array_result(c_array)  # In case you define a similar freeing function for input
+        raise e
+    finally:
+        _library().free_float_array_result(pointer)
+
+def return_int64_array(c_array: CInt64Array, number_of_elements: int) -> list[int]:
+    """Debugging function that shows you the Go representation of a C int64 array and returns a Python list
+
+    Notes
+    -----
+    - DOES NOT FREE INPUT ARRAY
+
+    Returns
+    -------
+    list[int]
+    """
+    return int64_array_result_to_list(_library().return_int64_array(c_array, number_of_elements))
+
+def return_double_array(c_array: CDoubleArray, number_of_elements: int) -> list[float]:
+    """Debugging function that shows you the Go representation of a C double array and returns a Python list
+
+    Notes
+    -----
+    - DOES NOT FREE INPUT ARRAY
+
+    Returns
+    -------
+    list[float]
+    """
+    return double_array_result_to_list(_library().return_double_array(c_array, number_of_elements))
+
+def _handle_result(pointer, convert_result):
+    """Converts the result of a return_handle_* export, which is NULL when the handle is released"""
+    if not pointer:
+        raise ValueError("Invalid or released handle")
+    return convert_result(pointer)
+
+def return_handle_string_array(handle:GoHandle|int) -> list[str]:
+    """Debugging function that downloads the strings behind a handle from upload_string_array()
+
+    Raises
+    ------
+    ValueError:
+        If the handle is released, or isn't a string array
+
+    Returns
+    -------
+    list[str]
+    """
+    return _handle_result(_library().return_handle_string_array(int(handle)), string_array_result_to_list)
+
+def return_handle_int_array(handle:GoHandle|int) -> list[int]:
+    """Debugging function that downloads the integers behind a handle from upload_int_array()
+
+    Raises
+    ------
+    ValueError:
+        If the handle is released, or isn't an int array
+
+    Returns
+    -------
+    list[int]
+    """
+    return _handle_result(_library().return_handle_int_array(int(handle)), int_array_result_to_list)
+
+def return_handle_float_array(handle:GoHandle|int) -> list[float]:
+    """Debugging function that downloads the floats behind a handle from upload_float_array()
+
+    Raises
+    ------
+    ValueError:
+        If the handle is released, or isn't a float array
+
+    Returns
+    -------
+    list[float]
+    """
+    return _handle_result(_library().return_handle_float_array(int(handle)), float_array_result_to_list)
+
+def handle_string_lengths(handle:GoHandle|int) -> list[int]:
+    """Debugging function that gets the byte length of every string behind a handle, like return_string_lengths() without re-sending the strings
+
+    Raises
+    ------
+    ValueError:
+        If the handle is released, or isn't a string array
+
+    Returns
+    -------
+    list[int]
+    """
+    return _handle_result(_library().handle_string_lengths(int(handle)), int_array_result_to_list)
+
+def stream_string_array(data:list[str|bytes], chunk_size:int=1024, callback=None, max_buffered_chunks:int=4):
+    """Debugging function that streams a string array back from Go in chunks, useful to check streaming works
+
+    Parameters
+    ----------
+    data : list[str | bytes]
+        The strings to send
 
-    if not result:
-        return ""
+    chunk_size : int, optional
+        The number of strings per chunk, by default 1024
 
-    copied_bytes = string_at(result)
-    decoded = copied_bytes.decode(errors="replace")
+    callback : Callable[[list[str]], bool | None], optional
+        Called with each chunk, return False to stop early, by default None (return an iterator)
 
-    return decoded
+    max_buffered_chunks : int, optional
+        When iterating, the number of chunks Go can get ahead of the consumer, by default 4
 
-def return_string_array(c_array:CStringArray, number_of_elements:int) ->list[str]:
-    """Debugging function that shows you the Go representation of a C array and returns the python list version
+    Returns
+    -------
+    int | Iterator[list[str]]
+        With a callback the number of strings Go sent, otherwise an iterator over the chunks (see stream_results())
+    """
+    c_array, number_of_items = prepare_string_array(data)
+    return stream_results(_library().stream_string_array, c_array, number_of_items, chunk_size, output_type=str, callback=callback, max_buffered_chunks=max_buffered_chunks)
+
+def stream_int_array(data:list[int], chunk_size:int=1024, callback=None, max_buffered_chunks:int=4):
+    """Debugging function that streams an int array back from Go in chunks, useful to check streaming works
 
     Parameters
     ----------
-    c_array : Array[c_char_p]
-        The array to print and convert
-    number_of_elements : int
-        The number of elements in the array
+    data : list[int]
+        The integers to send
+
+    chunk_size : int, optional
+        The number of integers per chunk, by default 1024
+
+    callback : Callable[[list[int]], bool | None], optional
+        Called with each chunk, return False to stop early, by default None (return an iterator)
+
+    max_buffered_chunks : int, optional
+        When iterating, the number of chunks Go can get ahead of the consumer, by default 4
+
+    Returns
+    -------
+    int | Iterator[list[int]]
+        With a callback the number of integers Go sent, otherwise an iterator over the chunks (see stream_results())
+    """
+    c_array, number_of_items = prepare_int_array(data)
+    return stream_results(_library().stream_int_array, c_array, number_of_items, chunk_size, output_type=int, callback=callback, max_buffered_chunks=max_buffered_chunks)
+
+def return_bool_array(c_array: CBoolArray, number_of_elements: int) -> list[bool]:
+    """Debugging function that shows you the Go representation of a bit-packed C bool array and returns a Python list
 
     Notes
     -----
     - DOES NOT FREE INPUT ARRAY
-    - This function returns the PYTHON list version, do not reassign input variable or it'll never free (i.e. c_array = return_string_array(c_array, number_of_elements))
 
     Returns
     -------
-    list[str]
-        The python string representation of the array
-        
-    Examples
-    --------
-    ```
-    data = [
-        random.choice(["Lorem", "ipsum", "dolor", "sit", "amet"]) 
-        for _ in range(100)
-    ]
-    
-    c_array, number_of_elements = prepare_string_array(data)
-    
-    result:list[str] = return_string_array(c_array, number_of_elements)
-    
-    lib.free_string_array_result(c_array, number_of_elements)
-    ```
+    list[bool]
     """
-    pointer = lib.return_string_array(c_array, number_of_elements)
+    return bool_array_result_to_list(_library().return_bool_array(c_array, number_of_elements))
 
-    result_data = pointer.contents
-    results = []
-    for i in range(result_data.numberOfElements):
-        results.append(result_data.data[i].decode(errors='replace'))
-    return results
+def return_uint8_array(c_array: CUint8Array, number_of_elements: int) -> list[int]:
+    """Debugging function that shows you the Go representation of a C uint8 array and returns a Python list
 
-def return_int_array(c_array: CIntArray, number_of_elements: int) -> list[int]:
-    """Debugging function that shows you the Go representation of a C int array and returns a Python list
+    Notes
+    -----
+    - DOES NOT FREE INPUT ARRAY
+
+    Returns
+    -------
+    list[int]
+    """
+    return uint8_array_result_to_list(_library().return_uint8_array(c_array, number_of_elements))
+
+def return_int8_array(c_array: CInt8Array, number_of_elements: int) -> list[int]:
+    """Debugging function that shows you the Go representation of a C int8 array and returns a Python list
 
     Notes
     -----
     - DOES NOT FREE INPUT ARRAY
-    - Frees input array ONLY on exception
-    - Returns the PYTHON list version, do not reassign input variable
 
     Returns
     -------
     list[int]
     """
-    pointer = lib.return_int_array(c_array, number_of_elements)
-    try:
-        result_data = pointer.contents
-        return [result_data.data[i] for i in range(result_data.numberOfElements)]
-    except Exception as e:
-        print(f"return_int_array(): Ran into error, freeing memory. Error: {e}")
-        lib.free_int_array_result(c_array)  # In case you define a similar freeing function for input
-        raise e
-    finally:
-        lib.free_int_array_result(pointer)
+    return int8_array_result_to_list(_library().return_int8_array(c_array, number_of_elements))
 
-def return_float_array(c_array: CFloatArray, number_of_elements: int) -> list[float]:
-    """Debugging function that shows you the Go representation of a C float array and returns a Python list
+def return_int16_array(c_array: CInt16Array, number_of_elements: int) -> list[int]:
+    """Debugging function that shows you the Go representation of a C int16 array and returns a Python list
 
     Notes
     -----
-    - DOES NOT FREE INPUT ARRAY ON SUCCESS
-    - Frees input array ONLY on exception
-    - Returns the PYTHON list version, do not reassign input variable
-    - The data is only accurate up to ~4 decimals (i.e. if value is -790.5207366698761 you might get -790.520751953125)
+    - DOES NOT FREE INPUT ARRAY
 
     Returns
     -------
-    list[float]
+    list[int]
+    """
+    return int16_array_result_to_list(_library().return_int16_array(c_array, number_of_elements))
+
+def return_nullable_int_array(c_array: CIntArray, validity: CValidityArray|None, number_of_elements: int) -> list[int|None]:
+    """Debugging function that shows you the Go representation of a nullable C int array and returns a Python list
+
+    Notes
+    -----
+    - DOES NOT FREE INPUT ARRAY
+
+    Returns
+    -------
+    list[int | None]
+    """
+    return nullable_int_array_result_to_list(_library().return_nullable_int_array(c_array, validity, number_of_elements))
+
+def return_nullable_float_array(c_array: CFloatArray, validity: CValidityArray|None, number_of_elements: int) -> list[float|None]:
+    """Debugging function that shows you the Go representation of a nullable C float array and returns a Python list
+
+    Notes
+    -----
+    - DOES NOT FREE INPUT ARRAY
+
+    Returns
+    -------
+    list[float | None]
+    """
+    return nullable_float_array_result_to_list(_library().return_nullable_float_array(c_array, validity, number_of_elements))
+
+def return_nullable_string_array(c_array: CStringArray, validity: CValidityArray|None, number_of_elements: int) -> list[str|None]:
+    """Debugging function that shows you the Go representation of a nullable C string array and returns a Python list
+
+    Notes
+    -----
+    - DOES NOT FREE INPUT ARRAY
+
+    Returns
+    -------
+    list[str | None]
+    """
+    return nullable_string_array_result_to_list(_library().return_nullable_string_array(c_array, validity, number_of_elements))
+
+def return_string_lengths(data:list[str|bytes]) -> list[int]:
+    """Debugging function that gets the byte length of every string in one batched call, useful to check batching works
+
+    Parameters
+    ----------
+    data : list[str | bytes]
+        The strings to get the length of
+
+    Returns
+    -------
+    list[int]
+        The length (in bytes once encoded) of each string
+    """
+    return batch_call(_library().return_string_lengths, data, str, int)
+
+def return_bytes_array(data:list[bytes|bytearray|memoryview]) -> list[memoryview]:
+    """Debugging function that sends binary blobs through Go and back, useful to check binary data survives untouched
+
+    Parameters
+    ----------
+    data : list[bytes | bytearray | memoryview]
+        The binary data to send
+
+    Returns
+    -------
+    list[memoryview]
+        Views over Go's copy of each item (see bytes_array_result_to_list())
+    """
+    c_array, lengths, number_of_items = prepare_bytes_array(data)
+    return bytes_array_result_to_list(_library().return_bytes_array(c_array, lengths, number_of_items))
+
+def msgpack_roundtrip(value) -> object:
+    """Debugging function that sends a nested value through Go as msgpack and back, useful to check the wire format
+
+    Parameters
+    ----------
+    value : None | bool | int | float | str | bytes | list | tuple | dict
+        The value to send (see encode_msgpack())
+
+    Returns
+    -------
+    object
+        The value as Go decoded and re-encoded it (tuples come back as lists)
+    """
+    c_data, length = prepare_msgpack(value)
+    return msgpack_result_to_object(_library().msgpack_roundtrip(c_data, length))
+
+def msgpack_records_roundtrip(records:list[dict]) -> list[dict]:
+    """Debugging function that decodes records into Go structs and back, an example of decoding msgpack into typed values
+
+    Parameters
+    ----------
+    records : list[dict]
+        Records with "name" (str), "scores" (list[float]), "tags" (dict[str, int]) and "children" (list of records) keys
+
+    Notes
+    -----
+    - Every key comes back (missing ones as None), and unknown keys are dropped, since Go returns its struct's fields
+
+    Raises
+    ------
+    ValueError
+        If a record doesn't fit the Go struct (i.e. a str score)
+
+    Returns
+    -------
+    list[dict]
+        The records as Go decoded and re-encoded them
+    """
+    c_data, length = prepare_msgpack(records)
+    return msgpack_result_to_object(_library().msgpack_records_roundtrip(c_data, length))
+
+def json_roundtrip(value) -> object:
+    """Debugging function that sends a nested value through Go as JSON and back, the baseline msgpack_roundtrip() is compared to
+
+    Parameters
+    ----------
+    value : None | bool | int | float | str | list | dict
+        The value to send, it has to be JSON serializable
+
+    Returns
+    -------
+    object
+        The value as Go decoded and re-encoded it (Go decodes every JSON number as a float64)
     """
-    pointer = lib.return_float_array(c_array, number_of_elements)
+    result = _library().json_roundtrip(prepare_string(json.dumps(value)))
+    if not result:
+        raise ValueError("Go failed to decode the JSON value")
     try:
-        result_data = pointer.contents
-        return [result_data.data[i] for i in range(result_data.numberOfElements)]
-    except Exception as e:
-        print(f"return_float_array(): Ran into error, freeing memory. Error: {e}")
-        lib.free_float_array_result(c_array)  # In case you define a similar freeing function for input
-        raise e
+        return json.loads(_c_string_contents(result))
     finally:
-        lib.free_float_array_result(pointer)
+        _library().FreeCString(result)
 
 def print_string(text: str | bytes):
     """Prints a string's go representation, useful to look for encoding issues
@@ -496,7 +3338,7 @@ def print_string(text: str | bytes):
         The data you want to see the go representation of
     """
     c_input = prepare_string(text)
-    lib.print_string(c_input)
+    _library().print_string(c_input)
 
 def print_string_array(data:list[str|bytes]):
     """Prints a string array's go representation, useful to look for encoding issues
@@ -512,7 +3354,7 @@ def print_string_array(data:list[str|bytes]):
     """
     c_array, number_of_items = prepare_string_array(data)
 
-    lib.print_string_array(c_array, number_of_items)
+    _library().print_string_array(c_array, number_of_items)
 
 def print_int_array(data:list[int]):
     """Prints a int array's go representation, useful to look for rounding/conversion issues
@@ -528,7 +3370,7 @@ def print_int_array(data:list[int]):
     """
     c_array, number_of_items = prepare_int_array(data)
 
-    lib.print_int_array(c_array, number_of_items)
+    _library().print_int_array(c_array, number_of_items)
 
 def print_float_array(data:list[float]):
     """Prints a float array's go representation, useful to look for rounding/conversion issues
@@ -543,33 +3385,327 @@ def print_float_array(data:list[float]):
         The data you want to see the go representation of
     """
     c_array, number_of_items = prepare_float_array(data)
-    lib.print_float_array(c_array, number_of_items)
+    _library().print_float_array(c_array, number_of_items)
+
+# ========== Buffer Pool ==========
+def enable_buffer_pool(enabled:bool=True, max_retained_bytes:int=256 * 1024 * 1024):
+    """Turns Go's pooled allocator for returned buffers on or off
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        If buffers freed with the free_* functions should be kept and reused by Go, by default True
+
+    max_retained_bytes : int, optional
+        The most memory the pool will hold on to, anything freed past this goes back to libc, by default 256MB
+
+    Notes
+    -----
+    - The pool is off by default, turning it off releases everything it retained
+    - Buffers are grouped into power of two size classes, so steady traffic of similar sizes reuses the same memory instead of churning the heap
+
+    Examples
+    --------
+    ```
+    enable_buffer_pool(max_retained_bytes=64 * 1024 * 1024)
+
+    for batch in batches:
+        c_array, number_of_items = prepare_int_array(batch)
+        result = int_array_result_to_list(lib.return_int_array(c_array, number_of_items)) # Freed back into the pool
+
+    print(buffer_pool_stats()) # {'hits': ..., 'misses': ..., 'retainedBytes': ..., ...}
+    ```
+    """
+    _library().enable_buffer_pool(1 if enabled else 0, max_retained_bytes)
+
+def trim_buffer_pool() -> int:
+    """Releases every buffer retained by the pool back to libc
+
+    Returns
+    -------
+    int
+        The number of bytes released
+    """
+    return _library().trim_buffer_pool()
+
+def buffer_pool_stats() -> dict[str, int]:
+    """Gets the buffer pool's statistics
+
+    Returns
+    -------
+    dict[str, int]
+        The number of allocations served from the pool (hits), allocations that went to libc while pooling was on (misses),
+        and the bytes/buffers currently retained along with the retained bytes limit
+    """
+    return _read_struct(_library().buffer_pool_stats, _CBufferPoolStats)
+
+# ========== Go Runtime ==========
+def go_memory_stats() -> dict[str, int|float]:
+    """Gets a snapshot of the Go runtime's memory and garbage collection statistics
+
+    Returns
+    -------
+    dict[str, int|float]
+        Go's heapAlloc, heapInuse, heapObjects, sys, mallocs, frees, numGC, totalAlloc, heapSys, heapIdle, heapReleased,
+        nextGC, lastGC (unix nanoseconds), numForcedGC, pauseTotalNs and gcCPUFraction (see runtime.MemStats), lastPauseNs/maxPauseNs
+        which are the latest and longest GC pauses out of the last 256, plus liveCBuffers/liveCBytes which count the memory Go
+        has handed to C (i.e. result arrays) that has not been freed yet
+
+    Notes
+    -----
+    - Reading the stats briefly stops Go's world, so sample it instead of calling it in hot loops
+    - liveCBuffers should return to the same value once every result has been freed, if it keeps growing something is leaking
+    """
+    return _read_struct(_library().go_memory_stats, _CGoMemoryStats)
+
+# Go's memory limit when none is set (math.MaxInt64)
+NO_MEMORY_LIMIT = 2**63 - 1
+
+def set_gomaxprocs(procs:int=0) -> int:
+    """Sets the number of threads that can run Go code at once (GOMAXPROCS), Go uses every core on the machine by default
+
+    Parameters
+    ----------
+    procs : int, optional
+        The new value, by default 0 which leaves it unchanged (to read it)
+
+    Returns
+    -------
+    int
+        The previous value
+    """
+    return _library().set_gomaxprocs(procs)
+
+def set_gc_percent(percent:int) -> int:
+    """Sets Go's garbage collection target percentage (GOGC, 100 by default), higher values collect less often but use more memory
+
+    Parameters
+    ----------
+    percent : int
+        The new value, negative turns the GC off so only the memory limit (see set_memory_limit()) triggers collections
+
+    Returns
+    -------
+    int
+        The previous value
+    """
+    return _library().set_gc_percent(percent)
+
+def set_memory_limit(limit:int=-1) -> int:
+    """Sets Go's soft memory limit (GOMEMLIMIT), Go collects more often as its memory gets close to it instead of overshooting
+
+    Parameters
+    ----------
+    limit : int, optional
+        The new limit in bytes (NO_MEMORY_LIMIT removes it), by default -1 which leaves it unchanged (to read it)
+
+    Notes
+    -----
+    - The limit only covers Go's own memory, not python's or the results handed to C (see liveCBytes in go_memory_stats())
+
+    Returns
+    -------
+    int
+        The previous limit in bytes
+    """
+    return _library().set_memory_limit(limit)
+
+def _read_cgroup_file(folders:list[str], name:str) -> list[str]|None:
+    """Reads the whitespace separated values in the first of folders that has a cgroup file, None if none of them do"""
+    for folder in folders:
+        try:
+            with open(os.path.join(folder, name)) as file:
+                return file.read().split()
+        except OSError:
+            continue
+    return None
+
+def _cgroup_paths(proc_file:str="/proc/self/cgroup") -> dict[str, str]:
+    """Maps each cgroup controller (\"\" for cgroup v2) to the group this process is in"""
+    try:
+        with open(proc_file) as file:
+            lines = file.read().splitlines()
+    except OSError:
+        return {}
+    paths = {}
+    for line in lines:
+        fields = line.split(":", 2)
+        if len(fields) != 3: # Blank or malformed lines
+            continue
+        _, controllers, path = fields
+        for controller in controllers.split(","):
+            paths[controller] = path.lstrip("/")
+    return paths
+
+def container_limits(root:str="/sys/fs/cgroup", proc_file:str="/proc/self/cgroup") -> dict[str, float|int|None]:
+    """Reads the CPU and memory limits of the container (cgroup v1 or v2) this process runs in
+
+    Parameters
+    ----------
+    root : str, optional
+        Where the cgroup filesystem is mounted, by default "/sys/fs/cgroup"
+
+    proc_file : str, optional
+        The file listing the groups this process is in, by default "/proc/self/cgroup"
+
+    Returns
+    -------
+    dict[str, float|int|None]
+        cpus: The CPU quota in cores (i.e. 1.5), None if there isn't one
+        memory: The memory limit in bytes, None if there isn't one
+    """
+    paths = _cgroup_paths(proc_file)
+    def folders(*controller:str) -> list[str]: # The process' own group first, then the mount's root (inside most containers)
+        folder = os.path.join(root, *controller)
+        path = paths.get(controller[0] if controller else "", "")
+        return [os.path.join(folder, path), folder] if path else [folder]
+
+    cpus = memory = None
+    cpu_max = _read_cgroup_file(folders(), "cpu.max")
+    memory_max = _read_cgroup_file(folders(), "memory.max")
+    if cpu_max is not None or memory_max is not None: # cgroup v2, no limit is "max"
+        if cpu_max and cpu_max[0] != "max":
+            cpus = int(cpu_max[0]) / int(cpu_max[1])
+        if memory_max and memory_max[0] != "max":
+            memory = int(memory_max[0])
+        return {"cpus": cpus, "memory": memory}
+
+    # cgroup v1, no quota is -1 and no memory limit is a huge (page rounded) number
+    quota = _read_cgroup_file(folders("cpu"), "cpu.cfs_quota_us")
+    period = _read_cgroup_file(folders("cpu"), "cpu.cfs_period_us")
+    if quota and period and int(quota[0]) > 0:
+        cpus = int(quota[0]) / int(period[0])
+    limit = _read_cgroup_file(folders("memory"), "memory.limit_in_bytes")
+    if limit and int(limit[0]) < 2**60:
+        memory = int(limit[0])
+    return {"cpus": cpus, "memory": memory}
+
+def tune_go_runtime(memory_fraction:float=0.5, cpu_fraction:float=1.0, root:str="/sys/fs/cgroup", proc_file:str="/proc/self/cgroup") -> dict[str, int|None]:
+    """Fits Go's runtime to the container this process runs in, so Go's GC doesn't overshoot the memory limit or fight python for cores
+
+    Parameters
+    ----------
+    memory_fraction : float, optional
+        The share of the container's memory limit Go's soft memory limit is set to (the rest is left for python), by default 0.5
+
+    cpu_fraction : float, optional
+        The share of the available cores (the CPU quota or the cores this process may run on) GOMAXPROCS is set to, by default 1.0
+
+    root : str, optional
+        Where the cgroup filesystem is mounted, by default "/sys/fs/cgroup"
+
+    proc_file : str, optional
+        The file listing the groups this process is in, by default "/proc/self/cgroup"
+
+    Notes
+    -----
+    - Without a memory limit Go's memory limit is left as is, GOMAXPROCS is always at least 1
+    - Call it once at startup, before the library does any real work
+
+    Raises
+    ------
+    ValueError:
+        If a fraction isn't above 0 and at most 1
+
+    Returns
+    -------
+    dict[str, int|None]
+        The gomaxprocs and memoryLimit that were set (memoryLimit is None if it was left as is)
+
+    Examples
+    --------
+    ```
+    tune_go_runtime(memory_fraction=0.3) # i.e. {'gomaxprocs': 2, 'memoryLimit': 644245094} in a 2 core, 2GiB container
+    ```
+    """
+    if not (0 < memory_fraction <= 1 and 0 < cpu_fraction <= 1):
+        raise ValueError(f"Fractions must be above 0 and at most 1, got memory_fraction={memory_fraction} and cpu_fraction={cpu_fraction}")
+    limits = container_limits(root, proc_file)
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    if limits["cpus"] is not None:
+        cpus = min(cpus, math.ceil(limits["cpus"]))
+    procs = max(1, int(cpus * cpu_fraction))
+    set_gomaxprocs(procs)
+
+    memory_limit = None
+    if limits["memory"] is not None:
+        memory_limit = int(limits["memory"] * memory_fraction)
+        set_memory_limit(memory_limit)
+    return {"gomaxprocs": procs, "memoryLimit": memory_limit}
 
 # ========== Free Functions ==========
 def free_c_string(ptr: c_char_p):
-    """Frees a single C string returned from Go (allocated via C.CString)."""
-    lib.FreeCString(ptr)
+    """Frees a single C string returned from Go (allocated via StringToCString() or C.CString)."""
+    _library().FreeCString(ptr)
 
 def free_string_array(ptr: CStringArray, count: int):
     """Frees an array of C strings returned from Go."""
-    lib.FreeStringArray(ptr, count)
+    _library().FreeStringArray(ptr, count)
 
 def free_int_array(ptr: CIntArray):
     """Frees a C int array returned from Go."""
-    lib.FreeIntArray(ptr)
+    _library().FreeIntArray(ptr)
     
 def free_float_array(ptr: CFloatArray):
     """Frees a C float array returned from Go."""
-    lib.FreeFloatArray(ptr)
+    _library().FreeFloatArray(ptr)
 
 def free_string_array_result(ptr: _CStringArrayResult):
     """Frees a StringArrayResult (including the array of strings and struct itself)."""
-    lib.free_string_array_result(ptr)
+    _library().free_string_array_result(ptr)
 
 def free_int_array_result(ptr: _CIntArrayResult):
     """Frees an IntArrayResult (including the array and the struct itself)."""
-    lib.free_int_array_result(ptr)
+    _library().free_int_array_result(ptr)
 
 def free_float_array_result(ptr: _CFloatArrayResult):
     """Frees a FloatArrayResult (including the array and the struct itself)."""
-    lib.free_float_array_result(ptr)
+    _library().free_float_array_result(ptr)
+
+def free_int64_array(ptr: CInt64Array):
+    """Frees a C int64 array returned from Go."""
+    _library().FreeInt64Array(ptr)
+
+def free_double_array(ptr: CDoubleArray):
+    """Frees a C double array returned from Go."""
+    _library().FreeDoubleArray(ptr)
+
+def free_int64_array_result(ptr: _CInt64ArrayResult):
+    """Frees an Int64ArrayResult (including the array and the struct itself)."""
+    _library().free_int64_array_result(ptr)
+
+def free_double_array_result(ptr: _CDoubleArrayResult):
+    """Frees a DoubleArrayResult (including the array and the struct itself)."""
+    _library().free_double_array_result(ptr)
+
+def free_bool_array_result(ptr: _CBoolArrayResult):
+    """Frees a BoolArrayResult (including the array and the struct itself)."""
+    _library().free_bool_array_result(ptr)
+
+def free_uint8_array_result(ptr: _CUint8ArrayResult):
+    """Frees a Uint8ArrayResult (including the array and the struct itself)."""
+    _library().free_uint8_array_result(ptr)
+
+def free_int8_array_result(ptr: _CInt8ArrayResult):
+    """Frees a Int8ArrayResult (including the array and the struct itself)."""
+    _library().free_int8_array_result(ptr)
+
+def free_int16_array_result(ptr: _CInt16ArrayResult):
+    """Frees a Int16ArrayResult (including the array and the struct itself)."""
+    _library().free_int16_array_result(ptr)
+
+def free_nullable_int_array_result(ptr: _CNullableIntArrayResult):
+    """Frees a NullableIntArrayResult (including the array, the validity and the struct itself)."""
+    _library().free_nullable_int_array_result(ptr)
+
+def free_nullable_float_array_result(ptr: _CNullableFloatArrayResult):
+    """Frees a NullableFloatArrayResult (including the array, the validity and the struct itself)."""
+    _library().free_nullable_float_array_result(ptr)
+
+def free_nullable_string_array_result(ptr: _CNullableStringArrayResult):
+    """Frees a NullableStringArrayResult (including the strings, the validity and the struct itself)."""
+    _library().free_nullable_string_array_result(ptr)
+
+def free_bytes_array_result(ptr: _CBytesArrayResult):
+    """Frees a BytesArrayResult (including the offsets, data and the struct itself)."""
+    _library().free_bytes_array_result(ptr)
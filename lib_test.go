@@ -5,7 +5,16 @@ package main
 // Functions are used by those tested
 
 import (
+	"bytes"
+	"encoding/json"
+	"fmt"
+	"math"
 	"math/rand/v2"
+	"os"
+	"path/filepath"
+	"reflect"
+	"runtime"
+	"strings"
 	"testing"
 	"unsafe"
 )
@@ -92,3 +101,839 @@ func TestNumberConversions(t *testing.T) {
 		}
 	}
 }
+
+func TestBatchConversions(t *testing.T) {
+	// BatchStrings runs the function once per string, in order
+	for _, test_input := range [][]string{
+		{"", "Hello World", "!@$#^%!#@@%*!", "AWDsadfSA", "\u2764", "\x41", "\n"},
+		{"Reeeee"},
+		{},
+	} {
+		cArray := StringSliceToCArray(test_input)
+		defer free_string_array_result(unsafe.Pointer(cArray))
+
+		temp := BatchStrings(unsafe.Pointer(cArray.data), int(cArray.numberOfElements), func(item string) int { return len(item) })
+		if len(temp) != len(test_input) {
+			t.Errorf(`TestBatchConversions:BatchStrings("%v"): got %d results, expected %d`, test_input, len(temp), len(test_input))
+		}
+		for i := range len(test_input) {
+			if temp[i] != len(test_input[i]) {
+				t.Errorf(`TestBatchConversions:BatchStrings("%s"): %d!=%d`, test_input[i], len(test_input[i]), temp[i])
+			}
+		}
+	}
+
+	// BatchInts/BatchFloats
+	test_ints := []int{-3, 0, 7, 10_000}
+	cInts := IntSliceToCArray(test_ints)
+	defer free_int_array_result(unsafe.Pointer(cInts))
+	doubled := BatchInts(unsafe.Pointer(cInts.data), int(cInts.numberOfElements), func(item int) int { return item * 2 })
+	for i := range len(test_ints) {
+		if doubled[i] != test_ints[i]*2 {
+			t.Errorf(`TestBatchConversions:BatchInts("%d"): %d!=%d`, test_ints[i], test_ints[i]*2, doubled[i])
+		}
+	}
+
+	test_floats := []float32{-1.5, 0, 3.25}
+	cFloats := FloatSliceToCArray(test_floats)
+	defer free_float_array_result(unsafe.Pointer(cFloats))
+	halved := BatchFloats(unsafe.Pointer(cFloats.data), int(cFloats.numberOfElements), func(item float32) float32 { return item / 2 })
+	for i := range len(test_floats) {
+		if halved[i] != test_floats[i]/2 {
+			t.Errorf(`TestBatchConversions:BatchFloats("%f"): %f!=%f`, test_floats[i], test_floats[i]/2, halved[i])
+		}
+	}
+}
+
+func TestTypedNumberConversions(t *testing.T) {
+	for _, size := range []int{0, 1, 100} {
+		// Int32SliceToCArray <--> CInt32ArrayToSlice
+		test_int32s := make([]int32, size)
+		for i := range size {
+			test_int32s[i] = rand.Int32() - rand.Int32()
+		}
+		r32 := Int32SliceToCArray(test_int32s)
+		defer free_int_array_result(unsafe.Pointer(r32))
+		temp_int32s := CInt32ArrayToSlice(unsafe.Pointer(r32.data), int(r32.numberOfElements))
+
+		// Int64SliceToCArray <--> CInt64ArrayToSlice
+		test_int64s := make([]int64, size)
+		for i := range size {
+			test_int64s[i] = rand.Int64() - rand.Int64()
+		}
+		r64 := Int64SliceToCArray(test_int64s)
+		defer free_int64_array_result(unsafe.Pointer(r64))
+		temp_int64s := CInt64ArrayToSlice(unsafe.Pointer(r64.data), int(r64.numberOfElements))
+
+		// Float32SliceToCArray <--> CFloat32ArrayToSlice
+		test_float32s := make([]float32, size)
+		for i := range size {
+			test_float32s[i] = rand.Float32() * float32(rand.IntN(10_000)-5_000)
+		}
+		rf32 := Float32SliceToCArray(test_float32s)
+		defer free_float_array_result(unsafe.Pointer(rf32))
+		temp_float32s := CFloat32ArrayToSlice(unsafe.Pointer(rf32.data), int(rf32.numberOfElements))
+
+		// Float64SliceToCArray <--> CFloat64ArrayToSlice
+		test_float64s := make([]float64, size)
+		for i := range size {
+			test_float64s[i] = rand.Float64() * float64(rand.IntN(10_000)-5_000)
+		}
+		rf64 := Float64SliceToCArray(test_float64s)
+		defer free_double_array_result(unsafe.Pointer(rf64))
+		temp_float64s := CFloat64ArrayToSlice(unsafe.Pointer(rf64.data), int(rf64.numberOfElements))
+
+		if len(temp_int32s) != size || len(temp_int64s) != size || len(temp_float32s) != size || len(temp_float64s) != size {
+			t.Errorf(`TestTypedNumberConversions: Wrong number of elements returned for size %d`, size)
+			continue
+		}
+		for i := range size {
+			if temp_int32s[i] != test_int32s[i] {
+				t.Errorf(`TestTypedNumberConversions:Int32SliceToCArray("%d"): %d!=%d`, test_int32s[i], test_int32s[i], temp_int32s[i])
+			}
+			if temp_int64s[i] != test_int64s[i] {
+				t.Errorf(`TestTypedNumberConversions:Int64SliceToCArray("%d"): %d!=%d`, test_int64s[i], test_int64s[i], temp_int64s[i])
+			}
+			if temp_float32s[i] != test_float32s[i] {
+				t.Errorf(`TestTypedNumberConversions:Float32SliceToCArray("%f"): %f!=%f`, test_float32s[i], test_float32s[i], temp_float32s[i])
+			}
+			if temp_float64s[i] != test_float64s[i] {
+				t.Errorf(`TestTypedNumberConversions:Float64SliceToCArray("%f"): %f!=%f`, test_float64s[i], test_float64s[i], temp_float64s[i])
+			}
+		}
+	}
+}
+
+// Element-by-element conversion ([]int -> C.int) vs a single memmove ([]int32 -> C.int)
+
+const benchmarkArraySize = 1_000_000
+
+func BenchmarkIntSliceToCArray(b *testing.B) {
+	data := make([]int, benchmarkArraySize)
+	for range b.N {
+		free_int_array_result(unsafe.Pointer(IntSliceToCArray(data)))
+	}
+}
+
+func BenchmarkInt32SliceToCArray(b *testing.B) {
+	data := make([]int32, benchmarkArraySize)
+	for range b.N {
+		free_int_array_result(unsafe.Pointer(Int32SliceToCArray(data)))
+	}
+}
+
+func BenchmarkCIntArrayToSlice(b *testing.B) {
+	r := Int32SliceToCArray(make([]int32, benchmarkArraySize))
+	defer free_int_array_result(unsafe.Pointer(r))
+	for range b.N {
+		CIntArrayToSlice(unsafe.Pointer(r.data), benchmarkArraySize)
+	}
+}
+
+func BenchmarkCInt32ArrayToSlice(b *testing.B) {
+	r := Int32SliceToCArray(make([]int32, benchmarkArraySize))
+	defer free_int_array_result(unsafe.Pointer(r))
+	for range b.N {
+		CInt32ArrayToSlice(unsafe.Pointer(r.data), benchmarkArraySize)
+	}
+}
+
+func BenchmarkFloat64SliceToCArray(b *testing.B) {
+	data := make([]float64, benchmarkArraySize)
+	for range b.N {
+		free_double_array_result(unsafe.Pointer(Float64SliceToCArray(data)))
+	}
+}
+
+func TestBufferPool(t *testing.T) {
+	// With the pool off (the default) buffers are exactly the size asked for, and never retained
+	startingBytes := liveCBytes.Load()
+	unpooled := Int32SliceToCArray(make([]int32, 100))
+	if grown := liveCBytes.Load() - startingBytes; grown != int64(unsafe.Sizeof(*unpooled))+400 {
+		t.Errorf(`TestBufferPool: Expected %d bytes for an unpooled result, got %d`, int64(unsafe.Sizeof(*unpooled))+400, grown)
+	}
+	free_int_array_result(unsafe.Pointer(unpooled))
+	if bufferPool.retainedBuffers != 0 || liveCBytes.Load() != startingBytes {
+		t.Errorf(`TestBufferPool: An unpooled result was retained`)
+	}
+
+	enable_buffer_pool(1, 1<<20)
+	defer enable_buffer_pool(0, 256<<20)
+
+	// Size classes
+	for _, test_case := range [][2]int{{0, 0}, {1, 0}, {64, 0}, {65, 1}, {128, 1}, {129, 2}, {1 << 30, 24}, {1<<30 + 1, poolUnpooledClass}} {
+		if class := poolSizeClass(test_case[0]); class != test_case[1] {
+			t.Errorf(`TestBufferPool:poolSizeClass(%d): %d!=%d`, test_case[0], test_case[1], class)
+		}
+	}
+
+	// Freed buffers are reused for the same size class
+	first := Int32SliceToCArray(make([]int32, 100))
+	firstData := unsafe.Pointer(first.data)
+	free_int_array_result(unsafe.Pointer(first))
+	second := Int32SliceToCArray(make([]int32, 90))
+	if unsafe.Pointer(second.data) != firstData && unsafe.Pointer(second) != firstData {
+		t.Errorf(`TestBufferPool: Expected a buffer from the free list to be reused`)
+	}
+	free_int_array_result(unsafe.Pointer(second))
+	if bufferPool.hits == 0 {
+		t.Errorf(`TestBufferPool: Expected pool hits after reuse, got %d`, bufferPool.hits)
+	}
+
+	// Strings round trip through pooled buffers
+	for _, test_input := range []string{"", "Hello World", "\u2764"} {
+		r := StringToCString(test_input)
+		if temp := CStringToString(r); temp != test_input {
+			t.Errorf(`TestBufferPool:StringToCString("%s"): %s!=%s`, test_input, test_input, temp)
+		}
+		FreeCString(r)
+	}
+
+	// Retained memory never goes past the limit, and trimming releases all of it
+	for range 100 {
+		free_int_array_result(unsafe.Pointer(Int32SliceToCArray(make([]int32, 10_000))))
+	}
+	buffers := make([]unsafe.Pointer, 0, 100)
+	for range 100 {
+		buffers = append(buffers, unsafe.Pointer(Int32SliceToCArray(make([]int32, 10_000))))
+	}
+	for _, buffer := range buffers {
+		free_int_array_result(buffer)
+	}
+	if bufferPool.retainedBytes > bufferPool.maxRetainedBytes {
+		t.Errorf(`TestBufferPool: Retained %d bytes, over the limit of %d`, bufferPool.retainedBytes, bufferPool.maxRetainedBytes)
+	}
+	retained := int64(bufferPool.retainedBytes)
+	if released := int64(trim_buffer_pool()); released != retained || bufferPool.retainedBytes != 0 || bufferPool.retainedBuffers != 0 {
+		t.Errorf(`TestBufferPool:trim_buffer_pool(): released %d of %d bytes`, released, retained)
+	}
+}
+
+func BenchmarkPooledInt32SliceToCArray(b *testing.B) {
+	enable_buffer_pool(1, 256<<20)
+	defer enable_buffer_pool(0, 256<<20)
+	data := make([]int32, benchmarkArraySize)
+	for range b.N {
+		free_int_array_result(unsafe.Pointer(Int32SliceToCArray(data)))
+	}
+}
+
+// Same layout as C.GoMemoryStats (test files can't use cgo)
+type goMemoryStats struct {
+	HeapAlloc, HeapInuse, HeapObjects, Sys, Mallocs, Frees, NumGC            uint64
+	LiveCBuffers, LiveCBytes                                                 int64
+	TotalAlloc, HeapSys, HeapIdle, HeapReleased, NextGC, LastGC, NumForcedGC uint64
+	PauseTotalNs, LastPauseNs, MaxPauseNs                                    uint64
+	GCCPUFraction                                                            float64
+}
+
+func TestGoMemoryStats(t *testing.T) {
+	var stats goMemoryStats
+	go_memory_stats(unsafe.Pointer(&stats))
+	if stats.HeapAlloc == 0 || stats.Sys == 0 {
+		t.Errorf(`TestGoMemoryStats: Expected heap and sys memory to be reported, got %+v`, stats)
+	}
+
+	// Live C buffers go up when memory is handed to C, and back down once it's freed (pooled or not)
+	for _, pooled := range []bool{false, true} {
+		if pooled {
+			enable_buffer_pool(1, 256<<20)
+		}
+		go_memory_stats(unsafe.Pointer(&stats))
+		startingBuffers, startingBytes := stats.LiveCBuffers, stats.LiveCBytes
+
+		result := unsafe.Pointer(Int32SliceToCArray(make([]int32, 1000)))
+		go_memory_stats(unsafe.Pointer(&stats))
+		if stats.LiveCBuffers != startingBuffers+2 || stats.LiveCBytes <= startingBytes+4000 {
+			t.Errorf(`TestGoMemoryStats(pooled=%t): Expected 2 more live buffers and over 4000 more bytes, got %d buffers and %d bytes`, pooled, stats.LiveCBuffers-startingBuffers, stats.LiveCBytes-startingBytes)
+		}
+
+		free_int_array_result(result)
+		go_memory_stats(unsafe.Pointer(&stats))
+		if stats.LiveCBuffers != startingBuffers || stats.LiveCBytes != startingBytes {
+			t.Errorf(`TestGoMemoryStats(pooled=%t): Expected live buffers to return to %d (%d bytes), got %d (%d bytes)`, pooled, startingBuffers, startingBytes, stats.LiveCBuffers, stats.LiveCBytes)
+		}
+	}
+	enable_buffer_pool(0, 256<<20)
+}
+
+func TestBytesConversions(t *testing.T) {
+	for _, size := range []int{0, 1, 100} {
+		test_input := make([][]byte, size)
+		for i := range size {
+			test_input[i] = make([]byte, rand.IntN(64)) // Includes empty items
+			for j := range test_input[i] {
+				test_input[i][j] = byte(rand.IntN(256)) // Includes NUL bytes
+			}
+		}
+		r := BytesSliceToCArray(test_input)
+		defer free_bytes_array_result(unsafe.Pointer(r))
+
+		// Items are back to back in one buffer, with numberOfElements+1 offsets
+		offsets := unsafe.Slice((*int64)(unsafe.Pointer(r.offsets)), size+1)
+		data := unsafe.Slice((*byte)(unsafe.Pointer(r.data)), offsets[size])
+		pointers := make([]unsafe.Pointer, size+1)
+		lengths := make([]int64, size+1)
+		for i := range size {
+			pointers[i] = unsafe.Pointer(unsafe.SliceData(data[offsets[i]:]))
+			lengths[i] = offsets[i+1] - offsets[i]
+		}
+		temp := CBytesArrayToSlice(unsafe.Pointer(&pointers[0]), unsafe.Pointer(&lengths[0]), int(r.numberOfElements))
+
+		if len(temp) != size {
+			t.Errorf(`TestBytesConversions: Wrong number of elements returned for size %d, got %d`, size, len(temp))
+			continue
+		}
+		for i := range size {
+			if !bytes.Equal(temp[i], test_input[i]) {
+				t.Errorf(`TestBytesConversions:BytesSliceToCArray(%v): %v!=%v`, test_input[i], test_input[i], temp[i])
+			}
+		}
+	}
+}
+
+func BenchmarkBytesSliceToCArray(b *testing.B) {
+	data := make([][]byte, 1000)
+	for i := range data {
+		data[i] = make([]byte, 1024)
+	}
+	b.SetBytes(1000 * 1024)
+	for range b.N {
+		free_bytes_array_result(unsafe.Pointer(BytesSliceToCArray(data)))
+	}
+}
+
+func TestCompactConversions(t *testing.T) {
+	for _, size := range []int{0, 1, 7, 8, 9, 100} {
+		// BoolSliceToCArray <--> CBoolArrayToSlice
+		test_bools := make([]bool, size)
+		for i := range size {
+			test_bools[i] = rand.IntN(2) == 1
+		}
+		rb := BoolSliceToCArray(test_bools)
+		defer free_bool_array_result(unsafe.Pointer(rb))
+		temp_bools := CBoolArrayToSlice(unsafe.Pointer(rb.data), int(rb.numberOfElements))
+
+		// Bits are packed least significant first
+		if size > 0 {
+			packed := unsafe.Slice((*byte)(unsafe.Pointer(rb.data)), (size+7)/8)
+			if (packed[0]&1 != 0) != test_bools[0] || (size > 8 && (packed[1]&1 != 0) != test_bools[8]) {
+				t.Errorf(`TestCompactConversions:BoolSliceToCArray(%v): Bits are not packed LSB first, got %08b`, test_bools, packed)
+			}
+		}
+
+		// Uint8SliceToCArray <--> CUint8ArrayToSlice
+		test_uint8s := make([]uint8, size)
+		for i := range size {
+			test_uint8s[i] = uint8(rand.IntN(256))
+		}
+		ru8 := Uint8SliceToCArray(test_uint8s)
+		defer free_uint8_array_result(unsafe.Pointer(ru8))
+		temp_uint8s := CUint8ArrayToSlice(unsafe.Pointer(ru8.data), int(ru8.numberOfElements))
+
+		// Int8SliceToCArray <--> CInt8ArrayToSlice
+		test_int8s := make([]int8, size)
+		for i := range size {
+			test_int8s[i] = int8(rand.IntN(256) - 128)
+		}
+		ri8 := Int8SliceToCArray(test_int8s)
+		defer free_int8_array_result(unsafe.Pointer(ri8))
+		temp_int8s := CInt8ArrayToSlice(unsafe.Pointer(ri8.data), int(ri8.numberOfElements))
+
+		// Int16SliceToCArray <--> CInt16ArrayToSlice
+		test_int16s := make([]int16, size)
+		for i := range size {
+			test_int16s[i] = int16(rand.IntN(65536) - 32768)
+		}
+		ri16 := Int16SliceToCArray(test_int16s)
+		defer free_int16_array_result(unsafe.Pointer(ri16))
+		temp_int16s := CInt16ArrayToSlice(unsafe.Pointer(ri16.data), int(ri16.numberOfElements))
+
+		if len(temp_bools) != size || len(temp_uint8s) != size || len(temp_int8s) != size || len(temp_int16s) != size {
+			t.Errorf(`TestCompactConversions: Wrong number of elements returned for size %d`, size)
+			continue
+		}
+		for i := range size {
+			if temp_bools[i] != test_bools[i] {
+				t.Errorf(`TestCompactConversions:BoolSliceToCArray(%d): %t!=%t`, i, test_bools[i], temp_bools[i])
+			}
+			if temp_uint8s[i] != test_uint8s[i] {
+				t.Errorf(`TestCompactConversions:Uint8SliceToCArray("%d"): %d!=%d`, test_uint8s[i], test_uint8s[i], temp_uint8s[i])
+			}
+			if temp_int8s[i] != test_int8s[i] {
+				t.Errorf(`TestCompactConversions:Int8SliceToCArray("%d"): %d!=%d`, test_int8s[i], test_int8s[i], temp_int8s[i])
+			}
+			if temp_int16s[i] != test_int16s[i] {
+				t.Errorf(`TestCompactConversions:Int16SliceToCArray("%d"): %d!=%d`, test_int16s[i], test_int16s[i], temp_int16s[i])
+			}
+		}
+	}
+
+	// Reused pooled buffers don't leak bits from their last use
+	enable_buffer_pool(1, 256<<20)
+	defer enable_buffer_pool(0, 256<<20)
+	allTrue := make([]bool, 64)
+	for i := range allTrue {
+		allTrue[i] = true
+	}
+	free_bool_array_result(unsafe.Pointer(BoolSliceToCArray(allTrue)))
+	r := BoolSliceToCArray(make([]bool, 64))
+	defer free_bool_array_result(unsafe.Pointer(r))
+	for i, value := range CBoolArrayToSlice(unsafe.Pointer(r.data), 64) {
+		if value {
+			t.Errorf(`TestCompactConversions:BoolSliceToCArray(): Bit %d was left over from a pooled buffer`, i)
+		}
+	}
+}
+
+func BenchmarkBoolSliceToCArray(b *testing.B) {
+	data := make([]bool, benchmarkArraySize)
+	for i := range data {
+		data[i] = i%3 == 0
+	}
+	for range b.N {
+		free_bool_array_result(unsafe.Pointer(BoolSliceToCArray(data)))
+	}
+}
+
+func TestNullableConversions(t *testing.T) {
+	// AllValid() edge cases, around the 8 byte fast path and the partial last byte
+	for _, size := range []int{0, 1, 7, 8, 9, 63, 64, 65, 200} {
+		validity := NewValidity(size)
+		if !validity.AllValid(size) || !Validity(nil).AllValid(size) {
+			t.Errorf(`TestNullableConversions:AllValid(%d): Expected all values to be valid`, size)
+		}
+		for i := range size {
+			validity.SetValid(i, false)
+			if validity.AllValid(size) || validity.IsValid(i) {
+				t.Errorf(`TestNullableConversions:AllValid(%d): Missing value %d was not found`, size, i)
+			}
+			validity.SetValid(i, true)
+		}
+		if size%8 != 0 {
+			validity[len(validity)-1] &^= 0x80 // Padding bits past the end are ignored
+			if !validity.AllValid(size) {
+				t.Errorf(`TestNullableConversions:AllValid(%d): Padding bits were checked`, size)
+			}
+		}
+	}
+
+	for _, size := range []int{0, 1, 9, 100} {
+		test_ints := make([]int32, size)
+		test_floats := make([]float32, size)
+		test_strings := make([]string, size)
+		validity := NewValidity(size)
+		for i := range size {
+			test_ints[i] = rand.Int32()
+			test_floats[i] = rand.Float32()
+			test_strings[i] = fmt.Sprintf("item %d", i)
+			if i%3 == 1 {
+				validity.SetValid(i, false)
+				test_ints[i], test_floats[i], test_strings[i] = 0, 0, ""
+			}
+		}
+
+		// NullableInt32SliceToCArray <--> CNullableInt32ArrayToSlice
+		ri := NullableInt32SliceToCArray(test_ints, validity)
+		defer free_nullable_int_array_result(unsafe.Pointer(ri))
+		temp_ints, int_validity := CNullableInt32ArrayToSlice(unsafe.Pointer(ri.data), unsafe.Pointer(ri.validity), int(ri.numberOfElements))
+
+		// NullableFloat32SliceToCArray <--> CNullableFloat32ArrayToSlice
+		rf := NullableFloat32SliceToCArray(test_floats, validity)
+		defer free_nullable_float_array_result(unsafe.Pointer(rf))
+		temp_floats, float_validity := CNullableFloat32ArrayToSlice(unsafe.Pointer(rf.data), unsafe.Pointer(rf.validity), int(rf.numberOfElements))
+
+		// NullableStringSliceToCArray <--> CNullableStringArrayToSlice
+		rs := NullableStringSliceToCArray(test_strings, validity)
+		defer free_nullable_string_array_result(unsafe.Pointer(rs))
+		temp_strings, string_validity := CNullableStringArrayToSlice(unsafe.Pointer(rs.data), unsafe.Pointer(rs.validity), int(rs.numberOfElements))
+
+		// Nothing is missing below 2 values, so no bitmap is sent
+		if (size < 2) != (ri.validity == nil) || (size < 2) != (int_validity == nil) {
+			t.Errorf(`TestNullableConversions(%d): A validity bitmap should only be sent when values are missing`, size)
+		}
+		if len(temp_ints) != size || len(temp_floats) != size || len(temp_strings) != size {
+			t.Errorf(`TestNullableConversions: Wrong number of elements returned for size %d`, size)
+			continue
+		}
+		for i := range size {
+			if int_validity.IsValid(i) != validity.IsValid(i) || float_validity.IsValid(i) != validity.IsValid(i) || string_validity.IsValid(i) != validity.IsValid(i) {
+				t.Errorf(`TestNullableConversions(%d): Validity of value %d was not kept`, size, i)
+			}
+			if temp_ints[i] != test_ints[i] || temp_floats[i] != test_floats[i] || temp_strings[i] != test_strings[i] {
+				t.Errorf(`TestNullableConversions(%d): %d, %f, %q != %d, %f, %q`, i, test_ints[i], test_floats[i], test_strings[i], temp_ints[i], temp_floats[i], temp_strings[i])
+			}
+		}
+	}
+
+	// Missing strings are sent as NULL, and a NULL string is missing even without a bitmap
+	rs := NullableStringSliceToCArray([]string{"a", "b"}, Validity{0b01})
+	defer free_nullable_string_array_result(unsafe.Pointer(rs))
+	pointers := unsafe.Slice((*unsafe.Pointer)(unsafe.Pointer(rs.data)), 2)
+	if pointers[0] == nil || pointers[1] != nil {
+		t.Errorf(`TestNullableConversions:NullableStringSliceToCArray(): Missing strings should be NULL`)
+	}
+	strings, validity := CNullableStringArrayToSlice(unsafe.Pointer(rs.data), nil, 2)
+	if strings[0] != "a" || !validity.IsValid(0) || validity.IsValid(1) {
+		t.Errorf(`TestNullableConversions:CNullableStringArrayToSlice(): NULL strings should be missing, got %q %08b`, strings, validity)
+	}
+}
+
+func BenchmarkValidityAllValid(b *testing.B) {
+	validity := NewValidity(benchmarkArraySize)
+	for range b.N {
+		if !validity.AllValid(benchmarkArraySize) {
+			b.Fatal("Expected all values to be valid")
+		}
+	}
+}
+
+// Same layout as C.StringArrayResult/C.IntArrayResult (test files can't use cgo)
+type goArrayResult struct {
+	NumberOfElements int32
+	Data             unsafe.Pointer
+}
+
+func TestResultStream(t *testing.T) {
+	var stats goMemoryStats
+	go_memory_stats(unsafe.Pointer(&stats))
+	liveBefore := stats.LiveCBuffers
+
+	// Chunks are full except the last, and arrive in order
+	for _, size := range []int{0, 1, 9, 10, 11, 1000} {
+		stream := NewInt32Stream(nil, nil, 10)
+		var received []int32
+		chunks := 0
+		stream.emit = func(chunk unsafe.Pointer) bool {
+			result := (*goArrayResult)(chunk)
+			received = append(received, CInt32ArrayToSlice(result.Data, int(result.NumberOfElements))...)
+			chunks++
+			return true
+		}
+		for i := range size {
+			if !stream.Send(int32(i)) {
+				t.Errorf(`TestResultStream(%d): Send() returned false without being cancelled`, size)
+			}
+		}
+		if !stream.Close() || stream.Sent() != size || len(received) != size || chunks != (size+9)/10 {
+			t.Errorf(`TestResultStream(%d): Sent %d values in %d chunks, expected %d in %d`, size, len(received), chunks, size, (size+9)/10)
+		}
+		for i, value := range received {
+			if value != int32(i) {
+				t.Errorf(`TestResultStream(%d): Value %d arrived as %d`, size, i, value)
+			}
+		}
+	}
+
+	// Cancelling stops the stream at the chunk the consumer cancelled on
+	stream := NewStringStream(nil, nil, 4)
+	var received []string
+	stream.emit = func(chunk unsafe.Pointer) bool {
+		result := (*goArrayResult)(chunk)
+		received = append(received, CStringArrayToSlice(result.Data, int(result.NumberOfElements))...)
+		return len(received) < 8
+	}
+	sent := 0
+	for i := range 100 {
+		if !stream.Send(fmt.Sprintf("match %d", i)) {
+			break
+		}
+		sent++
+	}
+	if sent != 7 || !stream.Cancelled() || stream.Close() || stream.Sent() != 8 || len(received) != 8 || received[7] != "match 7" {
+		t.Errorf(`TestResultStream: Expected the stream to stop after 2 chunks, sent %d, received %q`, sent, received)
+	}
+
+	// Every chunk is freed once it's been handed over
+	go_memory_stats(unsafe.Pointer(&stats))
+	if stats.LiveCBuffers != liveBefore {
+		t.Errorf(`TestResultStream: %d chunks were not freed`, stats.LiveCBuffers-liveBefore)
+	}
+}
+
+func BenchmarkResultStream(b *testing.B) {
+	for range b.N {
+		stream := NewInt32Stream(nil, nil, defaultChunkSize)
+		stream.emit = func(chunk unsafe.Pointer) bool { return true }
+		for i := range benchmarkArraySize {
+			stream.Send(int32(i))
+		}
+		stream.Close()
+	}
+}
+
+// Same layout as C.HandleStats (test files can't use cgo)
+type handleStats struct {
+	LiveHandles, LiveBytes, Uploads, Releases int64
+}
+
+func TestHandles(t *testing.T) {
+	var before, after handleStats
+	handle_stats(unsafe.Pointer(&before))
+
+	// Values come back out of a handle until it's released
+	handle := NewHandle([]string{"a", "bc"}, 3)
+	if handle == 0 {
+		t.Errorf(`TestHandles:NewHandle(): Handles should never be 0`)
+	}
+	if data, ok := HandleValue[[]string](handle); !ok || len(data) != 2 || data[1] != "bc" {
+		t.Errorf(`TestHandles:HandleValue(): Expected ["a" "bc"], got %q`, data)
+	}
+	if _, ok := HandleValue[[]int32](handle); ok {
+		t.Errorf(`TestHandles:HandleValue(): A []string handle was read as []int32`)
+	}
+	if handle_size(handle) != 3 {
+		t.Errorf(`TestHandles:handle_size(): Expected 3 bytes, got %d`, handle_size(handle))
+	}
+	handle_stats(unsafe.Pointer(&after))
+	if after.LiveHandles != before.LiveHandles+1 || after.LiveBytes != before.LiveBytes+3 || after.Uploads != before.Uploads+1 {
+		t.Errorf(`TestHandles:handle_stats(): Expected one more live handle, got %+v then %+v`, before, after)
+	}
+
+	// Releasing twice, and using a released handle, is safe
+	if !ReleaseHandle(handle) || ReleaseHandle(handle) || release_handle(handle) != 0 {
+		t.Errorf(`TestHandles:ReleaseHandle(): Only the first release should succeed`)
+	}
+	if _, ok := HandleValue[[]string](handle); ok || handle_size(handle) != -1 || return_handle_string_array(handle) != nil {
+		t.Errorf(`TestHandles: A released handle was still readable`)
+	}
+
+	// Uploads copy the C data, so it can be freed straight away
+	ri := Int32SliceToCArray([]int32{1, 2, 3})
+	intHandle := upload_int_array(unsafe.Pointer(ri.data), ri.numberOfElements)
+	free_int_array_result(unsafe.Pointer(ri))
+	rs := StringSliceToCArray([]string{"hello", "world!"})
+	stringHandle := upload_string_array(unsafe.Pointer(rs.data), rs.numberOfElements)
+	free_string_array_result(unsafe.Pointer(rs))
+	defer release_handle(intHandle)
+	defer release_handle(stringHandle)
+
+	if data, ok := HandleValue[[]int32](intHandle); !ok || len(data) != 3 || data[2] != 3 || handle_size(intHandle) != 12 {
+		t.Errorf(`TestHandles:upload_int_array(): Expected [1 2 3] in 12 bytes, got %v in %d`, data, handle_size(intHandle))
+	}
+	lengths := handle_string_lengths(stringHandle)
+	defer free_int_array_result(unsafe.Pointer(lengths))
+	if got := CInt32ArrayToSlice(unsafe.Pointer(lengths.data), int(lengths.numberOfElements)); len(got) != 2 || got[0] != 5 || got[1] != 6 {
+		t.Errorf(`TestHandles:handle_string_lengths(): Expected [5 6], got %v`, got)
+	}
+}
+
+func TestCPUProfile(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "default.pgo")
+	if err := StopCPUProfile(); err == nil {
+		t.Fatal("StopCPUProfile() should fail when no profile is running")
+	}
+	if err := StartCPUProfile(path); err != nil {
+		t.Fatalf("StartCPUProfile() = %v", err)
+	}
+	if err := StartCPUProfile(path); err == nil {
+		t.Fatal("StartCPUProfile() should fail while a profile is running")
+	}
+	validity := NewValidity(100_000)
+	for range 200 {
+		validity.AllValid(100_000)
+	}
+	if err := StopCPUProfile(); err != nil {
+		t.Fatalf("StopCPUProfile() = %v", err)
+	}
+	if info, err := os.Stat(path); err != nil || info.Size() == 0 {
+		t.Fatalf("profile wasn't written: %v", err)
+	}
+
+	// A profile that can't be created doesn't leave one running
+	if err := StartCPUProfile(filepath.Join(t.TempDir(), "missing", "default.pgo")); err == nil {
+		t.Fatal("StartCPUProfile() should fail for an unwritable path")
+	}
+	if err := StopCPUProfile(); err == nil {
+		t.Fatal("StopCPUProfile() should fail after a failed start")
+	}
+}
+
+func TestProfilesAndTraces(t *testing.T) {
+	folder := t.TempDir()
+	for _, name := range []string{"heap", "allocs", "goroutine"} {
+		path := filepath.Join(folder, name+".pprof")
+		if err := WriteProfile(name, path); err != nil {
+			t.Fatalf("WriteProfile(%q) = %v", name, err)
+		}
+		if info, err := os.Stat(path); err != nil || info.Size() == 0 {
+			t.Fatalf("%s profile wasn't written: %v", name, err)
+		}
+	}
+	if err := WriteProfile("missing", filepath.Join(folder, "missing.pprof")); err == nil {
+		t.Fatal("WriteProfile() should fail for an unknown profile")
+	}
+
+	path := filepath.Join(folder, "trace.out")
+	if err := StopTrace(); err == nil {
+		t.Fatal("StopTrace() should fail when no trace is running")
+	}
+	if err := StartTrace(path); err != nil {
+		t.Fatalf("StartTrace() = %v", err)
+	}
+	if err := StartTrace(path); err == nil {
+		t.Fatal("StartTrace() should fail while a trace is running")
+	}
+	NewValidity(100_000).AllValid(100_000)
+	if err := StopTrace(); err != nil {
+		t.Fatalf("StopTrace() = %v", err)
+	}
+	if info, err := os.Stat(path); err != nil || info.Size() == 0 {
+		t.Fatalf("trace wasn't written: %v", err)
+	}
+}
+
+func TestRuntimeSettings(t *testing.T) {
+	procs := set_gomaxprocs(0)
+	if procs < 1 || set_gomaxprocs(1) != procs || set_gomaxprocs(procs) != 1 {
+		t.Errorf("set_gomaxprocs() should return the previous value, started at %d", procs)
+	}
+	percent := set_gc_percent(50)
+	if set_gc_percent(percent) != 50 {
+		t.Error("set_gc_percent() should return the previous value")
+	}
+	limit := set_memory_limit(-1)
+	if set_memory_limit(1<<40) != limit || set_memory_limit(limit) != 1<<40 {
+		t.Errorf("set_memory_limit() should return the previous value, started at %d", limit)
+	}
+
+	// Forced collections show up in the GC stats
+	var before, after goMemoryStats
+	go_memory_stats(unsafe.Pointer(&before))
+	for range 3 {
+		runtime.GC()
+	}
+	go_memory_stats(unsafe.Pointer(&after))
+	if after.NumForcedGC-before.NumForcedGC != 3 || after.NumGC-before.NumGC < 3 {
+		t.Errorf("Expected 3 more forced collections, got %d (%d total)", after.NumForcedGC-before.NumForcedGC, after.NumGC-before.NumGC)
+	}
+	if after.PauseTotalNs <= before.PauseTotalNs || after.LastPauseNs == 0 || after.MaxPauseNs < after.LastPauseNs || after.LastGC == 0 {
+		t.Errorf("Expected GC pauses to be reported, got %+v", after)
+	}
+}
+
+func TestMsgpack(t *testing.T) {
+	// Dynamic values come back as the types decoding into any produces
+	value := map[string]any{
+		"name":    "widget",
+		"empty":   "",
+		"long":    strings.Repeat("x", 300),
+		"nothing": nil,
+		"flags":   []any{true, false},
+		"data":    []byte{0, 1, 2},
+		"scores":  []any{1.5, -2.25, math.Inf(1)},
+		"nested":  map[string]any{"ints": []any{int64(-33), int64(-129), int64(128), int64(65536), int64(math.MaxInt64), int64(math.MinInt64), uint64(math.MaxUint64)}},
+	}
+	encoded, err := MsgpackMarshal(value)
+	if err != nil {
+		t.Fatalf("MsgpackMarshal() = %v", err)
+	}
+	var decoded any
+	if err := MsgpackUnmarshal(encoded, &decoded); err != nil {
+		t.Fatalf("MsgpackUnmarshal() = %v", err)
+	}
+	if !reflect.DeepEqual(decoded, any(value)) {
+		t.Errorf("MsgpackUnmarshal(): Expected %v, got %v", value, decoded)
+	}
+	if small, _ := MsgpackMarshal([]any{int64(1), "a", nil}); !bytes.Equal(small, []byte{0x93, 0x01, 0xa1, 'a', 0xc0}) {
+		t.Errorf("MsgpackMarshal(): Expected fixarray/fixint/fixstr/nil bytes, got % x", small)
+	}
+
+	// Structs are decoded by tag or (case-insensitive) name, unknown keys are skipped
+	type record struct {
+		Name    string            `msgpack:"name"`
+		Count   int8              `msgpack:"count"`
+		Ratio   float32           // Untagged fields use their name
+		Labels  map[string]uint16 `msgpack:"labels"`
+		Next    *record           `msgpack:"next"`
+		Ignored string            `msgpack:"-"`
+	}
+	encoded, _ = MsgpackMarshal(map[string]any{
+		"name": "a", "COUNT": -5, "ratio": 2, "labels": map[string]any{"x": 7}, "unknown": []any{1, "b"},
+		"next": map[string]any{"name": "b", "next": nil}, "Ignored": "no",
+	})
+	var got record
+	if err := MsgpackUnmarshal(encoded, &got); err != nil {
+		t.Fatalf("MsgpackUnmarshal(&record) = %v", err)
+	}
+	expected := record{Name: "a", Count: -5, Ratio: 2, Labels: map[string]uint16{"x": 7}, Next: &record{Name: "b"}}
+	if !reflect.DeepEqual(got, expected) {
+		t.Errorf("MsgpackUnmarshal(&record): Expected %+v, got %+v", expected, got)
+	}
+	encoded, _ = MsgpackMarshal([]record{expected})
+	var records []record
+	if err := MsgpackUnmarshal(encoded, &records); err != nil || len(records) != 1 || !reflect.DeepEqual(records[0], expected) {
+		t.Errorf("MsgpackUnmarshal(&[]record): Expected a roundtrip of %+v, got %+v (%v)", expected, records, err)
+	}
+
+	// Bad data and values that don't fit are errors, not panics
+	var number int8
+	var text string
+	var nothing any
+	cases := []struct {
+		data []byte
+		out  any
+	}{
+		{encoded[:len(encoded)-1], &records},             // Truncated
+		{[]byte{0xcd, 0x01, 0x2c}, &number},              // 300 overflows an int8
+		{[]byte{0xa1, 'a'}, &number},                     // A string isn't a number
+		{[]byte{0x01}, &text},                            // A number isn't a string
+		{[]byte{0x01, 0x02}, &nothing},                   // Trailing bytes
+		{[]byte{0xdd, 0xff, 0xff, 0xff, 0xff}, &nothing}, // Array length longer than the data
+		{[]byte{0xc1}, &nothing},                         // Unused type byte
+		{[]byte{0x01}, number},                           // Not a pointer
+	}
+	// Lengths from the data are checked against the bytes left before anything is allocated
+	var typedMap map[string]int
+	var typedSlice []int
+	for _, header := range [][]byte{{0xdc, 0xff, 0xff}, {0xdd, 0xff, 0xff, 0xff, 0xff}, {0xde, 0xff, 0xff}, {0xdf, 0xff, 0xff, 0xff, 0xff}, {0x81, 0x01}} {
+		for _, out := range []any{&nothing, &typedMap, &typedSlice, &records} {
+			cases = append(cases, struct {
+				data []byte
+				out  any
+			}{header, out})
+		}
+	}
+	// Deeply nested data is an error, not a stack overflow
+	type nestedList []nestedList
+	var nested nestedList
+	deep := append(bytes.Repeat([]byte{0x91}, 1<<20), msgpackNil)
+	cases = append(cases, struct {
+		data []byte
+		out  any
+	}{deep, &nothing}, struct {
+		data []byte
+		out  any
+	}{deep, &nested})
+	for _, test := range cases {
+		if err := MsgpackUnmarshal(test.data, test.out); err == nil {
+			t.Errorf("MsgpackUnmarshal(% x, %T) should fail", test.data, test.out)
+		}
+	}
+	if _, err := MsgpackMarshal(make(chan int)); err == nil {
+		t.Error("MsgpackMarshal(chan) should fail")
+	}
+}
+
+func BenchmarkMsgpackVsJSON(b *testing.B) {
+	items := make([]any, 1_000)
+	for i := range items {
+		items[i] = map[string]any{"id": int64(i), "name": fmt.Sprint("item", i), "scores": []any{float64(i) / 3, 0.5}, "active": i%2 == 0}
+	}
+	encoded, _ := MsgpackMarshal(items)
+	jsonEncoded, _ := json.Marshal(items)
+	b.Run("msgpack", func(b *testing.B) {
+		for range b.N {
+			var decoded any
+			MsgpackUnmarshal(encoded, &decoded)
+			MsgpackMarshal(decoded)
+		}
+	})
+	b.Run("json", func(b *testing.B) {
+		for range b.N {
+			var decoded any
+			json.Unmarshal(jsonEncoded, &decoded)
+			json.Marshal(decoded)
+		}
+	})
+}
@@ -0,0 +1,347 @@
+"""Long-running soak test that looks for memory leaks in the round trip functions
+
+Every round trip path (return_*, *_result_to_list, free_*) is run many times at several payload sizes while sampling
+the process's RSS, python's tracemalloc and Go's runtime.MemStats. A path fails if memory keeps growing after the
+warm up past the configured thresholds, or if Go has handed buffers to C that were never freed.
+
+Usage
+-----
+```bash
+python soak.py --iterations 1000000 --sizes 1 100 10000 --report soak_report.json
+```
+
+The number of iterations is scaled down for bigger payloads (iterations // size, with a minimum of --min-iterations),
+so every size moves roughly the same number of items. The process exits with code 1 if any path fails.
+"""
+import os
+import sys
+import gc
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from platform import platform
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import lib as helpers
+
+# ========== Memory sampling ==========
+def rss_bytes() -> int:
+    """Gets the current resident set size of this process in bytes (peak RSS on platforms without /proc)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if platform().lower().startswith("macos") else peak * 1024
+
+def take_sample(iteration:int, started:float) -> dict:
+    """Samples RSS, python's traced memory and Go's memory statistics"""
+    go_stats = helpers.go_memory_stats()
+    return {
+        "iteration": iteration,
+        "seconds": time.perf_counter() - started,
+        "rss_bytes": rss_bytes(),
+        "python_traced_bytes": tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0,
+        "go_heap_bytes": go_stats["heapAlloc"],
+        "live_c_buffers": go_stats["liveCBuffers"],
+        "live_c_bytes": go_stats["liveCBytes"],
+    }
+
+# ========== Round trip paths ==========
+def _words(size:int) -> list[str]:
+    return [random.choice(["Lorem", "ipsum", "dolor", "sit", "amet", "❤"]) for _ in range(size)]
+
+def _round_trips(size:int) -> dict:
+    """Builds the round trips to soak, each one allocates in Go and frees through the public API"""
+    text = "".join(_words(size))
+    strings = _words(size)
+    ints = [random.randint(-1000, 1000) for _ in range(size)]
+    floats = [random.uniform(-1000, 1000) for _ in range(size)]
+    blobs = [random.randbytes(random.randint(0, 64)) for _ in range(size)]
+    bools = [random.random() < 0.5 for _ in range(size)]
+    small_ints = [random.randint(0, 127) for _ in range(size)]
+    nullable_ints = [None if random.random() < 0.2 else value for value in ints]
+    nullable_strings = [None if random.random() < 0.2 else value for value in strings]
+    lib = helpers.lib
+
+    def string_round_trip():
+        c_array, number_of_items = helpers.prepare_string_array(strings)
+        helpers.string_array_result_to_list(lib.return_string_array(c_array, number_of_items))
+
+    def int_round_trip():
+        c_array, number_of_items = helpers.prepare_int_array(ints)
+        helpers.int_array_result_to_list(lib.return_int_array(c_array, number_of_items))
+
+    def int_free_round_trip():
+        c_array, number_of_items = helpers.prepare_int_array(ints)
+        helpers.free_int_array_result(lib.return_int_array(c_array, number_of_items))
+
+    def float_round_trip():
+        c_array, number_of_items = helpers.prepare_float_array(floats)
+        helpers.float_array_result_to_list(lib.return_float_array(c_array, number_of_items))
+
+    def float_free_round_trip():
+        c_array, number_of_items = helpers.prepare_float_array(floats)
+        helpers.free_float_array_result(lib.return_float_array(c_array, number_of_items))
+
+    def int64_round_trip():
+        c_array, number_of_items = helpers.prepare_int64_array(ints)
+        helpers.int64_array_result_to_list(lib.return_int64_array(c_array, number_of_items))
+
+    def double_round_trip():
+        c_array, number_of_items = helpers.prepare_double_array(floats)
+        helpers.double_array_result_to_list(lib.return_double_array(c_array, number_of_items))
+
+    def bool_round_trip():
+        c_array, number_of_items = helpers.prepare_bool_array(bools)
+        helpers.bool_array_result_to_list(lib.return_bool_array(c_array, number_of_items))
+
+    def uint8_round_trip():
+        c_array, number_of_items = helpers.prepare_uint8_array(small_ints)
+        helpers.uint8_array_result_to_list(lib.return_uint8_array(c_array, number_of_items))
+
+    def int8_round_trip():
+        c_array, number_of_items = helpers.prepare_int8_array(small_ints)
+        helpers.int8_array_result_to_list(lib.return_int8_array(c_array, number_of_items))
+
+    def int16_round_trip():
+        c_array, number_of_items = helpers.prepare_int16_array(small_ints)
+        helpers.int16_array_result_to_list(lib.return_int16_array(c_array, number_of_items))
+
+    def bytes_round_trip():
+        c_array, lengths, number_of_items = helpers.prepare_bytes_array(blobs)
+        helpers.bytes_array_result_to_list(lib.return_bytes_array(c_array, lengths, number_of_items))
+
+    def nullable_int_round_trip():
+        c_array, validity, number_of_items = helpers.prepare_nullable_int_array(nullable_ints)
+        helpers.nullable_int_array_result_to_list(lib.return_nullable_int_array(c_array, validity, number_of_items))
+
+    def nullable_string_round_trip():
+        c_array, validity, number_of_items = helpers.prepare_nullable_string_array(nullable_strings)
+        helpers.nullable_string_array_result_to_list(lib.return_nullable_string_array(c_array, validity, number_of_items))
+
+    def stream_round_trip():
+        helpers.stream_string_array(strings, chunk_size=max(1, size // 4), callback=len)
+
+    def handle_round_trip():
+        with helpers.upload_string_array(strings) as handle:
+            helpers.handle_string_lengths(handle)
+
+    def string_free_round_trip():
+        c_array, number_of_items = helpers.prepare_string_array(strings)
+        helpers.free_string_array_result(lib.return_string_array(c_array, number_of_items))
+
+    c_strings, number_of_strings = helpers.prepare_string_array(strings)
+    c_ints, number_of_ints = helpers.prepare_int_array(ints)
+    c_floats, number_of_floats = helpers.prepare_float_array(floats)
+
+    return {
+        "return_string": lambda: helpers.return_string(text),
+        "return_string_array": lambda: helpers.return_string_array(c_strings, number_of_strings),
+        "return_int_array": lambda: helpers.return_int_array(c_ints, number_of_ints),
+        "return_float_array": lambda: helpers.return_float_array(c_floats, number_of_floats),
+        "return_string_lengths": lambda: helpers.return_string_lengths(strings),
+        "string_array_result_to_list": string_round_trip,
+        "int_array_result_to_list": int_round_trip,
+        "float_array_result_to_list": float_round_trip,
+        "int64_array_result_to_list": int64_round_trip,
+        "double_array_result_to_list": double_round_trip,
+        "bool_array_result_to_list": bool_round_trip,
+        "uint8_array_result_to_list": uint8_round_trip,
+        "int8_array_result_to_list": int8_round_trip,
+        "int16_array_result_to_list": int16_round_trip,
+        "bytes_array_result_to_list": bytes_round_trip,
+        "nullable_int_array_result_to_list": nullable_int_round_trip,
+        "nullable_string_array_result_to_list": nullable_string_round_trip,
+        "stream_string_array": stream_round_trip,
+        "upload_string_array": handle_round_trip,
+        "stream_int_array": lambda: list(helpers.stream_int_array(ints, chunk_size=max(1, size // 4))),
+        "free_string_array_result": string_free_round_trip,
+        "free_int_array_result": int_free_round_trip,
+        "free_float_array_result": float_free_round_trip,
+    }
+
+# ========== Soak ==========
+def soak_path(function, iterations:int, samples:int, warm_up:float, max_growth_bytes:int) -> dict:
+    """Runs a single round trip many times, sampling memory as it goes
+
+    Parameters
+    ----------
+    function : Callable[[], None]
+        The round trip to run
+
+    iterations : int
+        How many times to run it
+
+    samples : int
+        How many memory samples to take over the run
+
+    warm_up : float
+        The fraction of the run to ignore before measuring growth (caches, pools and allocators settling)
+
+    max_growth_bytes : int
+        How much RSS, traced python memory or Go heap can grow after the warm up before the path fails
+
+    Returns
+    -------
+    dict
+        The samples, growth after warm up, throughput and whether the path passed
+    """
+    sample_every = max(1, iterations // samples)
+    warm_up_iterations = int(iterations * warm_up)
+    gc.collect()
+    started = time.perf_counter()
+    history = [take_sample(0, started)]
+    baseline = None
+
+    for iteration in range(1, iterations + 1):
+        function()
+        if iteration == warm_up_iterations:
+            gc.collect()
+            baseline = take_sample(iteration, started)
+        if iteration % sample_every == 0:
+            history.append(take_sample(iteration, started))
+
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    final = take_sample(iterations, started)
+    baseline = baseline or history[0]
+
+    growth = {
+        "rss_bytes": final["rss_bytes"] - baseline["rss_bytes"],
+        "python_traced_bytes": final["python_traced_bytes"] - baseline["python_traced_bytes"],
+        "go_heap_bytes": final["go_heap_bytes"] - baseline["go_heap_bytes"],
+        "live_c_buffers": final["live_c_buffers"] - history[0]["live_c_buffers"],
+        "live_c_bytes": final["live_c_bytes"] - history[0]["live_c_bytes"],
+    }
+    failures = [
+        f"{name} grew by {growth[name]:,} bytes (limit {max_growth_bytes:,})"
+        for name in ("rss_bytes", "python_traced_bytes", "go_heap_bytes")
+        if growth[name] > max_growth_bytes
+    ]
+    if growth["live_c_buffers"] > 0:
+        failures.append(f"{growth['live_c_buffers']:,} buffers ({growth['live_c_bytes']:,} bytes) handed to C were never freed")
+
+    return {
+        "iterations": iterations,
+        "seconds": elapsed,
+        "iterations_per_second": iterations / elapsed if elapsed else 0,
+        "bytes_per_iteration": {name: value / max(1, iterations - warm_up_iterations) for name, value in growth.items()},
+        "growth": growth,
+        "passed": not failures,
+        "failures": failures,
+        "samples": history + [final],
+    }
+
+def run_soak(iterations:int=1_000_000, sizes:list[int]=(1, 100, 10_000), min_iterations:int=1_000, samples:int=50, warm_up:float=0.1, max_growth_mb:float=32, paths:list[str]|None=None, trace_python:bool=True, pool:bool=False) -> dict:
+    """Soaks every round trip path at each payload size
+
+    Parameters
+    ----------
+    iterations : int, optional
+        Iterations for a payload of 1 item, bigger payloads run iterations // size times, by default 1_000_000
+
+    sizes : list[int], optional
+        The payload sizes (items per call) to test, by default (1, 100, 10_000)
+
+    min_iterations : int, optional
+        The fewest iterations any size will run, by default 1_000
+
+    samples : int, optional
+        How many memory samples to take per path, by default 50
+
+    warm_up : float, optional
+        The fraction of each run to ignore before measuring growth, by default 0.1
+
+    max_growth_mb : float, optional
+        How much memory can grow after the warm up before a path fails, by default 32
+
+    paths : list[str] | None, optional
+        Only soak these paths, by default None which soaks every path
+
+    trace_python : bool, optional
+        If python allocations should be tracked with tracemalloc (slows things down considerably), by default True
+
+    pool : bool, optional
+        If the Go buffer pool should be enabled during the soak, by default False
+
+    Returns
+    -------
+    dict
+        The configuration, and the results for each path and size
+    """
+    report = {
+        "config": {
+            "iterations": iterations, "sizes": list(sizes), "min_iterations": min_iterations, "samples": samples,
+            "warm_up": warm_up, "max_growth_mb": max_growth_mb, "trace_python": trace_python, "pool": pool,
+            "backend": helpers.BACKEND,
+        },
+        "results": {},
+    }
+    if trace_python:
+        tracemalloc.start()
+    helpers.enable_buffer_pool(pool)
+    try:
+        for size in sizes:
+            round_trips = _round_trips(size)
+            for name, function in round_trips.items():
+                if paths and name not in paths:
+                    continue
+                result = soak_path(
+                    function,
+                    max(min_iterations, iterations // size),
+                    samples,
+                    warm_up,
+                    int(max_growth_mb * 1024 * 1024),
+                )
+                report["results"][f"{name}[{size}]"] = result
+                status = "PASS" if result["passed"] else "FAIL"
+                print(f"{status} {name}[{size}]: {result['iterations']:,} iterations, {result['iterations_per_second']:,.0f}/s, RSS {result['growth']['rss_bytes']:+,} bytes, live C buffers {result['growth']['live_c_buffers']:+,}")
+                for failure in result["failures"]:
+                    print(f"    {failure}")
+    finally:
+        helpers.enable_buffer_pool(False)
+        if trace_python:
+            tracemalloc.stop()
+    report["passed"] = all(result["passed"] for result in report["results"].values())
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--iterations", type=int, default=1_000_000, help="Iterations for a payload of 1 item (bigger payloads run iterations // size times)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10_000], help="Payload sizes (items per call)")
+    parser.add_argument("--min-iterations", type=int, default=1_000, help="The fewest iterations any size will run")
+    parser.add_argument("--samples", type=int, default=50, help="Memory samples taken per path")
+    parser.add_argument("--warm-up", type=float, default=0.1, help="Fraction of each run ignored before measuring growth")
+    parser.add_argument("--max-growth-mb", type=float, default=32, help="Memory growth after warm up that fails a path")
+    parser.add_argument("--paths", nargs="+", help="Only soak these paths (i.e. return_string int_array_result_to_list)")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Don't trace python allocations (much faster)")
+    parser.add_argument("--pool", action="store_true", help="Enable the Go buffer pool during the soak")
+    parser.add_argument("--report", help="Write the full report (including samples) as JSON to this path")
+    arguments = parser.parse_args()
+
+    report = run_soak(
+        iterations=arguments.iterations,
+        sizes=arguments.sizes,
+        min_iterations=arguments.min_iterations,
+        samples=arguments.samples,
+        warm_up=arguments.warm_up,
+        max_growth_mb=arguments.max_growth_mb,
+        paths=arguments.paths,
+        trace_python=not arguments.no_tracemalloc,
+        pool=arguments.pool,
+    )
+    if arguments.report:
+        with open(arguments.report, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    print("\nAll paths passed" if report["passed"] else "\nSome paths failed")
+    sys.exit(0 if report["passed"] else 1)
@@ -1,12 +1,14 @@
 import os
 import sys
 import random
+import gc
+import time
 from platform import platform
-from ctypes import ArgumentError, cdll, c_char_p, c_int, POINTER, c_float
+from ctypes import ArgumentError, cdll, c_char_p, c_int, POINTER, c_float, c_int64, c_double, c_longlong, c_ubyte, c_uint8, c_int8, c_int16
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 from lib import *
-from lib import _CStringArrayResult, _CIntArrayResult, _CFloatArrayResult
+from lib import _CStringArrayResult, _CIntArrayResult, _CFloatArrayResult, _CInt64ArrayResult, _CDoubleArrayResult, _CBytesArrayResult, _CBoolArrayResult, _CUint8ArrayResult, _CInt8ArrayResult, _CInt16ArrayResult, _CNullableIntArrayResult, _CNullableFloatArrayResult, _CNullableStringArrayResult, _build_command
 
 import pytest
 
@@ -48,6 +50,39 @@ lib.return_float_array.argtypes = [POINTER(c_float), c_int]
 lib.return_float_array.restype = POINTER(_CFloatArrayResult)
 lib.free_float_array_result.argtypes = [POINTER(_CFloatArrayResult)]
 
+lib.return_int64_array.argtypes = [POINTER(c_int64), c_int]
+lib.return_int64_array.restype = POINTER(_CInt64ArrayResult)
+lib.free_int64_array_result.argtypes = [POINTER(_CInt64ArrayResult)]
+
+lib.return_double_array.argtypes = [POINTER(c_double), c_int]
+lib.return_double_array.restype = POINTER(_CDoubleArrayResult)
+lib.free_double_array_result.argtypes = [POINTER(_CDoubleArrayResult)]
+
+lib.return_string_lengths.argtypes = [POINTER(c_char_p), c_int]
+lib.return_string_lengths.restype = POINTER(_CIntArrayResult)
+
+lib.return_bool_array.argtypes = [POINTER(c_ubyte), c_int]
+lib.return_bool_array.restype = POINTER(_CBoolArrayResult)
+lib.free_bool_array_result.argtypes = [POINTER(_CBoolArrayResult)]
+
+lib.return_uint8_array.argtypes = [POINTER(c_uint8), c_int]
+lib.return_uint8_array.restype = POINTER(_CUint8ArrayResult)
+lib.return_int8_array.argtypes = [POINTER(c_int8), c_int]
+lib.return_int8_array.restype = POINTER(_CInt8ArrayResult)
+lib.return_int16_array.argtypes = [POINTER(c_int16), c_int]
+lib.return_int16_array.restype = POINTER(_CInt16ArrayResult)
+
+lib.return_nullable_int_array.argtypes = [POINTER(c_int), POINTER(c_ubyte), c_int]
+lib.return_nullable_int_array.restype = POINTER(_CNullableIntArrayResult)
+lib.return_nullable_float_array.argtypes = [POINTER(c_float), POINTER(c_ubyte), c_int]
+lib.return_nullable_float_array.restype = POINTER(_CNullableFloatArrayResult)
+lib.return_nullable_string_array.argtypes = [POINTER(c_char_p), POINTER(c_ubyte), c_int]
+lib.return_nullable_string_array.restype = POINTER(_CNullableStringArrayResult)
+
+lib.return_bytes_array.argtypes = [POINTER(c_char_p), POINTER(c_longlong), c_int]
+lib.return_bytes_array.restype = POINTER(_CBytesArrayResult)
+lib.free_bytes_array_result.argtypes = [POINTER(_CBytesArrayResult)]
+
 def cstring_checks(correct_content:str, data_to_test:c_char_p):
     """Checks that a c string is setup correctly"""
     assert data_to_test is not None # NULL check
@@ -399,3 +434,758 @@ def test_debugging_functions(capsys:pytest.CaptureFixture[str]):
     n = 1000
     test_input = [random.uniform(-1000.00, 1000.00) for _ in range(n)]
     print_float_array(test_input)
+
+def test_batch_functions():
+    # Test batch_call()/return_string_lengths()
+    for test_input in (
+        ["","Hello World!", "!@$#^%!#@@%*!", "AWDsadfSA", "\u2764", "\x41", "\n"],
+        [
+            random.choice(["Lorem", "ipsum", "dolor", "sit", "amet"]) 
+            for _ in range(100)
+        ],
+        [b"Here", b"are", b"some", b"other", b"strings"],
+        []):
+        expected = [len(item.encode()) if type(item) == str else len(item) for item in test_input]
+        assert return_string_lengths(test_input) == expected
+        assert batch_call(lib.return_string_lengths, test_input, str, int) == expected
+
+    # Test input and output types get mapped to the right arrays
+    n = 1000
+    test_input = [random.randint(-1000, 1000) for _ in range(n)]
+    assert batch_call(lib.return_int_array, test_input, int, int) == test_input
+
+    # Invalid types
+    with pytest.raises(ValueError):
+        batch_call(lib.return_string_lengths, ["a"], dict, int)
+
+    # Functions setup by the caller are left alone, or rejected if they're setup for other types
+    from lib import BACKEND
+    if BACKEND == "ctypes":
+        lib.return_float_array.argtypes = [POINTER(c_float), c_int]
+        lib.return_float_array.restype = POINTER(_CFloatArrayResult)
+        assert batch_call(lib.return_float_array, [1.5, -2.0], float, float) == [1.5, -2.0]
+        with pytest.raises(TypeError):
+            batch_call(lib.return_float_array, [1, 2], int, int)
+        assert lib.return_float_array.restype == POINTER(_CFloatArrayResult)
+
+        # Results are freed by the library the function comes from, which has to be given for functions from elsewhere
+        from ctypes import CFUNCTYPE, c_void_p
+        elsewhere = CFUNCTYPE(c_void_p, POINTER(c_int), c_int)(lambda data, number_of_elements: None)
+        with pytest.raises(TypeError):
+            batch_call(elsewhere, [1], int, int)
+        assert batch_call(lib.return_int_array, [1, 2], int, int, library=lib) == [1, 2]
+
+def test_backend_selection(monkeypatch:pytest.MonkeyPatch):
+    from lib import _select_backend, BACKEND
+    assert BACKEND in ("ctypes", "cffi")
+    assert _select_backend("ctypes") == "ctypes"
+    assert _select_backend(" CTYPES ") == "ctypes"
+    assert _select_backend("auto") in ("ctypes", "cffi")
+
+    # Invalid backends
+    for test_input in ("", "cython", "pybind11"):
+        with pytest.raises(ValueError):
+            _select_backend(test_input)
+
+    # Falls back to ctypes when cffi is missing
+    monkeypatch.setitem(sys.modules, "cffi", None)
+    with pytest.warns(UserWarning):
+        assert _select_backend("cffi") == "ctypes"
+    assert _select_backend("auto") == "ctypes"
+
+def test_cffi_backend(monkeypatch:pytest.MonkeyPatch):
+    pytest.importorskip("cffi")
+    import importlib.util
+    import lib as helpers
+
+    # A second copy of the module imported with the cffi backend, it loads the same library so Go's state is shared
+    monkeypatch.setenv("CGO_HELPERS_BACKEND", "cffi")
+    spec = importlib.util.spec_from_file_location("lib_cffi", helpers.__file__)
+    cffi_helpers = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(cffi_helpers)
+    assert cffi_helpers.BACKEND == "cffi"
+    go = cffi_helpers._library()
+
+    def reuse_freed_memory() -> list:
+        """Frees anything unreferenced and overwrites it, so strings that weren't kept alive read back wrong"""
+        gc.collect()
+        return [cffi_helpers._ffi.new("char[]", b"\xff" * size) for size in range(16) for _ in range(20)]
+
+    # prepare_* -> Go -> *_result_to_list, which frees the result
+    starting_buffers = go_memory_stats()["liveCBuffers"]
+    for prepare, export, to_list, test_input in (
+        (cffi_helpers.prepare_string_array, go.return_string_array, cffi_helpers.string_array_result_to_list, ["Lorem", "世界", ""]),
+        (cffi_helpers.prepare_int_array, go.return_int_array, cffi_helpers.int_array_result_to_list, [1, -2, 2**31 - 1]),
+        (cffi_helpers.prepare_float_array, go.return_float_array, cffi_helpers.float_array_result_to_list, [1.5, -2.25]),
+        (cffi_helpers.prepare_bool_array, go.return_bool_array, cffi_helpers.bool_array_result_to_list, [True, False, True]),
+        (cffi_helpers.prepare_int16_array, go.return_int16_array, cffi_helpers.int16_array_result_to_list, [-32768, 0, 32767]),
+        (cffi_helpers.prepare_nullable_string_array, go.return_nullable_string_array, cffi_helpers.nullable_string_array_result_to_list, ["a", None, ""]),
+        ):
+        arguments = prepare(test_input)
+        scratch = reuse_freed_memory() # The strings are only referenced through the pointer array
+        assert to_list(export(*arguments)) == test_input
+    arguments = cffi_helpers.prepare_bytes_array([b"\x00\x01", b""])
+    scratch = reuse_freed_memory()
+    assert [bytes(item) for item in cffi_helpers.bytes_array_result_to_list(go.return_bytes_array(*arguments), copy=True)] == [b"\x00\x01", b""]
+    assert cffi_helpers.return_string("Lorem ipsum") == "Lorem ipsum"
+
+    # Freeing by hand
+    cffi_helpers.free_int_array_result(go.return_int_array(*cffi_helpers.prepare_int_array([1])))
+    assert go_memory_stats()["liveCBuffers"] == starting_buffers
+
+def test_typed_number_functions():
+    # Test prepare_int64_array()/int64_array_result_to_list()
+    for test_input in (
+        [random.randint(-2**63, 2**63 - 1) for _ in range(1000)],
+        [0, 1, -1, 2**40],
+        []):
+        c_array, number_of_items = prepare_int64_array(test_input)
+        assert len(test_input) == number_of_items
+        assert c_array[:] == test_input
+        assert int64_array_result_to_list(lib.return_int64_array(c_array, number_of_items)) == test_input
+        assert return_int64_array(c_array, number_of_items) == test_input
+
+    # Test prepare_double_array()/double_array_result_to_list(), doubles should be exact
+    for test_input in (
+        [random.uniform(-1000.0, 1000.0) for _ in range(1000)],
+        [0.0, -790.5207366698761, 1e300],
+        []):
+        c_array, number_of_items = prepare_double_array(test_input)
+        assert len(test_input) == number_of_items
+        assert double_array_result_to_list(lib.return_double_array(c_array, number_of_items)) == test_input
+        assert return_double_array(c_array, number_of_items) == test_input
+
+    # Invalid input
+    with pytest.raises(TypeError):
+        prepare_int64_array(["A"])
+    with pytest.raises(TypeError):
+        prepare_double_array(["A"])
+    with pytest.raises(OverflowError):
+        prepare_int64_array([2**64])
+
+def test_buffer_pool():
+    enable_buffer_pool(True, 1024 * 1024)
+    try:
+        starting_stats = buffer_pool_stats()
+        assert starting_stats["maxRetainedBytes"] == 1024 * 1024
+
+        # Round trips should be served from the pool after the first one
+        n = 1000
+        test_input = [random.randint(-1000, 1000) for _ in range(n)]
+        for _ in range(10):
+            c_array, number_of_items = prepare_int_array(test_input)
+            assert int_array_result_to_list(lib.return_int_array(c_array, number_of_items)) == test_input
+        for _ in range(10):
+            assert return_string_lengths(["Lorem", "ipsum", "dolor"]) == [5, 5, 5]
+        stats = buffer_pool_stats()
+        assert stats["hits"] > starting_stats["hits"]
+        assert 0 < stats["retainedBytes"] <= stats["maxRetainedBytes"]
+        assert stats["retainedBuffers"] > 0
+
+        # Trimming releases everything
+        assert trim_buffer_pool() == stats["retainedBytes"]
+        stats = buffer_pool_stats()
+        assert stats["retainedBytes"] == stats["retainedBuffers"] == 0
+    finally:
+        enable_buffer_pool(False)
+    
+    # Disabled pools don't retain anything
+    c_array, number_of_items = prepare_int_array([1, 2, 3])
+    assert int_array_result_to_list(lib.return_int_array(c_array, number_of_items)) == [1, 2, 3]
+    assert buffer_pool_stats()["retainedBytes"] == 0
+
+    # Memory from C.malloc (i.e. in your own exports) isn't the pool's, the free functions pass it straight to C.free
+    if not platform().lower().startswith("windows"):
+        libc = cdll.LoadLibrary(None)
+        libc.malloc.restype = POINTER(c_int)
+        starting_buffers = go_memory_stats()["liveCBuffers"]
+        free_int_array(libc.malloc(1 << 20))
+        free_int_array(None)
+        assert go_memory_stats()["liveCBuffers"] == starting_buffers
+
+def test_go_memory_stats():
+    stats = go_memory_stats()
+    assert stats["heapAlloc"] > 0 and stats["sys"] > 0
+
+    # Buffers handed to C are live until they're freed
+    starting_buffers = stats["liveCBuffers"]
+    c_array, number_of_items = prepare_int_array([1, 2, 3])
+    pointer = lib.return_int_array(c_array, number_of_items)
+    assert go_memory_stats()["liveCBuffers"] == starting_buffers + 2
+    free_int_array_result(pointer)
+    assert go_memory_stats()["liveCBuffers"] == starting_buffers
+
+    # The debugging functions free everything they get back from Go
+    return_string("Lorem ipsum")
+    c_array, number_of_items = prepare_string_array(["Lorem", "ipsum", "dolor"])
+    return_string_array(c_array, number_of_items)
+    assert go_memory_stats()["liveCBuffers"] == starting_buffers
+
+def test_go_runtime_settings(tmp_path):
+    procs = set_gomaxprocs()
+    assert procs >= 1
+    assert set_gomaxprocs(1) == procs and set_gomaxprocs(procs) == 1
+    limit = set_memory_limit()
+    assert set_memory_limit(2**40) == limit and set_memory_limit(limit) == 2**40
+
+    # A tiny GC target makes Go collect (and pause) while it builds results
+    before = go_memory_stats()
+    percent = set_gc_percent(1)
+    try:
+        c_array, number_of_items = prepare_string_array(["Lorem", "ipsum", "dolor"] * 10_000)
+        for _ in range(5):
+            return_string_array(c_array, number_of_items)
+    finally:
+        assert set_gc_percent(percent) == 1
+    after = go_memory_stats()
+    assert after["numGC"] > before["numGC"] and after["pauseTotalNs"] > before["pauseTotalNs"]
+    assert after["maxPauseNs"] >= after["lastPauseNs"] > 0 and after["lastGC"] > 0
+    assert after["totalAlloc"] > before["totalAlloc"] and 0 <= after["gcCPUFraction"] < 1
+
+    # cgroup v2, where the process can be in a nested group
+    (tmp_path / "v2" / "app").mkdir(parents=True)
+    (tmp_path / "v2" / "app" / "cpu.max").write_text("150000 100000\n")
+    (tmp_path / "v2" / "app" / "memory.max").write_text("1073741824\n")
+    (tmp_path / "v2.cgroup").write_text("0::/app\n")
+    assert container_limits(str(tmp_path / "v2"), str(tmp_path / "v2.cgroup")) == {"cpus": 1.5, "memory": 1073741824}
+    (tmp_path / "v2" / "app" / "cpu.max").write_text("max 100000\n")
+    (tmp_path / "v2" / "app" / "memory.max").write_text("max\n")
+    assert container_limits(str(tmp_path / "v2"), str(tmp_path / "v2.cgroup")) == {"cpus": None, "memory": None}
+
+    # cgroup v1, with a separate folder per controller
+    (tmp_path / "v1" / "cpu").mkdir(parents=True)
+    (tmp_path / "v1" / "memory").mkdir()
+    (tmp_path / "v1" / "cpu" / "cpu.cfs_quota_us").write_text("100000\n")
+    (tmp_path / "v1" / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    (tmp_path / "v1" / "memory" / "memory.limit_in_bytes").write_text("536870912\n")
+    (tmp_path / "v1.cgroup").write_text("4:memory:/\n\nmalformed\n2:cpu\n1:cpu,cpuacct:/\n") # Lines without 3 fields are skipped
+    assert container_limits(str(tmp_path / "v1"), str(tmp_path / "v1.cgroup")) == {"cpus": 1.0, "memory": 536870912}
+    assert container_limits(str(tmp_path / "missing"), str(tmp_path / "missing.cgroup")) == {"cpus": None, "memory": None}
+
+    try:
+        assert tune_go_runtime(memory_fraction=0.25, root=str(tmp_path / "v1"), proc_file=str(tmp_path / "v1.cgroup")) == {"gomaxprocs": 1, "memoryLimit": 134217728}
+        assert set_gomaxprocs() == 1 and set_memory_limit() == 134217728
+    finally:
+        set_gomaxprocs(procs)
+        set_memory_limit(limit)
+    with pytest.raises(ValueError):
+        tune_go_runtime(memory_fraction=0)
+
+def test_soak_harness():
+    from soak import run_soak
+    report = run_soak(iterations=2000, sizes=[1, 100], min_iterations=200, samples=5, trace_python=False)
+    assert report["passed"], {name: result["failures"] for name, result in report["results"].items() if not result["passed"]}
+    assert len(report["results"]) == 2 * 23
+    for result in report["results"].values():
+        assert result["growth"]["live_c_buffers"] == 0
+        assert result["iterations_per_second"] > 0
+
+def test_thread_safety(monkeypatch:pytest.MonkeyPatch):
+    import threading
+    import lib as helpers
+
+    # Many threads racing to load the library only load (and setup) it once
+    loads = []
+    original_get_library = helpers.get_library
+    def counting_get_library(*args, **kwargs):
+        loads.append(threading.get_ident())
+        return original_get_library(*args, **kwargs)
+    monkeypatch.setattr(helpers, "get_library", counting_get_library)
+    monkeypatch.setattr(helpers, "_lib", None)
+
+    barrier = threading.Barrier(16)
+    libraries = []
+    def load():
+        barrier.wait()
+        libraries.append(helpers._library())
+    threads = [threading.Thread(target=load) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
+    assert len(libraries) == 16 and all(library is libraries[0] for library in libraries)
+    assert helpers.lib is libraries[0]
+
+    # Round trips from many threads at once get their own results, and free all of them
+    starting_buffers = go_memory_stats()["liveCBuffers"]
+    errors = []
+    def round_trips(seed:int):
+        try:
+            test_input = [seed * 1000 + i for i in range(100)]
+            strings = [f"{seed}-{i}" for i in range(100)]
+            for _ in range(200):
+                c_array, number_of_items = prepare_int_array(test_input)
+                assert int_array_result_to_list(helpers.lib.return_int_array(c_array, number_of_items)) == test_input
+                assert return_string_lengths(strings) == [len(item) for item in strings]
+                assert return_string(strings[0]) == strings[0]
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=round_trips, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+    assert go_memory_stats()["liveCBuffers"] == starting_buffers
+
+def test_bytes_array_functions():
+    import gc
+    test_input = [b"\x00\x01\x02", b"", bytearray(b"NUL\x00in the middle"), memoryview(b"view"), bytes(range(256)), random.randbytes(10_000)]
+
+    # Python -> C, bytes are not copied
+    c_array, lengths, number_of_items = prepare_bytes_array(test_input)
+    assert number_of_items == len(test_input)
+    assert list(lengths) == [len(item) for item in test_input]
+
+    for copy in (False, True):
+        starting_buffers = go_memory_stats()["liveCBuffers"]
+        c_array, lengths, number_of_items = prepare_bytes_array(test_input)
+        views = bytes_array_result_to_list(lib.return_bytes_array(c_array, lengths, number_of_items), copy=copy)
+        assert [bytes(view) for view in views] == [bytes(item) for item in test_input] # NUL bytes and binary data survive
+        assert all(type(view) == memoryview and view.readonly for view in views)
+        if copy:
+            assert go_memory_stats()["liveCBuffers"] == starting_buffers # Copied and freed straight away
+            continue
+
+        # Go's memory lives as long as any view (or slice of a view) does
+        assert go_memory_stats()["liveCBuffers"] == starting_buffers + 3
+        last_slice = views[-1][100:200]
+        del views
+        gc.collect()
+        assert go_memory_stats()["liveCBuffers"] == starting_buffers + 3
+        assert bytes(last_slice) == test_input[-1][100:200]
+        del last_slice
+        gc.collect()
+        assert go_memory_stats()["liveCBuffers"] == starting_buffers
+
+    # Empty arrays, and freeing by hand
+    assert return_bytes_array([]) == []
+    c_array, lengths, number_of_items = prepare_bytes_array([b"abc"])
+    free_bytes_array_result(lib.return_bytes_array(c_array, lengths, number_of_items))
+
+def test_compact_array_functions():
+    for n in (0, 1, 7, 8, 9, 1000):
+        # Bools are packed 8 per byte, least significant bit first
+        test_bools = [random.random() < 0.5 for _ in range(n)]
+        c_array, number_of_items = prepare_bool_array(test_bools)
+        assert number_of_items == n
+        assert len(bytes(c_array)) == (n + 7) // 8
+        if n:
+            assert bytes(c_array)[0] & 1 == test_bools[0]
+        assert bool_array_result_to_list(lib.return_bool_array(c_array, number_of_items)) == test_bools
+
+        test_uint8s = [random.randint(0, 255) for _ in range(n)]
+        c_array, number_of_items = prepare_uint8_array(test_uint8s)
+        assert uint8_array_result_to_list(lib.return_uint8_array(c_array, number_of_items)) == test_uint8s
+
+        test_int8s = [random.randint(-128, 127) for _ in range(n)]
+        c_array, number_of_items = prepare_int8_array(test_int8s)
+        assert int8_array_result_to_list(lib.return_int8_array(c_array, number_of_items)) == test_int8s
+
+        test_int16s = [random.randint(-32768, 32767) for _ in range(n)]
+        c_array, number_of_items = prepare_int16_array(test_int16s)
+        assert int16_array_result_to_list(lib.return_int16_array(c_array, number_of_items)) == test_int16s
+
+    # Ints from 0 to 255 are packed by truthiness, others are rejected instead of wrapping
+    c_array, number_of_items = prepare_bool_array([0, 1, 2, 255])
+    assert return_bool_array(c_array, number_of_items) == [False, True, True, True]
+    for invalid in ([300, 0], [-1]):
+        with pytest.raises(ValueError):
+            prepare_bool_array(invalid)
+
+    # Values that don't fit are rejected instead of wrapping
+    for prepare, value in ((prepare_uint8_array, 256), (prepare_uint8_array, -1), (prepare_int8_array, 128), (prepare_int16_array, 32768)):
+        with pytest.raises(OverflowError):
+            prepare([value])
+    with pytest.raises(TypeError):
+        prepare_bool_array([None])
+
+    # Freeing by hand
+    c_array, number_of_items = prepare_bool_array([True])
+    free_bool_array_result(lib.return_bool_array(c_array, number_of_items))
+    c_array, number_of_items = prepare_int16_array([1])
+    free_int16_array_result(lib.return_int16_array(c_array, number_of_items))
+
+def test_nullable_array_functions():
+    for n in (0, 1, 7, 8, 9, 1000):
+        test_ints = [None if random.random() < 0.3 else random.randint(-2**31, 2**31 - 1) for _ in range(n)]
+        c_array, validity, number_of_items = prepare_nullable_int_array(test_ints)
+        assert number_of_items == n
+        assert (validity is None) == (None not in test_ints)
+        if validity is not None:
+            # Bit i is set when value i is present, least significant bit first
+            assert len(bytes(validity)) == (n + 7) // 8
+            assert bytes(validity)[0] & 1 == (test_ints[0] is not None)
+        assert nullable_int_array_result_to_list(lib.return_nullable_int_array(c_array, validity, number_of_items)) == test_ints
+
+        test_floats = [None if random.random() < 0.3 else float(random.randint(-1000, 1000)) / 4 for _ in range(n)]
+        c_array, validity, number_of_items = prepare_nullable_float_array(test_floats)
+        assert nullable_float_array_result_to_list(lib.return_nullable_float_array(c_array, validity, number_of_items)) == test_floats
+
+        test_strings = [None if random.random() < 0.3 else random.choice(["", "Hello", "世界", b"bytes"]) for _ in range(n)]
+        c_array, validity, number_of_items = prepare_nullable_string_array(test_strings)
+        expected = [item.decode() if type(item) == bytes else item for item in test_strings]
+        assert nullable_string_array_result_to_list(lib.return_nullable_string_array(c_array, validity, number_of_items)) == expected
+
+    # None is not the same as 0 or ""
+    c_array, validity, number_of_items = prepare_nullable_int_array([0, None])
+    assert return_nullable_int_array(c_array, validity, number_of_items) == [0, None]
+    c_array, validity, number_of_items = prepare_nullable_string_array(["", None])
+    assert return_nullable_string_array(c_array, validity, number_of_items) == ["", None]
+
+    # Nothing missing means no bitmap
+    c_array, validity, number_of_items = prepare_nullable_float_array([1.0, 2.0])
+    assert validity is None
+    assert return_nullable_float_array(c_array, validity, number_of_items) == [1.0, 2.0]
+
+    with pytest.raises(OverflowError):
+        prepare_nullable_int_array([2**31, None])
+    with pytest.raises(TypeError):
+        prepare_nullable_int_array(["1", None])
+
+    # Freeing by hand
+    c_array, validity, number_of_items = prepare_nullable_int_array([1, None])
+    free_nullable_int_array_result(lib.return_nullable_int_array(c_array, validity, number_of_items))
+    c_array, validity, number_of_items = prepare_nullable_string_array(["a", None])
+    free_nullable_string_array_result(lib.return_nullable_string_array(c_array, validity, number_of_items))
+
+def test_streaming_functions():
+    for n in (0, 1, 9, 10, 11, 1000):
+        test_strings = [f"match {i}" for i in range(n)]
+        chunks = list(stream_string_array(test_strings, chunk_size=10))
+        # Every chunk is full except the last
+        assert [len(chunk) for chunk in chunks] == [10] * (n // 10) + ([n % 10] if n % 10 else [])
+        assert [item for chunk in chunks for item in chunk] == test_strings
+
+        test_ints = [random.randint(-1000, 1000) for _ in range(n)]
+        received = []
+        assert stream_int_array(test_ints, chunk_size=7, callback=received.extend) == n
+        assert received == test_ints
+
+    # Returning False from the callback cancels the stream at that chunk
+    received = []
+    assert stream_int_array(list(range(100)), chunk_size=10, callback=lambda chunk: received.extend(chunk) or len(received) < 30) == 30
+    assert received == list(range(30))
+
+    # Exceptions cancel the stream, and are raised once Go returns
+    def fail(chunk):
+        raise KeyError("Stop")
+    with pytest.raises(KeyError):
+        stream_int_array(list(range(100)), chunk_size=10, callback=fail)
+
+    # Stopping the iterator early cancels Go, even when it's blocked on a full queue
+    chunks = stream_int_array(list(range(100_000)), chunk_size=10, max_buffered_chunks=1)
+    assert next(chunks) == list(range(10))
+    chunks.close()
+
+    # Works with any export that takes (..., callback, context)
+    c_array, number_of_items = prepare_float_array([1.5, 2.5])
+    lib.return_float_array.argtypes = [POINTER(c_float), c_int]
+    with pytest.raises(ValueError):
+        stream_results(lib.return_float_array, c_array, number_of_items, output_type=bytes)
+
+def test_handle_functions():
+    before = handle_stats()
+    test_strings = ["Hello", "World", "世界", ""]
+    with upload_string_array(test_strings) as handle:
+        assert int(handle) != 0 and not handle.released
+        assert handle.nbytes >= len("".join(test_strings).encode())
+        stats = handle_stats()
+        assert stats["liveHandles"] == before["liveHandles"] + 1
+        assert stats["liveBytes"] == before["liveBytes"] + handle.nbytes
+
+        # The data stays in Go, and can be queried many times without re-sending it
+        for _ in range(3):
+            assert return_handle_string_array(handle) == test_strings
+            assert handle_string_lengths(handle) == return_string_lengths(test_strings)
+    assert handle.released and handle.nbytes == 0
+    assert handle_stats()["liveHandles"] == before["liveHandles"]
+
+    # Released handles (and handles of the wrong type) are rejected instead of crashing
+    with pytest.raises(ValueError):
+        return_handle_string_array(handle)
+    assert not handle.release() # Releasing twice is safe
+
+    int_handle = upload_int_array([1, 2, 3])
+    float_handle = upload_float_array([1.5, -2.5])
+    assert return_handle_int_array(int_handle) == [1, 2, 3]
+    assert return_handle_float_array(float_handle) == [1.5, -2.5]
+    with pytest.raises(ValueError):
+        return_handle_int_array(float_handle)
+    assert int_handle.release()
+
+    # Handles that are never released are released once they're garbage collected
+    del float_handle
+    gc.collect()
+    after = handle_stats()
+    assert after["liveHandles"] == before["liveHandles"]
+    assert after["uploads"] - before["uploads"] == after["releases"] - before["releases"] == 3
+
+def test_go_function_decorator():
+    @go_function()
+    def return_string_array(data: list[str]) -> list[str]: ...
+
+    @go_function(name="return_string_lengths")
+    def lengths(data: list[str]) -> list[int]: ...
+
+    @go_function()
+    def return_int_array(data: list[int]) -> list[int]: ...
+
+    @go_function()
+    def return_float_array(data: list[float]) -> list[float]: ...
+
+    @go_function()
+    def return_bool_array(data: list[bool]) -> list[bool]: ...
+
+    @go_function()
+    def return_nullable_string_array(data: list[str|None]) -> list[str|None]: ...
+
+    @go_function()
+    def return_bytes_array(data: list[bytes]) -> list[memoryview]: ...
+
+    @go_function()
+    def upload_int_array(data: list[int]) -> GoHandle: ...
+
+    @go_function()
+    def return_handle_int_array(handle: GoHandle) -> list[int]: ...
+
+    @go_function()
+    def return_string(text: str) -> str: ...
+
+    assert return_string_array.__name__ == "return_string_array" and lengths.__wrapped__.__name__ == "lengths"
+    test_strings = ["Hello", "World", "世界", ""]
+    assert return_string_array(test_strings) == test_strings
+    assert return_string_array(data=test_strings) == test_strings
+    assert lengths(test_strings) == [5, 5, 6, 0]
+    assert return_int_array([1, -2, 2**31 - 1]) == [1, -2, 2**31 - 1]
+    assert return_int_array([]) == []
+    assert return_float_array([1.5, -2.25]) == [1.5, -2.25]
+    assert return_bool_array([True, False, True]) == [True, False, True]
+    assert return_nullable_string_array(["a", None, "b"]) == ["a", None, "b"]
+    assert [bytes(item) for item in return_bytes_array([b"\x00\x01", b""])] == [b"\x00\x01", b""]
+    assert return_string("Lorem ipsum") == "Lorem ipsum"
+    with upload_int_array([4, 5, 6]) as handle:
+        assert return_handle_int_array(handle) == [4, 5, 6]
+
+    # Handles from another library are released (and sized) in that library, not this module's
+    from lib import BACKEND
+    if BACKEND == "ctypes":
+        @go_function(lib, name="upload_int_array")
+        def upload_elsewhere(data: list[int]) -> GoHandle: ...
+
+        handle = upload_elsewhere([4, 5, 6])
+        assert handle.library is lib and lib.handle_size.restype == c_longlong
+        assert handle.nbytes > 0 and return_handle_int_array(handle) == [4, 5, 6]
+        assert handle.release() and handle.nbytes == 0
+
+    # The plan checks values while converting them, instead of passing garbage to Go
+    with pytest.raises(TypeError):
+        return_string_array([b"bytes"])
+    with pytest.raises(TypeError):
+        return_int_array([1.5])
+    with pytest.raises(OverflowError):
+        return_int_array([2**31])
+    with pytest.raises(TypeError):
+        return_string_array(test_strings, test_strings)
+
+    # Signatures are checked once, when they're decorated
+    with pytest.raises(TypeError):
+        @go_function()
+        def unsupported(data: dict[str, int]) -> None: ...
+    with pytest.raises(TypeError):
+        @go_function()
+        def missing_hint(data) -> None: ...
+    with pytest.raises(TypeError):
+        @go_function()
+        def missing_return(data: list[int]): ...
+
+def test_go_cache():
+    cache = GoCache()
+
+    @go_function(cache=cache)
+    def return_string_lengths(data: list[str]) -> list[int]: ...
+
+    @cache
+    def upper(data: list[str]) -> list[str]:
+        calls.append(data)
+        return [item.upper() for item in data]
+
+    calls = []
+    assert return_string_lengths(["Lorem", "世界"]) == [5, 6]
+    result = return_string_lengths(["Lorem", "世界"]) # A different list with the same content hits
+    assert result == [5, 6]
+    result.append(0) # Results are copies, so changing them doesn't change the cache
+    assert return_string_lengths(["Lorem", "世界"]) == [5, 6]
+    assert upper(["a"]) == upper(data=["a"]) == upper(["a"]) == ["A"]
+    assert len(calls) == 2 # The keyword call is a separate entry
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (3, 3, 3) and 0 < stats["bytes"] <= stats["maxBytes"]
+
+    # Arguments that can't be hashed skip the cache
+    assert upper([bytearray(b"a")]) == [bytearray(b"A")] and cache.stats()["uncacheable"] == 1
+
+    # Reloading the library clears every cache
+    get_library(dll_file)
+    assert len(cache) == 0 and cache.stats()["invalidations"] == 1
+    assert return_string_lengths(["Lorem", "世界"]) == [5, 6] and cache.stats()["misses"] == 4
+
+    # Least recently used entries are evicted to stay under the limits
+    small = GoCache(max_entries=2)
+    repeat_upper = small(lambda data: [item.upper() for item in data])
+    repeat_upper(["a"]), repeat_upper(["b"]), repeat_upper(["a"]), repeat_upper(["c"]) # Evicts ["b"]
+    assert small.stats()["evictions"] == 1
+    repeat_upper(["a"])
+    repeat_upper(["b"])
+    assert small.stats()["hits"] == 2 and small.stats()["misses"] == 4
+    tiny = GoCache(max_bytes=1_000)
+    tiny_upper = tiny(lambda data: [item.upper() for item in data])
+    tiny_upper(["x" * 2_000]) # Bigger than the whole budget, so it's never stored
+    assert len(tiny) == 0
+    for item in "abcdefghij":
+        tiny_upper([item * 10])
+    assert len(tiny) < 10 and tiny.stats()["bytes"] <= 1_000 and tiny.stats()["evictions"] > 0
+
+    # Entries expire after the ttl
+    expiring = GoCache(ttl=0.05)
+    expiring_upper = expiring(lambda data: [item.upper() for item in data])
+    expiring_upper(["a"])
+    expiring_upper(["a"])
+    time.sleep(0.1)
+    expiring_upper(["a"])
+    assert expiring.stats()["expirations"] == 1 and expiring.stats()["hits"] == 1
+
+    # Keyword arguments (of any type) and mixed tuples are part of the key
+    keyed = GoCache()
+    @keyed
+    def repeat(text: str, times: int = 1, separator: str = "", pair: tuple = ()) -> str:
+        calls.append(text)
+        return separator.join([text] * times) + repr(pair)
+
+    calls.clear()
+    assert repeat("a", times=3) == repeat("a", times=3) == "aaa()"
+    assert repeat("a", times=2, separator="-") == "a-a()" and repeat("a", 3) == "aaa()"
+    assert repeat("a", pair=("b", 1, 2.5)) == repeat("a", pair=("b", 1, 2.5)) == "a('b', 1, 2.5)"
+    assert len(calls) == 4 and keyed.stats()["hits"] == 2
+
+    # Released handles skip the cache, so their stale results aren't served
+    import lib as helpers # upload_int_array is a local stub name below
+    @keyed
+    def handle_ints(handle: GoHandle) -> list[int]:
+        return helpers.return_handle_int_array(handle)
+
+    handle = helpers.upload_int_array([1, 2])
+    assert handle_ints(handle) == handle_ints(handle=handle) == [1, 2]
+    handle.release()
+    with pytest.raises(ValueError):
+        handle_ints(handle)
+    assert keyed.stats()["uncacheable"] == 1
+
+    with pytest.raises(TypeError): # Handles can't be shared through a cache
+        @go_function(cache=cache)
+        def upload_int_array(data: list[int]) -> GoHandle: ...
+    with pytest.raises(ValueError):
+        GoCache(max_bytes=0)
+
+def test_profiling_functions(tmp_path):
+    profile_path = str(tmp_path / "default.pgo")
+    with pytest.raises(RuntimeError):
+        stop_cpu_profile()
+    start_cpu_profile(profile_path)
+    try:
+        with pytest.raises(RuntimeError):
+            start_cpu_profile(profile_path)
+        c_array, number_of_items = prepare_string_array(["Lorem", "ipsum", "世界"] * 10_000)
+        for _ in range(20):
+            return_string_array(c_array, number_of_items)
+    finally:
+        stop_cpu_profile()
+    assert os.path.getsize(profile_path) > 0
+    with pytest.raises(RuntimeError):
+        start_cpu_profile(str(tmp_path / "missing" / "default.pgo"))
+
+    # Snapshot profiles and execution traces
+    write_profile("heap", str(tmp_path / "heap.pprof"))
+    assert os.path.getsize(tmp_path / "heap.pprof") > 0
+    with pytest.raises(RuntimeError):
+        write_profile("missing", str(tmp_path / "missing.pprof"))
+    with pytest.raises(RuntimeError):
+        stop_trace()
+    capture_trace(str(tmp_path / "window.out"), 0.05)
+    assert os.path.getsize(tmp_path / "window.out") > 0
+
+    with go_profile(str(tmp_path / "request"), trace=True) as paths:
+        with pytest.raises(RuntimeError): # Go has one profiler, so blocks can't be nested
+            with go_profile(str(tmp_path / "nested")):
+                pass
+        return_string_array(c_array, number_of_items)
+    assert sorted(paths) == ["allocs", "cpu", "goroutine", "heap", "trace"]
+    assert all(os.path.getsize(path) > 0 for path in paths.values())
+
+    # Everything is stopped if the block fails, so profiling can start again
+    with pytest.raises(KeyError):
+        with go_profile(str(tmp_path / "failed"), trace=True):
+            raise KeyError("request failed")
+    with go_profile(str(tmp_path / "after"), profiles=()) as paths:
+        pass
+    assert list(paths) == ["cpu"]
+
+    # Build flags are configurable, and a profile turns on profile-guided optimization
+    assert _build_command("lib.so") == ["go", "build", *DEFAULT_BUILD_FLAGS, "-buildmode=c-shared", "-o", "lib.so"]
+    command = _build_command("lib.so", ["-trimpath"], "default.pgo")
+    assert command == ["go", "build", "-trimpath", "-pgo=default.pgo", "-buildmode=c-shared", "-o", "lib.so"]
+    with pytest.raises(ValueError):
+        get_library(str(tmp_path / "missing.so"))
+
+def test_msgpack_functions(monkeypatch:pytest.MonkeyPatch):
+    import math
+    import lib as helpers
+    test_input = {
+        "name": "widget", "long": "世界" * 100, "nothing": None, "flags": [True, False], "data": b"\x00\x01",
+        "scores": [1.5, -2.25, math.inf], "ints": [0, -1, -32, -33, -129, 128, 65_536, 2**63 - 1, -2**63, 2**64 - 1],
+        "nested": {"empty": {}, "list": [[]], 1: "int keys"},
+    }
+
+    # The msgpack package (if it's installed) and the pure python codec produce the same bytes
+    encodings = set()
+    for codec in {None, helpers._msgpack}:
+        monkeypatch.setattr(helpers, "_msgpack", codec)
+        encoded = encode_msgpack(test_input)
+        encodings.add(encoded)
+        assert decode_msgpack(encoded) == test_input
+        assert decode_msgpack(memoryview(bytearray(encoded))) == test_input
+        assert encode_msgpack([1, "a", None]) == b"\x93\x01\xa1a\xc0" # fixarray, fixint, fixstr, nil
+        assert decode_msgpack(encode_msgpack((1, (2, bytearray(b"3"))))) == [1, [2, b"3"]]
+
+        # Invalid data and unsupported values
+        for invalid in (encoded[:-1], encoded + b"\x00", b"\xc1", b"\xd9\x05ab", b"\x81\x91\x01\x02", b"\xa1\xff", b"\xd4\x01\x02", b"\x91" * 5000 + b"\xc0"):
+            with pytest.raises(ValueError):
+                decode_msgpack(invalid)
+        with pytest.raises(TypeError):
+            encode_msgpack({1, 2})
+        with pytest.raises(OverflowError):
+            encode_msgpack(2**64)
+        with pytest.raises(OverflowError):
+            encode_msgpack(-2**63 - 1)
+    assert len(encodings) == 1
+
+    # Through Go's dynamic values
+    assert msgpack_roundtrip(test_input) == test_input
+    assert math.isnan(msgpack_roundtrip(math.nan))
+
+    # Records are decoded into Go structs, so every field comes back and unknown keys are dropped
+    records = [{"name": "a", "scores": [0.5], "tags": {"x": 1}, "extra": True, "children": [{"NAME": "b", "scores": [1]}]}]
+    assert msgpack_records_roundtrip(records) == [
+        {"name": "a", "scores": [0.5], "tags": {"x": 1}, "children": [{"name": "b", "scores": [1.0], "tags": None, "children": None}]},
+    ]
+    with pytest.raises(ValueError):
+        msgpack_records_roundtrip([{"scores": ["not a number"]}])
+    with pytest.raises(ValueError):
+        msgpack_result_to_object(None)
+    # Lengths far past the data, and nesting past Go's depth limit
+    for invalid in (b"\xdc\xff\xff", b"\xdd\xff\xff\xff\xff", b"\xde\xff\xff", b"\xdf\xff\xff\xff\xff", b"\x91" * (1 << 20) + b"\xc0"):
+        with pytest.raises(ValueError):
+            msgpack_result_to_object(helpers._library().msgpack_roundtrip(invalid, len(invalid)))
+        with pytest.raises(ValueError):
+            msgpack_result_to_object(helpers._library().msgpack_records_roundtrip(invalid, len(invalid)))
+    assert json_roundtrip({"a": [1, "b", None]}) == {"a": [1, "b", None]}